@@ -16,10 +16,27 @@ class ChatResponse {
   });
 }
 
+/// Event from the streaming chat endpoint (Server-Sent Events)
+/// - metadata: intent/language as soon as NLU finishes
+/// - token: response text chunk
+/// - done: final response (same fields as the JSON endpoint)
+/// - error: processing failed
+class ChatStreamEvent {
+  final String event;
+  final Map<String, dynamic> data;
+
+  ChatStreamEvent(this.event, this.data);
+}
+
 class ChatService {
   // Read the value from .env
   final String baseUrl = dotenv.env['APIKEY'] ?? "";
 
+  // Optional streaming (SSE) endpoint - falls back to baseUrl when not set
+  final String streamUrl = dotenv.env['STREAM_APIKEY'] ?? "";
+
+  bool get supportsStreaming => streamUrl.isNotEmpty;
+
   /// Detect channel based on platform
   /// - Web (Chrome): requires PIN verification
   /// - Mobile (iOS/Android): skip PIN (user authenticated via app)
@@ -77,4 +94,59 @@ class ChatService {
           "Failed: ${response.statusCode} - ${response.body}");
     }
   }
+
+  /// Send a message to the streaming endpoint and yield SSE events as they arrive.
+  /// NOTE: On Flutter web the browser client buffers the body, so events arrive together.
+  Stream<ChatStreamEvent> streamMessage(
+    String userMessage, {
+    required String phoneNumber,
+    String? sessionId,
+  }) async* {
+    final body = {
+      "message": userMessage,
+      "phone_number": phoneNumber,
+      "channel": _channel,
+    };
+
+    if (sessionId != null) {
+      body["session_id"] = sessionId;
+    }
+
+    final request = http.Request('POST', Uri.parse(streamUrl))
+      ..headers["Content-Type"] = "application/json"
+      ..headers["Accept"] = "text/event-stream"
+      ..body = jsonEncode(body);
+
+    final client = http.Client();
+    try {
+      final response = await client.send(request);
+
+      if (response.statusCode != 200) {
+        final errorBody = await response.stream.bytesToString();
+        throw Exception("Failed: ${response.statusCode} - $errorBody");
+      }
+
+      // Parse SSE frames: "event: <name>" + "data: <json>" terminated by a blank line
+      String eventName = "message";
+      final dataLines = <String>[];
+
+      await for (final line in response.stream
+          .transform(utf8.decoder)
+          .transform(const LineSplitter())) {
+        if (line.isEmpty) {
+          if (dataLines.isNotEmpty) {
+            yield ChatStreamEvent(eventName, jsonDecode(dataLines.join("\n")));
+          }
+          eventName = "message";
+          dataLines.clear();
+        } else if (line.startsWith("event:")) {
+          eventName = line.substring(6).trim();
+        } else if (line.startsWith("data:")) {
+          dataLines.add(line.substring(5).trim());
+        }
+      }
+    } finally {
+      client.close();
+    }
+  }
 }
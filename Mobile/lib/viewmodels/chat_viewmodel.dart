@@ -48,6 +48,12 @@ class ChatViewModel extends ChangeNotifier {
     isLoading = true;
     notifyListeners();
 
+    // Stream the reply token by token when the SSE endpoint is configured
+    if (_chatService.supportsStreaming) {
+      await _sendMessageStreaming(msg);
+      return;
+    }
+
     try {
       // Pass session_id to continue the conversation
       ChatResponse response = await _chatService.sendMessage(
@@ -76,4 +82,56 @@ class ChatViewModel extends ChangeNotifier {
     isLoading = false;
     notifyListeners();
   }
+
+  Future<void> _sendMessageStreaming(String msg) async {
+    final buffer = StringBuffer();
+    int? replyIndex;
+
+    // Show the reply bubble as soon as the first token arrives
+    void showReply(String text, {List<Map<String, String>>? cards}) {
+      final reply = ChatMessage(message: text, isUser: false, cards: cards);
+      if (replyIndex == null) {
+        messages.add(reply);
+        replyIndex = messages.length - 1;
+      } else {
+        messages[replyIndex!] = reply;
+      }
+      isLoading = false;
+      notifyListeners();
+    }
+
+    try {
+      await for (final event in _chatService.streamMessage(
+        msg,
+        phoneNumber: phoneNumber,
+        sessionId: _sessionId,
+      )) {
+        switch (event.event) {
+          case "metadata":
+            // Store session_id early so a quick follow-up (e.g. PIN) continues the session
+            _sessionId = event.data["session_id"] ?? _sessionId;
+            break;
+          case "token":
+            buffer.write(event.data["text"] ?? "");
+            showReply(buffer.toString());
+            break;
+          case "done":
+            _sessionId = event.data["session_id"] ?? _sessionId;
+            // AUTO SHOW PLANS (not from API)
+            showReply(
+              (event.data["message"] ?? buffer.toString()).toString(),
+              cards: prepaidPlans,
+            );
+            break;
+          case "error":
+            throw Exception(event.data["message"] ?? event.data["error"]);
+        }
+      }
+    } catch (e) {
+      messages.add(ChatMessage(message: "Error: $e", isUser: false));
+    }
+
+    isLoading = false;
+    notifyListeners();
+  }
 }
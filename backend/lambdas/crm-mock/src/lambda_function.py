@@ -5,12 +5,39 @@ This Lambda simulates CRM API calls for voicemail management:
 1. Activate voicemail
 2. Deactivate voicemail
 3. Check voicemail status
+4. Any of the above for a batch of phone numbers (bulk)
 
 CRITICAL: Implements idempotency to prevent duplicate operations.
 
+Each activate/deactivate claims an idempotency record keyed by
+"session_id:action" (item "IDEMPOTENCY#<session_id>:<action>", turn 0) with
+a conditional put (attribute_not_exists). The record stores the result and
+expires by TTL. A retry, in any later turn, costs one conditional write: the
+failed condition returns the stored record, so its result is replayed
+without a read. A claim left "in_progress" by a crashed invocation can be
+taken over after IDEMPOTENCY_LEASE_SECONDS.
+
+By default the customer update and the completed idempotency record are
+written in one TransactWriteItems call: one round trip, and a crash can no
+longer leave the customer updated without its record (or the reverse).
+Backends without transactions (e.g. some local DynamoDB stand-ins) are
+detected on the first call and fall back to claim -> update -> mark.
+
+Bulk mode splits the phone numbers into chunks that run in parallel on
+BULK_EXECUTOR. A status chunk is one BatchGetItem (100 keys). An update
+chunk of CRM_BULK_CHUNK_SIZE numbers is one transaction with every
+customer update and idempotency record ("<batch_id>:<phone_number>" as the
+session), so each number is still changed at most once per batch_id.
+
 Environment Variables:
     DYNAMODB_CUSTOMERS_TABLE: Customer data table
-    IDEMPOTENCY_TABLE: Table for tracking completed operations (chatbot-sessions)
+    IDEMPOTENCY_TABLE: Table for idempotency records, sessions key schema (default: chatbot-sessions)
+    IDEMPOTENCY_TTL_HOURS: How long a completed operation is remembered (default: 24)
+    IDEMPOTENCY_LEASE_SECONDS: Age after which an unfinished claim is taken over (default: 30)
+    CRM_TRANSACTIONS_ENABLED: Write the update and idempotency record in one transaction (default: true)
+    CRM_BULK_MAX_ITEMS: Largest accepted bulk request (default: 1000)
+    CRM_BULK_CHUNK_SIZE: Phone numbers per update transaction (default: 25, at most 50)
+    CRM_BULK_CONCURRENCY: Chunks in flight per bulk request (default: 10)
     REGION: AWS region
 
 Input Event:
@@ -31,64 +58,167 @@ Output:
         "idempotent": false,  # true if already processed
         "error": "error message if failed"
     }
+
+Bulk Input Event:
+    {
+        "action": "bulk",
+        "operation": "deactivate" | "activate" | "check_status",
+        "phone_numbers": ["+60123456789", ...],   # at most CRM_BULK_MAX_ITEMS
+        "batch_id": "MIGRATION-2024-12-07"        # For idempotency (activate/deactivate)
+    }
+
+Bulk Output:
+    {
+        "success": true,
+        "action": "bulk_deactivate",
+        "results": [{"phone_number": "+60123456789", <result as above, no customer_id>}, ...],  # input order
+        "stats": {"items": 3, "unique": 3, "chunks": 1, "succeeded": 3, "idempotent": 0, "errors": 0},
+        "timestamp": "2024-12-07T15:30:00Z"
+    }
 """
 
 import json
-import boto3
 import os
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import Dict, Any, Optional
-from aws_xray_sdk.core import xray_recorder
+from typing import Dict, Any, List, Optional, Tuple
+
+# Shared helpers from the chatbot-core layer (X-Ray shim, lazy AWS clients)
+from chatbot_core import lazy_resource, xray_recorder, envelope
 
-# Initialize AWS clients
-dynamodb = boto3.resource('dynamodb', region_name=os.environ.get('REGION', 'ap-southeast-1'))
+# AWS clients are created on first use, not at import time
+dynamodb = lazy_resource('dynamodb')
 
 # Configuration
 CUSTOMERS_TABLE = os.environ.get('DYNAMODB_CUSTOMERS_TABLE', 'chatbot-customers')
 IDEMPOTENCY_TABLE = os.environ.get('IDEMPOTENCY_TABLE', 'chatbot-sessions')
+IDEMPOTENCY_TTL_HOURS = int(os.environ.get('IDEMPOTENCY_TTL_HOURS', '24'))
+IDEMPOTENCY_LEASE_SECONDS = int(os.environ.get('IDEMPOTENCY_LEASE_SECONDS', '30'))
+CRM_TRANSACTIONS_ENABLED = os.environ.get('CRM_TRANSACTIONS_ENABLED', 'true').lower() == 'true'
+
+# Error codes of backends that do not implement TransactWriteItems
+TRANSACTIONS_UNSUPPORTED_CODES = {'UnknownOperationException', 'NotImplementedException', 'NotImplemented'}
+
+# Cleared on the first unsupported-operation error (per container)
+_transactions_supported = True
+
+# Bulk mode: numbers per request, per update transaction (2 of the 100
+# actions each) and chunks in flight (the default boto3 connection pool is 10)
+CRM_BULK_MAX_ITEMS = int(os.environ.get('CRM_BULK_MAX_ITEMS', '1000'))
+CRM_BULK_CHUNK_SIZE = min(50, max(1, int(os.environ.get('CRM_BULK_CHUNK_SIZE', '25'))))
+CRM_BULK_CONCURRENCY = int(os.environ.get('CRM_BULK_CONCURRENCY', '10'))
+BATCH_GET_MAX_KEYS = 100
+BATCH_GET_MAX_ATTEMPTS = 5
+
+# Reused across warm invocations for the chunks of a bulk request
+BULK_EXECUTOR = ThreadPoolExecutor(max_workers=max(1, CRM_BULK_CONCURRENCY))
 
 
-@xray_recorder.capture("check_idempotency")
-def check_idempotency(session_id: str, action: str) -> Optional[Dict[str, Any]]:
+def idempotency_record_key(session_id: str, action: str) -> Dict[str, Any]:
+    """Key of the idempotency record for an operation (sessions table key schema)."""
+    return {'session_id': f"IDEMPOTENCY#{session_id}:{action}", 'turn_number': 0}
+
+
+def _deserialize(item: Dict[str, Any]) -> Dict[str, Any]:
+    """Low-level DynamoDB item (as returned with a failed condition) to Python values."""
+    from boto3.dynamodb.types import TypeDeserializer
+
+    deserializer = TypeDeserializer()
+    return {name: deserializer.deserialize(value) for name, value in item.items()}
+
+
+def _replay(existing: Dict[str, Any], session_id: str, action: str) -> Dict[str, Any]:
+    """Result for a request whose idempotency record already exists."""
+    idempotency_key = f"{session_id}:{action}"
+    if existing.get('status') == 'completed':
+        print(f"[IDEMPOTENT] Request detected: {idempotency_key}")
+        # Return cached result
+        return dict(existing.get('crm_result', {
+            "success": True,
+            "message": "Operation already completed"
+        }), idempotent=True)
+
+    print(f"[IDEMPOTENT] Operation in progress: {idempotency_key}")
+    return {
+        "success": False,
+        "action": action,
+        "error": "Operation already in progress",
+        "in_progress": True,
+        "idempotent": True,
+        "timestamp": datetime.utcnow().isoformat()
+    }
+
+
+def _customer_not_found(action: str) -> Dict[str, Any]:
+    """Result for an update of a phone number without a customer record."""
+    return {
+        "success": False,
+        "action": action,
+        "error": "Customer not found",
+        "timestamp": datetime.utcnow().isoformat()
+    }
+
+
+@xray_recorder.capture("claim_operation")
+def claim_operation(session_id: str, action: str) -> Optional[Dict[str, Any]]:
     """
-    Check if this operation was already completed (idempotency).
+    Claim an operation for this invocation (idempotency).
+
+    One conditional put of an "in_progress" record. If the record already
+    exists, the failed condition returns it and nothing else is read.
 
     Args:
         session_id: Session ID
         action: CRM action (e.g., "deactivate_voicemail")
 
     Returns:
-        Previous result if operation already completed, None otherwise
+        None if this invocation owns the operation (run it, then
+        mark_operation_completed or release_operation), otherwise the result
+        to return: the cached result, or an in-progress error for a
+        concurrent duplicate
     """
+    idempotency_key = f"{session_id}:{action}"
+    now = int(time.time())
     try:
-        idempotency_key = f"{session_id}:{action}"
-
-        # Query session table for this exact operation
-        sessions_table = dynamodb.Table(IDEMPOTENCY_TABLE)
-        response = sessions_table.query(
-            KeyConditionExpression='session_id = :sid',
-            ExpressionAttributeValues={':sid': session_id},
-            ScanIndexForward=False,
-            Limit=1
-        )
-
-        if 'Items' in response and len(response['Items']) > 0:
-            session = response['Items'][0]
-            completed_action = session.get('crm_action_completed')
-
-            if completed_action == idempotency_key:
-                print(f"[IDEMPOTENT] Request detected: {idempotency_key}")
-                # Return cached result
-                return session.get('crm_result', {
-                    "success": True,
-                    "message": "Operation already completed",
-                    "idempotent": True
-                })
-
-        return None
+        idempotency_table = dynamodb.Table(IDEMPOTENCY_TABLE)
+        conditional_check_failed = idempotency_table.meta.client.exceptions.ConditionalCheckFailedException
+        item = {
+            **idempotency_record_key(session_id, action),
+            'idempotency_key': idempotency_key,
+            'status': 'in_progress',
+            'claimed_at': now,
+            'ttl': now + IDEMPOTENCY_TTL_HOURS * 3600
+        }
+        try:
+            idempotency_table.put_item(
+                Item=item,
+                ConditionExpression='attribute_not_exists(session_id)',
+                ReturnValuesOnConditionCheckFailure='ALL_OLD'
+            )
+            return None
+        except conditional_check_failed as e:
+            existing = _deserialize(e.response.get('Item', {}))
+
+        # Unfinished claim: another invocation is running it, or crashed
+        claimed_at = int(existing.get('claimed_at', 0))
+        if existing.get('status') != 'completed' and now - claimed_at >= IDEMPOTENCY_LEASE_SECONDS:
+            try:
+                idempotency_table.put_item(
+                    Item=item,
+                    ConditionExpression='#status = :in_progress AND claimed_at = :claimed_at',
+                    ExpressionAttributeNames={'#status': 'status'},
+                    ExpressionAttributeValues={':in_progress': 'in_progress', ':claimed_at': claimed_at}
+                )
+                print(f"[WARN] Took over stale claim for {idempotency_key} ({now - claimed_at}s old)")
+                return None
+            except conditional_check_failed:
+                pass
+
+        return _replay(existing, session_id, action)
 
     except Exception as e:
-        print(f"[WARN] Error checking idempotency: {e}")
+        print(f"[WARN] Error claiming idempotency record: {e}")
         # On error, proceed with operation (fail open)
         return None
 
@@ -96,7 +226,7 @@ def check_idempotency(session_id: str, action: str) -> Optional[Dict[str, Any]]:
 @xray_recorder.capture("mark_completed")
 def mark_operation_completed(session_id: str, action: str, result: Dict[str, Any]) -> bool:
     """
-    Mark operation as completed for idempotency tracking.
+    Store the result on the claimed idempotency record.
 
     Args:
         session_id: Session ID
@@ -107,94 +237,265 @@ def mark_operation_completed(session_id: str, action: str, result: Dict[str, Any
         Success status
     """
     try:
-        idempotency_key = f"{session_id}:{action}"
-        sessions_table = dynamodb.Table(IDEMPOTENCY_TABLE)
-
-        # Get current session to update
-        response = sessions_table.query(
-            KeyConditionExpression='session_id = :sid',
-            ExpressionAttributeValues={':sid': session_id},
-            ScanIndexForward=False,
-            Limit=1
+        idempotency_table = dynamodb.Table(IDEMPOTENCY_TABLE)
+        idempotency_table.update_item(
+            Key=idempotency_record_key(session_id, action),
+            UpdateExpression="SET #status = :completed, crm_result = :result, #ttl = :ttl",
+            ExpressionAttributeNames={'#status': 'status', '#ttl': 'ttl'},
+            ExpressionAttributeValues={
+                ':completed': 'completed',
+                ':result': result,
+                ':ttl': int(time.time()) + IDEMPOTENCY_TTL_HOURS * 3600
+            }
         )
 
-        if 'Items' in response and len(response['Items']) > 0:
-            session = response['Items'][0]
-
-            sessions_table.update_item(
-                Key={
-                    'session_id': session_id,
-                    'turn_number': session['turn_number']
-                },
-                UpdateExpression="SET crm_action_completed = :key, crm_result = :result",
-                ExpressionAttributeValues={
-                    ':key': idempotency_key,
-                    ':result': result
-                }
-            )
-
-            print(f"[OK] Marked operation as completed: {idempotency_key}")
-            return True
-
-        return False
+        print(f"[OK] Marked operation as completed: {session_id}:{action}")
+        return True
 
     except Exception as e:
         print(f"[WARN] Error marking operation completed: {e}")
         return False
 
 
-@xray_recorder.capture("deactivate_voicemail")
-def deactivate_voicemail(phone_number: str, customer_id: str, session_id: str) -> Dict[str, Any]:
+@xray_recorder.capture("release_operation")
+def release_operation(session_id: str, action: str) -> None:
+    """Drop the claim of a failed operation so a retry can run it."""
+    try:
+        dynamodb.Table(IDEMPOTENCY_TABLE).delete_item(Key=idempotency_record_key(session_id, action))
+    except Exception as e:
+        print(f"[WARN] Error releasing idempotency record: {e}")
+
+
+class TransactionsUnsupported(Exception):
+    """The DynamoDB backend does not implement TransactWriteItems."""
+
+
+def _voicemail_transact_items(
+    phone_number: str,
+    session_id: str,
+    action: str,
+    active: bool,
+    result: Dict[str, Any],
+    now: int
+) -> List[Dict[str, Any]]:
+    """Conditional customer update (existing customers only) and completed-record put for one phone number."""
+    return [
+        {'Update': {
+            'TableName': CUSTOMERS_TABLE,
+            'Key': {'phone_number': phone_number},
+            'UpdateExpression': "SET voicemail_active = :active, updated_at = :timestamp",
+            'ConditionExpression': 'attribute_exists(phone_number)',
+            'ExpressionAttributeValues': {':active': active, ':timestamp': result['timestamp']}
+        }},
+        {'Put': {
+            'TableName': IDEMPOTENCY_TABLE,
+            'Item': {
+                **idempotency_record_key(session_id, action),
+                'idempotency_key': f"{session_id}:{action}",
+                'status': 'completed',
+                'crm_result': result,
+                'claimed_at': now,
+                'ttl': now + IDEMPOTENCY_TTL_HOURS * 3600
+            },
+            'ConditionExpression': 'attribute_not_exists(session_id) OR '
+                                   '(#status = :in_progress AND claimed_at <= :stale)',
+            'ExpressionAttributeNames': {'#status': 'status'},
+            'ExpressionAttributeValues': {':in_progress': 'in_progress', ':stale': now - IDEMPOTENCY_LEASE_SECONDS},
+            'ReturnValuesOnConditionCheckFailure': 'ALL_OLD'
+        }}
+    ]
+
+
+@xray_recorder.capture("transact_voicemail_updates")
+def transact_voicemail_updates(
+    updates: List[Tuple[str, str, Dict[str, Any]]],
+    action: str,
+    active: bool
+) -> List[Optional[Dict[str, Any]]]:
     """
-    Deactivate voicemail for customer.
+    Apply voicemail changes and write their completed idempotency records atomically.
+
+    One TransactWriteItems call for all updates. The record puts are
+    conditional (no record yet, or a stale claim left by the fallback path),
+    so a duplicate cancels the whole transaction and gets its stored record
+    back. Its result is replayed, and the other updates are written again
+    without it. The same goes for a phone number without a customer record
+    (the customer update is conditional): it gets "Customer not found".
+
+    Args:
+        updates: (phone_number, session_id, result to cache) per change
+        action: CRM action
+        active: New voicemail state
+
+    Returns:
+        Per update, None if the change was applied, otherwise the result to
+        return (cached result, in-progress error, or customer not found)
+
+    Raises:
+        TransactionsUnsupported: The backend has no transactions (nothing was written)
+    """
+    global _transactions_supported
+
+    client = dynamodb.meta.client
+    outcomes: List[Optional[Dict[str, Any]]] = [None] * len(updates)
+    pending = list(range(len(updates)))
+    while pending:
+        now = int(time.time())
+        try:
+            client.transact_write_items(TransactItems=[
+                item
+                for index in pending
+                for item in _voicemail_transact_items(updates[index][0], updates[index][1], action, active,
+                                                      updates[index][2], now)
+            ])
+            return outcomes
+
+        except client.exceptions.TransactionCanceledException as e:
+            # Two actions per update: the customer update, then the record put
+            reasons = e.response.get('CancellationReasons', [])
+            settled = set()
+            for position, index in enumerate(pending):
+                update, put = (reasons[2 * position:2 * position + 2] + [{}, {}])[:2]
+                if put.get('Code') == 'ConditionalCheckFailed':
+                    outcomes[index] = _replay(_deserialize(put.get('Item', {})), updates[index][1], action)
+                elif update.get('Code') == 'ConditionalCheckFailed':
+                    print(f"[WARN] Customer not found: {updates[index][0]}")
+                    outcomes[index] = _customer_not_found(action)
+                else:
+                    continue
+                settled.add(index)
+            if not settled:
+                raise
+            pending = [index for index in pending if index not in settled]
+
+        except Exception as e:
+            if getattr(e, 'response', {}).get('Error', {}).get('Code') in TRANSACTIONS_UNSUPPORTED_CODES:
+                print(f"[WARN] Transactions not supported by {IDEMPOTENCY_TABLE} backend, falling back: {e}")
+                _transactions_supported = False
+                raise TransactionsUnsupported() from e
+            raise
+
+    return outcomes
+
+
+def transact_voicemail_update(
+    phone_number: str,
+    session_id: str,
+    action: str,
+    active: bool,
+    result: Dict[str, Any]
+) -> Optional[Dict[str, Any]]:
+    """
+    Apply one voicemail change and its completed idempotency record atomically.
+
+    Args:
+        phone_number: Customer phone number
+        session_id: Session ID
+        action: CRM action
+        active: New voicemail state
+        result: Operation result to cache
+
+    Returns:
+        None if the change was applied, otherwise the result to return
+        (cached result, in-progress error, or customer not found)
+
+    Raises:
+        TransactionsUnsupported: The backend has no transactions (nothing was written)
+    """
+    return transact_voicemail_updates([(phone_number, session_id, result)], action, active)[0]
+
+
+def voicemail_result(customer_id: Optional[str], active: bool) -> Dict[str, Any]:
+    """Successful activate/deactivate result (cached in the idempotency record).
+
+    Bulk updates do not know the customer ID (a transaction returns no
+    attributes), so their results carry no customer_id.
+    """
+    result = {
+        "success": True,
+        "action": "activate_voicemail" if active else "deactivate_voicemail",
+        "customer_id": customer_id,
+        "voicemail_status": "active" if active else "inactive",
+        "timestamp": datetime.utcnow().isoformat(),
+        "idempotent": False
+    }
+    if customer_id is None:
+        del result['customer_id']
+    return result
+
+
+def update_voicemail(phone_number: str, customer_id: str, session_id: str, active: bool) -> Dict[str, Any]:
+    """
+    Set voicemail on or off for customer, at most once per session and action.
 
     Args:
         phone_number: Customer phone number
         customer_id: Customer ID
         session_id: Session ID
+        active: New voicemail state
 
     Returns:
         Operation result
     """
-    action = "deactivate_voicemail"
+    action = "activate_voicemail" if active else "deactivate_voicemail"
+    verb = "activating" if active else "deactivating"
+    result = voicemail_result(customer_id, active)
+
+    if CRM_TRANSACTIONS_ENABLED and _transactions_supported:
+        try:
+            cached_result = transact_voicemail_update(phone_number, session_id, action, active, result)
+            if cached_result:
+                return cached_result
+
+            print(f"[OK] {'Activated' if active else 'Deactivated'} voicemail for customer {customer_id}")
+            return result
+
+        except TransactionsUnsupported:
+            pass
+
+        except Exception as e:
+            print(f"[ERROR] Error {verb} voicemail: {e}")
+            return {
+                "success": False,
+                "action": action,
+                "error": str(e),
+                "timestamp": datetime.utcnow().isoformat()
+            }
 
-    # Check idempotency
-    cached_result = check_idempotency(session_id, action)
+    # Fallback without transactions: claim -> update -> mark
+    cached_result = claim_operation(session_id, action)
     if cached_result:
-        cached_result['idempotent'] = True
         return cached_result
 
     try:
         customers_table = dynamodb.Table(CUSTOMERS_TABLE)
 
-        # Update customer record
-        customers_table.update_item(
-            Key={'phone_number': phone_number},
-            UpdateExpression="SET voicemail_active = :inactive, updated_at = :timestamp",
-            ExpressionAttributeValues={
-                ':inactive': False,
-                ':timestamp': datetime.utcnow().isoformat()
-            }
-        )
-
-        result = {
-            "success": True,
-            "action": action,
-            "customer_id": customer_id,
-            "voicemail_status": "inactive",
-            "timestamp": datetime.utcnow().isoformat(),
-            "idempotent": False
-        }
+        # Update customer record (existing customers only)
+        try:
+            customers_table.update_item(
+                Key={'phone_number': phone_number},
+                UpdateExpression="SET voicemail_active = :active, updated_at = :timestamp",
+                ConditionExpression='attribute_exists(phone_number)',
+                ExpressionAttributeValues={
+                    ':active': active,
+                    ':timestamp': result['timestamp']
+                }
+            )
+        except customers_table.meta.client.exceptions.ConditionalCheckFailedException:
+            print(f"[WARN] Customer not found: {phone_number}")
+            release_operation(session_id, action)
+            return _customer_not_found(action)
 
         # Mark as completed for idempotency
         mark_operation_completed(session_id, action, result)
 
-        print(f"[OK] Deactivated voicemail for customer {customer_id}")
+        print(f"[OK] {'Activated' if active else 'Deactivated'} voicemail for customer {customer_id}")
 
         return result
 
     except Exception as e:
-        print(f"[ERROR] Error deactivating voicemail: {e}")
+        print(f"[ERROR] Error {verb} voicemail: {e}")
+        release_operation(session_id, action)
         return {
             "success": False,
             "action": action,
@@ -203,10 +504,10 @@ def deactivate_voicemail(phone_number: str, customer_id: str, session_id: str) -
         }
 
 
-@xray_recorder.capture("activate_voicemail")
-def activate_voicemail(phone_number: str, customer_id: str, session_id: str) -> Dict[str, Any]:
+@xray_recorder.capture("deactivate_voicemail")
+def deactivate_voicemail(phone_number: str, customer_id: str, session_id: str) -> Dict[str, Any]:
     """
-    Activate voicemail for customer.
+    Deactivate voicemail for customer.
 
     Args:
         phone_number: Customer phone number
@@ -216,51 +517,23 @@ def activate_voicemail(phone_number: str, customer_id: str, session_id: str) ->
     Returns:
         Operation result
     """
-    action = "activate_voicemail"
+    return update_voicemail(phone_number, customer_id, session_id, active=False)
 
-    # Check idempotency
-    cached_result = check_idempotency(session_id, action)
-    if cached_result:
-        cached_result['idempotent'] = True
-        return cached_result
 
-    try:
-        customers_table = dynamodb.Table(CUSTOMERS_TABLE)
-
-        # Update customer record
-        customers_table.update_item(
-            Key={'phone_number': phone_number},
-            UpdateExpression="SET voicemail_active = :active, updated_at = :timestamp",
-            ExpressionAttributeValues={
-                ':active': True,
-                ':timestamp': datetime.utcnow().isoformat()
-            }
-        )
-
-        result = {
-            "success": True,
-            "action": action,
-            "customer_id": customer_id,
-            "voicemail_status": "active",
-            "timestamp": datetime.utcnow().isoformat(),
-            "idempotent": False
-        }
-
-        # Mark as completed for idempotency
-        mark_operation_completed(session_id, action, result)
-
-        print(f"[OK] Activated voicemail for customer {customer_id}")
+@xray_recorder.capture("activate_voicemail")
+def activate_voicemail(phone_number: str, customer_id: str, session_id: str) -> Dict[str, Any]:
+    """
+    Activate voicemail for customer.
 
-        return result
+    Args:
+        phone_number: Customer phone number
+        customer_id: Customer ID
+        session_id: Session ID
 
-    except Exception as e:
-        print(f"[ERROR] Error activating voicemail: {e}")
-        return {
-            "success": False,
-            "action": action,
-            "error": str(e),
-            "timestamp": datetime.utcnow().isoformat()
-        }
+    Returns:
+        Operation result
+    """
+    return update_voicemail(phone_number, customer_id, session_id, active=True)
 
 
 @xray_recorder.capture("check_voicemail_status")
@@ -312,6 +585,151 @@ def check_voicemail_status(phone_number: str, customer_id: str) -> Dict[str, Any
         }
 
 
+def update_voicemail_chunk(phone_numbers: List[str], batch_id: str, active: bool) -> Dict[str, Dict[str, Any]]:
+    """
+    Set voicemail on or off for a chunk of phone numbers (one transaction).
+
+    Falls back to one update_voicemail() per number when transactions are
+    off or unsupported, or the chunk transaction failed (e.g. a conflict).
+
+    Args:
+        phone_numbers: Unique phone numbers (at most CRM_BULK_CHUNK_SIZE)
+        batch_id: Bulk request ID (idempotency)
+        active: New voicemail state
+
+    Returns:
+        Phone number -> operation result
+    """
+    action = "activate_voicemail" if active else "deactivate_voicemail"
+    if CRM_TRANSACTIONS_ENABLED and _transactions_supported:
+        results = [voicemail_result(None, active) for _ in phone_numbers]
+        try:
+            outcomes = transact_voicemail_updates(
+                [(phone, f"{batch_id}:{phone}", result) for phone, result in zip(phone_numbers, results)],
+                action,
+                active
+            )
+            return {phone: outcome or result for phone, outcome, result in zip(phone_numbers, outcomes, results)}
+        except TransactionsUnsupported:
+            pass
+        except Exception as e:
+            print(f"[WARN] Chunk transaction failed, updating {len(phone_numbers)} numbers one by one: {e}")
+
+    return {phone: update_voicemail(phone, None, f"{batch_id}:{phone}", active) for phone in phone_numbers}
+
+
+def check_voicemail_status_chunk(phone_numbers: List[str]) -> Dict[str, Dict[str, Any]]:
+    """
+    Check voicemail status for up to 100 phone numbers with BatchGetItem.
+
+    Unprocessed keys (throttling) are retried with backoff.
+
+    Args:
+        phone_numbers: Unique phone numbers (at most BATCH_GET_MAX_KEYS)
+
+    Returns:
+        Phone number -> status result
+    """
+    keys = [{'phone_number': phone} for phone in phone_numbers]
+    customers: Dict[str, Dict[str, Any]] = {}
+    for attempt in range(BATCH_GET_MAX_ATTEMPTS):
+        response = dynamodb.batch_get_item(RequestItems={
+            CUSTOMERS_TABLE: {'Keys': keys, 'ProjectionExpression': 'phone_number, customer_id, voicemail_active'}
+        })
+        for customer in response.get('Responses', {}).get(CUSTOMERS_TABLE, []):
+            customers[customer['phone_number']] = customer
+        keys = response.get('UnprocessedKeys', {}).get(CUSTOMERS_TABLE, {}).get('Keys', [])
+        if not keys:
+            break
+        time.sleep(0.05 * 2 ** attempt)
+
+    unprocessed = {key['phone_number'] for key in keys}
+    timestamp = datetime.utcnow().isoformat()
+    results = {}
+    for phone in phone_numbers:
+        customer = customers.get(phone)
+        if customer is None:
+            error = "Throttled, try again later" if phone in unprocessed else "Customer not found"
+            results[phone] = {"success": False, "error": error, "timestamp": timestamp}
+            continue
+        results[phone] = {
+            "success": True,
+            "action": "check_status",
+            "customer_id": customer.get('customer_id'),
+            "voicemail_status": "active" if customer.get('voicemail_active', False) else "inactive",
+            "timestamp": timestamp
+        }
+    return results
+
+
+@xray_recorder.capture("bulk_voicemail_operation")
+def bulk_voicemail_operation(operation: str, phone_numbers: List[Any], batch_id: Optional[str]) -> Dict[str, Any]:
+    """
+    Run a voicemail operation for a batch of phone numbers.
+
+    Duplicate numbers are processed once. Chunks (BATCH_GET_MAX_KEYS for
+    status checks, CRM_BULK_CHUNK_SIZE for update transactions, single
+    numbers without transactions) run on BULK_EXECUTOR, at most
+    CRM_BULK_CONCURRENCY at a time.
+
+    Args:
+        operation: "deactivate", "activate" or "check_status"
+        phone_numbers: Phone numbers (at most CRM_BULK_MAX_ITEMS)
+        batch_id: Bulk request ID, required for activate/deactivate (idempotency)
+
+    Returns:
+        {"success": true, "results": [...] in input order, "stats": {...}};
+        failed items carry "success": false and "error"
+    """
+    valid = [phone for phone in phone_numbers if isinstance(phone, str) and phone.strip()]
+    unique = list(dict.fromkeys(valid))
+    if operation == 'check_status':
+        size = BATCH_GET_MAX_KEYS
+        work = check_voicemail_status_chunk
+        args: Tuple[Any, ...] = ()
+    else:
+        # Without transactions a chunk is updated number by number: one per task
+        size = CRM_BULK_CHUNK_SIZE if CRM_TRANSACTIONS_ENABLED and _transactions_supported else 1
+        work = update_voicemail_chunk
+        args = (batch_id, operation == 'activate')
+
+    chunks = [unique[i:i + size] for i in range(0, len(unique), size)]
+    futures = [(chunk, BULK_EXECUTOR.submit(work, chunk, *args)) for chunk in chunks]
+    by_phone: Dict[str, Dict[str, Any]] = {}
+    for chunk, future in futures:
+        try:
+            by_phone.update(future.result())
+        except Exception as e:
+            print(f"[ERROR] Bulk chunk failed: {e}")
+            by_phone.update({phone: {"success": False, "error": str(e)} for phone in chunk})
+
+    results = []
+    for phone in phone_numbers:
+        if isinstance(phone, str) and phone in by_phone:
+            results.append(dict(by_phone[phone], phone_number=phone))
+        else:
+            results.append({"success": False, "phone_number": phone, "error": "Missing or invalid phone_number"})
+
+    succeeded = sum(1 for result in results if result.get('success'))
+    stats = {
+        'items': len(phone_numbers),
+        'unique': len(unique),
+        'chunks': len(chunks),
+        'succeeded': succeeded,
+        'idempotent': sum(1 for result in results if result.get('idempotent')),
+        'errors': len(results) - succeeded
+    }
+    print(f"[OK] Bulk {operation}: {json.dumps(stats)}")
+
+    return {
+        "success": True,
+        "action": f"bulk_{operation}",
+        "results": results,
+        "stats": stats,
+        "timestamp": datetime.utcnow().isoformat()
+    }
+
+
 @xray_recorder.capture("handler")
 def handler(event, context):
     """
@@ -326,10 +744,10 @@ def handler(event, context):
     """
     print(f"[CRM] CRM Mock invoked with event: {json.dumps(event, default=str)}")
 
+    enveloped = False
     try:
-        # Parse input
-        if isinstance(event, str):
-            event = json.loads(event)
+        # Parse input (envelope from the orchestrator, or a plain dict)
+        event, enveloped = envelope.open_request(event)
 
         if 'body' in event:
             body = json.loads(event['body']) if isinstance(event['body'], str) else event['body']
@@ -338,53 +756,69 @@ def handler(event, context):
 
         # Extract parameters
         action = body.get('action', 'check_status')
+
+        # Bulk mode: {"action": "bulk", "operation": ..., "phone_numbers": [...]}
+        if action == 'bulk':
+            operation = body.get('operation')
+            phone_numbers = body.get('phone_numbers')
+            batch_id = body.get('batch_id')
+            if operation not in ('deactivate', 'activate', 'check_status'):
+                return envelope.respond({
+                    'error': f'Unknown operation: {operation}. Supported: deactivate, activate, check_status'
+                }, 400, enveloped)
+            if not isinstance(phone_numbers, list) or not phone_numbers:
+                return envelope.respond({'error': 'phone_numbers must be a non-empty list'}, 400, enveloped)
+            if len(phone_numbers) > CRM_BULK_MAX_ITEMS:
+                return envelope.respond({
+                    'error': f'Too many phone numbers: {len(phone_numbers)} (max {CRM_BULK_MAX_ITEMS})'
+                }, 400, enveloped)
+            if operation != 'check_status' and not batch_id:
+                return envelope.respond({
+                    'error': 'batch_id required for idempotency'
+                }, 400, enveloped)
+            result = bulk_voicemail_operation(operation, phone_numbers, batch_id)
+            if enveloped:
+                return envelope.wrap(result)
+            return {'statusCode': 200, 'body': json.dumps(result, default=str)} if 'body' in event else result
         phone_number = body.get('phone_number')
         customer_id = body.get('customer_id')
         session_id = body.get('session_id')
 
         if not phone_number or not customer_id:
-            return {
-                'statusCode': 400,
-                'body': json.dumps({
-                    'error': 'Missing required fields: phone_number, customer_id'
-                })
-            }
+            return envelope.respond({
+                'error': 'Missing required fields: phone_number, customer_id'
+            }, 400, enveloped)
 
         # Route to appropriate CRM action
         if action == 'deactivate':
             if not session_id:
-                return {
-                    'statusCode': 400,
-                    'body': json.dumps({
-                        'error': 'session_id required for idempotency'
-                    })
-                }
+                return envelope.respond({
+                    'error': 'session_id required for idempotency'
+                }, 400, enveloped)
             result = deactivate_voicemail(phone_number, customer_id, session_id)
 
         elif action == 'activate':
             if not session_id:
-                return {
-                    'statusCode': 400,
-                    'body': json.dumps({
-                        'error': 'session_id required for idempotency'
-                    })
-                }
+                return envelope.respond({
+                    'error': 'session_id required for idempotency'
+                }, 400, enveloped)
             result = activate_voicemail(phone_number, customer_id, session_id)
 
         elif action == 'check_status':
             result = check_voicemail_status(phone_number, customer_id)
 
         else:
-            return {
-                'statusCode': 400,
-                'body': json.dumps({
-                    'error': f'Unknown action: {action}. Supported: deactivate, activate, check_status'
-                })
-            }
+            return envelope.respond({
+                'error': f'Unknown action: {action}. Supported: deactivate, activate, check_status, bulk'
+            }, 400, enveloped)
 
         # Return result
+        status_code = 200 if result.get('success') else 500
+        if enveloped:
+            return envelope.wrap(result, status_code)
+
         response = {
-            'statusCode': 200 if result.get('success') else 500,
+            'statusCode': status_code,
             'body': json.dumps(result, default=str)
         }
 
@@ -392,10 +826,7 @@ def handler(event, context):
 
     except Exception as e:
         print(f"[ERROR] Error in CRM Mock: {e}")
-        return {
-            'statusCode': 500,
-            'body': json.dumps({
-                'error': str(e),
-                'success': False
-            })
-        }
+        return envelope.respond({
+            'error': str(e),
+            'success': False
+        }, 500, enveloped)
@@ -8,14 +8,33 @@ REFACTORED to use AWS Best Practices:
 
 Environment Variables:
     DYNAMODB_CUSTOMERS_TABLE: Customer data table
-    DYNAMODB_SESSIONS_TABLE: Session tracking table
-    MAX_PIN_ATTEMPTS: Maximum failed PIN attempts (default: 3)
+    MAX_PIN_ATTEMPTS: Maximum failed PIN attempts per phone number (default: 3)
     PIN_LOCKOUT_MINUTES: Account lockout duration (default: 15)
+    RATE_LIMIT_*: Message rate limits for the check_rate_limit action (see chatbot_core.rate_limit)
+    PIN_HASH_POLICY: KDF for new and rehashed PINs, e.g. "pbkdf2-sha256$i=100000"
+        or "scrypt$n=16384,r=8,p=1" (default: pbkdf2-sha256$i=100000)
     REGION: AWS region
 
+PIN hashes are self-describing (chatbot_core.pin_hash): any supported
+algorithm and cost is verified, and a hash that differs from PIN_HASH_POLICY
+is replaced after a successful login. Changing the policy therefore needs no
+offline re-hashing; scripts/benchmark_pin_hash.py maps KDF cost to verify
+latency per Lambda memory size.
+
+Failed attempts are counted per phone number on the customer record
+(pin_failed_attempts, atomic ADD), so a new session does not reset them. The
+attempt that reaches MAX_PIN_ATTEMPTS sets pin_locked_until in a conditional
+update; verify_pin reads the lock and the count in its single get_item.
+
+DynamoDB calls per verify_pin outcome:
+    success: 1 read, plus 1 conditional write only to reset failed attempts
+             and/or rehash (both in the same update)
+    wrong PIN: 1 read + 1 write (2 writes for the attempt that locks)
+    locked: 1 read (lock expiry is evaluated on read, never written)
+
 Input Event:
     {
-        "action": "verify_pin",
+        "action": "verify_pin",            # or "check_rate_limit" (no security_pin)
         "session_id": "SESSION-CUST001-123",
         "phone_number": "+60123456789",
         "security_pin": "1234"
@@ -27,38 +46,49 @@ Output:
         "pin_verified": true/false,
         "rate_limit_exceeded": false,
         "error": "error message if any",
-        "attempts_remaining": 2
+        "attempts_remaining": 2,
+        "retry_after_seconds": 4.5         # check_rate_limit only, when exceeded
     }
+
+The webhooks run the same per-phone and per-session token buckets in-process
+(chatbot_core.RateLimiter) before any orchestrator work; check_rate_limit
+exposes them to other callers.
 """
 
 import json
-import boto3
 import os
-import hashlib
-import hmac
+import time
 from datetime import datetime, timedelta
 from typing import Dict, Any
-from aws_xray_sdk.core import xray_recorder
 
-# Initialize AWS clients
-dynamodb = boto3.resource('dynamodb', region_name=os.environ.get('REGION', 'ap-southeast-1'))
+# Shared helpers from the chatbot-core layer (X-Ray shim, lazy AWS clients)
+from chatbot_core import lazy_resource, xray_recorder, envelope, emit_metrics, hash_pin, verify_pin_hash, RateLimiter
+
+# AWS clients are created on first use, not at import time
+dynamodb = lazy_resource('dynamodb')
 
 # Configuration
 CUSTOMERS_TABLE = os.environ.get('DYNAMODB_CUSTOMERS_TABLE', 'chatbot-customers')
-SESSIONS_TABLE = os.environ.get('DYNAMODB_SESSIONS_TABLE', 'chatbot-sessions')
 MAX_PIN_ATTEMPTS = int(os.environ.get('MAX_PIN_ATTEMPTS', '3'))
 PIN_LOCKOUT_MINUTES = int(os.environ.get('PIN_LOCKOUT_MINUTES', '15'))
 
+# Message rate limits (token buckets per phone number and session)
+RATE_LIMITER = RateLimiter.from_env(service='guardrails')
+
 
 @xray_recorder.capture("verify_pin")
 def verify_pin(phone_number: str, provided_pin: str) -> Dict[str, Any]:
     """
-    Verify PIN using PBKDF2-HMAC-SHA256 with constant-time comparison.
+    Verify PIN against its versioned hash with constant-time comparison.
 
     SECURITY:
     - Uses constant-time comparison (hmac.compare_digest) to prevent timing attacks
     - NEVER logs plaintext PINs
-    - Hashes provided PIN with stored salt before comparison
+    - Hashes provided PIN with the stored algorithm, cost and salt before comparison
+    - Rehashes to PIN_HASH_POLICY after a successful match if the stored hash is outdated
+
+    A successful match also resets the failed attempt counter, in the same
+    conditional write as the rehash; with nothing to change there is no write.
 
     Args:
         phone_number: Customer phone number
@@ -68,14 +98,16 @@ def verify_pin(phone_number: str, provided_pin: str) -> Dict[str, Any]:
         {
             "verified": true/false,
             "locked": true/false,
+            "failed_attempts": failed attempts since the last success or lockout,
             "error": "error message"
         }
     """
     try:
-        # Get customer record from DynamoDB
+        # Get the PIN state of the customer record (one read for every outcome)
         customers_table = dynamodb.Table(CUSTOMERS_TABLE)
         response = customers_table.get_item(
-            Key={'phone_number': phone_number}
+            Key={'phone_number': phone_number},
+            ProjectionExpression='phone_number, security_pin_hash, salt, pin_failed_attempts, pin_locked_until'
         )
 
         if 'Item' not in response:
@@ -87,8 +119,10 @@ def verify_pin(phone_number: str, provided_pin: str) -> Dict[str, Any]:
             }
 
         customer = response['Item']
+        failed_attempts = int(customer.get('pin_failed_attempts', 0))
 
-        # Check if account is locked
+        # Check if account is locked (an expired lock is ignored and cleared
+        # by the next attempt counter update, so unlocking costs no write)
         if customer.get('pin_locked_until'):
             locked_until = datetime.fromisoformat(customer['pin_locked_until'])
             if datetime.utcnow() < locked_until:
@@ -97,46 +131,49 @@ def verify_pin(phone_number: str, provided_pin: str) -> Dict[str, Any]:
                 return {
                     "verified": False,
                     "locked": True,
+                    "failed_attempts": failed_attempts,
                     "error": f"Account locked due to failed PIN attempts. Try again in {minutes_left} minutes."
                 }
-            else:
-                # Lockout period expired, unlock account
-                print(f"[UNLOCK] Lockout period expired, unlocking account")
-                customers_table.update_item(
-                    Key={'phone_number': phone_number},
-                    UpdateExpression="REMOVE pin_locked_until"
-                )
+            print(f"[UNLOCK] Lockout period expired for {phone_number}")
 
-        # Get stored PIN hash and salt
+        # Get stored PIN hash (legacy records keep the salt in a separate attribute)
         stored_hash = customer.get('security_pin_hash')
         salt_hex = customer.get('salt')
 
-        if not stored_hash or not salt_hex:
-            print(f"[ERROR] Missing PIN hash or salt for customer {phone_number}")
+        if not stored_hash:
+            print(f"[ERROR] Missing PIN hash for customer {phone_number}")
             return {
                 "verified": False,
                 "locked": False,
                 "error": "Invalid customer data"
             }
 
-        # Hash the provided PIN with the stored salt
-        salt = bytes.fromhex(salt_hex)
-        computed_hash = hashlib.pbkdf2_hmac(
-            'sha256',
-            provided_pin.encode('utf-8'),
-            salt,
-            100000  # 100,000 iterations
+        # Hash the provided PIN with the stored algorithm, cost and salt
+        start = time.perf_counter()
+        try:
+            pin_matches, needs_rehash = verify_pin_hash(provided_pin, stored_hash, salt_hex)
+        except ValueError as e:
+            print(f"[ERROR] Unreadable PIN hash for customer {phone_number}: {e}")
+            return {
+                "verified": False,
+                "locked": False,
+                "error": "Invalid customer data"
+            }
+        emit_metrics(
+            {'PinHashMs': ((time.perf_counter() - start) * 1000, 'Milliseconds')},
+            dimensions={'Service': 'guardrails', 'Operation': 'verify_pin'}
         )
-        computed_hash_hex = computed_hash.hex()
-
-        # Constant-time comparison (prevents timing attacks)
-        pin_matches = hmac.compare_digest(computed_hash_hex, stored_hash)
 
         if pin_matches:
             print(f"[OK] PIN verified for {phone_number}")
+            if failed_attempts or needs_rehash:
+                record_verified_pin(
+                    customers_table, phone_number, provided_pin, stored_hash, failed_attempts, needs_rehash
+                )
             return {
                 "verified": True,
                 "locked": False,
+                "failed_attempts": failed_attempts,
                 "error": None
             }
         else:
@@ -144,6 +181,7 @@ def verify_pin(phone_number: str, provided_pin: str) -> Dict[str, Any]:
             return {
                 "verified": False,
                 "locked": False,
+                "failed_attempts": failed_attempts,
                 "error": "Incorrect PIN"
             }
 
@@ -156,134 +194,162 @@ def verify_pin(phone_number: str, provided_pin: str) -> Dict[str, Any]:
         }
 
 
-@xray_recorder.capture("track_failed_attempt")
-def track_failed_attempt(session_id: str, phone_number: str) -> Dict[str, Any]:
+@xray_recorder.capture("record_verified_pin")
+def record_verified_pin(
+    customers_table,
+    phone_number: str,
+    pin: str,
+    stored_hash: str,
+    failed_attempts: int,
+    needs_rehash: bool
+) -> bool:
     """
-    Track failed PIN attempt and lock account after MAX_PIN_ATTEMPTS.
+    Reset the failed attempt counter and/or rehash the PIN in one conditional write.
+
+    Conditional on the hash that was just verified, so a PIN changed in the
+    meantime is never overwritten. Failures are logged; the login still succeeds.
 
     Args:
-        session_id: Session ID
+        customers_table: chatbot-customers Table resource
         phone_number: Customer phone number
+        pin: PIN that matched stored_hash
+        stored_hash: security_pin_hash value that was verified
+        failed_attempts: pin_failed_attempts read by verify_pin
+        needs_rehash: stored_hash differs from PIN_HASH_POLICY
 
     Returns:
-        {
-            "locked": true/false,
-            "attempts_remaining": int,
-            "lock_until": ISO timestamp (if locked)
-        }
+        Success status
     """
+    assignments, removals = [], []
+    values: Dict[str, Any] = {':old': stored_hash}
+    if failed_attempts:
+        assignments.append("pin_failed_attempts = :zero")
+        removals.append("pin_locked_until")
+        values[':zero'] = 0
+    if needs_rehash:
+        assignments.append("security_pin_hash = :new")
+        removals.append("salt")
+        values[':new'] = hash_pin(pin)
+
     try:
-        sessions_table = dynamodb.Table(SESSIONS_TABLE)
-
-        # Get current session
-        response = sessions_table.query(
-            KeyConditionExpression='session_id = :sid',
-            ExpressionAttributeValues={':sid': session_id},
-            ScanIndexForward=False,  # Latest first
-            Limit=1
+        customers_table.update_item(
+            Key={'phone_number': phone_number},
+            UpdateExpression=f"SET {', '.join(assignments)} REMOVE {', '.join(removals)}",
+            ConditionExpression="security_pin_hash = :old",
+            ExpressionAttributeValues=values
         )
-
-        if 'Items' not in response or len(response['Items']) == 0:
-            print(f"[WARN] Session not found: {session_id}, creating new session record")
-            current_attempts = 0
-        else:
-            session = response['Items'][0]
-            current_attempts = session.get('pin_attempts', 0)
-
-        # Increment attempts
-        new_attempts = current_attempts + 1
-
-        # Update session with new attempt count
-        if response.get('Items'):
-            sessions_table.update_item(
-                Key={
-                    'session_id': session_id,
-                    'turn_number': response['Items'][0]['turn_number']
-                },
-                UpdateExpression="SET pin_attempts = :attempts",
-                ExpressionAttributeValues={':attempts': new_attempts}
-            )
-
-        print(f"[INFO] Failed PIN attempt #{new_attempts} for session {session_id}")
-
-        # Check if should lock account
-        if new_attempts >= MAX_PIN_ATTEMPTS:
-            # Lock account for PIN_LOCKOUT_MINUTES
-            lock_until = datetime.utcnow() + timedelta(minutes=PIN_LOCKOUT_MINUTES)
-            lock_until_iso = lock_until.isoformat()
-
-            # Update customer record with lockout timestamp
-            customers_table = dynamodb.Table(CUSTOMERS_TABLE)
-            customers_table.update_item(
-                Key={'phone_number': phone_number},
-                UpdateExpression="SET pin_locked_until = :lock_time",
-                ExpressionAttributeValues={':lock_time': lock_until_iso}
-            )
-
-            print(f"[LOCKED] Account locked until {lock_until_iso}")
-
-            return {
-                "locked": True,
-                "attempts_remaining": 0,
-                "lock_until": lock_until_iso
-            }
-
-        # Not locked yet
-        attempts_remaining = MAX_PIN_ATTEMPTS - new_attempts
-        return {
-            "locked": False,
-            "attempts_remaining": attempts_remaining,
-            "lock_until": None
-        }
-
+        if failed_attempts:
+            print(f"[OK] Reset PIN attempts for {phone_number}")
+        if needs_rehash:
+            print(f"[OK] Rehashed PIN for {phone_number} to the current policy")
+            emit_metrics({'PinRehashed': (1, 'Count')}, dimensions={'Service': 'guardrails', 'Operation': 'verify_pin'})
+        return True
     except Exception as e:
-        print(f"[ERROR] Error tracking failed attempt: {e}")
-        return {
-            "locked": False,
-            "attempts_remaining": 0,
-            "error": str(e)
-        }
+        print(f"[WARN] PIN attempt reset/rehash skipped for {phone_number}: {e}")
+        return False
 
 
-@xray_recorder.capture("reset_pin_attempts")
-def reset_pin_attempts(session_id: str) -> bool:
+@xray_recorder.capture("track_failed_attempt")
+def track_failed_attempt(phone_number: str) -> Dict[str, Any]:
     """
-    Reset PIN attempt counter after successful verification.
+    Count a failed PIN attempt for the phone number and lock after MAX_PIN_ATTEMPTS.
+
+    Usually one conditional ADD on the customer record. The attempt that
+    reaches the limit fails that condition and instead sets pin_locked_until
+    (and restarts the count for after the lockout) in a second conditional
+    update, so concurrent attempts can neither lose a count nor skip the lock.
 
     Args:
-        session_id: Session ID
+        phone_number: Customer phone number
 
     Returns:
-        Success status
+        {
+            "locked": true/false,
+            "attempts_remaining": int (None if the attempt could not be counted),
+            "lock_until": ISO timestamp (if locked)
+        }
     """
     try:
-        sessions_table = dynamodb.Table(SESSIONS_TABLE)
-
-        # Get current session
-        response = sessions_table.query(
-            KeyConditionExpression='session_id = :sid',
-            ExpressionAttributeValues={':sid': session_id},
-            ScanIndexForward=False,
-            Limit=1
+        customers_table = dynamodb.Table(CUSTOMERS_TABLE)
+        conditional_check_failed = customers_table.meta.client.exceptions.ConditionalCheckFailedException
+        # Records loaded with an explicit NULL pin_locked_until are not locked either
+        not_locked = (
+            "(attribute_not_exists(pin_locked_until) OR attribute_type(pin_locked_until, :null) "
+            "OR pin_locked_until < :now)"
         )
 
-        if 'Items' in response and len(response['Items']) > 0:
-            sessions_table.update_item(
-                Key={
-                    'session_id': session_id,
-                    'turn_number': response['Items'][0]['turn_number']
-                },
-                UpdateExpression="SET pin_attempts = :zero",
-                ExpressionAttributeValues={':zero': 0}
-            )
-            print(f"[OK] Reset PIN attempts for session {session_id}")
-            return True
+        # A reset by a concurrent successful login between the two updates
+        # means the count starts over
+        for _ in range(3):
+            now = datetime.utcnow()
+            try:
+                response = customers_table.update_item(
+                    Key={'phone_number': phone_number},
+                    UpdateExpression="ADD pin_failed_attempts :one",
+                    ConditionExpression=(
+                        f"attribute_exists(phone_number) AND {not_locked} AND "
+                        "(attribute_not_exists(pin_failed_attempts) OR pin_failed_attempts < :last)"
+                    ),
+                    ExpressionAttributeValues={
+                        ':one': 1,
+                        ':last': MAX_PIN_ATTEMPTS - 1,
+                        ':now': now.isoformat(),
+                        ':null': 'NULL'
+                    },
+                    ReturnValues='UPDATED_NEW'
+                )
+                attempts = int(response['Attributes']['pin_failed_attempts'])
+                print(f"[INFO] Failed PIN attempt #{attempts} for {phone_number}")
+                return {
+                    "locked": False,
+                    "attempts_remaining": MAX_PIN_ATTEMPTS - attempts,
+                    "lock_until": None
+                }
+            except conditional_check_failed:
+                pass
 
-        return False
+            # This attempt reaches the limit, or the account is already locked
+            lock_until_iso = (now + timedelta(minutes=PIN_LOCKOUT_MINUTES)).isoformat()
+            try:
+                customers_table.update_item(
+                    Key={'phone_number': phone_number},
+                    UpdateExpression="SET pin_locked_until = :lock_time, pin_failed_attempts = :zero",
+                    ConditionExpression=f"{not_locked} AND pin_failed_attempts >= :last",
+                    ExpressionAttributeValues={
+                        ':lock_time': lock_until_iso,
+                        ':zero': 0,
+                        ':last': MAX_PIN_ATTEMPTS - 1,
+                        ':now': now.isoformat(),
+                        ':null': 'NULL'
+                    },
+                    ReturnValuesOnConditionCheckFailure='ALL_OLD'
+                )
+                print(f"[LOCKED] Account locked until {lock_until_iso}")
+                return {
+                    "locked": True,
+                    "attempts_remaining": 0,
+                    "lock_until": lock_until_iso
+                }
+            except conditional_check_failed as e:
+                locked_until = e.response.get('Item', {}).get('pin_locked_until', {}).get('S')
+                if locked_until and locked_until >= now.isoformat():
+                    print(f"[LOCKED] Account already locked until {locked_until}")
+                    return {
+                        "locked": True,
+                        "attempts_remaining": 0,
+                        "lock_until": locked_until
+                    }
+
+        raise RuntimeError("attempt counter kept changing concurrently")
 
     except Exception as e:
-        print(f"[ERROR] Error resetting PIN attempts: {e}")
-        return False
+        print(f"[ERROR] Error tracking failed attempt: {e}")
+        # The count is unknown: do not report it as exhausted
+        return {
+            "locked": False,
+            "attempts_remaining": None,
+            "error": str(e)
+        }
 
 
 @xray_recorder.capture("check_authorization")
@@ -291,6 +357,9 @@ def check_authorization(event: Dict[str, Any]) -> Dict[str, Any]:
     """
     Main authorization check - PIN verification and rate limiting.
 
+    check_rate_limit takes a token from the phone and session buckets and is
+    authorized unless one of them is empty.
+
     NOTE: Abusive language detection is handled by Bedrock Guardrails (not here).
 
     Args:
@@ -300,7 +369,6 @@ def check_authorization(event: Dict[str, Any]) -> Dict[str, Any]:
         Authorization result
     """
     action = event.get('action', 'verify_pin')
-    session_id = event.get('session_id')
     phone_number = event.get('phone_number')
     provided_pin = event.get('security_pin')
 
@@ -312,6 +380,15 @@ def check_authorization(event: Dict[str, Any]) -> Dict[str, Any]:
         "attempts_remaining": MAX_PIN_ATTEMPTS
     }
 
+    if action == 'check_rate_limit':
+        decision = RATE_LIMITER.check(phone=phone_number, session=event.get('session_id'))
+        result["authorized"] = decision.allowed
+        result["rate_limit_exceeded"] = not decision.allowed
+        if not decision.allowed:
+            result["error"] = f"Too many messages. Try again in {int(decision.retry_after) + 1} seconds."
+            result["retry_after_seconds"] = decision.retry_after
+        return result
+
     # Verify PIN if provided
     if action == 'verify_pin' and provided_pin:
         if not phone_number:
@@ -329,20 +406,20 @@ def check_authorization(event: Dict[str, Any]) -> Dict[str, Any]:
         if pin_result.get("verified"):
             result["pin_verified"] = True
             result["authorized"] = True
-            # Reset failed attempts
-            if session_id:
-                reset_pin_attempts(session_id)
+        elif pin_result.get("error") == "Incorrect PIN":
+            # Track failed attempt per phone number
+            attempt_result = track_failed_attempt(phone_number)
+            result["attempts_remaining"] = attempt_result.get("attempts_remaining")
+
+            if attempt_result.get("locked"):
+                result["rate_limit_exceeded"] = True
+                result["error"] = f"Account locked. Too many failed PIN attempts. Locked until {attempt_result['lock_until']}."
+            elif result["attempts_remaining"] is None:
+                result["error"] = "Incorrect PIN."
+            else:
+                result["error"] = f"Incorrect PIN. {result['attempts_remaining']} attempts remaining."
         else:
-            # Track failed attempt
-            if session_id:
-                attempt_result = track_failed_attempt(session_id, phone_number)
-                result["attempts_remaining"] = attempt_result.get("attempts_remaining", 0)
-
-                if attempt_result.get("locked"):
-                    result["rate_limit_exceeded"] = True
-                    result["error"] = f"Account locked. Too many failed PIN attempts. Locked until {attempt_result['lock_until']}."
-                else:
-                    result["error"] = f"Incorrect PIN. {result['attempts_remaining']} attempts remaining."
+            result["error"] = pin_result.get("error")
 
     return result
 
@@ -364,10 +441,10 @@ def handler(event, context):
     """
     print(f"[GUARD] Guardrails invoked with event: {json.dumps(event, default=str)}")
 
+    enveloped = False
     try:
-        # Parse input
-        if isinstance(event, str):
-            event = json.loads(event)
+        # Parse input (envelope from the orchestrator, or a plain dict)
+        event, enveloped = envelope.open_request(event)
 
         if 'body' in event:
             body = json.loads(event['body']) if isinstance(event['body'], str) else event['body']
@@ -378,8 +455,12 @@ def handler(event, context):
         result = check_authorization(body)
 
         # Return result
+        status_code = 200 if result['authorized'] else 403
+        if enveloped:
+            return envelope.wrap(result, status_code)
+
         response = {
-            'statusCode': 200 if result['authorized'] else 403,
+            'statusCode': status_code,
             'body': json.dumps(result)
         }
 
@@ -387,10 +468,7 @@ def handler(event, context):
 
     except Exception as e:
         print(f"[ERROR] Error in Guardrails: {e}")
-        return {
-            'statusCode': 500,
-            'body': json.dumps({
-                'error': str(e),
-                'authorized': False
-            })
-        }
+        return envelope.respond({
+            'error': str(e),
+            'authorized': False
+        }, 500, enveloped)
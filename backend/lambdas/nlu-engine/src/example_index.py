@@ -0,0 +1,145 @@
+"""
+Example Index - nearest labelled training examples for dynamic few-shot NLU prompts.
+
+Every training example (EN, BM and slang from Data/nlu_training_data.json) is
+turned into a compact hashed n-gram vector: the intent classifier features
+(words, word bigrams, character 2-4 grams of the slang-normalized text) are
+hashed with CRC32 into DIMENSIONS signed buckets and L2-normalized. The k
+examples with the highest cosine similarity to an incoming normalized message
+are injected into the NLU prompt instead of a fixed example list.
+
+With NumPy the vectors are rows of a float32 matrix and a lookup is one
+matrix-vector product; without it (NumPy is not part of the Lambda package)
+an inverted bucket index gives the same scores in pure Python.
+
+Built offline by backend/scripts/build_nlu_assets.py as the "nlu_examples"
+table of the asset bundle: "00042" -> "intent<TAB>normalized text<TAB>original
+text", plus the reserved row "\\0dimensions". Vectors are computed when the
+table is loaded.
+
+Usage:
+    index = ExampleIndex.from_table(bundle.table('nlu_examples'))
+    for score, example in index.nearest("nak off voicemail", k=8):
+        print(example.intent, example.text)
+"""
+
+import math
+import zlib
+from typing import Dict, List, Mapping, NamedTuple, Optional, Sequence, Tuple
+
+from intent_classifier import extract_features
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+DIMENSIONS = 2048
+DIMENSIONS_KEY = '\0dimensions'
+
+
+class Example(NamedTuple):
+    intent: str
+    normalized: str
+    text: str
+
+
+def hashed_vector(text: str, dimensions: int = DIMENSIONS) -> Dict[int, float]:
+    """Sparse L2-normalized signed feature-hashing vector of a normalized message."""
+    vector: Dict[int, float] = {}
+    for feature in extract_features(text)[0]:
+        digest = zlib.crc32(feature.encode('utf-8'))
+        bucket = digest % dimensions
+        # The top bit picks the sign, so colliding features tend to cancel out
+        vector[bucket] = vector.get(bucket, 0.0) + (-1.0 if digest & 0x80000000 else 1.0)
+    norm = math.sqrt(sum(value * value for value in vector.values()))
+    return {bucket: value / norm for bucket, value in vector.items() if value} if norm else {}
+
+
+class ExampleIndex:
+    """k-nearest-neighbour lookup over labelled examples."""
+
+    def __init__(self, examples: Sequence[Example], dimensions: int = DIMENSIONS, use_numpy: Optional[bool] = None):
+        self.examples = list(examples)
+        self.dimensions = dimensions
+        self.use_numpy = np is not None if use_numpy is None else use_numpy and np is not None
+        vectors = [hashed_vector(example.normalized, dimensions) for example in self.examples]
+
+        if self.use_numpy:
+            self._matrix = np.zeros((len(vectors), dimensions), dtype=np.float32)
+            for row, vector in enumerate(vectors):
+                self._matrix[row, list(vector)] = list(vector.values())
+        else:
+            self._postings: Dict[int, List[Tuple[int, float]]] = {}
+            for row, vector in enumerate(vectors):
+                for bucket, value in vector.items():
+                    self._postings.setdefault(bucket, []).append((row, value))
+
+    def __len__(self) -> int:
+        return len(self.examples)
+
+    def _scores(self, query: Dict[int, float]) -> List[Tuple[float, int]]:
+        """(cosine similarity, row) of every example sharing a bucket with the query."""
+        scores: Dict[int, float] = {}
+        for bucket, weight in query.items():
+            for row, value in self._postings.get(bucket, ()):
+                scores[row] = scores.get(row, 0.0) + weight * value
+        return [(score, row) for row, score in scores.items()]
+
+    def nearest(self, text: str, k: int) -> List[Tuple[float, Example]]:
+        """
+        The k most similar examples to a normalized message.
+
+        Examples with the same normalized text are returned once.
+
+        Returns:
+            [(cosine similarity, Example)], most similar first; only positive similarities
+        """
+        query = hashed_vector(text, self.dimensions)
+        if not query or k <= 0 or not self.examples:
+            return []
+
+        if self.use_numpy:
+            dense = np.zeros(self.dimensions, dtype=np.float32)
+            dense[list(query)] = list(query.values())
+            similarities = self._matrix @ dense
+            # Over-fetch so duplicates can be dropped without a second pass
+            count = min(len(self.examples), 2 * k)
+            top = np.argpartition(-similarities, count - 1)[:count]
+            ranked = sorted(((float(similarities[row]), int(row)) for row in top), key=lambda item: (-item[0], item[1]))
+        else:
+            ranked = sorted(self._scores(query), key=lambda item: (-item[0], item[1]))
+
+        selected: List[Tuple[float, Example]] = []
+        seen = set()
+        for score, row in ranked:
+            example = self.examples[row]
+            if score <= 0 or len(selected) == k:
+                break
+            if example.normalized not in seen:
+                seen.add(example.normalized)
+                selected.append((score, example))
+        return selected
+
+    def to_table(self) -> Dict[str, str]:
+        """Serialize as a string table for the NLU asset bundle."""
+        width = len(str(len(self.examples)))
+        table = {
+            str(row).zfill(width): '\t'.join(example)
+            for row, example in enumerate(self.examples)
+        }
+        table[DIMENSIONS_KEY] = str(self.dimensions)
+        return table
+
+    @classmethod
+    def from_table(cls, table: Mapping[str, str], use_numpy: Optional[bool] = None) -> 'ExampleIndex':
+        """Load from a bundle table (AssetTable or dict)."""
+        dimensions = table.get(DIMENSIONS_KEY)
+        if not dimensions:
+            raise ValueError("nlu_examples table is missing its dimensions row")
+        examples = [
+            Example(*value.split('\t', 2))
+            for key, value in sorted(table.items())
+            if key != DIMENSIONS_KEY
+        ]
+        return cls(examples, int(dimensions), use_numpy)
@@ -0,0 +1,174 @@
+"""
+Intent Classifier - local naive Bayes fast path for the NLU engine.
+
+A multinomial naive Bayes model over words, word bigrams and character 2-4
+grams, trained offline from Data/nlu_training_data.json (slang-normalized) by
+backend/scripts/build_nlu_assets.py and shipped in the NLU asset bundle as the
+"intent_model" table. Classifying a message is a few dozen table lookups, so
+confident messages ("hi", "agent", "off voicemail") can skip the Bedrock call.
+
+Confidence is a softmax over the class scores divided by
+(number of known features) ** LENGTH_EXPONENT. Plain naive Bayes posteriors
+are close to 1.0 for almost every message because the n-gram features are
+highly correlated; the length normalization makes the confidence usable as a
+threshold (see scripts/evaluate_fast_path.py).
+
+Rows are sparse: most features were seen with one or two intents, so a row
+only stores "class:delta" pairs relative to the per-class log-probability of an
+unseen feature. Table layout: "feature" -> "3:2.31 7:0.69", plus the reserved
+rows "\\0labels", "\\0priors" and "\\0unseen".
+
+Usage:
+    model = IntentClassifier.train([("nak off voicemail", "deactivate_voicemail"), ...])
+    intent, confidence, coverage = model.predict("off vm")
+"""
+
+import re
+import math
+from typing import Dict, List, Mapping, Optional, Sequence, Tuple, Union
+
+WORD = re.compile(r'[^\W\d_]+')
+NGRAM_RANGE = (2, 4)
+LENGTH_EXPONENT = 0.7
+DEFAULT_ALPHA = 0.1
+
+LABELS_KEY = '\0labels'
+PRIORS_KEY = '\0priors'
+UNSEEN_KEY = '\0unseen'
+
+Row = List[Tuple[int, float]]
+
+
+def extract_features(text: str) -> Tuple[List[str], List[str]]:
+    """
+    Features of a message.
+
+    Returns:
+        (features, words) - words are kept for the vocabulary coverage check
+    """
+    words = WORD.findall(text.lower())
+    features = ['w:' + word for word in words]
+    features += [f'b:{first} {second}' for first, second in zip(words, words[1:])]
+    low, high = NGRAM_RANGE
+    for word in words:
+        padded = f' {word} '
+        for size in range(low, high + 1):
+            features += [padded[i:i + size] for i in range(len(padded) - size + 1)]
+    return features, words
+
+
+class IntentClassifier:
+    """Naive Bayes intent classifier backed by a feature -> sparse log-probability table."""
+
+    def __init__(
+        self,
+        labels: Sequence[str],
+        log_priors: Sequence[float],
+        unseen: Sequence[float],
+        rows: Mapping[str, Union[str, Row]]
+    ):
+        self.labels = list(labels)
+        self.log_priors = list(log_priors)
+        self.unseen = list(unseen)
+        self._rows = rows
+        self._parsed: Dict[str, Row] = {}
+
+    def _row(self, feature: str) -> Optional[Row]:
+        """
+        (class index, delta) pairs of one feature (parsed on first use, then memoized).
+
+        Only known features are memoized, so the memo never outgrows the model
+        table however much unseen user text a warm container classifies.
+        """
+        row = self._parsed.get(feature)
+        if row is None:
+            row = self._rows.get(feature)
+            if row is None:
+                return None
+            if isinstance(row, str):
+                row = [(int(index), float(delta)) for index, delta in (pair.split(':') for pair in row.split())]
+            self._parsed[feature] = row
+        return row
+
+    def predict(self, text: str) -> Tuple[Optional[str], float, float]:
+        """
+        Classify a (slang-normalized) message.
+
+        Returns:
+            (intent or None if no feature is known, confidence 0-1, fraction of words seen in training)
+        """
+        features, words = extract_features(text)
+        deltas = [0.0] * len(self.labels)
+        known = 0
+        for feature in features:
+            row = self._row(feature)
+            if row is not None:
+                known += 1
+                for index, delta in row:
+                    deltas[index] += delta
+        if not known:
+            return None, 0.0, 0.0
+
+        scale = known ** LENGTH_EXPONENT
+        scaled = [
+            (prior + known * unseen + delta) / scale
+            for prior, unseen, delta in zip(self.log_priors, self.unseen, deltas)
+        ]
+        best = max(range(len(scaled)), key=scaled.__getitem__)
+        total = sum(math.exp(score - scaled[best]) for score in scaled)
+        coverage = sum(self._row('w:' + word) is not None for word in words) / len(words)
+        return self.labels[best], 1.0 / total, coverage
+
+    @classmethod
+    def train(cls, examples: Sequence[Tuple[str, str]], alpha: float = DEFAULT_ALPHA) -> 'IntentClassifier':
+        """
+        Fit on (text, intent) pairs with additive smoothing.
+
+        Args:
+            examples: Slang-normalized training messages and their intents
+            alpha: Smoothing added to every feature count
+        """
+        labels = sorted({intent for _, intent in examples})
+        index = {intent: i for i, intent in enumerate(labels)}
+        counts: Dict[str, Dict[int, int]] = {}
+        totals = [0] * len(labels)
+        documents = [0] * len(labels)
+
+        for text, intent in examples:
+            i = index[intent]
+            documents[i] += 1
+            for feature in extract_features(text)[0]:
+                per_class = counts.setdefault(feature, {})
+                per_class[i] = per_class.get(i, 0) + 1
+                totals[i] += 1
+
+        vocabulary = len(counts)
+        denominators = [total + alpha * vocabulary for total in totals]
+        unseen = [math.log(alpha / denominator) for denominator in denominators]
+        # log((count + alpha) / d) - log(alpha / d) = log(1 + count / alpha)
+        rows = {
+            feature: sorted((i, math.log(1 + count / alpha)) for i, count in per_class.items())
+            for feature, per_class in counts.items()
+        }
+        log_priors = [math.log(count / len(examples)) for count in documents]
+        return cls(labels, log_priors, unseen, rows)
+
+    def to_table(self) -> Dict[str, str]:
+        """Serialize as a string table for the NLU asset bundle."""
+        table = {
+            feature: ' '.join(f'{index}:{delta:.4g}' for index, delta in self._row(feature))
+            for feature in self._rows
+        }
+        table[LABELS_KEY] = ' '.join(self.labels)
+        table[PRIORS_KEY] = ' '.join(f'{value:.6g}' for value in self.log_priors)
+        table[UNSEEN_KEY] = ' '.join(f'{value:.6g}' for value in self.unseen)
+        return table
+
+    @classmethod
+    def from_table(cls, table: Mapping[str, str]) -> 'IntentClassifier':
+        """Load from a bundle table (AssetTable or dict) without parsing every row."""
+        header = [table.get(key) for key in (LABELS_KEY, PRIORS_KEY, UNSEEN_KEY)]
+        if not all(header):
+            raise ValueError("intent_model table is missing its labels, priors or unseen rows")
+        labels, priors, unseen = header
+        return cls(labels.split(), [float(v) for v in priors.split()], [float(v) for v in unseen.split()], table)
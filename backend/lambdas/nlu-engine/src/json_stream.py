@@ -0,0 +1,165 @@
+"""
+JSON Stream - incremental, tolerant parser for the JSON object in a model reply.
+
+The NLU model replies with one JSON object, sometimes wrapped in a markdown
+fence or preceded by a sentence. JsonFieldStream is fed text deltas as they
+arrive from converse_stream and records each top-level field of the first
+object as soon as its value is complete, so the caller can stop reading once
+"intent" and "confidence" are known instead of waiting for "slots" and
+"reasoning".
+
+A number, true, false or null is only complete once the character after it
+arrives (",", "}" or whitespace), so "0.9" is never returned for "0.95".
+Values that are not valid JSON (e.g. a bare word) are kept as stripped text.
+
+Usage:
+    fields = JsonFieldStream()
+    for delta in deltas:
+        fields.feed(delta)
+        if fields.has('intent', 'confidence'):
+            break
+    fields.close()
+    result = fields.fields
+"""
+
+import json
+from typing import Any, Dict, List, Optional
+
+WHITESPACE = ' \t\r\n'
+
+
+class JsonFieldStream:
+    """Top-level fields of the first JSON object in a stream of text deltas."""
+
+    def __init__(self):
+        self.fields: Dict[str, Any] = {}
+        self.done = False
+        self.chars = 0
+        self._state = 'seek'
+        self._token: List[str] = []
+        self._key: Optional[str] = None
+        self._escape = False
+        self._in_string = False
+        self._depth = 0
+
+    def has(self, *names: str) -> bool:
+        return all(name in self.fields for name in names)
+
+    def feed(self, text: str) -> Dict[str, Any]:
+        """
+        Consume a text delta.
+
+        Returns:
+            Fields completed so far
+        """
+        self.chars += len(text)
+        for char in text:
+            if self.done:
+                break
+            self._step(char)
+        return self.fields
+
+    def close(self) -> Dict[str, Any]:
+        """End of input: keep a scalar that was cut off by the end of the reply (e.g. at maxTokens)."""
+        if self._state == 'scalar':
+            self._finish_value()
+        return self.fields
+
+    def _step(self, char: str) -> None:
+        state = self._state
+        if state == 'seek':
+            if char == '{':
+                self._state = 'key_start'
+        elif state == 'key_start':
+            if char == '"':
+                self._state, self._token = 'key', []
+            elif char == '}':
+                self.done = True
+        elif state == 'key':
+            if self._escape:
+                self._escape = False
+                self._token.append(char)
+            elif char == '\\':
+                self._escape = True
+                self._token.append(char)
+            elif char == '"':
+                self._key = json.loads('"' + ''.join(self._token) + '"')
+                self._state = 'colon'
+            else:
+                self._token.append(char)
+        elif state == 'colon':
+            if char == ':':
+                self._state = 'value_start'
+        elif state == 'value_start':
+            if char in WHITESPACE:
+                return
+            self._token = [char]
+            if char == '"':
+                self._state = 'string'
+            elif char in '{[':
+                self._state, self._depth, self._in_string = 'nested', 1, False
+            else:
+                self._state = 'scalar'
+        elif state == 'string':
+            self._token.append(char)
+            if self._escape:
+                self._escape = False
+            elif char == '\\':
+                self._escape = True
+            elif char == '"':
+                self._finish_value()
+        elif state == 'nested':
+            self._token.append(char)
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == '\\':
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+            elif char == '"':
+                self._in_string = True
+            elif char in '{[':
+                self._depth += 1
+            elif char in '}]':
+                self._depth -= 1
+                if not self._depth:
+                    self._finish_value()
+        elif state == 'scalar':
+            if char in WHITESPACE or char in ',}':
+                self._finish_value()
+                self._step(char)
+            else:
+                self._token.append(char)
+        elif state == 'after_value':
+            if char == ',':
+                self._state = 'key_start'
+            elif char == '}':
+                self.done = True
+
+    def _finish_value(self) -> None:
+        raw = ''.join(self._token)
+        try:
+            value = json.loads(raw)
+        except ValueError:
+            value = raw.strip().strip('"')
+        self.fields[self._key] = value
+        self._state, self._token = 'after_value', []
+
+
+def parse_json_object(text: str) -> Dict[str, Any]:
+    """
+    Top-level fields of the first JSON object in a complete model reply.
+
+    Tolerates markdown fences, text around the object and a reply truncated
+    after its last complete field.
+
+    Raises:
+        ValueError: If the text contains no JSON fields
+    """
+    stream = JsonFieldStream()
+    stream.feed(text)
+    stream.close()
+    if not stream.fields:
+        raise ValueError(f"No JSON object in model output: {text[:100]!r}")
+    return stream.fields
@@ -8,14 +8,65 @@ REFACTORED to use AWS Best Practices:
 - Proper error handling
 
 Environment Variables:
-    BEDROCK_MODEL_NOVA_PRO or BEDROCK_MODEL: Bedrock model ID (default: apac.amazon.nova-pro-v1:0)
+    BEDROCK_MODEL_NOVA_PRO or BEDROCK_MODEL: Bedrock model ID of the "pro" tier (default: apac.amazon.nova-pro-v1:0)
+    BEDROCK_MODEL_ROUTES / BEDROCK_MODEL_FAST: Model routing table (see chatbot_core.routing, stage "nlu")
     BEDROCK_GUARDRAIL_ID: Guardrail identifier
     BEDROCK_GUARDRAIL_VERSION: Guardrail version (default: DRAFT)
     NLU_PROMPT_ID: Prompt Management ARN for intent classification
+    NLU_INTENT_PROMPT_ID: Optional intent-only Prompt Management ARN (see below), preferred over NLU_PROMPT_ID
+    NLU_INTENT_MAX_TOKENS: maxTokens for the intent-only prompt (default: 64)
+    NLU_STREAMING: "true" to call Bedrock with ConverseStream and stop reading once intent and confidence are complete
+    NLU_CASCADE: "true" to classify with the fast model first and escalate unsure results (default: false)
+    NLU_CASCADE_THRESHOLD: First-stage confidence below which the larger model re-classifies (default: 0.8)
+    NLU_FEW_SHOT_K: Nearest training examples added to the NLU prompt (default: 0, disabled)
+    BEDROCK_PROMPT_CACHE: "false" to send the system prompt without a cache point (A/B switch, see chatbot_core.prompts)
     SLANG_DICT_S3_BUCKET: S3 bucket containing slang_dictionary.json
     SLANG_DICT_S3_KEY: S3 key for slang dictionary
+    NLU_ASSETS_PATH: Compiled NLU asset bundle (default: nlu_assets.bin in the package or /opt)
+    NLU_ASSETS_S3_KEY: S3 key of a compiled bundle, fetched with an ETag check when no bundle is packaged
+    NLU_ASSETS_S3_BUCKET: Bucket for NLU_ASSETS_S3_KEY (default: SLANG_DICT_S3_BUCKET)
+    SLANG_DICT_REFRESH_SECONDS: Minimum seconds between background dictionary refresh checks (default: 300, 0 disables)
+    NLU_FAST_PATH_THRESHOLD: Local classifier confidence needed to skip Bedrock (default: 0.85, above 1 disables)
+    NLU_FAST_PATH_INTENTS: Comma-separated intents the local classifier may return
+    NLU_PROMPT_VERSION: Prompt version for cache keys (default: the prompt ARN in use, pin a version in it)
+    NLU_CACHE_MAX_ENTRIES: In-memory result cache size (default: 1000, 0 disables the cache)
+    NLU_CACHE_TTL_SECONDS: Result cache TTL (default: 3600)
+    NLU_CACHE_TABLE: Optional DynamoDB table shared by all containers (key cache_key, TTL attribute ttl)
+    NLU_BATCH_MAX_MESSAGES: Largest accepted batch (default: 128)
+    NLU_BATCH_CONCURRENCY: Concurrent Bedrock calls per batch (default: 8)
     REGION: AWS region
 
+Slots:
+    phone_number, security_pin and language_preference are always extracted
+    locally (slot_extractor.py) and override the model's values. With
+    NLU_INTENT_PROMPT_ID the prompt only has to classify the intent and reply
+    with {"intent": "...", "confidence": 0.0-1.0}, which fits in a few dozen
+    output tokens. With NLU_PROMPT_ID alone the full prompt is used and its
+    slots are kept as a fallback when local extraction finds nothing.
+
+Streaming:
+    With NLU_STREAMING the model reply is parsed as it arrives (json_stream.py)
+    and the stream is closed as soon as "intent" and "confidence" are complete,
+    so prompts should ask for those two fields first. Guardrails run in their
+    default synchronous mode for ConverseStream, so streamed text has already
+    been checked when it is read.
+
+Cascade:
+    With NLU_CASCADE the prompt first runs on the "nlu:cascade_first" model
+    route (fast tier, e.g. Nova Lite) and is re-run on "nlu:cascade_escalate"
+    (pro tier) only when the intent is unclear_intent or the confidence is
+    below NLU_CASCADE_THRESHOLD. The result carries a "cascade" field with the
+    first-stage intent, confidence and model, whether it escalated, and the
+    time spent in each stage.
+
+Few-shot examples:
+    With NLU_FEW_SHOT_K the k training examples closest to the normalized
+    message (example_index.py, "nlu_examples" table of the asset bundle) are
+    put into the user turn: in place of {{examples}} if the prompt template
+    has that variable, otherwise appended. The system prompt stays static and
+    cacheable, so a slim template without a fixed example list pays only for
+    the examples that are relevant to the message.
+
 Input Event:
     {
         "message": "nk off vm skrg",
@@ -29,43 +80,79 @@ Output:
         "slots": {
             "phone_number": "+60123456789",
             "security_pin": null,
-            "language_preference": "EN"
+            "language_preference": "BM"
         },
+        "language": "MIXED",
         "normalized_message": "nak off voicemail sekarang"
     }
+
+Batch Input Event:
+    {
+        "messages": ["hi", "nk off vm skrg", "pin saya 1234"]
+    }
+
+Batch Output:
+    {
+        "results": [<result as above>, ...],     # input order; failed items carry "error"
+        "stats": {"messages": 3, "unique": 3, "fast_path": 2, "cache_hits": 0, "bedrock_calls": 1, "errors": 0}
+    }
 """
 
 import json
-import boto3
-from botocore.config import Config
 import os
-import re
-from typing import Dict, Any, Optional
-# from aws_xray_sdk.core import xray_recorder  # Removed - not needed for testing
-
-# Initialize AWS clients with retry and timeout config
-bedrock_config = Config(
-    retries={'max_attempts': 6, 'mode': 'adaptive'},
-    connect_timeout=10,
-    read_timeout=60,
-    max_pool_connections=20
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional, Tuple
+
+# Shared helpers from the chatbot-core layer (lazy AWS clients)
+from chatbot_core import (
+    BEDROCK_CONFIG,
+    lazy_client,
+    lazy_resource,
+    extract_text_value,
+    build_system_blocks,
+    uses_prompt_cache,
+    emit_metrics,
+    envelope,
+    ModelRouter,
 )
 
-bedrock_runtime = boto3.client(
-    'bedrock-runtime',
-    region_name=os.environ.get('REGION', 'ap-southeast-1'),
-    config=bedrock_config
-)
-
-bedrock_agent_mgmt = boto3.client(
-    'bedrock-agent',
-    region_name=os.environ.get('REGION', 'ap-southeast-1')
-)
-
-s3_client = boto3.client('s3', region_name=os.environ.get('REGION', 'ap-southeast-1'))
-
-# Global cache for slang dictionary
+from slang_matcher import SlangMatcher
+from intent_classifier import IntentClassifier
+from example_index import ExampleIndex
+from nlu_cache import NluResultCache
+from slot_extractor import SlotExtractor
+from json_stream import JsonFieldStream, parse_json_object
+from nlu_assets import BUNDLE_FILENAME, AssetBundle, fetch_bundle, flatten_slang_dictionary
+
+# AWS clients are created on first use, not at import time
+bedrock_runtime = lazy_client('bedrock-runtime', config=BEDROCK_CONFIG)
+bedrock_agent_mgmt = lazy_client('bedrock-agent')
+s3_client = lazy_client('s3')
+dynamodb = lazy_resource('dynamodb')
+
+# Global cache for slang dictionary, its compiled matcher and the asset bundle it came from
 SLANG_DICT = None
+SLANG_MATCHER = None
+NLU_ASSETS = None
+
+# Background refresh state. SLANG_DICT and SLANG_MATCHER are only swapped
+# together while holding SLANG_LOCK.
+SLANG_DICT_VERSION = None
+SLANG_DICT_ETAG = None
+SLANG_LOCK = threading.Lock()
+SLANG_REFRESH_THREAD = None
+SLANG_LAST_REFRESH_CHECK = time.monotonic()
+
+# Bundles replaced by a refresh; unmapped at the start of the next invocation,
+# when no request can still be reading them
+RETIRED_ASSETS: List[AssetBundle] = []
+
+# Local fast-path classifier, slot extractor and few-shot example index, loaded from the asset bundle on first use
+INTENT_CLASSIFIER = None
+SLOT_EXTRACTOR = None
+EXAMPLE_INDEX = None
 
 # Configuration
 BEDROCK_MODEL = (
@@ -74,26 +161,144 @@ BEDROCK_MODEL = (
     or os.environ.get('BEDROCK_MODEL_HAIKU')
     or 'apac.amazon.nova-pro-v1:0'
 )
+MODEL_ROUTER = ModelRouter.from_env(BEDROCK_MODEL, service='nlu-engine')
 GUARDRAIL_ID = os.environ.get('BEDROCK_GUARDRAIL_ID')
 GUARDRAIL_VERSION = os.environ.get('BEDROCK_GUARDRAIL_VERSION', 'DRAFT')
 NLU_PROMPT_ID = os.environ.get('NLU_PROMPT_ID')  # Prompt Management ARN
+NLU_INTENT_PROMPT_ID = os.environ.get('NLU_INTENT_PROMPT_ID')  # Intent-only prompt, slots are extracted locally
+NLU_INTENT_MAX_TOKENS = int(os.environ.get('NLU_INTENT_MAX_TOKENS', '64'))
+NLU_MAX_TOKENS = 500
+NLU_STREAMING = os.environ.get('NLU_STREAMING', 'false').lower() == 'true'
+NLU_FEW_SHOT_K = int(os.environ.get('NLU_FEW_SHOT_K', '0'))
+NLU_CASCADE = os.environ.get('NLU_CASCADE', 'false').lower() == 'true'
+NLU_CASCADE_THRESHOLD = float(os.environ.get('NLU_CASCADE_THRESHOLD', '0.8'))
+
+# Compiled asset bundle: packaged with the function or layer, or fetched from S3
+NLU_ASSETS_PATH = os.environ.get('NLU_ASSETS_PATH')
+NLU_ASSETS_S3_KEY = os.environ.get('NLU_ASSETS_S3_KEY')
+NLU_ASSETS_CACHE_PATH = os.path.join('/tmp', BUNDLE_FILENAME)
+SLANG_DICT_REFRESH_SECONDS = float(os.environ.get('SLANG_DICT_REFRESH_SECONDS', '300'))
+
+# Local fast path: only intents the orchestrator handles without model-specific slots
+NLU_FAST_PATH_THRESHOLD = float(os.environ.get('NLU_FAST_PATH_THRESHOLD', '0.85'))
+NLU_FAST_PATH_INTENTS = frozenset(
+    intent.strip() for intent in os.environ.get(
+        'NLU_FAST_PATH_INTENTS',
+        'greeting,deactivate_voicemail,activate_voicemail,query_voicemail_info,escalate_to_agent,out_of_scope'
+    ).split(',') if intent.strip()
+)
+# Share of message words the classifier must have seen in training
+NLU_FAST_PATH_MIN_COVERAGE = 0.8
+
+# Bedrock result cache. Results only stay valid for the same prompt, model and guardrail.
+NLU_PROMPT_VERSION = os.environ.get('NLU_PROMPT_VERSION') or NLU_INTENT_PROMPT_ID or NLU_PROMPT_ID or ''
+NLU_CACHE = NluResultCache(
+    max_entries=int(os.environ.get('NLU_CACHE_MAX_ENTRIES', '1000')),
+    ttl_seconds=int(os.environ.get('NLU_CACHE_TTL_SECONDS', '3600')),
+    namespace=(
+        f"{NLU_PROMPT_VERSION}|{MODEL_ROUTER.primary_model('nlu')}|{GUARDRAIL_ID}:{GUARDRAIL_VERSION}"
+        f"|fewshot{NLU_FEW_SHOT_K}|cascade{NLU_CASCADE_THRESHOLD if NLU_CASCADE else 'off'}"
+    ),
+    table_name=os.environ.get('NLU_CACHE_TABLE'),
+    dynamodb=dynamodb
+)
+
+# Batch mode: messages per request and concurrent Bedrock calls
+NLU_BATCH_MAX_MESSAGES = int(os.environ.get('NLU_BATCH_MAX_MESSAGES', '128'))
+NLU_BATCH_CONCURRENCY = int(os.environ.get('NLU_BATCH_CONCURRENCY', '8'))
+
+# Reused across warm invocations for the Bedrock calls of a batch
+BATCH_EXECUTOR = ThreadPoolExecutor(max_workers=max(1, NLU_BATCH_CONCURRENCY))
+
+
+def load_nlu_assets() -> Optional[AssetBundle]:
+    """
+    Open the compiled NLU asset bundle (cached globally per Lambda container).
+
+    Looks for, in order:
+    1. NLU_ASSETS_PATH
+    2. nlu_assets.bin packaged next to this file, then /opt/nlu_assets.bin (layer)
+    3. s3://NLU_ASSETS_S3_BUCKET/NLU_ASSETS_S3_KEY, cached in /tmp with its ETag
+
+    Returns:
+        AssetBundle, or None if no bundle is available (callers fall back to the JSON source)
+    """
+    global NLU_ASSETS
+
+    if NLU_ASSETS is not None:
+        return NLU_ASSETS
+
+    candidates = [NLU_ASSETS_PATH] if NLU_ASSETS_PATH else [
+        os.path.join(os.path.dirname(os.path.abspath(__file__)), BUNDLE_FILENAME),
+        os.path.join('/opt', BUNDLE_FILENAME),
+    ]
+    try:
+        path = next((candidate for candidate in candidates if os.path.exists(candidate)), None)
+        if path is None and NLU_ASSETS_S3_KEY:
+            bucket = os.environ.get('NLU_ASSETS_S3_BUCKET') or os.environ.get('SLANG_DICT_S3_BUCKET')
+            path, downloaded = fetch_bundle(s3_client, bucket, NLU_ASSETS_S3_KEY, NLU_ASSETS_CACHE_PATH)
+            print(f"[INFO] NLU assets s3://{bucket}/{NLU_ASSETS_S3_KEY} {'downloaded' if downloaded else 'not modified'}")
+        if path is None:
+            return None
+
+        NLU_ASSETS = AssetBundle.open(path)
+        print(f"[OK] Opened NLU assets {NLU_ASSETS.version} from {path} "
+              f"({', '.join(f'{name}={len(table)}' for name, table in NLU_ASSETS.tables.items())})")
+    except Exception as e:
+        print(f"[WARN] Could not load NLU asset bundle, falling back to JSON: {e}")
+        return None
+
+    return NLU_ASSETS
+
+
+def record_slang_reload(outcome: str, source: str, duration_ms: float) -> None:
+    """
+    Emit dictionary version and reload duration metrics (CloudWatch EMF).
+
+    Args:
+        outcome: initial, reloaded, not_modified, unchanged or error
+        source: Where the dictionary was (re)loaded from
+        duration_ms: Time spent checking, downloading and compiling
+    """
+    emit_metrics(
+        {
+            'SlangDictionaryReloadMs': (round(duration_ms, 2), 'Milliseconds'),
+            'SlangDictionaryReloaded': (1 if outcome in ('initial', 'reloaded') else 0, 'Count'),
+            'SlangDictionaryReloadErrors': (1 if outcome == 'error' else 0, 'Count'),
+            'SlangDictionaryEntries': (len(SLANG_DICT or {}), 'Count'),
+        },
+        dimensions={'Service': 'nlu-engine', 'DictionaryVersion': str(SLANG_DICT_VERSION)},
+        dimension_sets=[['Service'], ['Service', 'DictionaryVersion']],
+        properties={'outcome': outcome, 'source': source}
+    )
 
 
 def load_slang_dictionary() -> Dict[str, str]:
     """
-    Load and FLATTEN nested slang dictionary from S3 (cached globally per Lambda container).
+    Load the flattened slang dictionary (cached globally per Lambda container).
 
-    The S3 file has nested structure: {categories: {common_abbreviations: {entries: [{slang, standard}]}}}
-    We flatten it to: {slang_term: standard_term} for fast lookup.
+    Uses the precompiled table from the NLU asset bundle when one is available.
+    Otherwise loads and FLATTENS the nested JSON from S3:
+    {categories: {common_abbreviations: {entries: [{slang, standard}]}}} -> {slang_term: standard_term}
+
+    Later updates are picked up by refresh_slang_dictionary() in the background.
 
     Returns:
         Dictionary mapping slang terms to normalized forms
     """
-    global SLANG_DICT
+    global SLANG_DICT, SLANG_DICT_VERSION, SLANG_DICT_ETAG
 
     if SLANG_DICT is not None:
         return SLANG_DICT
 
+    start = time.perf_counter()
+    bundle = load_nlu_assets()
+    if bundle is not None and bundle.table('slang') is not None:
+        SLANG_DICT = bundle.table('slang').as_dict()
+        SLANG_DICT_VERSION = bundle.version
+        record_slang_reload('initial', bundle.path, (time.perf_counter() - start) * 1000)
+        return SLANG_DICT
+
     bucket = os.environ.get('SLANG_DICT_S3_BUCKET')
     key = os.environ.get('SLANG_DICT_S3_KEY', 'slang_dictionary.json')
 
@@ -126,75 +331,12 @@ def load_slang_dictionary() -> Dict[str, str]:
         raw_dict = json.loads(response['Body'].read().decode('utf-8'))
 
         # Flatten nested category structure to simple {slang: standard} mapping
-        SLANG_DICT = {}
-        for category_name, category_data in raw_dict.get('categories', {}).items():
-            entries = category_data.get('entries', [])
-
-            for entry in entries:
-                # Handle different entry structures
-                if isinstance(entry.get('slang'), str):
-                    # Structure 1: {"slang": "nk", "standard": "nak"}
-                    slang = entry.get('slang', '').lower()
-                    standard = entry.get('standard', slang)
-                    if slang:
-                        SLANG_DICT[slang] = standard
-
-                elif isinstance(entry.get('slang'), list):
-                    # Structure 2: {"slang": ["ape", "mcm mne"], "bahasa": [...], "english": [...]}
-                    slang_list = entry.get('slang', [])
-                    bahasa_list = entry.get('bahasa', [])
-                    english_list = entry.get('english', [])
-
-                    # Map slang to bahasa if available, otherwise to english
-                    for idx, slang_term in enumerate(slang_list):
-                        if isinstance(slang_term, str):
-                            slang_term = slang_term.lower()
-                            if idx < len(bahasa_list):
-                                SLANG_DICT[slang_term] = bahasa_list[idx]
-                            elif idx < len(english_list):
-                                SLANG_DICT[slang_term] = english_list[idx]
-
-                elif 'variations' in entry:
-                    # Structure 3: action_verbs, service_terms with variations
-                    # {"action": "deactivate", "variations": {"english": [...], "bahasa": [...], "slang": [...]}}
-                    variations = entry.get('variations', {})
-                    slang_list = variations.get('slang', [])
-                    bahasa_list = variations.get('bahasa', [])
-                    english_list = variations.get('english', [])
-
-                    # Map all slang variations
-                    for slang_term in slang_list:
-                        if isinstance(slang_term, str):
-                            slang_lower = slang_term.lower()
-                            # For slang in variations, map to the first bahasa equivalent or first english
-                            if bahasa_list:
-                                SLANG_DICT[slang_lower] = bahasa_list[0]
-                            elif english_list:
-                                SLANG_DICT[slang_lower] = english_list[0]
-
-                    # Also map some english/bahasa terms for normalization
-                    for eng_term in english_list[:3]:  # Map first few english variations
-                        if isinstance(eng_term, str):
-                            SLANG_DICT[eng_term.lower()] = eng_term
-
-                    for bm_term in bahasa_list[:3]:  # Map first few bahasa variations
-                        if isinstance(bm_term, str):
-                            SLANG_DICT[bm_term.lower()] = bm_term
-
-                elif 'english' in entry and 'bahasa' in entry and 'slang' in entry:
-                    # Structure 4: question_words, confirmation_words, politeness_markers
-                    # {english": [...], "bahasa": [...], "slang": [...]}
-                    slang_list = entry.get('slang', [])
-                    bahasa_list = entry.get('bahasa', [])
-
-                    # Map slang to corresponding bahasa
-                    for idx, slang_term in enumerate(slang_list):
-                        if isinstance(slang_term, str):
-                            slang_lower = slang_term.lower()
-                            if idx < len(bahasa_list):
-                                SLANG_DICT[slang_lower] = bahasa_list[idx]
+        SLANG_DICT = flatten_slang_dictionary(raw_dict)
+        SLANG_DICT_ETAG = response.get('ETag')
+        SLANG_DICT_VERSION = (SLANG_DICT_ETAG or '').strip('"') or None
 
         print(f"[OK] Loaded and flattened {len(SLANG_DICT)} slang mappings from {len(raw_dict.get('categories', {}))} categories")
+        record_slang_reload('initial', f"s3://{bucket}/{key}", (time.perf_counter() - start) * 1000)
 
     except Exception as e:
         print(f"[ERROR] Error loading slang dictionary: {e}")
@@ -203,14 +345,177 @@ def load_slang_dictionary() -> Dict[str, str]:
     return SLANG_DICT
 
 
+def _is_not_modified(error: Exception) -> bool:
+    """True for the 304 S3 returns when If-None-Match matches the current ETag."""
+    code = getattr(error, 'response', {}).get('Error', {}).get('Code')
+    return code in ('304', 'NotModified')
+
+
+def refresh_slang_dictionary() -> str:
+    """
+    Check S3 for a newer slang dictionary and swap it in if there is one.
+
+    Polls the compiled bundle (NLU_ASSETS_S3_KEY) when configured, otherwise
+    slang_dictionary.json (SLANG_DICT_S3_KEY). Both use an If-None-Match
+    conditional GET, so an unchanged dictionary costs one empty 304 response.
+    The new map and its SlangMatcher are built before the swap; requests keep
+    using the previous pair until then. A replaced bundle is closed later by
+    close_retired_assets().
+
+    Returns:
+        Outcome: reloaded, not_modified, unchanged, disabled or error
+    """
+    global SLANG_DICT, SLANG_MATCHER, SLANG_DICT_VERSION, SLANG_DICT_ETAG
+    global NLU_ASSETS, INTENT_CLASSIFIER, SLOT_EXTRACTOR, EXAMPLE_INDEX
+
+    start = time.perf_counter()
+    bucket = os.environ.get('SLANG_DICT_S3_BUCKET')
+    source = 'unknown'
+    bundle = None
+    etag = SLANG_DICT_ETAG
+
+    try:
+        if NLU_ASSETS_S3_KEY:
+            bundle_bucket = os.environ.get('NLU_ASSETS_S3_BUCKET') or bucket
+            source = f"s3://{bundle_bucket}/{NLU_ASSETS_S3_KEY}"
+            path, downloaded = fetch_bundle(s3_client, bundle_bucket, NLU_ASSETS_S3_KEY, NLU_ASSETS_CACHE_PATH)
+            if not downloaded:
+                outcome = 'not_modified'
+            else:
+                bundle = AssetBundle.open(path)
+                new_dict = bundle.table('slang').as_dict()
+                version = bundle.version
+                outcome = 'unchanged' if version == SLANG_DICT_VERSION else 'reloaded'
+        elif bucket:
+            key = os.environ.get('SLANG_DICT_S3_KEY', 'slang_dictionary.json')
+            source = f"s3://{bucket}/{key}"
+            request = {'Bucket': bucket, 'Key': key}
+            if SLANG_DICT_ETAG:
+                request['IfNoneMatch'] = SLANG_DICT_ETAG
+            try:
+                response = s3_client.get_object(**request)
+            except Exception as e:
+                if not _is_not_modified(e):
+                    raise
+                outcome = 'not_modified'
+            else:
+                new_dict = flatten_slang_dictionary(json.loads(response['Body'].read().decode('utf-8')))
+                etag = response.get('ETag')
+                version = (etag or '').strip('"') or None
+                # A packaged bundle built from the same JSON has a different version but the same map
+                outcome = 'unchanged' if new_dict == SLANG_DICT else 'reloaded'
+        else:
+            return 'disabled'
+
+        if outcome == 'reloaded':
+            matcher = SlangMatcher(new_dict)
+            with SLANG_LOCK:
+                SLANG_DICT, SLANG_MATCHER, SLANG_DICT_VERSION = new_dict, matcher, version
+                if bundle is not None:
+                    # The previous mapping stays valid for readers still using it
+                    if NLU_ASSETS is not None:
+                        RETIRED_ASSETS.append(NLU_ASSETS)
+                    NLU_ASSETS, INTENT_CLASSIFIER, SLOT_EXTRACTOR, EXAMPLE_INDEX = bundle, None, None, None
+                    bundle = None
+            print(f"[OK] Slang dictionary reloaded from {source}: version {version}, {len(new_dict)} mappings")
+        SLANG_DICT_ETAG = etag
+
+    except Exception as e:
+        outcome = 'error'
+        print(f"[WARN] Slang dictionary refresh failed, keeping version {SLANG_DICT_VERSION}: {e}")
+
+    if bundle is not None:
+        # Downloaded but not swapped in (same version, or the swap failed)
+        bundle.close()
+
+    record_slang_reload(outcome, source, (time.perf_counter() - start) * 1000)
+    return outcome
+
+
+def close_retired_assets() -> int:
+    """
+    Unmap asset bundles replaced by refresh_slang_dictionary().
+
+    Called at the start of an invocation: Lambda runs one invocation at a time
+    per container, so the requests that read the old bundle have finished.
+
+    Returns:
+        Number of bundles closed
+    """
+    with SLANG_LOCK:
+        retired = RETIRED_ASSETS[:]
+        RETIRED_ASSETS.clear()
+    for bundle in retired:
+        try:
+            bundle.close()
+        except Exception as e:
+            print(f"[WARN] Error closing retired NLU assets {bundle.version}: {e}")
+    return len(retired)
+
+
+def maybe_refresh_slang_dictionary() -> Optional[threading.Thread]:
+    """
+    Start a background refresh if SLANG_DICT_REFRESH_SECONDS have passed since the last check.
+
+    Never blocks the caller. At most one refresh runs at a time. Lambda freezes
+    the container between invocations, so a refresh that is still running when
+    a response is returned finishes during a later invocation.
+
+    Returns:
+        The refresh thread if one was started, else None
+    """
+    global SLANG_REFRESH_THREAD, SLANG_LAST_REFRESH_CHECK
+
+    if SLANG_DICT_REFRESH_SECONDS <= 0 or SLANG_DICT is None:
+        return None
+    now = time.monotonic()
+    if now - SLANG_LAST_REFRESH_CHECK < SLANG_DICT_REFRESH_SECONDS:
+        return None
+
+    with SLANG_LOCK:
+        if SLANG_REFRESH_THREAD is not None and SLANG_REFRESH_THREAD.is_alive():
+            return None
+        SLANG_LAST_REFRESH_CHECK = now
+        SLANG_REFRESH_THREAD = threading.Thread(target=refresh_slang_dictionary, name='slang-refresh', daemon=True)
+        SLANG_REFRESH_THREAD.start()
+        return SLANG_REFRESH_THREAD
+
+
 # @xray_recorder.capture("normalize_slang")  # Removed - not needed
+def get_slang_matcher() -> SlangMatcher:
+    """
+    Compiled matcher for the current slang dictionary.
+
+    Returns:
+        SlangMatcher (compiled once per container and dictionary version)
+    """
+    global SLANG_MATCHER
+
+    slang_dict = load_slang_dictionary()
+    matcher = SLANG_MATCHER
+
+    # Compile once per container (rebuilt if the dictionary object changes). Re-checked
+    # under the lock so a concurrent background swap is not undone.
+    if matcher is None or matcher.source is not slang_dict:
+        with SLANG_LOCK:
+            if SLANG_MATCHER is None or SLANG_MATCHER.source is not SLANG_DICT:
+                SLANG_MATCHER = SlangMatcher(SLANG_DICT)
+            matcher = SLANG_MATCHER
+
+    return matcher
+
+
 def normalize_slang(message: str) -> str:
     """
     Normalize Malaysian slang in user message.
 
+    Single-word and multi-word entries are replaced in one longest-match pass
+    (see slang_matcher.py). Spacing, punctuation and casing outside matched
+    spans are kept as typed.
+
     Examples:
         "nk off vm skrg" → "nak off voicemail sekarang"
-        "pls matikan mel suara" → "please matikan mel suara"
+        "mcm mne nk off vm?" → "macam mana nak off voicemail?"
 
     Args:
         message: User message with potential slang
@@ -218,67 +523,184 @@ def normalize_slang(message: str) -> str:
     Returns:
         Normalized message
     """
-    slang_dict = load_slang_dictionary()
+    return get_slang_matcher().normalize(message)
 
-    # Tokenize (split on whitespace and keep punctuation)
-    tokens = re.findall(r'\w+|[^\w\s]', message.lower())
 
-    normalized_tokens = []
-    for token in tokens:
-        # Check if token is in slang dictionary
-        normalized = slang_dict.get(token, token)
-        normalized_tokens.append(normalized)
+def load_intent_classifier() -> Optional[IntentClassifier]:
+    """
+    Local intent classifier from the asset bundle (cached globally per Lambda container).
 
-    return ' '.join(normalized_tokens)
+    Returns:
+        IntentClassifier, or None if the bundle has no intent_model table
+    """
+    global INTENT_CLASSIFIER
+
+    if INTENT_CLASSIFIER is None:
+        bundle = load_nlu_assets()
+        table = bundle.table('intent_model') if bundle is not None else None
+        if table is not None:
+            INTENT_CLASSIFIER = IntentClassifier.from_table(table)
+    return INTENT_CLASSIFIER
+
+
+def load_slot_extractor() -> SlotExtractor:
+    """
+    Local slot extractor (cached globally per Lambda container).
+
+    Uses the language_model and language_markers tables of the asset bundle;
+    without a bundle, phone numbers and PINs are still extracted and the
+    language defaults to EN.
+    """
+    global SLOT_EXTRACTOR
+
+    if SLOT_EXTRACTOR is None:
+        bundle = load_nlu_assets()
+        model_table = bundle.table('language_model') if bundle is not None else None
+        markers = bundle.table('language_markers') if bundle is not None else None
+        try:
+            language_model = IntentClassifier.from_table(model_table) if model_table is not None else None
+        except ValueError as e:
+            print(f"[WARN] Invalid language model in asset bundle: {e}")
+            language_model = None
+        SLOT_EXTRACTOR = SlotExtractor(language_model, markers)
+    return SLOT_EXTRACTOR
+
+
+def load_example_index() -> ExampleIndex:
+    """
+    Few-shot example index (cached globally per Lambda container).
+
+    Empty when the asset bundle has no nlu_examples table, so prompts are sent without examples.
+    """
+    global EXAMPLE_INDEX
+
+    if EXAMPLE_INDEX is None:
+        bundle = load_nlu_assets()
+        table = bundle.table('nlu_examples') if bundle is not None else None
+        try:
+            EXAMPLE_INDEX = ExampleIndex.from_table(table) if table is not None else ExampleIndex([])
+        except ValueError as e:
+            print(f"[WARN] Invalid example index in asset bundle: {e}")
+            EXAMPLE_INDEX = ExampleIndex([])
+        if not len(EXAMPLE_INDEX):
+            print("[WARN] No few-shot examples in the asset bundle, NLU_FEW_SHOT_K has no effect")
+    return EXAMPLE_INDEX
+
+
+def format_few_shot_examples(normalized_message: str, k: int) -> str:
+    """
+    The k nearest training examples as prompt lines.
+
+    Returns:
+        'Similar messages and their intents:\n"turn off vm" -> deactivate_voicemail ...', or "" if none
+    """
+    nearest = load_example_index().nearest(normalized_message, k)
+    if not nearest:
+        return ""
+    lines = [f"{json.dumps(example.text, ensure_ascii=False)} -> {example.intent}" for _, example in nearest]
+    return "Similar messages and their intents:\n" + "\n".join(lines)
 
 
-def extract_text_value(text_content) -> str:
+def extract_slots(message: str, normalized_message: str) -> Dict[str, Optional[str]]:
     """
-    Extract string from Prompt Management text content.
-    
-    Handles both formats:
-    - Direct string: "text here"
-    - Dict format: {'format': 'plain_text', 'text': 'text here'}
-    - Nested dict: {'text': {'format': 'plain_text', 'text': 'text here'}}
-    
+    Extract phone number, PIN and language locally.
+
+    Args:
+        message: Original user message (phone numbers and PINs)
+        normalized_message: Slang-normalized message (language detection)
+
+    Returns:
+        {"phone_number", "security_pin", "language_preference", "language"}
+    """
+    return load_slot_extractor().extract(message, normalized_message)
+
+
+def apply_local_slots(result: Dict[str, Any], local_slots: Dict[str, Optional[str]]) -> Dict[str, Any]:
+    """
+    Merge locally extracted slots into an intent result.
+
+    Local values win; the model's phone number and PIN are only kept when
+    nothing was found locally (full prompt mode).
+    """
+    slots = result.get('slots') or {}
+    for name in ('phone_number', 'security_pin'):
+        slots[name] = local_slots[name] or slots.get(name)
+    slots['language_preference'] = local_slots['language_preference']
+    result['slots'] = slots
+    result['language'] = local_slots['language']
+    return result
+
+
+def detect_intent_locally(message: str, normalized_message: str) -> Optional[Dict[str, Any]]:
+    """
+    Classify the message in-process and skip Bedrock when the result is confident.
+
+    Only used for intents in NLU_FAST_PATH_INTENTS and when most words were
+    seen in training. Everything else returns None and goes to Bedrock. Slots
+    are left empty; the handler fills them with apply_local_slots().
+
     Args:
-        text_content: Text content from Prompt Management API
-        
+        message: Original user message
+        normalized_message: Slang-normalized message
+
     Returns:
-        Extracted string value
+        Intent result in the same shape as detect_intent_via_bedrock, or None
     """
-    if isinstance(text_content, str):
-        return text_content
-    if isinstance(text_content, dict):
-        # Check for nested 'text' field that might be a dict
-        text_value = text_content.get('text', '')
-        if isinstance(text_value, dict):
-            # Handle {'text': {'format': 'plain_text', 'text': 'actual text'}}
-            return text_value.get('text', '')
-        return text_value if isinstance(text_value, str) else ''
-    return ''
+    if NLU_FAST_PATH_THRESHOLD > 1:
+        return None
+
+    try:
+        classifier = load_intent_classifier()
+        if classifier is None:
+            return None
+        intent, confidence, coverage = classifier.predict(normalized_message)
+    except Exception as e:
+        print(f"[WARN] Local intent classifier failed, using Bedrock: {e}")
+        return None
+
+    if (
+        intent not in NLU_FAST_PATH_INTENTS
+        or confidence < NLU_FAST_PATH_THRESHOLD
+        or coverage < NLU_FAST_PATH_MIN_COVERAGE
+    ):
+        print(f"[INFO] Local classifier: {intent} ({confidence:.2f}, coverage {coverage:.2f}) - using Bedrock")
+        return None
+
+    print(f"[OK] Intent detected locally: {intent} (confidence: {confidence:.2f})")
+    return {
+        "intent": intent,
+        "confidence": round(confidence, 4),
+        "slots": {
+            "phone_number": None,
+            "security_pin": None,
+            "language_preference": "EN"
+        },
+        "reasoning": "Local fast-path classifier"
+    }
 
 
 # @xray_recorder.capture("get_nlu_prompt")  # Removed - not needed
-def get_nlu_prompt(message: str, normalized_message: str) -> Dict[str, Any]:
+def get_nlu_prompt(message: str, normalized_message: str, prompt_id: Optional[str] = None) -> Dict[str, Any]:
     """
     Get intent classification prompt from Bedrock Prompt Management.
 
     Args:
         message: Original user message
         normalized_message: Slang-normalized message
+        prompt_id: Prompt ARN (default: NLU_PROMPT_ID)
 
     Returns:
         Prompt with variables substituted
     """
-    if not NLU_PROMPT_ID:
+    prompt_id = prompt_id or NLU_PROMPT_ID
+    if not prompt_id:
         print("[ERROR] NLU_PROMPT_ID not set - Bedrock Prompt Management is required")
         raise ValueError("NLU_PROMPT_ID environment variable must be set to use Bedrock Prompt Management")
 
     try:
         # Get prompt from Prompt Management
         response = bedrock_agent_mgmt.get_prompt(
-            promptIdentifier=NLU_PROMPT_ID
+            promptIdentifier=prompt_id
         )
 
         # Extract prompt content from correct API structure
@@ -302,8 +724,17 @@ def get_nlu_prompt(message: str, normalized_message: str) -> Dict[str, Any]:
         user_message = user_template.replace('{{original_message}}', message)
         user_message = user_message.replace('{{normalized_message}}', normalized_message)
 
+        # Dynamic few-shot examples go in the user turn, after the cached system prompt
+        examples = format_few_shot_examples(normalized_message, NLU_FEW_SHOT_K) if NLU_FEW_SHOT_K > 0 else ""
+        if '{{examples}}' in user_message:
+            user_message = user_message.replace('{{examples}}', examples)
+        elif examples:
+            user_message = f"{user_message}\n\n{examples}"
+
+        # The system prompt is identical for every message: cache it, variables are in the user turn
         return {
             "system": system_prompt,
+            "system_blocks": build_system_blocks(system_prompt),
             "user_message": user_message
         }
 
@@ -315,10 +746,166 @@ def get_nlu_prompt(message: str, normalized_message: str) -> Dict[str, Any]:
         raise RuntimeError(f"Failed to get NLU prompt from Bedrock Prompt Management: {e}")
 
 
+def converse_intent_stream(converse_args: Dict[str, Any], *route_keys: str) -> Tuple[Dict[str, Any], str, str]:
+    """
+    Run the NLU prompt with ConverseStream, reading only until intent and confidence are complete.
+
+    Args:
+        converse_args: Same arguments detect_intent_via_bedrock passes to converse
+        route_keys: Model route keys (cascade stage)
+
+    Returns:
+        (fields parsed from the reply, stop reason - "early_stop" if the stream was closed early, model ID)
+    """
+    start = time.perf_counter()
+    # Latency is recorded when the stream is closed; usage only arrives if it was read to the end
+    stream = MODEL_ROUTER.stream(
+        'nlu', lambda model_id: bedrock_runtime.converse_stream(modelId=model_id, **converse_args), *route_keys,
+        prompt_cache=uses_prompt_cache(converse_args["system"])
+    )
+    fields = JsonFieldStream()
+    stop_reason = ""
+    try:
+        for stream_event in stream:
+            delta = stream_event.get("contentBlockDelta", {}).get("delta", {}).get("text")
+            if delta:
+                fields.feed(delta)
+                if fields.has('intent', 'confidence'):
+                    stop_reason = "early_stop"
+                    break
+            if "messageStop" in stream_event:
+                stop_reason = stream_event["messageStop"].get("stopReason", "")
+    finally:
+        # Release the connection instead of draining the rest of the reply
+        stream.close()
+
+    fields.close()
+    if not fields.fields and stop_reason != "guardrail_intervened":
+        raise ValueError("No JSON object in streamed model output")
+    print(f"[OK] NLU stream read {fields.chars} chars in {(time.perf_counter() - start) * 1000:.0f}ms ({stop_reason})")
+    return fields.fields, stop_reason, stream.model
+
+
+def classify_intent(converse_args: Dict[str, Any], *route_keys: str) -> Tuple[Dict[str, Any], str]:
+    """
+    One NLU model call: send the prompt and parse intent, confidence and slots.
+
+    Args:
+        converse_args: Converse arguments without modelId
+        route_keys: Model route keys (cascade stage)
+
+    Returns:
+        (intent result, model ID that produced it)
+
+    Raises:
+        ValueError: If the reply has no usable intent/confidence (other errors from Bedrock as raised)
+    """
+    if NLU_STREAMING:
+        intent_result, stop_reason, model = converse_intent_stream(converse_args, *route_keys)
+    else:
+        # Routed model with fallback; latency and token usage are recorded per model
+        response, model = MODEL_ROUTER.invoke(
+            'nlu', lambda model_id: bedrock_runtime.converse(modelId=model_id, **converse_args), *route_keys,
+            prompt_cache=uses_prompt_cache(converse_args["system"])
+        )
+        stop_reason = response.get("stopReason", "")
+
+    # Check if guardrails intervened (abusive/inappropriate content blocked)
+    if stop_reason == "guardrail_intervened":
+        print(f"[GUARD] Guardrails INTERVENED - content blocked as inappropriate")
+        return {
+            "intent": "abusive_language",
+            "confidence": 1.0,
+            "slots": {
+                "phone_number": None,
+                "security_pin": None,
+                "language_preference": "EN"
+            },
+            "reasoning": "Content blocked by Bedrock Guardrails - inappropriate or abusive language detected"
+        }, model
+
+    if not NLU_STREAMING:
+        content_blocks = response.get("output", {}).get("message", {}).get("content", [])
+        if not content_blocks or not content_blocks[0].get("text"):
+            raise ValueError("Empty or unexpected content returned from model")
+
+        # JSON object from the reply (markdown fences and surrounding text are skipped)
+        intent_result = parse_json_object(content_blocks[0].get("text", ""))
+
+    # Validate required fields
+    if 'intent' not in intent_result or 'confidence' not in intent_result:
+        raise ValueError("Missing required fields in Bedrock response")
+    intent_result['confidence'] = float(intent_result['confidence'])
+
+    # Ensure slots exist
+    if 'slots' not in intent_result:
+        intent_result['slots'] = {
+            "phone_number": None,
+            "security_pin": None,
+            "language_preference": "EN"
+        }
+    return intent_result, model
+
+
+def needs_escalation(result: Dict[str, Any]) -> bool:
+    """Cascade rule: re-run on the larger model when the small one is unsure (a guardrail block is final)."""
+    if result['intent'] == 'abusive_language':
+        return False
+    return result['intent'] == 'unclear_intent' or result['confidence'] < NLU_CASCADE_THRESHOLD
+
+
+def classify_intent_cascade(converse_args: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Two-stage classification: the "nlu:cascade_first" route (fast tier), then
+    "nlu:cascade_escalate" (pro tier) only if needs_escalation().
+
+    Returns:
+        Intent result with a "cascade" field recording both decisions:
+        {"first_model", "first_intent", "first_confidence", "threshold",
+         "escalated", "model", "first_stage_ms", "escalation_ms"}
+    """
+    start = time.perf_counter()
+    result, first_model = classify_intent(converse_args, 'cascade_first')
+    first_stage_ms = (time.perf_counter() - start) * 1000
+    cascade = {
+        "first_model": first_model,
+        "first_intent": result['intent'],
+        "first_confidence": result['confidence'],
+        "threshold": NLU_CASCADE_THRESHOLD,
+        "escalated": False,
+        "model": first_model,
+        "first_stage_ms": round(first_stage_ms, 1),
+        "escalation_ms": 0.0,
+    }
+
+    if needs_escalation(result):
+        start = time.perf_counter()
+        try:
+            escalated, model = classify_intent(converse_args, 'cascade_escalate')
+            result = escalated
+            cascade.update(escalated=True, model=model)
+        except Exception as e:
+            # The first-stage answer is still better than unclear_intent
+            print(f"[WARN] NLU escalation failed, keeping the first-stage result: {e}")
+            cascade['escalation_error'] = str(e)
+        cascade['escalation_ms'] = round((time.perf_counter() - start) * 1000, 1)
+
+    emit_metrics(
+        {
+            'NluCascadeEscalated': (int(cascade['escalated']), 'Count'),
+            'NluCascadeFirstStageMs': (first_stage_ms, 'Milliseconds'),
+            'NluCascadeEscalationMs': (cascade['escalation_ms'], 'Milliseconds'),
+        },
+        dimensions={'Service': 'nlu-engine', 'Operation': 'cascade'}
+    )
+    result['cascade'] = cascade
+    return result
+
+
 # @xray_recorder.capture("detect_intent_bedrock")  # Removed - not needed
 def detect_intent_via_bedrock(message: str, normalized_message: str) -> Dict[str, Any]:
     """
-    Detect intent and extract slots using Bedrock with Guardrails.
+    Detect intent (and slots, with the full prompt) using Bedrock with Guardrails.
 
     Args:
         message: Original user message
@@ -327,12 +914,13 @@ def detect_intent_via_bedrock(message: str, normalized_message: str) -> Dict[str
     Returns:
         Dictionary with intent, confidence, and slots
     """
-    # Get prompt (from Prompt Management or fallback)
-    prompt = get_nlu_prompt(message, normalized_message)
+    # Intent-only prompt when configured: a much shorter reply, slots come from slot_extractor
+    prompt = get_nlu_prompt(message, normalized_message, NLU_INTENT_PROMPT_ID)
+    max_tokens = NLU_INTENT_MAX_TOKENS if NLU_INTENT_PROMPT_ID else NLU_MAX_TOKENS
 
     try:
-        # Build messages for Nova conversation
-        system_messages = [
+        # Build messages for Nova conversation (static system prompt first, marked as a cache point)
+        system_messages = prompt.get("system_blocks") or [
             {"text": prompt["system"]}
         ]
 
@@ -348,11 +936,10 @@ def detect_intent_via_bedrock(message: str, normalized_message: str) -> Dict[str
         ]
 
         converse_args = {
-            "modelId": BEDROCK_MODEL,
             "system": system_messages,
             "messages": messages,
             "inferenceConfig": {
-                "maxTokens": 500,
+                "maxTokens": max_tokens,
                 "temperature": 0.1
             }
         }
@@ -364,53 +951,10 @@ def detect_intent_via_bedrock(message: str, normalized_message: str) -> Dict[str
                 "guardrailVersion": GUARDRAIL_VERSION
             }
 
-        response = bedrock_runtime.converse(**converse_args)
-
-        # Check if guardrails intervened (abusive/inappropriate content blocked)
-        stop_reason = response.get("stopReason", "")
-        if stop_reason == "guardrail_intervened":
-            print(f"[GUARD] Guardrails INTERVENED - content blocked as inappropriate")
-            return {
-                "intent": "abusive_language",
-                "confidence": 1.0,
-                "slots": {
-                    "phone_number": None,
-                    "security_pin": None,
-                    "language_preference": "EN"
-                },
-                "reasoning": "Content blocked by Bedrock Guardrails - inappropriate or abusive language detected"
-            }
-
-        content_blocks = response.get("output", {}).get("message", {}).get("content", [])
-        if not content_blocks or not content_blocks[0].get("text"):
-            raise ValueError("Empty or unexpected content returned from model")
-
-        content_text = content_blocks[0].get("text", "")
-
-        # Extract JSON from response (handle markdown code blocks if present)
-        json_match = re.search(r'```(?:json)?\\s*(\\{.*?\\})\\s*```', content_text, re.DOTALL)
-        if json_match:
-            content_text = json_match.group(1).strip()
-        elif '```' in content_text:
-            parts = content_text.split('```')
-            if len(parts) >= 3:
-                content_text = parts[1].strip()
-                if content_text.startswith('json'):
-                    content_text = content_text[4:].strip()
-
-        intent_result = json.loads(content_text)
-
-        # Validate required fields
-        if 'intent' not in intent_result or 'confidence' not in intent_result:
-            raise ValueError("Missing required fields in Bedrock response")
-
-        # Ensure slots exist
-        if 'slots' not in intent_result:
-            intent_result['slots'] = {
-                "phone_number": None,
-                "security_pin": None,
-                "language_preference": "EN"
-            }
+        if NLU_CASCADE:
+            intent_result = classify_intent_cascade(converse_args)
+        else:
+            intent_result, _ = classify_intent(converse_args)
 
         print(f"[OK] Intent detected: {intent_result['intent']} (confidence: {intent_result['confidence']:.2f})")
 
@@ -427,10 +971,132 @@ def detect_intent_via_bedrock(message: str, normalized_message: str) -> Dict[str
                 "security_pin": None,
                 "language_preference": "EN"
             },
-            "reasoning": f"Error during intent detection: {str(e)}"
+            "reasoning": f"Error during intent detection: {str(e)}",
+            "error": str(e)
         }
 
 
+def detect_intent_cached(message: str, normalized_message: str) -> Tuple[Dict[str, Any], bool]:
+    """
+    Bedrock intent detection through the NLU result cache.
+
+    Messages with digits bypass the cache, and results with phone number or
+    PIN slots are never stored (see nlu_cache.py).
+
+    Args:
+        message: Original user message
+        normalized_message: Slang-normalized message
+
+    Returns:
+        (intent result, True if it came from the cache)
+    """
+    if not NLU_CACHE.enabled or not NLU_CACHE.cacheable_message(message):
+        return detect_intent_via_bedrock(message, normalized_message), False
+
+    key = NLU_CACHE.key(normalized_message)
+    cached = NLU_CACHE.get(key)
+    if cached is not None:
+        print(f"[OK] Intent from cache: {cached.get('intent')} (confidence: {cached.get('confidence', 0):.2f})")
+        return cached, True
+
+    result = detect_intent_via_bedrock(message, normalized_message)
+    NLU_CACHE.put(key, result)
+    return result, False
+
+
+def classify_message(message: str, normalized_message: str) -> Tuple[Dict[str, Any], str]:
+    """
+    Detect intent locally if confident, else from the cache, else via Bedrock (with Guardrails).
+
+    Returns:
+        (intent result, source: "fast_path" | "cache" | "bedrock")
+    """
+    result = detect_intent_locally(message, normalized_message)
+    if result is not None:
+        return result, 'fast_path'
+    result, cache_hit = detect_intent_cached(message, normalized_message)
+    return result, 'cache' if cache_hit else 'bedrock'
+
+
+def _batch_error(error: str) -> Dict[str, Any]:
+    return {'error': error, 'intent': 'unclear_intent', 'confidence': 0.0}
+
+
+def detect_intents_batch(messages: List[Any]) -> Dict[str, Any]:
+    """
+    Classify a list of messages in one invocation.
+
+    Messages are slang-normalized with one matcher, and messages that
+    normalize to the same text are classified once (messages with digits are
+    only merged with identical messages, like the cache). Each unique message
+    goes through the fast path and the cache; the rest are sent to Bedrock on
+    BATCH_EXECUTOR, at most NLU_BATCH_CONCURRENCY at a time. Slots are
+    extracted per message.
+
+    Args:
+        messages: User messages (at most NLU_BATCH_MAX_MESSAGES)
+
+    Returns:
+        {"results": [...] in input order, "stats": {...}}; items that could not
+        be classified carry an "error" field
+    """
+    matcher = get_slang_matcher()
+    maybe_refresh_slang_dictionary()
+
+    results: List[Optional[Dict[str, Any]]] = [None] * len(messages)
+    normalized: Dict[int, str] = {}
+    groups: Dict[str, List[int]] = {}
+    for index, message in enumerate(messages):
+        if not isinstance(message, str) or not message.strip():
+            results[index] = _batch_error('Missing or invalid message')
+            continue
+        normalized[index] = matcher.normalize(message)
+        key = NLU_CACHE.key(normalized[index]) if NLU_CACHE.cacheable_message(message) else f"\0{message}"
+        groups.setdefault(key, []).append(index)
+
+    stats = {'messages': len(messages), 'unique': len(groups), 'fast_path': 0, 'cache_hits': 0, 'bedrock_calls': 0, 'errors': 0}
+    intents: Dict[str, Dict[str, Any]] = {}
+    pending = {}
+    for key, indexes in groups.items():
+        first = indexes[0]
+        local = detect_intent_locally(messages[first], normalized[first])
+        if local is not None:
+            intents[key] = local
+            stats['fast_path'] += 1
+        else:
+            pending[key] = BATCH_EXECUTOR.submit(detect_intent_cached, messages[first], normalized[first])
+
+    for key, future in pending.items():
+        try:
+            intents[key], cache_hit = future.result()
+            stats['cache_hits' if cache_hit else 'bedrock_calls'] += 1
+        except Exception as e:
+            print(f"[ERROR] Batch item failed: {e}")
+            intents[key] = _batch_error(str(e))
+
+    for key, indexes in groups.items():
+        for index in indexes:
+            # Each item gets its own copy: slots differ between messages with the same intent
+            result = dict(intents[key], slots=dict(intents[key].get('slots') or {}))
+            apply_local_slots(result, extract_slots(messages[index], normalized[index]))
+            result['normalized_message'] = normalized[index]
+            results[index] = result
+
+    stats['errors'] = sum('error' in result for result in results)
+    print(f"[OK] Batch classified: {json.dumps(stats)}")
+    emit_metrics(
+        {
+            'NluBatchMessages': (stats['messages'], 'Count'),
+            'NluFastPathHits': (stats['fast_path'], 'Count'),
+            'NluCacheHits': (stats['cache_hits'], 'Count'),
+            'NluBedrockCalls': (stats['bedrock_calls'], 'Count'),
+            'NluBatchErrors': (stats['errors'], 'Count'),
+        },
+        dimensions={'Service': 'nlu-engine'}
+    )
+    return {'results': results, 'stats': stats}
+
+
 # @xray_recorder.capture("handler")  # Removed - not needed
 def handler(event, context):
     """
@@ -445,38 +1111,65 @@ def handler(event, context):
     """
     print(f"[NLU] NLU Engine invoked with event: {json.dumps(event)}")
 
+    enveloped = False
     try:
-        # Parse input
-        if isinstance(event, str):
-            event = json.loads(event)
+        # Unmap bundles a background refresh replaced during an earlier invocation
+        close_retired_assets()
+
+        # Parse input (envelope from the orchestrator, or a plain dict)
+        event, enveloped = envelope.open_request(event)
 
         # Get message from event
         if 'body' in event:
             # API Gateway event
             body = json.loads(event['body']) if isinstance(event['body'], str) else event['body']
-            message = body.get('message', '')
         else:
             # Direct Lambda invocation
-            message = event.get('message', '')
+            body = event
+        message = body.get('message', '')
+
+        # Batch mode: {"messages": [...]}
+        messages = body.get('messages')
+        if messages is not None:
+            if not isinstance(messages, list) or not messages:
+                return envelope.respond({'error': 'messages must be a non-empty list'}, 400, enveloped)
+            if len(messages) > NLU_BATCH_MAX_MESSAGES:
+                return envelope.respond(
+                    {'error': f'Too many messages: {len(messages)} (max {NLU_BATCH_MAX_MESSAGES})'}, 400, enveloped
+                )
+            batch = detect_intents_batch(messages)
+            if enveloped:
+                return envelope.wrap(batch)
+            return {'statusCode': 200, 'body': json.dumps(batch)} if 'body' in event else batch
 
         if not message:
-            return {
-                'statusCode': 400,
-                'body': json.dumps({'error': 'Missing required field: message'})
-            }
+            return envelope.respond({'error': 'Missing required field: message'}, 400, enveloped)
 
-        # Step 1: Normalize slang
+        # Step 1: Normalize slang (and check for dictionary updates in the background)
         print(f"Original message: {message}")
         normalized_message = normalize_slang(message)
+        maybe_refresh_slang_dictionary()
         print(f"Normalized message: {normalized_message}")
 
-        # Step 2: Detect intent via Bedrock (with Guardrails)
-        result = detect_intent_via_bedrock(message, normalized_message)
+        # Step 2: Detect intent locally if confident, else from the cache, else via Bedrock (with Guardrails)
+        result, source = classify_message(message, normalized_message)
+        emit_metrics(
+            {
+                'NluFastPathHits': (1 if source == 'fast_path' else 0, 'Count'),
+                'NluCacheHits': (1 if source == 'cache' else 0, 'Count'),
+            },
+            dimensions={'Service': 'nlu-engine'}
+        )
 
-        # Step 3: Add normalized message to result
+        # Step 3: Phone number, PIN and language are extracted locally
+        apply_local_slots(result, extract_slots(message, normalized_message))
+
+        # Step 4: Add normalized message to result
         result['normalized_message'] = normalized_message
 
         # Return result
+        if enveloped:
+            return envelope.wrap(result)
         return {
             'statusCode': 200,
             'body': json.dumps(result)
@@ -484,11 +1177,8 @@ def handler(event, context):
 
     except Exception as e:
         print(f"[ERROR] Error in NLU Engine: {e}")
-        return {
-            'statusCode': 500,
-            'body': json.dumps({
-                'error': str(e),
-                'intent': 'unclear_intent',
-                'confidence': 0.0
-            })
-        }
+        return envelope.respond({
+            'error': str(e),
+            'intent': 'unclear_intent',
+            'confidence': 0.0
+        }, 500, enveloped)
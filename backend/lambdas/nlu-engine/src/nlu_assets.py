@@ -0,0 +1,458 @@
+"""
+NLU Assets - compiled, versioned lookup tables for the NLU engine.
+
+The slang dictionary (and the keyword, language marker, intent classifier and
+few-shot example tables derived from the training data) are compiled offline by
+backend/scripts/build_nlu_assets.py into one binary file. The Lambda opens it with mmap at cold start instead of
+downloading, parsing and flattening the nested JSON.
+
+File layout (little-endian):
+
+    header     32 bytes   magic "NLUA", format, table count, directory offset,
+                          directory length, 16-byte content digest
+    directory  JSON       {"version", "built_at", "sources", "tables": {name: {"offset", "count"}}}
+    table      per table  count (u32), key offsets (u32 * count+1),
+                          value offsets (u32 * count+1), UTF-8 keys, UTF-8 values
+
+Keys are sorted by their UTF-8 bytes, so a single lookup is a binary search on
+the mapped file and nothing is parsed until it is used. The version is derived
+from the table contents only: rebuilding the same inputs gives the same version.
+
+Usage (build):
+    write_bundle('nlu_assets.bin', compile_tables(slang_json, training_json))
+
+Usage (runtime):
+    bundle = AssetBundle.open('nlu_assets.bin')
+    slang_dict = bundle.table('slang').as_dict()
+"""
+
+import os
+import re
+import sys
+import json
+import mmap
+import struct
+import hashlib
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from example_index import Example, ExampleIndex
+from intent_classifier import IntentClassifier
+from slang_matcher import SlangMatcher
+
+MAGIC = b'NLUA'
+FORMAT_VERSION = 1
+HEADER = struct.Struct('<4sHHII16s')
+COUNT = struct.Struct('<I')
+
+# File name of the bundle inside the Lambda package (or /opt for a layer)
+BUNDLE_FILENAME = 'nlu_assets.bin'
+
+# Placeholders in training examples: "{+60123456789|phone_number}"
+ENTITY_PLACEHOLDER = re.compile(r'\{[^}]*\}')
+ENTITY_VALUE = re.compile(r'\{([^|}]*)\|[^}]*\}')
+WORD = re.compile(r'[^\W\d_]+')
+
+
+class AssetTable:
+    """Read-only string -> string table backed by a bundle buffer."""
+
+    def __init__(self, buffer, offset: int):
+        self._buffer = buffer
+        count = COUNT.unpack_from(buffer, offset)[0]
+        index_size = 4 * (count + 1)
+        keys_index = offset + COUNT.size
+        values_index = keys_index + index_size
+
+        view = memoryview(buffer)
+        if sys.byteorder == 'little':
+            # Zero-copy view of the offset arrays
+            self._key_offsets = view[keys_index:values_index].cast('I')
+            self._value_offsets = view[values_index:values_index + index_size].cast('I')
+        else:
+            self._key_offsets = struct.unpack_from(f'<{count + 1}I', buffer, keys_index)
+            self._value_offsets = struct.unpack_from(f'<{count + 1}I', buffer, values_index)
+        view.release()
+
+        self._keys_start = values_index + index_size
+        self._values_start = self._keys_start + self._key_offsets[count]
+        self._count = count
+
+    def __len__(self) -> int:
+        return self._count
+
+    def _key_bytes(self, index: int) -> bytes:
+        start = self._keys_start
+        return self._buffer[start + self._key_offsets[index]:start + self._key_offsets[index + 1]]
+
+    def _value(self, index: int) -> str:
+        start = self._values_start
+        return self._buffer[start + self._value_offsets[index]:start + self._value_offsets[index + 1]].decode('utf-8')
+
+    def get(self, key: str, default: Optional[str] = None) -> Optional[str]:
+        """Binary search for key without materializing the table."""
+        target = key.encode('utf-8')
+        low, high = 0, self._count
+        while low < high:
+            middle = (low + high) // 2
+            if self._key_bytes(middle) < target:
+                low = middle + 1
+            else:
+                high = middle
+        if low < self._count and self._key_bytes(low) == target:
+            return self._value(low)
+        return default
+
+    def __contains__(self, key: str) -> bool:
+        return self.get(key) is not None
+
+    def items(self) -> Iterator[Tuple[str, str]]:
+        for index in range(self._count):
+            yield self._key_bytes(index).decode('utf-8'), self._value(index)
+
+    def as_dict(self) -> Dict[str, str]:
+        """Copy the table into a dict (for callers that need hashed lookups)."""
+        return dict(self.items())
+
+    def release(self):
+        if isinstance(self._key_offsets, memoryview):
+            self._key_offsets.release()
+            self._value_offsets.release()
+
+
+class AssetBundle:
+    """A compiled NLU asset file, memory-mapped read-only."""
+
+    def __init__(self, buffer, path: Optional[str] = None, mapped=None):
+        if len(buffer) < HEADER.size:
+            raise ValueError("NLU asset bundle is truncated")
+        magic, file_format, table_count, dir_offset, dir_length, digest = HEADER.unpack_from(buffer, 0)
+        if magic != MAGIC:
+            raise ValueError(f"Not an NLU asset bundle (magic {magic!r})")
+        if file_format != FORMAT_VERSION:
+            raise ValueError(f"Unsupported NLU asset format v{file_format} (expected v{FORMAT_VERSION})")
+
+        self.path = path
+        self.metadata: Dict[str, Any] = json.loads(bytes(buffer[dir_offset:dir_offset + dir_length]))
+        self.version: str = self.metadata['version']
+        if digest.hex() != self.version:
+            raise ValueError("NLU asset bundle header and directory versions differ")
+
+        self._buffer = buffer
+        self._mapped = mapped
+        self.tables: Dict[str, AssetTable] = {
+            name: AssetTable(buffer, entry['offset'])
+            for name, entry in self.metadata.get('tables', {}).items()
+        }
+        if len(self.tables) != table_count:
+            raise ValueError("NLU asset bundle directory is incomplete")
+
+    @classmethod
+    def open(cls, path: str) -> 'AssetBundle':
+        """Memory-map a bundle file. The mapping stays valid if the file is later replaced."""
+        with open(path, 'rb') as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            return cls(mapped, path=path, mapped=mapped)
+        except Exception:
+            mapped.close()
+            raise
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> 'AssetBundle':
+        return cls(data)
+
+    def table(self, name: str) -> Optional[AssetTable]:
+        return self.tables.get(name)
+
+    def close(self):
+        for table in self.tables.values():
+            table.release()
+        self.tables = {}
+        if self._mapped is not None:
+            self._mapped.close()
+            self._mapped = None
+
+
+# =============================================================================
+# BUILD
+# =============================================================================
+
+def _digest(tables: Dict[str, Dict[str, str]]) -> bytes:
+    """Content digest over the sorted tables (independent of build time)."""
+    canonical = json.dumps(tables, sort_keys=True, ensure_ascii=False, separators=(',', ':'))
+    return hashlib.sha256(canonical.encode('utf-8')).digest()[:16]
+
+
+def _encode_table(mapping: Dict[str, str]) -> bytes:
+    entries = sorted((key.encode('utf-8'), value.encode('utf-8')) for key, value in mapping.items())
+    key_offsets, value_offsets = [0], [0]
+    for key, value in entries:
+        key_offsets.append(key_offsets[-1] + len(key))
+        value_offsets.append(value_offsets[-1] + len(value))
+    return b''.join([
+        COUNT.pack(len(entries)),
+        struct.pack(f'<{len(key_offsets)}I', *key_offsets),
+        struct.pack(f'<{len(value_offsets)}I', *value_offsets),
+        b''.join(key for key, _ in entries),
+        b''.join(value for _, value in entries),
+    ])
+
+
+def encode_bundle(tables: Dict[str, Dict[str, str]], sources: Optional[Dict[str, Any]] = None) -> bytes:
+    """
+    Serialize lookup tables into the bundle format.
+
+    Args:
+        tables: {table_name: {key: value}}
+        sources: Optional provenance recorded in the directory (file names, source versions)
+
+    Returns:
+        Bundle bytes
+    """
+    digest = _digest(tables)
+    blobs, offsets, position = [], {}, HEADER.size
+    for name in sorted(tables):
+        blob = _encode_table(tables[name])
+        blob += b'\0' * (-len(blob) % 4)  # keep every table 4-byte aligned
+        offsets[name] = {'offset': position, 'count': len(tables[name])}
+        blobs.append(blob)
+        position += len(blob)
+
+    directory = json.dumps({
+        'version': digest.hex(),
+        'built_at': datetime.now(timezone.utc).isoformat(),
+        'sources': sources or {},
+        'tables': offsets,
+    }, separators=(',', ':')).encode('utf-8')
+
+    header = HEADER.pack(MAGIC, FORMAT_VERSION, len(tables), position, len(directory), digest)
+    return header + b''.join(blobs) + directory
+
+
+def write_bundle(path: str, tables: Dict[str, Dict[str, str]], sources: Optional[Dict[str, Any]] = None) -> str:
+    """
+    Write a bundle file atomically (readers never see a partial file).
+
+    Returns:
+        Bundle version (hex content digest)
+    """
+    data = encode_bundle(tables, sources)
+    temp_path = f"{path}.tmp"
+    with open(temp_path, 'wb') as f:
+        f.write(data)
+    os.replace(temp_path, path)
+    return HEADER.unpack_from(data, 0)[5].hex()
+
+
+def flatten_slang_dictionary(raw_dict: Dict[str, Any]) -> Dict[str, str]:
+    """
+    Flatten the nested slang dictionary JSON to a {slang_term: standard_term} mapping.
+
+    Keys may be single words ("nk") or phrases ("mcm mne"); both are matched by
+    SlangMatcher.
+
+    Args:
+        raw_dict: Parsed slang_dictionary.json
+
+    Returns:
+        Dictionary mapping slang terms to normalized forms
+    """
+    mappings = {}
+    for category_name, category_data in raw_dict.get('categories', {}).items():
+        entries = category_data.get('entries', [])
+
+        for entry in entries:
+            # Handle different entry structures
+            if isinstance(entry.get('slang'), str):
+                # Structure 1: {"slang": "nk", "standard": "nak"}
+                slang = entry.get('slang', '').lower()
+                standard = entry.get('standard', slang)
+                if slang:
+                    mappings[slang] = standard
+
+            elif isinstance(entry.get('slang'), list):
+                # Structure 2: {"slang": ["ape", "mcm mne"], "bahasa": [...], "english": [...]}
+                slang_list = entry.get('slang', [])
+                bahasa_list = entry.get('bahasa', [])
+                english_list = entry.get('english', [])
+
+                # Map slang to bahasa if available, otherwise to english
+                for idx, slang_term in enumerate(slang_list):
+                    if isinstance(slang_term, str):
+                        slang_term = slang_term.lower()
+                        if idx < len(bahasa_list):
+                            mappings[slang_term] = bahasa_list[idx]
+                        elif idx < len(english_list):
+                            mappings[slang_term] = english_list[idx]
+
+            elif 'variations' in entry:
+                # Structure 3: action_verbs, service_terms with variations
+                # {"action": "deactivate", "variations": {"english": [...], "bahasa": [...], "slang": [...]}}
+                variations = entry.get('variations', {})
+                slang_list = variations.get('slang', [])
+                bahasa_list = variations.get('bahasa', [])
+                english_list = variations.get('english', [])
+
+                # Map all slang variations
+                for slang_term in slang_list:
+                    if isinstance(slang_term, str):
+                        slang_lower = slang_term.lower()
+                        # For slang in variations, map to the first bahasa equivalent or first english
+                        if bahasa_list:
+                            mappings[slang_lower] = bahasa_list[0]
+                        elif english_list:
+                            mappings[slang_lower] = english_list[0]
+
+                # Also map some english/bahasa terms for normalization
+                for eng_term in english_list[:3]:  # Map first few english variations
+                    if isinstance(eng_term, str):
+                        mappings[eng_term.lower()] = eng_term
+
+                for bm_term in bahasa_list[:3]:  # Map first few bahasa variations
+                    if isinstance(bm_term, str):
+                        mappings[bm_term.lower()] = bm_term
+
+            elif 'english' in entry and 'bahasa' in entry and 'slang' in entry:
+                # Structure 4: question_words, confirmation_words, politeness_markers
+                # {english": [...], "bahasa": [...], "slang": [...]}
+                slang_list = entry.get('slang', [])
+                bahasa_list = entry.get('bahasa', [])
+
+                # Map slang to corresponding bahasa
+                for idx, slang_term in enumerate(slang_list):
+                    if isinstance(slang_term, str):
+                        slang_lower = slang_term.lower()
+                        if idx < len(bahasa_list):
+                            mappings[slang_lower] = bahasa_list[idx]
+
+    return mappings
+
+
+def _words(text: str) -> set:
+    return set(WORD.findall(ENTITY_PLACEHOLDER.sub(' ', text.lower())))
+
+
+def build_language_markers(raw_slang: Dict[str, Any], training_data: Dict[str, Any]) -> Dict[str, str]:
+    """
+    Words that only ever appear in one language: {word: "EN" | "BM"}.
+
+    Sources are the english/bahasa lists in the slang dictionary and the
+    examples_en/examples_bm training examples. Words seen in both languages
+    are dropped.
+    """
+    seen: Dict[str, set] = {}
+
+    def add(texts, language):
+        for text in texts:
+            if isinstance(text, str):
+                for word in _words(text):
+                    seen.setdefault(word, set()).add(language)
+
+    for category in raw_slang.get('categories', {}).values():
+        for entry in category.get('entries', []):
+            lists = entry.get('variations', entry)
+            add(lists.get('english', []) if isinstance(lists.get('english'), list) else [], 'EN')
+            add(lists.get('bahasa', []) if isinstance(lists.get('bahasa'), list) else [], 'BM')
+
+    for group in training_data.get('intents', []) + training_data.get('entities', []):
+        add(group.get('examples_en', []), 'EN')
+        add(group.get('examples_bm', []), 'BM')
+
+    return {word: languages.pop() for word, languages in seen.items() if len(languages) == 1}
+
+
+def build_language_model(raw_slang: Dict[str, Any], training_data: Dict[str, Any]) -> IntentClassifier:
+    """
+    Per-word EN/BM classifier over character n-grams.
+
+    Trained on the distinct words that only ever appear in one language (the
+    same sources as build_language_markers), so unseen words are classified
+    by their spelling.
+    """
+    markers = build_language_markers(raw_slang, training_data)
+    return IntentClassifier.train(sorted(markers.items()))
+
+
+def training_examples(training_data: Dict[str, Any], matcher: SlangMatcher) -> List[Tuple[str, str]]:
+    """All EN, BM and slang intent examples as (slang-normalized text, intent) pairs."""
+    return [
+        (matcher.normalize(example), intent['intent_name'])
+        for intent in training_data.get('intents', [])
+        for field in ('examples_en', 'examples_bm', 'examples_slang')
+        for example in intent.get(field, [])
+    ]
+
+
+def build_examples(training_data: Dict[str, Any], matcher: SlangMatcher) -> List[Example]:
+    """Few-shot examples: intent, slang-normalized text (indexed) and the original text (shown to the model)."""
+    examples = []
+    for intent in training_data.get('intents', []):
+        for field in ('examples_en', 'examples_bm', 'examples_slang'):
+            for example in intent.get(field, []):
+                text = ' '.join(ENTITY_VALUE.sub(r'\1', example).split())
+                examples.append(Example(intent['intent_name'], matcher.normalize(text), text))
+    return examples
+
+
+def compile_tables(raw_slang: Dict[str, Any], training_data: Optional[Dict[str, Any]] = None) -> Dict[str, Dict[str, str]]:
+    """
+    Build every NLU lookup table from the source JSON files.
+
+    Args:
+        raw_slang: Parsed slang_dictionary.json
+        training_data: Parsed nlu_training_data.json (optional)
+
+    Returns:
+        {"slang": ..., "language_markers": ..., "intent_model": ..., "language_model": ...,
+         "nlu_examples": ...}
+    """
+    slang = flatten_slang_dictionary(raw_slang)
+    tables = {'slang': slang}
+    if training_data:
+        tables['language_markers'] = build_language_markers(raw_slang, training_data)
+        matcher = SlangMatcher(slang)
+        examples = training_examples(training_data, matcher)
+        tables['intent_model'] = IntentClassifier.train(examples).to_table()
+        tables['language_model'] = build_language_model(raw_slang, training_data).to_table()
+        tables['nlu_examples'] = ExampleIndex(build_examples(training_data, matcher)).to_table()
+    return tables
+
+
+# =============================================================================
+# S3 DISTRIBUTION
+# =============================================================================
+
+def fetch_bundle(s3_client, bucket: str, key: str, cache_path: str) -> Tuple[str, bool]:
+    """
+    Download a bundle from S3 into cache_path, skipping the body if unchanged.
+
+    The ETag of the cached copy is kept next to it (cache_path + ".etag") and
+    sent as If-None-Match; S3 answers 304 when the object has not changed.
+
+    Returns:
+        (cache_path, True if a new copy was downloaded)
+    """
+    etag_path = f"{cache_path}.etag"
+    request = {'Bucket': bucket, 'Key': key}
+    if os.path.exists(cache_path) and os.path.exists(etag_path):
+        with open(etag_path) as f:
+            request['IfNoneMatch'] = f.read().strip()
+
+    try:
+        response = s3_client.get_object(**request)
+    except Exception as e:
+        error = getattr(e, 'response', {}).get('Error', {})
+        if error.get('Code') in ('304', 'NotModified'):
+            return cache_path, False
+        raise
+
+    data = response['Body'].read()
+    AssetBundle.from_bytes(data)  # validate before replacing the cached copy
+    temp_path = f"{cache_path}.tmp"
+    with open(temp_path, 'wb') as f:
+        f.write(data)
+    os.replace(temp_path, cache_path)
+    with open(etag_path, 'w') as f:
+        f.write(response.get('ETag', ''))
+    return cache_path, True
@@ -0,0 +1,157 @@
+"""
+NLU Cache - LRU + TTL cache of intent results, with an optional DynamoDB tier.
+
+Many inbound messages are the same short strings after slang normalization
+("hi", "agent", "off vm"). Their Bedrock results are cached per container, and
+optionally in a DynamoDB table shared by all containers.
+
+Keys are a SHA-256 of the cache namespace (prompt version, model, guardrail)
+and the normalized message, lowercased with whitespace collapsed. Values are
+stored as JSON strings, so every hit returns a fresh copy.
+
+Messages with digits are never cached (they may carry a phone number or PIN),
+and neither are results with phone_number or security_pin slots, or failed
+(zero-confidence) results.
+
+Usage:
+    cache = NluResultCache(max_entries=1000, ttl_seconds=3600, namespace='prompt:3|nova-pro')
+    key = cache.key(normalized_message)
+    result = cache.get(key) if cache.cacheable_message(message) else None
+"""
+
+import sys
+import json
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+# Slots that must never be written to the cache
+SENSITIVE_SLOTS = ('phone_number', 'security_pin')
+
+
+class NluResultCache:
+    """In-memory LRU with per-entry expiry, backed by an optional DynamoDB table."""
+
+    def __init__(
+        self,
+        max_entries: int,
+        ttl_seconds: int,
+        namespace: str = '',
+        table_name: Optional[str] = None,
+        dynamodb=None
+    ):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.namespace = namespace
+        self.table_name = table_name
+        self._dynamodb = dynamodb
+        self._table = None
+        self._entries: 'OrderedDict[str, Tuple[float, str]]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {'hits': 0, 'shared_hits': 0, 'misses': 0, 'puts': 0, 'skipped': 0}
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0 and self.ttl_seconds > 0
+
+    @property
+    def table(self):
+        """Shared DynamoDB tier (resolved on first use), or None."""
+        if self._table is None and self.table_name and self._dynamodb is not None:
+            self._table = self._dynamodb.Table(self.table_name)
+        return self._table
+
+    def key(self, normalized_message: str) -> str:
+        text = ' '.join(normalized_message.lower().split())
+        return hashlib.sha256(f"{self.namespace}\n{text}".encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def cacheable_message(message: str) -> bool:
+        """Messages with digits may contain a phone number or PIN."""
+        return bool(message) and not any(char.isdigit() for char in message)
+
+    @staticmethod
+    def cacheable_result(result: Dict[str, Any]) -> bool:
+        if not result.get('intent') or not result.get('confidence'):
+            return False
+        slots = result.get('slots') or {}
+        return not any(slots.get(slot) for slot in SENSITIVE_SLOTS)
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up a result: memory first, then the shared table.
+
+        Returns:
+            A copy of the cached result, or None
+        """
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] > now:
+                    self._entries.move_to_end(key)
+                    self.stats['hits'] += 1
+                    return json.loads(entry[1])
+                del self._entries[key]
+
+        if self.table is not None:
+            try:
+                item = self.table.get_item(Key={'cache_key': key}).get('Item')
+                # DynamoDB TTL deletion is lazy, so check expiry here too
+                if item and int(item.get('ttl', 0)) > now:
+                    self._remember(key, item['result'], float(item['ttl']))
+                    self.stats['shared_hits'] += 1
+                    return json.loads(item['result'])
+            except Exception as e:
+                print(f"[WARN] NLU cache table read failed: {e}")
+
+        self.stats['misses'] += 1
+        return None
+
+    def put(self, key: str, result: Dict[str, Any]) -> bool:
+        """
+        Store a result unless it carries sensitive slots or is a failure.
+
+        Returns:
+            True if stored
+        """
+        if not self.cacheable_result(result):
+            self.stats['skipped'] += 1
+            return False
+
+        value = json.dumps(result, separators=(',', ':'), default=str)
+        expires_at = time.time() + self.ttl_seconds
+        self._remember(key, value, expires_at)
+        self.stats['puts'] += 1
+
+        if self.table is not None:
+            try:
+                self.table.put_item(Item={'cache_key': key, 'result': value, 'ttl': int(expires_at)})
+            except Exception as e:
+                print(f"[WARN] NLU cache table write failed: {e}")
+        return True
+
+    def _remember(self, key: str, value: str, expires_at: float) -> None:
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def memory_bytes(self) -> int:
+        """Approximate memory held by the in-memory tier (keys, values, entry tuples, dict)."""
+        with self._lock:
+            entries = list(self._entries.items())
+            size = sys.getsizeof(self._entries)
+        for key, entry in entries:
+            size += sys.getsizeof(key) + sys.getsizeof(entry) + sys.getsizeof(entry[0]) + sys.getsizeof(entry[1])
+        return size
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
@@ -0,0 +1,144 @@
+"""
+Slang Matcher - longest-match phrase normalization over a token trie.
+
+The flattened slang dictionary contains single words ("nk" -> "nak") and
+phrases ("mcm mne" -> "macam mana"). Entries are compiled once into a trie
+keyed by token. A message is normalized in one left-to-right pass:
+
+1. re.split on words gives [gap, word, gap, word, ..., gap] (C speed)
+2. Every word is looked up in a dict of single-word entries (one list pass)
+3. Only words that can start a phrase walk the trie across the following gaps
+   and words; the longest complete entry wins (bounded by the longest entry)
+   and replaces the span
+
+Only matched spans are replaced. Everything else - spacing, punctuation and
+casing - is copied from the original message.
+
+Usage:
+    matcher = SlangMatcher({'nk': 'nak', 'vm': 'voicemail', 'mcm mne': 'macam mana'})
+    matcher.normalize("Mcm mne  nk off VM?")  # "macam mana  nak off voicemail?"
+"""
+
+import re
+from itertools import compress, count
+from typing import Dict, List, Optional, Tuple
+
+# Same token definition as the original tokenizer: words and single punctuation marks
+TOKEN_PATTERN = re.compile(r'\w+|[^\w\s]')
+WORD_SPLIT = re.compile(r'(\w+)')
+PUNCTUATION = re.compile(r'[^\w\s]')
+
+# Marks a complete entry inside a trie node
+_END = '\0'
+
+
+def _is_word(token: str) -> bool:
+    """True for word tokens, False for punctuation tokens and _END."""
+    return token[0] == '_' or token[0].isalnum()
+
+
+class SlangMatcher:
+    """Compiled token trie for longest-match slang normalization."""
+
+    def __init__(self, mappings: Dict[str, str]):
+        self.source = mappings
+        self.root: Dict[str, dict] = {}
+        self.words: Dict[str, str] = {}
+        self.size = 0
+        self.max_tokens = 0
+
+        for slang, standard in mappings.items():
+            tokens = TOKEN_PATTERN.findall(slang.lower())
+            if not tokens or not isinstance(standard, str):
+                continue
+            if not _is_word(tokens[0]):
+                print(f"[WARN] Skipping slang entry that starts with punctuation: {slang!r}")
+                continue
+            node = self.root
+            for token in tokens:
+                node = node.setdefault(token, {})
+            if _END not in node:
+                self.size += 1
+            node[_END] = standard
+            if len(tokens) == 1:
+                self.words[tokens[0]] = standard
+            self.max_tokens = max(self.max_tokens, len(tokens))
+
+        # A phrase can only start at word i if word i has longer entries below it and
+        # either (word i, word i+1) begins an entry or word i is followed by punctuation
+        self.phrase_starts = frozenset(token for token, node in self.root.items() if len(node) > (_END in node))
+        self.phrase_pairs = frozenset(
+            (first, second) for first, node in self.root.items() for second in node if _is_word(second)
+        )
+        self.punctuation_starts = frozenset(
+            first for first, node in self.root.items() if any(token != _END and not _is_word(token) for token in node)
+        )
+
+    def _longest_match(self, parts: List[str], lowered: List[str], start: int) -> Optional[Tuple[int, str]]:
+        """
+        Walk the trie from word `start`.
+
+        Tokens inside a phrase may only be separated by whitespace and
+        punctuation tokens that are part of the entry, so "mcm mne" matches
+        "mcm   mne" but not "mcm, mne".
+
+        Returns:
+            (index of the last matched word, replacement) or None
+        """
+        node = self.root[lowered[start]]
+        best = (start, node[_END]) if _END in node else None
+
+        for index in range(start + 1, len(lowered)):
+            gap = parts[2 * index]
+            if gap != ' ':
+                for mark in PUNCTUATION.findall(gap):
+                    node = node.get(mark)
+                    if node is None:
+                        return best
+            node = node.get(lowered[index])
+            if node is None:
+                break
+            if _END in node:
+                best = (index, node[_END])
+        return best
+
+    def normalize(self, message: str) -> str:
+        """
+        Replace every longest slang match in message.
+
+        Args:
+            message: Original user message
+
+        Returns:
+            Message with slang spans replaced, all other characters unchanged
+        """
+        if not message or not self.root:
+            return message
+
+        parts = WORD_SPLIT.split(message)
+        words = parts[1::2]
+        # Chat messages are usually typed in lowercase already
+        lowered = words if message.lower() == message else list(map(str.lower, words))
+
+        # Single-word replacements for every word in one pass (map keeps the loop in C)
+        parts[1::2] = map(self.words.get, lowered, words)
+        if self.phrase_starts.isdisjoint(lowered):
+            return ''.join(parts)
+
+        # Walk the trie only where a phrase can start; a longer match overwrites
+        # its first word and blanks the words and gaps it covers
+        phrase_pairs = self.phrase_pairs
+        punctuation_starts = self.punctuation_starts
+        covered = 0
+        for index in compress(range(len(lowered) - 1), map(self.phrase_starts.__contains__, lowered)):
+            first = lowered[index]
+            if index < covered or ((first, lowered[index + 1]) not in phrase_pairs and first not in punctuation_starts):
+                continue
+            match = self._longest_match(parts, lowered, index)
+            if match is None or match[0] == index:
+                continue
+            last, replacement = match
+            parts[2 * index + 1] = replacement
+            parts[2 * index + 2:2 * last + 2] = [''] * (2 * (last - index))
+            covered = last + 1
+        return ''.join(parts)
@@ -0,0 +1,168 @@
+"""
+Slot Extractor - deterministic phone number, PIN and language detection.
+
+Replaces the slot values the LLM used to return inside its JSON reply:
+
+- phone_number: Malaysian numbers in free text ("0123456789", "+60 12-345 6789"),
+  normalized with chatbot_core.normalize_phone_number and validated
+- security_pin: a standalone 4-digit number, preferring one next to a PIN
+  keyword ("pin saya 1234", "my pin is 1234", "kod 1234")
+- language: EN, BM or MIXED from per-word votes of a character n-gram naive
+  Bayes model (the "language_model" table in the NLU asset bundle) and the
+  language marker words
+- language_preference: the language the customer asked for ("BM please",
+  "guna bahasa inggeris"), else the dominant language of the message
+
+Usage:
+    extractor = SlotExtractor(language_model, language_markers)
+    extractor.extract("nk off vm, pin saya 1234")
+    # {'phone_number': None, 'security_pin': '1234', 'language_preference': 'BM', 'language': 'MIXED'}
+"""
+
+import re
+from typing import Dict, List, Mapping, Optional, Tuple
+
+from chatbot_core import normalize_phone_number
+
+from intent_classifier import IntentClassifier
+
+# Digit runs with optional single spaces/hyphens between groups, optional leading +
+PHONE_CANDIDATE = re.compile(r'(?<![\w+])\+?\d(?:[ -]?\d){7,13}(?!\w)')
+VALID_PHONE = re.compile(r'^\+60(?:1\d{8,9}|[3-9]\d{7,8})$')
+PIN = re.compile(r'(?<![\w+])\d{4}(?!\w)')
+PIN_KEYWORD = re.compile(r'\b(?:pin|kod|code|passcode|katalaluan|kata laluan)\b', re.IGNORECASE)
+WORD = re.compile(r'[^\W\d_]+')
+# Explicit language requests (a message naming both languages is ambiguous and ignored)
+REQUESTED_LANGUAGE = (
+    ('EN', re.compile(r'\b(?:english|inggeris|en)\b', re.IGNORECASE)),
+    ('BM', re.compile(r'\b(?:bahasa (?:malaysia|melayu)|melayu|malay|bm)\b', re.IGNORECASE)),
+)
+
+# How close (characters) a PIN keyword must be before the number
+PIN_KEYWORD_WINDOW = 25
+# Per-word language votes below this confidence are ignored
+WORD_CONFIDENCE = 0.75
+# A message is MIXED when the minority language has at least this many words
+# and this share of the votes (one stray loanword is not code-switching)
+MIXED_MIN_WORDS = 2
+MIXED_SHARE = 0.2
+
+
+def _valid_phone(candidate: str) -> Optional[str]:
+    normalized = normalize_phone_number(candidate)
+    return normalized if normalized and VALID_PHONE.match(normalized) else None
+
+
+def find_phone_numbers(text: str) -> List[Tuple[str, Tuple[int, int]]]:
+    """
+    Malaysian phone numbers in text.
+
+    Returns:
+        [(normalized +60 number, (start, end) span in text)]
+    """
+    found = []
+    for match in PHONE_CANDIDATE.finditer(text):
+        normalized = _valid_phone(match.group())
+        if normalized:
+            found.append((normalized, match.span()))
+            continue
+        # "1234 0123456789" runs a PIN into a number: try each space-separated group
+        offset = match.start()
+        for part in re.finditer(r'\S+', match.group()):
+            normalized = _valid_phone(part.group())
+            if normalized:
+                found.append((normalized, (offset + part.start(), offset + part.end())))
+    return found
+
+
+def extract_phone_number(text: str) -> Optional[str]:
+    """First Malaysian phone number in text, normalized to +60XXXXXXXXX."""
+    found = find_phone_numbers(text)
+    return found[0][0] if found else None
+
+
+def extract_security_pin(text: str) -> Optional[str]:
+    """
+    4-digit PIN in text.
+
+    A number right after a PIN keyword wins. Otherwise a single standalone
+    4-digit number is taken as the PIN; several without a keyword are ambiguous.
+    """
+    phone_spans = [span for _, span in find_phone_numbers(text)]
+    candidates = [
+        match for match in PIN.finditer(text)
+        if not any(start <= match.start() < end for start, end in phone_spans)
+    ]
+    if not candidates:
+        return None
+
+    for match in candidates:
+        window = text[max(0, match.start() - PIN_KEYWORD_WINDOW):match.start()]
+        if PIN_KEYWORD.search(window):
+            return match.group()
+    return candidates[0].group() if len(candidates) == 1 else None
+
+
+def requested_language(text: str) -> Optional[str]:
+    """EN or BM if the message names exactly one of the two languages, else None."""
+    named = [language for language, pattern in REQUESTED_LANGUAGE if pattern.search(text)]
+    return named[0] if len(named) == 1 else None
+
+
+class SlotExtractor:
+    """Local slot extraction with an optional language model from the asset bundle."""
+
+    def __init__(self, language_model: Optional[IntentClassifier] = None, markers: Optional[Mapping[str, str]] = None):
+        self.language_model = language_model
+        self.markers = markers
+
+    def _word_language(self, word: str) -> Optional[str]:
+        if self.markers is not None:
+            marked = self.markers.get(word)
+            if marked:
+                return marked
+        if self.language_model is not None and len(word) > 1:
+            language, confidence, _ = self.language_model.predict(word)
+            if confidence >= WORD_CONFIDENCE:
+                return language
+        return None
+
+    def detect_language(self, text: str) -> Tuple[str, str]:
+        """
+        Detect the message language.
+
+        Returns:
+            (language_preference "EN" | "BM", language "EN" | "BM" | "MIXED")
+        """
+        votes = [self._word_language(word) for word in WORD.findall(text.lower())]
+        english, bahasa = votes.count('EN'), votes.count('BM')
+        if not english and not bahasa:
+            return 'EN', 'EN'
+
+        if english == bahasa and self.language_model is not None:
+            dominant = self.language_model.predict(text)[0] or 'EN'
+        else:
+            dominant = 'BM' if bahasa > english else 'EN'
+        minority = min(english, bahasa)
+        mixed = minority >= MIXED_MIN_WORDS and minority / (english + bahasa) >= MIXED_SHARE
+        return dominant, 'MIXED' if mixed else dominant
+
+    def extract(self, text: str, normalized_text: Optional[str] = None) -> Dict[str, Optional[str]]:
+        """
+        All local slots of a message.
+
+        Args:
+            text: Original message (phone numbers and PINs)
+            normalized_text: Slang-normalized message for language detection (default: text)
+
+        Returns:
+            {"phone_number", "security_pin", "language_preference", "language"}
+        """
+        language_text = normalized_text if normalized_text is not None else text
+        preference, language = self.detect_language(language_text)
+        return {
+            'phone_number': extract_phone_number(text),
+            'security_pin': extract_security_pin(text),
+            'language_preference': requested_language(language_text) or preference,
+            'language': language,
+        }
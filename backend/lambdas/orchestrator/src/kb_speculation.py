@@ -0,0 +1,114 @@
+"""
+KB Speculation - start Knowledge Base retrieval before the intent is known.
+
+Knowledge Base questions ("how much does voicemail cost?") used to pay for
+NLU and then for retrieve_and_generate one after the other. When a message
+looks like a question (looks_like_kb_query), the orchestrator starts the KB
+request on a worker thread at the same time as NLU:
+
+- the intent lands in the KB intent set: the running request is used
+  (KbSpeculation.result), saving the time it already ran before it was needed
+- any other intent: the request is discarded (KbSpeculation.discard) -
+  cancelled if it had not started yet, otherwise its Bedrock cost is wasted
+
+The heuristic is deliberately cheap (regexes on the raw message, EN, BM and
+common slang) and errs towards not speculating on action requests.
+
+Usage:
+    speculation = KbSpeculation.start(executor, query_knowledge_base, message)
+    ...
+    response, saved_ms = speculation.result()   # or speculation.discard()
+"""
+
+import re
+import time
+from concurrent.futures import Executor, Future
+from typing import Any, Callable, Optional, Tuple
+
+# Question openers (EN, BM and slang spellings)
+QUESTION_START = re.compile(
+    r"^(what|what's|whats|how|why|when|where|which|who|is|are|does|do|can|could|will|should|"
+    r"apa|ape|apakah|bagaimana|macam|mcm|camne|cmne|berapa|brape|brapa|bila|mana|mne|kenapa|knp|"
+    r"adakah|boleh|bole|blh|tell me|explain|terangkan|beritahu|cerita|cite)\b"
+)
+# "... about voicemail", "vm tu ape"
+ASKS_ABOUT = re.compile(r"\b(about|info|information|details|tentang|pasal|psl|maklumat|butiran|ape|apa|brape|berapa)\b")
+# Subjects the Knowledge Base answers
+KB_TOPIC = re.compile(
+    r"\b(cost|costs|price|prices|pricing|charge|charges|charged|fee|fees|rate|rates|free|"
+    r"harga|hrga|caj|kadar|percuma|"
+    r"plan|plans|pelan|package|pakej|bill|billing|bil|sim|esim|roaming|perayauan|"
+    r"coverage|liputan|network|rangkaian|signal|data|quota|kuota|hotspot|internet|"
+    r"owe|payment|hutang|bayaran|tertunggak|"
+    r"voicemail|voice mail|vm|mel suara|feature|features|ciri)\b"
+)
+# Requests to change something go to the CRM flow and fault reports to
+# technical support, not to the KB
+ACTION = re.compile(
+    r"\b(activate|deactiv\w*|enable|disable|turn (on|off)|switch (on|off)|start|cancel|stop|remove|reset|"
+    r"aktif\w*|nyahaktif\w*|matik\w*|hidupk\w*|mula\w*|berhenti|tutup|buka|batal\w*|on|off|"
+    r"not working|cannot|can't|problem|slow|down|tidak berfungsi|masalah|perlahan|tiada|xde|x jln)\b"
+)
+MIN_WORDS = 2
+
+
+def looks_like_kb_query(message: str) -> bool:
+    """
+    Cheap guess whether NLU will route the message to the Knowledge Base.
+
+    True for questions (question mark or question opener) and for short
+    statements about a KB topic ("roaming charges"), unless the message asks
+    for an action (activate, turn off, matikan, ...).
+    """
+    text = message.lower().strip()
+    words = re.findall(r"[\w']+", text)
+    if len(words) < MIN_WORDS or ACTION.search(text):
+        return False
+    is_question = text.endswith('?') or bool(QUESTION_START.match(text) or ASKS_ABOUT.search(text))
+    return bool(KB_TOPIC.search(text)) and (is_question or len(words) <= 4)
+
+
+class KbSpeculation:
+    """A Knowledge Base request started before the intent is known."""
+
+    def __init__(self, future: Future, timings: dict):
+        self.future = future
+        self.timings = timings
+
+    @classmethod
+    def start(cls, executor: Executor, func: Callable[..., Any], *args: Any) -> 'KbSpeculation':
+        timings = {}
+
+        def run():
+            timings['start'] = time.perf_counter()
+            try:
+                return func(*args)
+            finally:
+                timings['end'] = time.perf_counter()
+
+        return cls(executor.submit(run), timings)
+
+    def result(self, timeout: Optional[float] = None) -> Tuple[Any, float]:
+        """
+        Wait for the speculative request.
+
+        Returns:
+            (func result, milliseconds saved compared with starting the request now)
+
+        Raises:
+            Whatever func raised
+        """
+        needed = time.perf_counter()
+        value = self.future.result(timeout)
+        # Time the request had already run when it was needed
+        saved_ms = (min(self.timings['end'], needed) - self.timings['start']) * 1000
+        return value, max(0.0, saved_ms)
+
+    def discard(self) -> bool:
+        """
+        Drop the speculative request.
+
+        Returns:
+            True if it was cancelled before it ran (nothing was spent)
+        """
+        return self.future.cancel()
@@ -14,61 +14,53 @@ Environment Variables:
     CRM_LAMBDA_ARN: ARN of CRM mock Lambda
     BEDROCK_KB_ID: Bedrock Knowledge Base ID
     BEDROCK_MODEL_NOVA_PRO: Nova Pro inference profile/model ID (default: apac.amazon.nova-pro-v1:0)
+    BEDROCK_MODEL_ROUTES / BEDROCK_MODEL_FAST: Model per stage and intent (see chatbot_core.routing;
+        stages "translate", "response" keyed by status and intent, "kb")
     BEDROCK_GUARDRAIL_ID: Guardrail identifier
     BEDROCK_GUARDRAIL_VERSION: Guardrail version
     RESPONSE_PROMPT_ID: Prompt Management ARN for response generation
     TRANSLATION_PROMPT_ID: Prompt Management ARN for translation
+    KB_SPECULATION: "true" to start KB retrieval in parallel with NLU for question-shaped
+        messages (default: false, see kb_speculation.py)
+    BEDROCK_PROMPT_CACHE: "false" to send system prompts without a cache point (A/B switch, see chatbot_core.prompts)
     DYNAMODB_SESSIONS_TABLE: Sessions table
     DYNAMODB_AUDIT_TABLE: Audit logs table
-    DYNAMODB_CUSTOMERS_TABLE: Customers table
+    DYNAMODB_CUSTOMERS_TABLE: Customers table (read by chatbot_core.lookup_customer)
     REGION: AWS region
 """
 
 import json
-import boto3
-from botocore.config import Config
 import os
 import uuid
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from decimal import Decimal
-from typing import Dict, Any, List, Optional
-
-# Make X-Ray optional
-try:
-    from aws_xray_sdk.core import xray_recorder
-except ImportError:
-    class DummyRecorder:
-        def capture(self, name):
-            def decorator(func):
-                return func
-            return decorator
-    xray_recorder = DummyRecorder()
-
-# Configure retry logic for throttling protection (Bedrock, KB)
-bedrock_config = Config(
-    retries={
-        'max_attempts': 6,
-        'mode': 'adaptive'
-    },
-    connect_timeout=10,
-    read_timeout=60,
-    max_pool_connections=20
+from typing import Dict, Any, List, Optional, Callable
+
+# Shared helpers from the chatbot-core layer (X-Ray shim, lazy AWS clients)
+from chatbot_core import (
+    BEDROCK_CONFIG,
+    lazy_client,
+    lazy_resource,
+    xray_recorder,
+    lookup_customer,
+    extract_text_value,
+    build_system_blocks,
+    uses_prompt_cache,
+    emit_metrics,
+    envelope,
+    ModelRouter,
 )
 
-# Initialize AWS clients
-dynamodb = boto3.resource('dynamodb', region_name=os.environ.get('REGION', 'ap-southeast-1'))
-lambda_client = boto3.client('lambda', region_name=os.environ.get('REGION', 'ap-southeast-1'))
-bedrock_runtime = boto3.client(
-    'bedrock-runtime',
-    region_name=os.environ.get('REGION', 'ap-southeast-1'),
-    config=bedrock_config
-)
-bedrock_agent = boto3.client(
-    'bedrock-agent-runtime',
-    region_name=os.environ.get('REGION', 'ap-southeast-1'),
-    config=bedrock_config
-)
-bedrock_agent_mgmt = boto3.client('bedrock-agent', region_name=os.environ.get('REGION', 'ap-southeast-1'))
+from kb_speculation import KbSpeculation, looks_like_kb_query
+
+# AWS clients are created on first use, not at import time
+dynamodb = lazy_resource('dynamodb')
+lambda_client = lazy_client('lambda')
+bedrock_runtime = lazy_client('bedrock-runtime', config=BEDROCK_CONFIG)
+bedrock_agent = lazy_client('bedrock-agent-runtime', config=BEDROCK_CONFIG)
+bedrock_agent_mgmt = lazy_client('bedrock-agent')
 
 # Configuration
 NLU_LAMBDA = os.environ.get('NLU_LAMBDA_ARN')
@@ -81,6 +73,7 @@ BEDROCK_MODEL = (
     or os.environ.get('BEDROCK_MODEL')
     or 'apac.amazon.nova-pro-v1:0'
 )
+MODEL_ROUTER = ModelRouter.from_env(BEDROCK_MODEL, service='orchestrator')
 GUARDRAIL_ID = os.environ.get('BEDROCK_GUARDRAIL_ID')
 GUARDRAIL_VERSION = os.environ.get('BEDROCK_GUARDRAIL_VERSION', 'DRAFT')
 RESPONSE_PROMPT_ID = os.environ.get('RESPONSE_PROMPT_ID')  # Prompt Management ARN
@@ -88,7 +81,37 @@ TRANSLATION_PROMPT_ID = os.environ.get('TRANSLATION_PROMPT_ID')  # Prompt Manage
 
 SESSIONS_TABLE = os.environ.get('DYNAMODB_SESSIONS_TABLE', 'chatbot-sessions')
 AUDIT_TABLE = os.environ.get('DYNAMODB_AUDIT_TABLE', 'chatbot-audit-logs')
-CUSTOMERS_TABLE = os.environ.get('DYNAMODB_CUSTOMERS_TABLE', 'chatbot-customers')
+
+KB_SPECULATION = os.environ.get('KB_SPECULATION', 'false').lower() == 'true'
+
+# Intents answered from the Knowledge Base (RAG with Automated Reasoning)
+KB_INTENTS = frozenset({
+    "query_voicemail_info", "query_voicemail_access",
+    "query_plan_info", "query_sim_card", "query_billing",
+    "query_data", "query_roaming", "query_network", "general_inquiry",
+})
+
+# Robotic openings removed from KB answers (see strip_kb_preamble)
+KB_PREAMBLES = (
+    "Based on the retrieved results, ",
+    "Based on retrieved results, ",
+    "Based on the information provided, ",
+    "Based on information provided, ",
+    "According to the retrieved information, ",
+    "According to the information, ",
+    "The retrieved results indicate that ",
+    "From the retrieved information, ",
+    "Based on the context provided, ",
+    "Berdasarkan maklumat yang diperoleh, ",
+    "Berdasarkan keputusan yang diperoleh, ",
+)
+
+# Runs speculative KB requests while NLU is in flight; reused across warm invocations
+SPECULATION_EXECUTOR = ThreadPoolExecutor(max_workers=2)
+
+# Per-request event sink for the streaming chat endpoint (see stream_server.py).
+# When set, generate_response and English KB answers stream tokens through it as Bedrock produces them.
+STREAM_CONTEXT = threading.local()
 
 
 def get_session_state(session_id: str) -> Dict[str, Any]:
@@ -220,77 +243,6 @@ def clean_markdown_formatting(text: str) -> str:
     return text.strip()
 
 
-def normalize_phone_number(phone: str) -> str:
-    """
-    Normalize Malaysian phone number to standard +60 format.
-    
-    Handles formats:
-    - +60177967594
-    - 60177967594
-    - 0177967594
-    - 177967594
-    - +60 17 796 7594 (with spaces)
-    
-    Returns:
-        Normalized phone number in +60XXXXXXXXX format
-    """
-    if not phone:
-        return None
-    
-    # Remove all non-digit characters except leading +
-    cleaned = ''.join(c for c in phone if c.isdigit() or c == '+')
-    
-    # Remove leading + for processing
-    if cleaned.startswith('+'):
-        cleaned = cleaned[1:]
-    
-    # Handle different formats
-    if cleaned.startswith('60'):
-        # Already has country code
-        return f'+{cleaned}'
-    elif cleaned.startswith('0'):
-        # Malaysian format starting with 0
-        return f'+60{cleaned[1:]}'
-    elif len(cleaned) >= 9 and len(cleaned) <= 11:
-        # Assume Malaysian number without country code or leading 0
-        return f'+60{cleaned}'
-    else:
-        # Return as-is with + prefix
-        return f'+{cleaned}' if cleaned else None
-
-
-def lookup_customer(phone_number: str) -> Optional[Dict[str, Any]]:
-    """
-    Look up customer in DynamoDB by phone number.
-    
-    Args:
-        phone_number: Normalized phone number (+60XXXXXXXXX)
-        
-    Returns:
-        Customer record or None if not found
-    """
-    if not phone_number:
-        return None
-    
-    try:
-        customers_table = dynamodb.Table(CUSTOMERS_TABLE)
-        response = customers_table.get_item(
-            Key={'phone_number': phone_number}
-        )
-        
-        customer = response.get('Item')
-        if customer:
-            print(f"[OK] Found customer: {customer.get('customer_id')} for phone {phone_number}")
-            return customer
-        else:
-            print(f"[WARN] Customer not found for phone: {phone_number}")
-            return None
-            
-    except Exception as e:
-        print(f"[ERROR] Error looking up customer: {e}")
-        return None
-
-
 @xray_recorder.capture("invoke_nlu")
 def invoke_nlu(message: str) -> Dict[str, Any]:
     """Invoke NLU Engine to detect intent and extract slots."""
@@ -298,15 +250,10 @@ def invoke_nlu(message: str) -> Dict[str, Any]:
         response = lambda_client.invoke(
             FunctionName=NLU_LAMBDA,
             InvocationType='RequestResponse',
-            Payload=json.dumps({"message": message})
+            Payload=envelope.encode({"message": message})
         )
 
-        result = json.loads(response['Payload'].read())
-
-        if 'body' in result:
-            body = json.loads(result['body']) if isinstance(result['body'], str) else result['body']
-            return body
-
+        _, result = envelope.decode(response['Payload'].read())
         return result
 
     except Exception as e:
@@ -333,15 +280,10 @@ def invoke_guardrails(action: str, session_id: str, phone_number: str, security_
         response = lambda_client.invoke(
             FunctionName=GUARDRAILS_LAMBDA,
             InvocationType='RequestResponse',
-            Payload=json.dumps(payload)
+            Payload=envelope.encode(payload)
         )
 
-        result = json.loads(response['Payload'].read())
-
-        if 'body' in result:
-            body = json.loads(result['body']) if isinstance(result['body'], str) else result['body']
-            return body
-
+        _, result = envelope.decode(response['Payload'].read())
         return result
 
     except Exception as e:
@@ -366,15 +308,10 @@ def invoke_crm(action: str, phone_number: str, customer_id: str, session_id: str
         response = lambda_client.invoke(
             FunctionName=CRM_LAMBDA,
             InvocationType='RequestResponse',
-            Payload=json.dumps(payload)
+            Payload=envelope.encode(payload)
         )
 
-        result = json.loads(response['Payload'].read())
-
-        if 'body' in result:
-            body = json.loads(result['body']) if isinstance(result['body'], str) else result['body']
-            return body
-
+        _, result = envelope.decode(response['Payload'].read())
         return result
 
     except Exception as e:
@@ -385,12 +322,133 @@ def invoke_crm(action: str, phone_number: str, customer_id: str, session_id: str
         }
 
 
+def kb_retrieval_config() -> Dict[str, Any]:
+    """retrieveAndGenerateConfiguration for the knowledge base (modelArn is set per routed model)."""
+    # Build retrieval configuration with Automated Reasoning
+    retrieval_config = {
+        'type': 'KNOWLEDGE_BASE',
+        'knowledgeBaseConfiguration': {
+            'knowledgeBaseId': BEDROCK_KB_ID,
+            'retrievalConfiguration': {
+                'vectorSearchConfiguration': {
+                    'numberOfResults': 3
+                }
+            }
+        }
+    }
+
+    # Add Guardrails in generationConfiguration if configured
+    if GUARDRAIL_ID:
+        retrieval_config['knowledgeBaseConfiguration']['generationConfiguration'] = {
+            'guardrailConfiguration': {
+                'guardrailId': GUARDRAIL_ID,
+                'guardrailVersion': GUARDRAIL_VERSION
+            }
+        }
+    return retrieval_config
+
+
+def query_knowledge_base(query: str) -> Dict[str, Any]:
+    """
+    Bedrock retrieve_and_generate call for a query (raw response).
+
+    Runs on SPECULATION_EXECUTOR when started before NLU, so it only touches
+    the Bedrock client.
+    """
+    retrieval_config = kb_retrieval_config()
+
+    def retrieve_and_generate(model_id: str) -> Dict[str, Any]:
+        retrieval_config['knowledgeBaseConfiguration']['modelArn'] = model_id
+        return bedrock_agent.retrieve_and_generate(
+            input={'text': query},
+            retrieveAndGenerateConfiguration=retrieval_config
+        )
+
+    # Nova Pro inference profile/model ID by default (route "kb")
+    response, _ = MODEL_ROUTER.invoke('kb', retrieve_and_generate)
+    return response
+
+
+def stream_knowledge_base(query: str, emit: Callable[[str, Dict[str, Any]], None]) -> Dict[str, Any]:
+    """
+    Bedrock retrieve_and_generate_stream call for a query, emitting the answer as token events.
+
+    Tokens are a preview: the answer up to its last finished sentence or line,
+    cleaned like the final answer (preamble and Markdown removed). The done
+    event carries the final text, which the client shows instead (e.g. the
+    escalation offer when the answer turns out to be ungrounded).
+
+    Args:
+        query: Customer message
+        emit: Event sink for the streaming endpoint
+
+    Returns:
+        Response shaped like retrieve_and_generate's (output.text, citations, guardrailAction)
+    """
+    retrieval_config = kb_retrieval_config()
+
+    def retrieve_and_generate_stream(model_id: str) -> Dict[str, Any]:
+        retrieval_config['knowledgeBaseConfiguration']['modelArn'] = model_id
+        return bedrock_agent.retrieve_and_generate_stream(
+            input={'text': query},
+            retrieveAndGenerateConfiguration=retrieval_config
+        )
+
+    chunks = []
+    citations = []
+    guardrail_action = None
+    emitted = ''
+    for stream_event in MODEL_ROUTER.stream('kb', retrieve_and_generate_stream):
+        if 'output' in stream_event:
+            chunks.append(stream_event['output'].get('text', ''))
+            text = ''.join(chunks)
+            # Only finished sentences/lines, so Markdown cleanup does not rewrite emitted text
+            boundary = max(text.rfind('\n'), text.rfind('. ') + 1)
+            if boundary > 0:
+                preview = clean_markdown_formatting(strip_kb_preamble(text[:boundary]))
+                if len(preview) > len(emitted) and preview.startswith(emitted):
+                    emit("token", {"text": preview[len(emitted):]})
+                    emitted = preview
+        if 'citation' in stream_event:
+            citation = stream_event['citation']
+            references = citation.get('retrievedReferences') or citation.get('citation', {}).get('retrievedReferences', [])
+            citations.append({'retrievedReferences': references})
+        if 'guardrail' in stream_event:
+            guardrail_action = stream_event['guardrail'].get('action')
+
+    response = {'output': {'text': ''.join(chunks)}, 'citations': citations}
+    if guardrail_action:
+        response['guardrailAction'] = guardrail_action
+    return response
+
+
+def strip_kb_preamble(text: str) -> str:
+    """Remove a robotic "Based on the retrieved results, ..." opening and capitalize what follows."""
+    for preamble in KB_PREAMBLES:
+        if text.lower().startswith(preamble.lower()):
+            # Remove the preamble and capitalize the first letter
+            text = text[len(preamble):]
+            if text:
+                text = text[0].upper() + text[1:]
+            break
+    return text
+
+
 @xray_recorder.capture("retrieve_from_kb")
-def retrieve_from_kb(query: str, language: str = "EN") -> Dict[str, Any]:
+def retrieve_from_kb(query: str, language: str = "EN", speculation: Optional[KbSpeculation] = None) -> Dict[str, Any]:
     """
     Retrieve and generate response from Bedrock Knowledge Base (RAG).
 
     Uses Automated Reasoning for hallucination prevention.
+
+    Args:
+        query: Customer message
+        language: Response language ("EN" or "BM")
+        speculation: query_knowledge_base(query) already started in parallel with NLU
+
+    On the streaming endpoint, English answers are streamed (stream_knowledge_base).
+    BM answers are translated after generation and a speculative result is
+    already complete, so those arrive with the done event.
     """
     if not BEDROCK_KB_ID:
         return {
@@ -400,33 +458,14 @@ def retrieve_from_kb(query: str, language: str = "EN") -> Dict[str, Any]:
         }
 
     try:
-        # Build retrieval configuration with Automated Reasoning
-        retrieval_config = {
-            'type': 'KNOWLEDGE_BASE',
-            'knowledgeBaseConfiguration': {
-                'knowledgeBaseId': BEDROCK_KB_ID,
-                'modelArn': BEDROCK_MODEL,  # Use Nova Pro inference profile/model ID
-                'retrievalConfiguration': {
-                    'vectorSearchConfiguration': {
-                        'numberOfResults': 3
-                    }
-                }
-            }
-        }
-
-        # Add Guardrails in generationConfiguration if configured
-        if GUARDRAIL_ID:
-            retrieval_config['knowledgeBaseConfiguration']['generationConfiguration'] = {
-                'guardrailConfiguration': {
-                    'guardrailId': GUARDRAIL_ID,
-                    'guardrailVersion': GUARDRAIL_VERSION
-                }
-            }
-
-        response = bedrock_agent.retrieve_and_generate(
-            input={'text': query},
-            retrieveAndGenerateConfiguration=retrieval_config
-        )
+        emit = getattr(STREAM_CONTEXT, 'emit', None)
+        if speculation:
+            response, saved_ms = speculation.result()
+            record_kb_speculation(used=True, saved_ms=saved_ms)
+        elif emit and language != "BM":
+            response = stream_knowledge_base(query, emit)
+        else:
+            response = query_knowledge_base(query)
 
         # Debug: Print full response structure
         print(f"[DEBUG] KB Response keys: {list(response.keys())}")
@@ -462,27 +501,7 @@ def retrieve_from_kb(query: str, language: str = "EN") -> Dict[str, Any]:
         citations = response.get('citations', [])
         
         # Clean up KB response - remove unwanted preambles that sound robotic
-        unwanted_preambles = [
-            "Based on the retrieved results, ",
-            "Based on retrieved results, ",
-            "Based on the information provided, ",
-            "Based on information provided, ",
-            "According to the retrieved information, ",
-            "According to the information, ",
-            "The retrieved results indicate that ",
-            "From the retrieved information, ",
-            "Based on the context provided, ",
-            "Berdasarkan maklumat yang diperoleh, ",
-            "Berdasarkan keputusan yang diperoleh, ",
-        ]
-        
-        for preamble in unwanted_preambles:
-            if generated_text.lower().startswith(preamble.lower()):
-                # Remove the preamble and capitalize the first letter
-                generated_text = generated_text[len(preamble):]
-                if generated_text:
-                    generated_text = generated_text[0].upper() + generated_text[1:]
-                break
+        generated_text = strip_kb_preamble(generated_text)
         
         # Clean up Markdown formatting for universal compatibility
         # (WhatsApp, Flutter web/mobile all display plain text better)
@@ -523,6 +542,31 @@ def retrieve_from_kb(query: str, language: str = "EN") -> Dict[str, Any]:
         }
 
 
+def start_kb_speculation(message: str) -> Optional[KbSpeculation]:
+    """Start query_knowledge_base in the background if the message looks like a KB question."""
+    if not (KB_SPECULATION and BEDROCK_KB_ID and message and looks_like_kb_query(message)):
+        return None
+    print("[INFO] Message looks like a KB query, starting retrieval in parallel with NLU")
+    return KbSpeculation.start(SPECULATION_EXECUTOR, query_knowledge_base, message)
+
+
+def record_kb_speculation(used: bool, saved_ms: float = 0.0, cancelled: bool = False) -> None:
+    """
+    Emit the outcome of one speculative KB request.
+
+    Waste rate = sum(KbSpeculationWasted) / (sum(KbSpeculationUsed) + sum(KbSpeculationWasted))
+    """
+    emit_metrics(
+        {
+            'KbSpeculationUsed': (int(used), 'Count'),
+            'KbSpeculationWasted': (int(not used and not cancelled), 'Count'),
+            'KbSpeculationCancelled': (int(cancelled), 'Count'),
+            'KbSpeculationSavedMs': (saved_ms, 'Milliseconds'),
+        },
+        dimensions={'Service': 'orchestrator', 'Operation': 'kb_speculation'}
+    )
+
+
 @xray_recorder.capture("get_translation_prompt")
 def get_translation_prompt(text: str, target_language: str = "Bahasa Malaysia") -> Dict[str, Any]:
     """
@@ -552,13 +596,14 @@ def get_translation_prompt(text: str, target_language: str = "Bahasa Malaysia")
         if messages and messages[0].get('content'):
             user_template = extract_text_value(messages[0]['content'][0])
         
-        # Replace variables
+        # Replace variables (the target language is fixed, so the whole system prompt is cacheable)
         system_prompt = system_prompt.replace('{{target_language}}', target_language)
         user_message = user_template.replace('{{target_language}}', target_language)
         user_message = user_message.replace('{{text}}', text)
         
         return {
             "system": system_prompt,
+            "system_blocks": build_system_blocks(system_prompt),
             "user_message": user_message
         }
         
@@ -574,7 +619,7 @@ def translate_to_bahasa(text: str) -> Optional[str]:
         # Get prompt from Prompt Management
         prompt = get_translation_prompt(text, "Bahasa Malaysia")
         
-        system_messages = [{"text": prompt["system"]}]
+        system_messages = prompt["system_blocks"]
         
         messages = [{
             "role": "user",
@@ -582,7 +627,6 @@ def translate_to_bahasa(text: str) -> Optional[str]:
         }]
 
         converse_args = {
-            "modelId": BEDROCK_MODEL,
             "system": system_messages,
             "messages": messages,
             "inferenceConfig": {
@@ -597,7 +641,10 @@ def translate_to_bahasa(text: str) -> Optional[str]:
                 "guardrailVersion": GUARDRAIL_VERSION
             }
 
-        response = bedrock_runtime.converse(**converse_args)
+        response, _ = MODEL_ROUTER.invoke(
+            'translate', lambda model_id: bedrock_runtime.converse(modelId=model_id, **converse_args),
+            prompt_cache=uses_prompt_cache(system_messages)
+        )
         content = response.get("output", {}).get("message", {}).get("content", [])
         if content and "text" in content[0]:
             return content[0]["text"].strip()
@@ -608,33 +655,6 @@ def translate_to_bahasa(text: str) -> Optional[str]:
         return None
 
 
-def extract_text_value(text_content) -> str:
-    """
-    Extract string from Prompt Management text content.
-    
-    Handles both formats:
-    - Direct string: "text here"
-    - Dict format: {'format': 'plain_text', 'text': 'text here'}
-    - Nested dict: {'text': {'format': 'plain_text', 'text': 'text here'}}
-    
-    Args:
-        text_content: Text content from Prompt Management API
-        
-    Returns:
-        Extracted string value
-    """
-    if isinstance(text_content, str):
-        return text_content
-    if isinstance(text_content, dict):
-        # Check for nested 'text' field that might be a dict
-        text_value = text_content.get('text', '')
-        if isinstance(text_value, dict):
-            # Handle {'text': {'format': 'plain_text', 'text': 'actual text'}}
-            return text_value.get('text', '')
-        return text_value if isinstance(text_value, str) else ''
-    return ''
-
-
 @xray_recorder.capture("get_response_prompt")
 def get_response_prompt(intent: str, context: Dict[str, Any], language: str) -> Dict[str, Any]:
     """
@@ -669,17 +689,19 @@ def get_response_prompt(intent: str, context: Dict[str, Any], language: str) ->
         if messages and messages[0].get('content'):
             user_template = extract_text_value(messages[0]['content'][0])
 
-        # Replace variables
-        system_prompt = system_prompt.replace('{{intent}}', intent)
-        system_prompt = system_prompt.replace('{{context}}', json.dumps(context, indent=2))
-        system_prompt = system_prompt.replace('{{language}}', language)
+        # Replace variables. The system prompt text before the first variable is
+        # the same for every request and goes before the cache point.
+        variables = {'intent': intent, 'context': json.dumps(context, indent=2), 'language': language}
+        system_blocks = build_system_blocks(system_prompt, variables)
+        system_prompt = ''.join(block.get('text', '') for block in system_blocks)
         
         user_message = user_template.replace('{{intent}}', intent)
-        user_message = user_message.replace('{{context}}', json.dumps(context, indent=2))
+        user_message = user_message.replace('{{context}}', variables['context'])
         user_message = user_message.replace('{{language}}', language)
 
         return {
             "system": system_prompt,
+            "system_blocks": system_blocks,
             "user_message": user_message
         }
 
@@ -703,9 +725,7 @@ def generate_response(intent: str, context: Dict[str, Any], language: str = "EN"
     prompt = get_response_prompt(intent, context, language)
 
     try:
-        system_messages = [
-            {"text": prompt["system"]}
-        ]
+        system_messages = prompt["system_blocks"]
 
         messages = [
             {
@@ -719,7 +739,6 @@ def generate_response(intent: str, context: Dict[str, Any], language: str = "EN"
         ]
 
         converse_args = {
-            "modelId": BEDROCK_MODEL,
             "system": system_messages,
             "messages": messages,
             "inferenceConfig": {
@@ -734,7 +753,17 @@ def generate_response(intent: str, context: Dict[str, Any], language: str = "EN"
                 "guardrailVersion": GUARDRAIL_VERSION
             }
 
-        response = bedrock_runtime.converse(**converse_args)
+        # Simple statuses/intents (greeting, PIN prompt) go to the fast tier, see chatbot_core.routing
+        route_keys = (context.get("status"), intent)
+
+        emit = getattr(STREAM_CONTEXT, 'emit', None)
+        if emit:
+            return generate_response_stream(converse_args, emit, *route_keys)
+
+        response, _ = MODEL_ROUTER.invoke(
+            'response', lambda model_id: bedrock_runtime.converse(modelId=model_id, **converse_args),
+            *route_keys, prompt_cache=uses_prompt_cache(system_messages)
+        )
         content = response.get("output", {}).get("message", {}).get("content", [])
 
         # Bedrock Converse returns content as [{"text": "response"}] without a type field
@@ -749,8 +778,50 @@ def generate_response(intent: str, context: Dict[str, Any], language: str = "EN"
         return "I'm sorry, I encountered an error. Please try again or contact customer service."
 
 
+def generate_response_stream(
+    converse_args: Dict[str, Any],
+    emit: Callable[[str, Dict[str, Any]], None],
+    *route_keys: Optional[str]
+) -> str:
+    """
+    Stream a response with ConverseStream, emitting each text delta as a token event.
+
+    Args:
+        converse_args: Same arguments generate_response passes to converse
+        emit: Event sink for the streaming endpoint
+        route_keys: Response status and intent, for the model route
+
+    Returns:
+        Full generated text (used for the final event, session state and audit)
+    """
+    # Latency (whole generation) and token usage are recorded when the stream ends
+    stream = MODEL_ROUTER.stream(
+        'response', lambda model_id: bedrock_runtime.converse_stream(modelId=model_id, **converse_args),
+        *route_keys, prompt_cache=uses_prompt_cache(converse_args["system"])
+    )
+
+    chunks = []
+    for stream_event in stream:
+        delta = stream_event.get("contentBlockDelta", {}).get("delta", {}).get("text")
+        if delta:
+            chunks.append(delta)
+            emit("token", {"text": delta})
+
+    text = ''.join(chunks).strip()
+    if text:
+        return text
+
+    print("[WARN] Empty content returned from Nova stream")
+    return "I'm sorry, I encountered an error. Please try again or contact customer service."
+
+
 @xray_recorder.capture("handle_intent")
-def handle_intent(intent: str, slots: Dict[str, Any], session_data: Dict[str, Any]) -> Dict[str, Any]:
+def handle_intent(
+    intent: str,
+    slots: Dict[str, Any],
+    session_data: Dict[str, Any],
+    kb_speculation: Optional[KbSpeculation] = None
+) -> Dict[str, Any]:
     """
     Handle detected intent and orchestrate appropriate actions.
 
@@ -759,6 +830,9 @@ def handle_intent(intent: str, slots: Dict[str, Any], session_data: Dict[str, An
     Channel-specific behavior:
     - mobile: Skip PIN verification (user is authenticated via app)
     - whatsapp/web: Require phone verification and 4-digit PIN
+
+    kb_speculation is the KB request started alongside NLU (process_turn);
+    it is consumed here for KB intents.
     """
     session_id = session_data['session_id']
     phone_number = session_data['phone_number']
@@ -839,7 +913,7 @@ def handle_intent(intent: str, slots: Dict[str, Any], session_data: Dict[str, An
                 "response": generate_response(intent, {
                     "status": "pin_verification_failed",
                     "error": guard_result.get('error'),
-                    "attempts_remaining": guard_result.get('attempts_remaining', 0)
+                    "attempts_remaining": guard_result.get('attempts_remaining')
                 }, language),
                 "grounded": False,
                 "citations": [],
@@ -872,12 +946,10 @@ def handle_intent(intent: str, slots: Dict[str, Any], session_data: Dict[str, An
                 "requires_followup": False
             }
 
-    elif intent in ["query_voicemail_info", "query_voicemail_access", 
-                     "query_plan_info", "query_sim_card", "query_billing",
-                     "query_data", "query_roaming", "query_network", "general_inquiry"]:
+    elif intent in KB_INTENTS:
         # Knowledge base queries (RAG with Automated Reasoning)
         # Covers voicemail info, plans, SIM cards, billing, data, roaming, network, etc.
-        kb_result = retrieve_from_kb(session_data['message'], language)
+        kb_result = retrieve_from_kb(session_data['message'], language, kb_speculation)
         
         # Check if KB response is unhelpful (no grounding or contains "insufficient information" phrases)
         unhelpful_phrases = [
@@ -1036,98 +1108,133 @@ def log_audit(session_data: Dict[str, Any], nlu_result: Dict[str, Any], response
         print(f"[ERROR] Error logging audit: {e}")
 
 
-@xray_recorder.capture("handler")
-def handler(event, context):
+@xray_recorder.capture("process_turn")
+def process_turn(event: Dict[str, Any], emit: Optional[Callable[[str, Dict[str, Any]], None]] = None) -> Dict[str, Any]:
     """
-    Orchestrator Lambda handler with AWS Best Practices (2025).
+    Run one conversation turn: session state, NLU, intent handling and audit.
 
-    Uses:
-    - Bedrock Prompt Management (no hardcoded prompts)
-    - Bedrock Guardrails (PII, content filtering, automated reasoning)
-    - Amazon Nova Pro (fast, safety-enabled)
-    - Session state tracking for multi-turn conversations
+    Args:
+        event: Orchestrator input (session_id, customer_id, phone_number, message, ...)
+        emit: Optional event sink used by the streaming endpoint. Receives a
+            "metadata" event as soon as NLU finishes and "token" events while
+            the response is generated.
+
+    Returns:
+        Response data (response, intent, confidence, language, grounded, ...)
     """
     start_time = datetime.utcnow()
 
-    print(f"[ORCH] Orchestrator invoked with event: {json.dumps(event, default=str)}")
-
-    try:
-        # Parse event
-        if isinstance(event, str):
-            event = json.loads(event)
-
-        session_data = {
-            'session_id': event.get('session_id'),
-            'customer_id': event.get('customer_id'),
-            'phone_number': event.get('phone_number'),
-            'message': event.get('message'),
-            'turn_number': event.get('turn_number', 0),
-            'channel': event.get('channel', 'web')  # whatsapp, web, or mobile
-        }
-
-        # Check session state for multi-turn context
-        session_state = get_session_state(session_data['session_id'])
-        awaiting_action = session_state.get('awaiting_action')
-        pending_intent = session_state.get('pending_intent')
-        
-        message = session_data['message']
-        
-        # Handle session state - bypass NLU if we're waiting for specific input
-        if awaiting_action == 'pin' and pending_intent:
-            # User is providing PIN - check if message looks like a PIN (digits only)
-            if message.strip().isdigit() and len(message.strip()) == 4:
-                print(f"[OK] Session awaiting PIN, message looks like PIN: {message[:2]}**")
-                # Treat as PIN input, use pending intent
-                intent = pending_intent
-                slots = {'security_pin': message.strip()}
-                confidence = 1.0
-                nlu_result = {'intent': intent, 'confidence': confidence, 'slots': slots}
-                # Clear the awaiting state
-                update_session_state(session_data['session_id'], None, None)
-            else:
-                # Not a valid PIN, run NLU normally
-                nlu_result = invoke_nlu(message)
-                intent = nlu_result.get('intent')
-                slots = nlu_result.get('slots', {})
-                confidence = nlu_result.get('confidence', 0.0)
+    session_data = {
+        'session_id': event.get('session_id'),
+        'customer_id': event.get('customer_id'),
+        'phone_number': event.get('phone_number'),
+        'message': event.get('message'),
+        'turn_number': event.get('turn_number', 0),
+        'channel': event.get('channel', 'web')  # whatsapp, web, or mobile
+    }
+
+    # Check session state for multi-turn context
+    session_state = get_session_state(session_data['session_id'])
+    awaiting_action = session_state.get('awaiting_action')
+    pending_intent = session_state.get('pending_intent')
+    
+    message = session_data['message']
+    kb_speculation = None
+    
+    # Handle session state - bypass NLU if we're waiting for specific input
+    if awaiting_action == 'pin' and pending_intent:
+        # User is providing PIN - check if message looks like a PIN (digits only)
+        if message.strip().isdigit() and len(message.strip()) == 4:
+            print(f"[OK] Session awaiting PIN, message looks like PIN: {message[:2]}**")
+            # Treat as PIN input, use pending intent
+            intent = pending_intent
+            slots = {'security_pin': message.strip()}
+            confidence = 1.0
+            nlu_result = {'intent': intent, 'confidence': confidence, 'slots': slots}
+            # Clear the awaiting state
+            update_session_state(session_data['session_id'], None, None)
         else:
-            # Normal flow - invoke NLU for intent detection
+            # Not a valid PIN, run NLU normally
+            kb_speculation = start_kb_speculation(message)
             nlu_result = invoke_nlu(message)
             intent = nlu_result.get('intent')
             slots = nlu_result.get('slots', {})
             confidence = nlu_result.get('confidence', 0.0)
+    else:
+        # Normal flow - invoke NLU for intent detection (KB retrieval may already be running)
+        kb_speculation = start_kb_speculation(message)
+        nlu_result = invoke_nlu(message)
+        intent = nlu_result.get('intent')
+        slots = nlu_result.get('slots', {})
+        confidence = nlu_result.get('confidence', 0.0)
+
+    print(f"[OK] NLU Result: intent={intent}, confidence={confidence:.2f}")
+
+    if kb_speculation and intent not in KB_INTENTS:
+        cancelled = kb_speculation.discard()
+        record_kb_speculation(used=False, cancelled=cancelled)
+        print(f"[INFO] Discarded speculative KB retrieval (intent {intent}, cancelled={cancelled})")
+        kb_speculation = None
+
+    if emit:
+        emit("metadata", {
+            "intent": intent,
+            "language": slots.get('language_preference', 'EN'),
+            "confidence": confidence
+        })
+
+    # Handle intent (orchestrate guardrails, CRM, KB)
+    STREAM_CONTEXT.emit = emit
+    try:
+        response_data = handle_intent(intent, slots, session_data, kb_speculation)
+    finally:
+        STREAM_CONTEXT.emit = None
+    
+    # Add intent and confidence to response for metadata tracking
+    response_data['intent'] = intent
+    response_data['confidence'] = confidence
+    response_data['language'] = slots.get('language_preference', 'EN')
+    
+    # If response indicates we're waiting for something, update session state
+    if response_data.get('awaiting') == 'security_pin':
+        update_session_state(session_data['session_id'], 'pin', intent)
 
-        print(f"[OK] NLU Result: intent={intent}, confidence={confidence:.2f}")
+    # Log to audit table
+    latency_ms = (datetime.utcnow() - start_time).total_seconds() * 1000
+    log_audit(session_data, nlu_result, response_data, latency_ms)
 
-        # Handle intent (orchestrate guardrails, CRM, KB)
-        response_data = handle_intent(intent, slots, session_data)
-        
-        # Add intent and confidence to response for metadata tracking
-        response_data['intent'] = intent
-        response_data['confidence'] = confidence
-        response_data['language'] = slots.get('language_preference', 'EN')
-        
-        # If response indicates we're waiting for something, update session state
-        if response_data.get('awaiting') == 'security_pin':
-            update_session_state(session_data['session_id'], 'pin', intent)
+    print(f"[OK] Orchestrator completed in {latency_ms:.0f}ms")
 
-        # Log to audit table
-        latency_ms = (datetime.utcnow() - start_time).total_seconds() * 1000
-        log_audit(session_data, nlu_result, response_data, latency_ms)
+    return response_data
 
-        print(f"[OK] Orchestrator completed in {latency_ms:.0f}ms")
 
-        return {
-            'statusCode': 200,
-            'body': json.dumps(response_data)
-        }
+@xray_recorder.capture("handler")
+def handler(event, context):
+    """
+    Orchestrator Lambda handler with AWS Best Practices (2025).
+
+    Uses:
+    - Bedrock Prompt Management (no hardcoded prompts)
+    - Bedrock Guardrails (PII, content filtering, automated reasoning)
+    - Amazon Nova Pro (fast, safety-enabled)
+    - Session state tracking for multi-turn conversations
+    """
+    print(f"[ORCH] Orchestrator invoked with event: {json.dumps(event, default=str)}")
+
+    enveloped = False
+    try:
+        # Parse event (envelope from the webhooks, or a plain dict)
+        event, enveloped = envelope.open_request(event)
+
+        response_data = process_turn(event)
+        status_code = 200
 
     except Exception as e:
         print(f"[ERROR] Error in Orchestrator: {e}")
-        return {
-            'statusCode': 500,
-            'body': json.dumps({
-                'error': str(e),
-                'response': "I apologize, but I encountered an error. Please try again."
-            })
+        response_data = {
+            'error': str(e),
+            'response': "I apologize, but I encountered an error. Please try again."
         }
+        status_code = 500
+
+    return envelope.respond(response_data, status_code, enveloped)
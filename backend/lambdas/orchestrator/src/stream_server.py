@@ -0,0 +1,207 @@
+"""
+Streaming Chat Endpoint - Server-Sent Events (SSE)
+
+Streaming variant of the API handler chat entry point. Instead of returning one
+JSON body after the orchestrator finishes, it runs the orchestrator pipeline
+in-process and streams:
+
+    event: metadata   {"session_id", "intent", "language", "confidence"}  (as soon as NLU finishes)
+    event: token      {"text": "..."}                                     (as the response is generated)
+    event: done       same JSON body as the API handler response
+    event: error      {"error": "...", "message": "..."}
+
+Errors before the stream starts are plain JSON responses with the API
+handler's status codes: 400 (validation), 429 (rate limited), 503 with
+Retry-After (session busy with a concurrent message) and 500.
+
+Deployment:
+    Python Lambda runtimes cannot stream responses natively, so this module runs as
+    a plain HTTP server behind the AWS Lambda Web Adapter layer with
+    AWS_LWA_INVOKE_MODE=response_stream and a Function URL in RESPONSE_STREAM
+    invoke mode. The same server is the local stand-in:
+
+        PYTHONPATH=../../../layers/chatbot-core/python python stream_server.py --port 8080
+
+Environment Variables:
+    PORT: Listen port (default: 8080, set by Lambda Web Adapter)
+    RATE_LIMIT_*: Per-phone and per-session throttling, same settings as the webhooks
+        (see chatbot_core.rate_limit); throttled requests get a 429 before any stream
+    Plus all orchestrator environment variables (see lambda_function.py)
+
+Input (POST, same body as the API handler):
+    {
+        "phone_number": "+60123456789",
+        "message": "nk off vm skrg",
+        "session_id": "SESSION-CUST001-123",  # Optional, for resuming
+        "channel": "web"
+    }
+"""
+
+import json
+import os
+import re
+import argparse
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Any, Optional
+
+from chatbot_core import (
+    normalize_phone_number,
+    sanitize_message,
+    create_or_resume_session,
+    SessionTurnConflict,
+    RateLimiter,
+)
+
+import lambda_function as orchestrator
+
+# Token buckets per phone number and session; floods are dropped before they cost Bedrock calls
+RATE_LIMITER = RateLimiter.from_env(service='stream-server')
+
+CORS_HEADERS = {
+    'Access-Control-Allow-Origin': '*',
+    'Access-Control-Allow-Headers': 'Content-Type',
+    'Access-Control-Allow-Methods': 'POST, OPTIONS'
+}
+
+
+def open_session(phone_number: str, message: str, session_id: Optional[str], channel: str) -> Dict[str, Any]:
+    """
+    Create or resume a session the same way the API handler does (chatbot_core.sessions).
+
+    Args:
+        phone_number: Normalized phone number
+        message: Sanitized user message
+        session_id: Existing session ID (optional)
+        channel: Channel type (web, mobile)
+
+    Returns:
+        Orchestrator input event for this turn
+
+    Raises:
+        SessionTurnConflict: Concurrent requests kept taking the next turn of the session
+    """
+    session = create_or_resume_session(phone_number, message, session_id, channel)
+    return {
+        'session_id': session['session_id'],
+        'turn_number': int(session['turn_number']),
+        'customer_id': session['customer_id'],
+        'phone_number': session['phone_number'],
+        'message': message,
+        'channel': channel,
+        'is_new_session': session['is_new_session']
+    }
+
+
+class ChatStreamHandler(BaseHTTPRequestHandler):
+    """HTTP handler that answers chat POSTs with a text/event-stream body."""
+
+    def do_OPTIONS(self):
+        self.send_response(200)
+        for key, value in CORS_HEADERS.items():
+            self.send_header(key, value)
+        self.end_headers()
+
+    def do_POST(self):
+        try:
+            length = int(self.headers.get('Content-Length', 0))
+            body = json.loads(self.rfile.read(length) or b'{}')
+        except ValueError:
+            return self._send_json(400, {'error': 'Invalid JSON body'})
+
+        phone_number = normalize_phone_number(str(body.get('phone_number', '')).strip())
+        message = sanitize_message(str(body.get('message', '')).strip())
+        channel = body.get('channel', 'web')
+
+        if not phone_number or not re.match(r'^\+60\d{9,11}$', phone_number):
+            return self._send_json(400, {'error': 'Invalid phone number format. Expected: +60XXXXXXXXX'})
+        if not message:
+            return self._send_json(400, {'error': 'Missing required field: message'})
+
+        # Throttle floods before any session or orchestrator work (same 429 as the webhooks)
+        decision = RATE_LIMITER.check(phone=phone_number, session=body.get('session_id'))
+        if not decision.allowed:
+            return self._send_json(429, {
+                'error': 'Too many messages. Please wait a moment and try again.',
+                'retry_after_seconds': decision.retry_after
+            }, headers={'Retry-After': str(int(decision.retry_after) + 1)})
+
+        # Open the session before the stream starts, so failures get the API handler's status codes
+        try:
+            event = open_session(phone_number, message, body.get('session_id'), channel)
+        except SessionTurnConflict as conflict:
+            print(f"[WARN] {conflict}")
+            return self._send_json(503, {
+                'error': 'Session is busy with another message. Please try again.',
+                'session_id': body.get('session_id')
+            }, headers={'Retry-After': '1'})
+        except Exception as e:
+            print(f"[ERROR] Error opening session: {e}")
+            return self._send_json(500, {'error': str(e)})
+        session_id = event['session_id']
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Cache-Control', 'no-cache')
+        self.send_header('X-Accel-Buffering', 'no')
+        for key, value in CORS_HEADERS.items():
+            self.send_header(key, value)
+        self.end_headers()
+
+        try:
+            def emit(name: str, data: Dict[str, Any]) -> None:
+                if name == 'metadata':
+                    data = {'session_id': session_id, **data}
+                self._send_event(name, data)
+
+            response_data = orchestrator.process_turn(event, emit)
+
+            self._send_event('done', {
+                'session_id': session_id,
+                'message': response_data.get('response', 'Processing...'),
+                'metadata': {
+                    'intent': response_data.get('intent'),
+                    'grounded': response_data.get('grounded', False),
+                    'language': response_data.get('language', 'EN'),
+                    'confidence': response_data.get('confidence')
+                },
+                'requires_followup': response_data.get('requires_followup', False),
+                'escalate': response_data.get('escalate', False),
+                'timestamp': datetime.utcnow().isoformat() + 'Z'
+            })
+
+        except Exception as e:
+            print(f"[ERROR] Error in streaming chat endpoint: {e}")
+            self._send_event('error', {
+                'error': 'Failed to process message',
+                'session_id': session_id,
+                'message': 'Sorry, I encountered an error. Please try again.'
+            })
+
+    def _send_event(self, name: str, data: Dict[str, Any]) -> None:
+        self.wfile.write(f"event: {name}\ndata: {json.dumps(data, default=str)}\n\n".encode('utf-8'))
+        self.wfile.flush()
+
+    def _send_json(self, status: int, payload: Dict[str, Any], headers: Optional[Dict[str, str]] = None) -> None:
+        encoded = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(encoded)))
+        for key, value in {**CORS_HEADERS, **(headers or {})}.items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(encoded)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Streaming (SSE) chat endpoint')
+    parser.add_argument('--port', type=int, default=int(os.environ.get('PORT', '8080')))
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(('0.0.0.0', args.port), ChatStreamHandler)
+    print(f"[STREAM] Streaming chat endpoint listening on :{args.port}")
+    server.serve_forever()
+
+
+if __name__ == '__main__':
+    main()
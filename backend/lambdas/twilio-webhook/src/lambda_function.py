@@ -10,6 +10,11 @@ Environment Variables:
     TWILIO_ACCOUNT_SID: Twilio Account SID
     TWILIO_AUTH_TOKEN: Twilio Auth Token
     TWILIO_WHATSAPP_NUMBER: Twilio WhatsApp sender number (e.g., whatsapp:+14155238886)
+    COALESCE_WINDOW_MS: Debounce window for merging rapid message bursts (default: 0 = disabled)
+    COALESCE_MAX_WAIT_MS: Maximum latency added by coalescing, measured from the first message (default: 2500)
+    RATE_LIMIT_ENABLED: "true" to drop message floods per sender (default: false)
+    RATE_LIMIT_PHONE_PER_MINUTE / RATE_LIMIT_PHONE_BURST: Per-phone bucket (default: 20 / 10)
+    RATE_LIMIT_TABLE: Shared bucket state (default: sessions table, "" = per container)
     REGION: AWS region
 
 Twilio Webhook Format (form-urlencoded):
@@ -20,13 +25,13 @@ Twilio Webhook Format (form-urlencoded):
 """
 
 import json
-import boto3
 import os
 import re
 import uuid
 import hmac
 import hashlib
 import base64
+import time
 from datetime import datetime, timedelta
 from typing import Dict, Any, Optional
 from urllib.parse import parse_qs, urlencode
@@ -40,13 +45,22 @@ except ImportError:
     TWILIO_SDK_AVAILABLE = False
     print("[WARN] Twilio SDK not available, signature validation disabled")
 
-# Initialize AWS clients
-dynamodb = boto3.resource('dynamodb', region_name=os.environ.get('REGION', 'ap-southeast-1'))
-lambda_client = boto3.client('lambda', region_name=os.environ.get('REGION', 'ap-southeast-1'))
+# Shared helpers from the chatbot-core layer (lazy AWS clients)
+from chatbot_core import (
+    lazy_client,
+    lazy_resource,
+    lookup_customer,
+    sanitize_message,
+    envelope,
+    RateLimiter,
+)
+
+# AWS clients are created on first use, not at import time
+dynamodb = lazy_resource('dynamodb')
+lambda_client = lazy_client('lambda')
 
 # Configuration
 SESSIONS_TABLE = os.environ.get('DYNAMODB_SESSIONS_TABLE', 'chatbot-sessions')
-CUSTOMERS_TABLE = os.environ.get('DYNAMODB_CUSTOMERS_TABLE', 'chatbot-customers')
 ORCHESTRATOR_ARN = os.environ.get('ORCHESTRATOR_LAMBDA_ARN')
 REGION = os.environ.get('REGION', 'ap-southeast-1')
 
@@ -58,76 +72,14 @@ TWILIO_WHATSAPP_NUMBER = os.environ.get('TWILIO_WHATSAPP_NUMBER', 'whatsapp:+141
 # Session TTL: 24 hours
 SESSION_TTL_HOURS = 24
 
+# Burst coalescing: "nk off vm", "skrg", "pls" sent as separate WhatsApp messages
+# are merged into one orchestrator turn when they arrive within the window
+COALESCE_WINDOW_MS = int(os.environ.get('COALESCE_WINDOW_MS', '0'))
+COALESCE_MAX_WAIT_MS = int(os.environ.get('COALESCE_MAX_WAIT_MS', '2500'))
+COALESCE_BUFFER_TTL_SECONDS = 300
 
-def normalize_phone_number(phone: str) -> Optional[str]:
-    """
-    Normalize Malaysian phone number to standard +60 format.
-    
-    Handles formats:
-    - +60177967594
-    - 60177967594
-    - 0177967594
-    - 177967594
-    - +60 17 796 7594 (with spaces)
-    
-    Returns:
-        Normalized phone number in +60XXXXXXXXX format or None
-    """
-    if not phone:
-        return None
-    
-    # Remove all non-digit characters except leading +
-    cleaned = ''.join(c for c in phone if c.isdigit() or c == '+')
-    
-    # Remove leading + for processing
-    if cleaned.startswith('+'):
-        cleaned = cleaned[1:]
-    
-    # Handle different formats
-    if cleaned.startswith('60'):
-        # Already has country code
-        return f'+{cleaned}'
-    elif cleaned.startswith('0'):
-        # Malaysian format starting with 0
-        return f'+60{cleaned[1:]}'
-    elif len(cleaned) >= 9 and len(cleaned) <= 11:
-        # Assume Malaysian number without country code or leading 0
-        return f'+60{cleaned}'
-    else:
-        # Return as-is with + prefix
-        return f'+{cleaned}' if cleaned else None
-
-
-def lookup_customer(phone_number: str) -> Optional[Dict[str, Any]]:
-    """
-    Look up customer in DynamoDB by phone number.
-    
-    Args:
-        phone_number: Normalized phone number (+60XXXXXXXXX)
-        
-    Returns:
-        Customer record or None if not found
-    """
-    if not phone_number:
-        return None
-    
-    try:
-        customers_table = dynamodb.Table(CUSTOMERS_TABLE)
-        response = customers_table.get_item(
-            Key={'phone_number': phone_number}
-        )
-        
-        customer = response.get('Item')
-        if customer:
-            print(f"[OK] Found customer: {customer.get('customer_id')} for phone {phone_number}")
-            return customer
-        else:
-            print(f"[INFO] Customer not found for phone: {phone_number}")
-            return None
-            
-    except Exception as e:
-        print(f"[ERROR] Error looking up customer: {e}")
-        return None
+# Token bucket per sender; floods are dropped before they cost Bedrock calls
+RATE_LIMITER = RateLimiter.from_env(service='twilio-webhook')
 
 
 def validate_twilio_signature(event: Dict[str, Any]) -> bool:
@@ -231,39 +183,108 @@ def parse_twilio_webhook(event: Dict[str, Any]) -> Dict[str, Any]:
     }
 
 
-def sanitize_message(message: str) -> str:
+def validate_phone_number(phone_number: str) -> bool:
     """
-    Sanitize user message (prevent injection attacks).
+    Validate phone number format (Malaysian or international).
     
     Args:
-        message: User message
+        phone_number: Phone number to validate
         
     Returns:
-        Sanitized message
+        True if valid, False otherwise
     """
-    # Limit length
-    message = message[:500]
-    
-    # Remove potentially dangerous characters
-    sanitized = re.sub(r'<script.*?</script>', '', message, flags=re.IGNORECASE | re.DOTALL)
-    sanitized = re.sub(r'<.*?>', '', sanitized)  # Remove HTML tags
-    
-    return sanitized.strip()
+    # Accept Malaysian numbers (+60) and international numbers
+    pattern = r'^\+\d{10,15}$'
+    return bool(re.match(pattern, phone_number))
 
 
-def validate_phone_number(phone_number: str) -> bool:
+def coalesce_inbound_message(phone_number: str, message: str, message_sid: str) -> Optional[str]:
     """
-    Validate phone number format (Malaysian or international).
+    Debounce a burst of WhatsApp messages from the same sender into one turn.
+    
+    Each fragment is appended to a per-sender buffer item in the sessions table.
+    The invocation then waits until COALESCE_WINDOW_MS after its own fragment
+    (capped at COALESCE_MAX_WAIT_MS after the first fragment of the burst) and
+    claims the buffer only if no newer fragment has arrived in the meantime.
+    Fragments are merged in the order DynamoDB serialized the appends, so the
+    result is deterministic regardless of which invocation flushes. A fragment
+    Twilio redelivered (same MessageSid) is merged once.
     
     Args:
-        phone_number: Phone number to validate
+        phone_number: Customer phone number (WhatsApp sender)
+        message: Sanitized message text
+        message_sid: Twilio MessageSid of this fragment
         
     Returns:
-        True if valid, False otherwise
+        Merged message if this invocation owns the turn, None if a later
+        invocation will process the burst
     """
-    # Accept Malaysian numbers (+60) and international numbers
-    pattern = r'^\+\d{10,15}$'
-    return bool(re.match(pattern, phone_number))
+    sessions_table = dynamodb.Table(SESSIONS_TABLE)
+    message_sid = message_sid or uuid.uuid4().hex
+    
+    # Buffer item has no phone_number attribute so session lookups never match it
+    buffer_key = {'session_id': f"COALESCE#{phone_number}", 'turn_number': 0}
+    received_ms = int(time.time() * 1000)
+    
+    try:
+        response = sessions_table.update_item(
+            Key=buffer_key,
+            UpdateExpression=(
+                "SET fragments = list_append(if_not_exists(fragments, :empty), :fragment), "
+                "first_received_ms = if_not_exists(first_received_ms, :now), "
+                "last_message_sid = :sid, #ttl = :ttl"
+            ),
+            ExpressionAttributeNames={'#ttl': 'ttl'},
+            ExpressionAttributeValues={
+                ':empty': [],
+                ':fragment': [{'message_sid': message_sid, 'text': message, 'received_ms': received_ms}],
+                ':now': received_ms,
+                ':sid': message_sid,
+                ':ttl': int(time.time()) + COALESCE_BUFFER_TTL_SECONDS
+            },
+            ReturnValues='ALL_NEW'
+        )
+    except Exception as e:
+        # Fail open: process this fragment on its own
+        print(f"[WARN] Error buffering message for coalescing: {e}")
+        return message
+    
+    first_received_ms = int(response['Attributes'].get('first_received_ms', received_ms))
+    deadline_ms = min(received_ms + COALESCE_WINDOW_MS, first_received_ms + COALESCE_MAX_WAIT_MS)
+    wait_ms = deadline_ms - int(time.time() * 1000)
+    if wait_ms > 0:
+        time.sleep(wait_ms / 1000)
+    
+    # Claim the buffer only if this fragment is still the latest one
+    try:
+        response = sessions_table.delete_item(
+            Key=buffer_key,
+            ConditionExpression='last_message_sid = :sid',
+            ExpressionAttributeValues={':sid': message_sid},
+            ReturnValues='ALL_OLD'
+        )
+    except sessions_table.meta.client.exceptions.ConditionalCheckFailedException:
+        print(f"[COALESCE] Newer message arrived, deferring {message_sid} to later invocation")
+        return None
+    except Exception as e:
+        print(f"[WARN] Error claiming coalescing buffer: {e}")
+        return message
+    
+    fragments = response.get('Attributes', {}).get('fragments', [])
+    if not fragments:
+        return message
+    
+    # Webhook retries append the same MessageSid again; keep its first append only
+    unique_fragments = {}
+    for fragment in fragments:
+        unique_fragments.setdefault(fragment.get('message_sid'), fragment)
+    fragments = list(unique_fragments.values())
+    
+    merged = ' '.join(f.get('text', '') for f in fragments if f.get('text'))[:500]
+    added_latency_ms = int(time.time() * 1000) - first_received_ms
+    print(f"[COALESCE] Merged {len(fragments)} message(s) into one turn (+{added_latency_ms}ms): {merged[:50]}...")
+    
+    return merged
 
 
 def create_or_resume_session(phone_number: str, message: str, session_id: Optional[str] = None) -> Dict[str, Any]:
@@ -405,7 +426,7 @@ def invoke_orchestrator(session_data: Dict[str, Any], message: str, phone_number
         phone_number: Customer phone number
         
     Returns:
-        Orchestrator response
+        Orchestrator response data (decoded envelope)
     """
     if not ORCHESTRATOR_ARN:
         print("[ERROR] ORCHESTRATOR_LAMBDA_ARN not configured")
@@ -425,10 +446,10 @@ def invoke_orchestrator(session_data: Dict[str, Any], message: str, phone_number
         response = lambda_client.invoke(
             FunctionName=ORCHESTRATOR_ARN,
             InvocationType='RequestResponse',
-            Payload=json.dumps(payload)
+            Payload=envelope.encode(payload)
         )
         
-        orchestrator_response = json.loads(response['Payload'].read())
+        _, orchestrator_response = envelope.decode(response['Payload'].read())
         
         if response.get('FunctionError'):
             raise Exception(f"Orchestrator error: {orchestrator_response}")
@@ -547,6 +568,30 @@ def handler(event, context):
                 'body': ''
             }
         
+        # Drop floods before coalescing, session or orchestrator work (no reply,
+        # so an abusive sender does not cost outbound messages either)
+        if not RATE_LIMITER.check(phone=phone_number).allowed:
+            return {
+                'statusCode': 200,
+                'headers': {
+                    'Content-Type': 'text/plain'
+                },
+                'body': ''
+            }
+        
+        # Merge rapid multi-message bursts into a single orchestrator turn
+        if COALESCE_WINDOW_MS > 0:
+            message = coalesce_inbound_message(phone_number, message, webhook_data['message_sid'])
+            if message is None:
+                # A later message in the same burst will carry this one
+                return {
+                    'statusCode': 200,
+                    'headers': {
+                        'Content-Type': 'text/plain'
+                    },
+                    'body': ''
+                }
+        
         # Create or resume session
         session_data = create_or_resume_session(phone_number, message)
         
@@ -555,11 +600,7 @@ def handler(event, context):
             orchestrator_response = invoke_orchestrator(session_data, message, phone_number)
             
             # Extract response text
-            response_body = orchestrator_response.get('body', {})
-            if isinstance(response_body, str):
-                response_body = json.loads(response_body)
-            
-            bot_response = response_body.get('response', 'I apologize, I encountered an error. Please try again.')
+            bot_response = orchestrator_response.get('response', 'I apologize, I encountered an error. Please try again.')
             
         except Exception as orch_error:
             print(f"[ERROR] Orchestrator error: {orch_error}")
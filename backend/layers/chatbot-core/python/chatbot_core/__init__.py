@@ -0,0 +1,70 @@
+"""
+Chatbot Core - shared helpers for all chatbot Lambda functions.
+
+Deployed as the chatbot-core Lambda layer (python/ directory), so every
+function imports it as a top-level package:
+
+    from chatbot_core import lazy_client, lookup_customer, normalize_phone_number
+
+Modules:
+    clients: Lazily constructed, memoized boto3 clients/resources
+    tracing: Optional X-Ray recorder (no-op when aws_xray_sdk is unavailable)
+    validation: Phone number normalization and message sanitization
+    customers: Customer lookup in DynamoDB
+    sessions: Session create/resume for the chat entry points
+    prompts: Bedrock Prompt Management helpers and prompt-cache system blocks
+    envelope: Single-pass codec for Lambda-to-Lambda payloads
+    metrics: CloudWatch Embedded Metric Format records
+    routing: Bedrock model routing per pipeline stage with fallback chains
+    pin_hash: Versioned, self-describing PIN hashes with rehash-on-verify
+    rate_limit: Token-bucket rate limiting per phone number and session
+"""
+
+from chatbot_core.clients import (
+    BEDROCK_CONFIG,
+    REGION,
+    get_client,
+    get_resource,
+    lazy_client,
+    lazy_resource,
+    serialize_item,
+    deserialize_item,
+)
+from chatbot_core.tracing import xray_recorder
+from chatbot_core.validation import normalize_phone_number, sanitize_message
+from chatbot_core.customers import lookup_customer
+from chatbot_core.sessions import SessionTurnConflict, create_or_resume_session, get_latest_session_turn
+from chatbot_core.prompts import extract_text_value, build_system_blocks, uses_prompt_cache, record_bedrock_usage
+from chatbot_core.metrics import emit_metrics
+from chatbot_core.routing import ModelRouter
+from chatbot_core.pin_hash import hash_pin, verify_pin_hash
+from chatbot_core.rate_limit import RateLimiter
+from chatbot_core import envelope
+
+__all__ = [
+    'BEDROCK_CONFIG',
+    'REGION',
+    'get_client',
+    'get_resource',
+    'lazy_client',
+    'lazy_resource',
+    'serialize_item',
+    'deserialize_item',
+    'xray_recorder',
+    'normalize_phone_number',
+    'sanitize_message',
+    'lookup_customer',
+    'SessionTurnConflict',
+    'create_or_resume_session',
+    'get_latest_session_turn',
+    'extract_text_value',
+    'build_system_blocks',
+    'uses_prompt_cache',
+    'record_bedrock_usage',
+    'emit_metrics',
+    'ModelRouter',
+    'hash_pin',
+    'verify_pin_hash',
+    'RateLimiter',
+    'envelope',
+]
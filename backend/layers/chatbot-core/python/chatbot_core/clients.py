@@ -0,0 +1,119 @@
+"""
+Lazily constructed, memoized AWS clients.
+
+Creating a boto3 client costs tens of milliseconds (endpoint and service model
+loading), and most Lambdas created several at import time even when a warm
+request never used them. Clients here are built on first use and shared for
+the lifetime of the container.
+
+Usage:
+    dynamodb = lazy_resource('dynamodb')
+    bedrock_runtime = lazy_client('bedrock-runtime', config=BEDROCK_CONFIG)
+
+    dynamodb.Table('chatbot-sessions')  # Client is created here, once
+
+boto3 clients are thread-safe, resources are not: code that uses DynamoDB
+from worker threads uses get_client('dynamodb') with serialize_item() and
+deserialize_item().
+"""
+
+import os
+import threading
+from typing import Any, Dict, Optional, Tuple
+
+from botocore.config import Config
+
+REGION = os.environ.get('REGION', 'ap-southeast-1')
+
+# Configure retry logic for throttling protection (Bedrock, KB)
+BEDROCK_CONFIG = Config(
+    retries={
+        'max_attempts': 6,
+        'mode': 'adaptive'
+    },
+    connect_timeout=10,
+    read_timeout=60,
+    max_pool_connections=20
+)
+
+_CLIENTS: Dict[Tuple[str, str, str, Optional[int]], Any] = {}
+_LOCK = threading.Lock()
+
+
+def _get(kind: str, service_name: str, config: Optional[Config], region_name: Optional[str]) -> Any:
+    key = (kind, service_name, region_name or REGION, id(config) if config else None)
+    instance = _CLIENTS.get(key)
+    if instance is not None:
+        return instance
+
+    # boto3's default session is not thread-safe, so creation is serialized
+    with _LOCK:
+        instance = _CLIENTS.get(key)
+        if instance is None:
+            import boto3
+            factory = boto3.client if kind == 'client' else boto3.resource
+            kwargs = {'region_name': region_name or REGION}
+            if config:
+                kwargs['config'] = config
+            instance = factory(service_name, **kwargs)
+            _CLIENTS[key] = instance
+    return instance
+
+
+def get_client(service_name: str, config: Optional[Config] = None, region_name: Optional[str] = None) -> Any:
+    """
+    Get a memoized boto3 client, creating it on first call.
+
+    Args:
+        service_name: AWS service (e.g., "lambda", "bedrock-runtime")
+        config: Optional botocore Config (memoized per Config instance)
+        region_name: Region override (default: REGION env var)
+
+    Returns:
+        boto3 client
+    """
+    return _get('client', service_name, config, region_name)
+
+
+def get_resource(service_name: str, config: Optional[Config] = None, region_name: Optional[str] = None) -> Any:
+    """Get a memoized boto3 resource (e.g., "dynamodb"), creating it on first call."""
+    return _get('resource', service_name, config, region_name)
+
+
+class LazyClient:
+    """Module-level stand-in that resolves to the memoized client on first attribute access."""
+
+    def __init__(self, kind: str, service_name: str, config: Optional[Config], region_name: Optional[str]):
+        self._args = (kind, service_name, config, region_name)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(_get(*self._args), name)
+
+    def __repr__(self) -> str:
+        return f"LazyClient({self._args[0]}:{self._args[1]})"
+
+
+def lazy_client(service_name: str, config: Optional[Config] = None, region_name: Optional[str] = None) -> LazyClient:
+    """Declare a module-level client without creating it at import time."""
+    return LazyClient('client', service_name, config, region_name)
+
+
+def lazy_resource(service_name: str, config: Optional[Config] = None, region_name: Optional[str] = None) -> LazyClient:
+    """Declare a module-level resource without creating it at import time."""
+    return LazyClient('resource', service_name, config, region_name)
+
+
+def serialize_item(item: Dict[str, Any]) -> Dict[str, Any]:
+    """Python values to a low-level DynamoDB client item (as a Table resource writes them)."""
+    from boto3.dynamodb.types import TypeSerializer
+
+    serializer = TypeSerializer()
+    return {name: serializer.serialize(value) for name, value in item.items()}
+
+
+def deserialize_item(item: Dict[str, Any]) -> Dict[str, Any]:
+    """Low-level DynamoDB client item to Python values (as a Table resource returns them)."""
+    from boto3.dynamodb.types import TypeDeserializer
+
+    deserializer = TypeDeserializer()
+    return {name: deserializer.deserialize(value) for name, value in item.items()}
@@ -0,0 +1,44 @@
+"""
+Customer lookup in the chatbot-customers DynamoDB table.
+"""
+
+import os
+from typing import Any, Dict, Optional
+
+from chatbot_core.clients import get_client, deserialize_item
+
+CUSTOMERS_TABLE = os.environ.get('DYNAMODB_CUSTOMERS_TABLE', 'chatbot-customers')
+
+
+def lookup_customer(phone_number: str) -> Optional[Dict[str, Any]]:
+    """
+    Look up customer in DynamoDB by phone number.
+
+    Uses the low-level client, so it is safe to call from worker threads.
+    
+    Args:
+        phone_number: Normalized phone number (+60XXXXXXXXX)
+        
+    Returns:
+        Customer record or None if not found
+    """
+    if not phone_number:
+        return None
+    
+    try:
+        response = get_client('dynamodb').get_item(
+            TableName=CUSTOMERS_TABLE,
+            Key={'phone_number': {'S': phone_number}}
+        )
+        
+        customer = deserialize_item(response['Item']) if 'Item' in response else None
+        if customer:
+            print(f"[OK] Found customer: {customer.get('customer_id')} for phone {phone_number}")
+            return customer
+        else:
+            print(f"[INFO] Customer not found for phone: {phone_number}")
+            return None
+            
+    except Exception as e:
+        print(f"[ERROR] Error looking up customer: {e}")
+        return None
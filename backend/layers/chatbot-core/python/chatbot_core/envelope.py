@@ -0,0 +1,147 @@
+"""
+Envelope codec for Lambda-to-Lambda payloads.
+
+Handlers used to return {'statusCode': 200, 'body': json.dumps(result)}, so every
+hop serialized the result twice and every caller needed its own
+'body' in result special case. An envelope carries the status code and the
+data in one object that is serialized once:
+
+    {"v": 1, "statusCode": 200, "codec": "json", "data": {...}}
+
+With ENVELOPE_CODEC=msgpack (and msgpack installed), "data" is a base64 string
+of the msgpack-encoded result instead. Lambda payloads must be JSON, so this only
+pays off for large payloads - see scripts/benchmark_envelope_codec.py.
+
+Usage (caller):
+    response = lambda_client.invoke(FunctionName=..., Payload=encode(request))
+    status_code, result = decode(response['Payload'].read())
+
+Usage (handler):
+    event, enveloped = open_request(event)
+    ...
+    return respond(result, status_code, enveloped)
+"""
+
+import os
+import json
+import base64
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Dict, Tuple, Union
+
+try:
+    import msgpack
+    MSGPACK_AVAILABLE = True
+except ImportError:
+    MSGPACK_AVAILABLE = False
+
+SCHEMA_VERSION = 1
+ENVELOPE_CODEC = os.environ.get('ENVELOPE_CODEC', 'json').lower()
+
+
+def _default(value: Any) -> Any:
+    """Serialize DynamoDB Decimals and datetimes the same way for both codecs."""
+    if isinstance(value, Decimal):
+        return int(value) if value == value.to_integral_value() else float(value)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return str(value)
+
+
+def is_envelope(message: Any) -> bool:
+    """True if message is an envelope dict (any schema version)."""
+    return isinstance(message, dict) and 'v' in message and 'codec' in message and 'data' in message
+
+
+def wrap(data: Dict[str, Any], status_code: int = 200, codec: str = None) -> Dict[str, Any]:
+    """
+    Build an envelope around data.
+
+    Args:
+        data: Result or request payload
+        status_code: HTTP-style status code
+        codec: "json" or "msgpack" (default: ENVELOPE_CODEC env var)
+
+    Returns:
+        JSON-serializable envelope dict
+    """
+    codec = codec or ENVELOPE_CODEC
+    if codec == 'msgpack' and MSGPACK_AVAILABLE:
+        packed = msgpack.packb(data, default=_default, use_bin_type=True)
+        return {
+            'v': SCHEMA_VERSION,
+            'statusCode': status_code,
+            'codec': 'msgpack',
+            'data': base64.b64encode(packed).decode('ascii')
+        }
+    return {'v': SCHEMA_VERSION, 'statusCode': status_code, 'codec': 'json', 'data': data}
+
+
+def unwrap(message: Any) -> Tuple[int, Dict[str, Any]]:
+    """
+    Read status code and data from an envelope.
+
+    Also accepts the legacy {'statusCode', 'body': '<json>'} shape and plain
+    result dicts, so callers keep working against functions that have not been
+    redeployed yet.
+
+    Returns:
+        (status_code, data)
+    """
+    if isinstance(message, (bytes, bytearray)):
+        message = message.decode('utf-8')
+    if isinstance(message, str):
+        message = json.loads(message) if message else {}
+    if not isinstance(message, dict):
+        return 200, {'result': message}
+
+    if is_envelope(message):
+        if message['v'] > SCHEMA_VERSION:
+            print(f"[WARN] Envelope schema v{message['v']} is newer than v{SCHEMA_VERSION}")
+        data = message['data']
+        if message['codec'] == 'msgpack':
+            if not MSGPACK_AVAILABLE:
+                raise ValueError("Received msgpack envelope but msgpack is not installed")
+            data = msgpack.unpackb(base64.b64decode(data), raw=False)
+        return int(message.get('statusCode', 200)), data
+
+    if 'body' in message and 'statusCode' in message:
+        body = message['body']
+        data = json.loads(body) if isinstance(body, str) and body else (body or {})
+        return int(message['statusCode']), data
+
+    return 200, message
+
+
+def encode(data: Dict[str, Any], status_code: int = 200, codec: str = None) -> bytes:
+    """Serialize data as an envelope, once, for a Lambda invoke Payload."""
+    return json.dumps(wrap(data, status_code, codec), default=_default, separators=(',', ':')).encode('utf-8')
+
+
+def decode(payload: Union[bytes, str, Dict[str, Any]]) -> Tuple[int, Dict[str, Any]]:
+    """Parse a Lambda invoke response Payload. Same return value as unwrap()."""
+    return unwrap(payload)
+
+
+def respond(data: Dict[str, Any], status_code: int, enveloped: bool) -> Dict[str, Any]:
+    """
+    Handler response in the caller's format: an envelope for envelope callers,
+    otherwise the API Gateway {'statusCode', 'body'} shape.
+    """
+    if enveloped:
+        return wrap(data, status_code)
+    return {'statusCode': status_code, 'body': json.dumps(data, default=_default)}
+
+
+def open_request(event: Any) -> Tuple[Dict[str, Any], bool]:
+    """
+    Unwrap an incoming Lambda event.
+
+    Returns:
+        (event data, True if the caller sent an envelope and expects one back)
+    """
+    if isinstance(event, str):
+        event = json.loads(event)
+    if is_envelope(event):
+        return unwrap(event)[1], True
+    return event, False
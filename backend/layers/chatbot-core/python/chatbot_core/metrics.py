@@ -0,0 +1,55 @@
+"""
+CloudWatch metrics via the Embedded Metric Format (EMF).
+
+A metric is one JSON line on stdout. CloudWatch Logs extracts it into a
+metric asynchronously, so emitting costs no API call and no latency on the
+request path.
+
+Usage:
+    emit_metrics(
+        {'SlangDictionaryReloadMs': (12.5, 'Milliseconds')},
+        dimensions={'Service': 'nlu-engine'},
+        properties={'dictionary_version': 'e4ad1c66'}
+    )
+"""
+
+import os
+import json
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+METRICS_NAMESPACE = os.environ.get('METRICS_NAMESPACE', 'Chatbot')
+
+
+def emit_metrics(
+    metrics: Dict[str, Tuple[float, str]],
+    dimensions: Optional[Dict[str, str]] = None,
+    properties: Optional[Dict[str, Any]] = None,
+    dimension_sets: Optional[List[List[str]]] = None,
+    namespace: Optional[str] = None
+) -> None:
+    """
+    Print one EMF record.
+
+    Args:
+        metrics: {metric_name: (value, unit)}, e.g. {'ReloadMs': (12.5, 'Milliseconds')}
+        dimensions: Dimension values (low cardinality)
+        properties: Extra searchable fields that are not metrics
+        dimension_sets: Dimension name combinations (default: all dimensions together)
+        namespace: CloudWatch namespace (default: METRICS_NAMESPACE env var)
+    """
+    dimensions = dimensions or {}
+    record = {
+        '_aws': {
+            'Timestamp': int(time.time() * 1000),
+            'CloudWatchMetrics': [{
+                'Namespace': namespace or METRICS_NAMESPACE,
+                'Dimensions': dimension_sets or [list(dimensions)],
+                'Metrics': [{'Name': name, 'Unit': unit} for name, (_, unit) in metrics.items()]
+            }]
+        }
+    }
+    record.update(properties or {})
+    record.update(dimensions)
+    record.update({name: value for name, (value, _) in metrics.items()})
+    print(json.dumps(record, default=str))
@@ -0,0 +1,171 @@
+"""
+Versioned, self-describing PIN hashes.
+
+A stored hash names its algorithm and cost parameters next to the salt and
+the digest, so the KDF cost can change without re-hashing every customer
+offline:
+
+    $pbkdf2-sha256$i=100000$<salt hex>$<digest hex>
+    $scrypt$n=16384,r=8,p=1$<salt hex>$<digest hex>
+
+Records written before this format (a bare hex digest in security_pin_hash
+plus a separate "salt" attribute) are read as PBKDF2-HMAC-SHA256 with
+100,000 iterations.
+
+New hashes use the policy in PIN_HASH_POLICY ("<algorithm>$<params>", default
+pbkdf2-sha256$i=100000). verify_pin_hash() accepts any supported algorithm
+and parameters and reports whether the stored hash differs from the policy,
+so the caller can rehash the PIN it just verified.
+
+Usage:
+    stored = hash_pin("1234")
+    matches, needs_rehash = verify_pin_hash("1234", stored)
+"""
+
+import os
+import hmac
+import hashlib
+from typing import Dict, NamedTuple, Optional, Tuple
+
+DEFAULT_POLICY = 'pbkdf2-sha256$i=100000'
+PIN_HASH_POLICY = os.environ.get('PIN_HASH_POLICY', DEFAULT_POLICY)
+
+SALT_BYTES = 32
+DIGEST_BYTES = 32
+
+# Records without a "$" prefix (security_pin_hash + salt attributes)
+LEGACY_ALGORITHM = 'pbkdf2-sha256'
+LEGACY_PARAMS = {'i': 100000}
+
+# Accepted parameter ranges; also bounds the work a stored hash can ask for
+PARAM_RANGES = {
+    'pbkdf2-sha256': {'i': (1000, 10_000_000)},
+    'scrypt': {'n': (2, 1 << 20), 'r': (1, 32), 'p': (1, 16)},
+}
+
+
+class PinHash(NamedTuple):
+    algorithm: str
+    params: Dict[str, int]
+    salt: bytes
+    digest: bytes
+
+    def encode(self) -> str:
+        return f"${self.algorithm}${format_params(self.params)}${self.salt.hex()}${self.digest.hex()}"
+
+
+def format_params(params: Dict[str, int]) -> str:
+    return ','.join(f"{name}={value}" for name, value in params.items())
+
+
+def _parse_params(algorithm: str, text: str) -> Dict[str, int]:
+    ranges = PARAM_RANGES.get(algorithm)
+    if ranges is None:
+        raise ValueError(f"Unsupported PIN hash algorithm: {algorithm}")
+
+    params = {}
+    for item in text.split(','):
+        name, _, value = item.partition('=')
+        params[name.strip()] = int(value)
+    if set(params) != set(ranges):
+        raise ValueError(f"{algorithm} needs parameters {sorted(ranges)}, got {sorted(params)}")
+    for name, (low, high) in ranges.items():
+        if not low <= params[name] <= high:
+            raise ValueError(f"{algorithm} parameter {name}={params[name]} outside [{low}, {high}]")
+    if algorithm == 'scrypt' and params['n'] & (params['n'] - 1):
+        raise ValueError("scrypt parameter n must be a power of two")
+    # Canonical order, so equal policies compare and encode equal
+    return {name: params[name] for name in ranges}
+
+
+def parse_policy(policy: str) -> Tuple[str, Dict[str, int]]:
+    """
+    Parse a hashing policy such as "pbkdf2-sha256$i=100000" or "scrypt$n=16384,r=8,p=1".
+
+    Raises:
+        ValueError: Unknown algorithm or invalid parameters
+    """
+    algorithm, _, params = policy.strip().strip('$').partition('$')
+    return algorithm, _parse_params(algorithm, params)
+
+
+def parse_pin_hash(stored: str, legacy_salt: Optional[str] = None) -> PinHash:
+    """
+    Decode a stored PIN hash.
+
+    Args:
+        stored: security_pin_hash attribute
+        legacy_salt: salt attribute (hex) of records in the pre-versioned format
+
+    Raises:
+        ValueError: Malformed hash, unsupported algorithm or a legacy hash without salt
+    """
+    if not stored.startswith('$'):
+        if not legacy_salt:
+            raise ValueError("Legacy PIN hash without salt")
+        return PinHash(LEGACY_ALGORITHM, dict(LEGACY_PARAMS), bytes.fromhex(legacy_salt), bytes.fromhex(stored))
+
+    parts = stored.split('$')
+    if len(parts) != 5:
+        raise ValueError("Malformed PIN hash")
+    _, algorithm, params, salt, digest = parts
+    return PinHash(algorithm, _parse_params(algorithm, params), bytes.fromhex(salt), bytes.fromhex(digest))
+
+
+def derive(pin: str, algorithm: str, params: Dict[str, int], salt: bytes, length: int = DIGEST_BYTES) -> bytes:
+    """Run the KDF of a PIN hash."""
+    secret = pin.encode('utf-8')
+    if algorithm == 'pbkdf2-sha256':
+        return hashlib.pbkdf2_hmac('sha256', secret, salt, params['i'], length)
+    if algorithm == 'scrypt':
+        n, r, p = params['n'], params['r'], params['p']
+        return hashlib.scrypt(secret, salt=salt, n=n, r=r, p=p, dklen=length,
+                              maxmem=128 * r * (n + p + 2) + (1 << 20))
+    raise ValueError(f"Unsupported PIN hash algorithm: {algorithm}")
+
+
+def hash_pin(pin: str, policy: Optional[str] = None, salt: Optional[bytes] = None) -> str:
+    """
+    Hash a PIN with the current policy (PIN_HASH_POLICY) and a fresh random salt.
+
+    Returns:
+        Encoded hash for the security_pin_hash attribute
+    """
+    algorithm, params = parse_policy(policy or PIN_HASH_POLICY)
+    salt = salt if salt is not None else os.urandom(SALT_BYTES)
+    return PinHash(algorithm, params, salt, derive(pin, algorithm, params, salt)).encode()
+
+
+def verify_pin_hash(
+    pin: str,
+    stored: str,
+    legacy_salt: Optional[str] = None,
+    policy: Optional[str] = None
+) -> Tuple[bool, bool]:
+    """
+    Check a PIN against a stored hash of any supported version (constant-time).
+
+    Args:
+        pin: Plaintext PIN
+        stored: security_pin_hash attribute
+        legacy_salt: salt attribute of pre-versioned records
+        policy: Policy to compare against (default: PIN_HASH_POLICY)
+
+    Returns:
+        (PIN matches, stored hash should be replaced with hash_pin(pin))
+
+    Raises:
+        ValueError: The stored hash cannot be decoded
+    """
+    parsed = parse_pin_hash(stored, legacy_salt)
+    computed = derive(pin, parsed.algorithm, parsed.params, parsed.salt, len(parsed.digest))
+    matches = hmac.compare_digest(computed, parsed.digest)
+
+    algorithm, params = parse_policy(policy or PIN_HASH_POLICY)
+    outdated = (
+        not stored.startswith('$')
+        or parsed.algorithm != algorithm
+        or parsed.params != params
+        or len(parsed.digest) != DIGEST_BYTES
+    )
+    return matches, matches and outdated
@@ -0,0 +1,135 @@
+"""
+Bedrock Prompt Management helpers.
+
+Also builds Converse system blocks with a prompt cache point: the static
+prefix of a system prompt template (everything before the line holding its
+first request-specific {{variable}}) is sent first and marked with a
+cachePoint, so Bedrock can reuse it across requests; the rendered remainder
+follows. Controlled by:
+
+    BEDROCK_PROMPT_CACHE: "true" (default) or "false", for A/B measurement
+    BEDROCK_PROMPT_CACHE_MIN_TOKENS: Smallest prefix (estimated tokens) given a
+        cache point (default: 1024, below the model minimum nothing is cached)
+
+record_bedrock_usage() emits the token counts from a Converse response,
+including cacheReadInputTokens/cacheWriteInputTokens, with a PromptCache
+dimension so both arms can be compared in CloudWatch.
+"""
+
+import os
+import re
+from typing import Any, Dict, List, Optional
+
+from chatbot_core.metrics import emit_metrics
+
+PROMPT_CACHE_ENABLED = os.environ.get('BEDROCK_PROMPT_CACHE', 'true').lower() == 'true'
+PROMPT_CACHE_MIN_TOKENS = int(os.environ.get('BEDROCK_PROMPT_CACHE_MIN_TOKENS', '1024'))
+
+# Rough size estimate used for the minimum-prefix check
+CHARS_PER_TOKEN = 4
+VARIABLE = re.compile(r'\{\{\s*(\w+)\s*\}\}')
+
+# Converse usage fields reported as metrics
+USAGE_METRICS = {
+    'inputTokens': 'InputTokens',
+    'outputTokens': 'OutputTokens',
+    'cacheReadInputTokens': 'CacheReadInputTokens',
+    'cacheWriteInputTokens': 'CacheWriteInputTokens',
+}
+
+
+def extract_text_value(text_content) -> str:
+    """
+    Extract string from Prompt Management text content.
+    
+    Handles both formats:
+    - Direct string: "text here"
+    - Dict format: {'format': 'plain_text', 'text': 'text here'}
+    - Nested dict: {'text': {'format': 'plain_text', 'text': 'text here'}}
+    
+    Args:
+        text_content: Text content from Prompt Management API
+        
+    Returns:
+        Extracted string value
+    """
+    if isinstance(text_content, str):
+        return text_content
+    if isinstance(text_content, dict):
+        # Check for nested 'text' field that might be a dict
+        text_value = text_content.get('text', '')
+        if isinstance(text_value, dict):
+            # Handle {'text': {'format': 'plain_text', 'text': 'actual text'}}
+            return text_value.get('text', '')
+        return text_value if isinstance(text_value, str) else ''
+    return ''
+
+
+def render_template(template: str, variables: Dict[str, str]) -> str:
+    """Substitute {{name}} placeholders; unknown placeholders are left as they are."""
+    return VARIABLE.sub(lambda match: variables.get(match.group(1), match.group(0)), template)
+
+
+def build_system_blocks(
+    template: str,
+    variables: Optional[Dict[str, str]] = None,
+    cache: Optional[bool] = None
+) -> List[Dict[str, Any]]:
+    """
+    Converse system blocks with the static prefix of the template marked as cacheable.
+
+    Args:
+        template: System prompt template; constant placeholders should already be rendered
+        variables: Request-specific values for the remaining {{placeholders}}
+        cache: Override BEDROCK_PROMPT_CACHE
+
+    Returns:
+        [{"text": prefix}, {"cachePoint": {"type": "default"}}, {"text": rest}], or a
+        single text block when caching is off or the prefix is too small
+    """
+    variables = variables or {}
+    cache = PROMPT_CACHE_ENABLED if cache is None else cache
+
+    # The prefix ends at the start of the line holding the first request-specific variable
+    first = next((match for match in VARIABLE.finditer(template) if match.group(1) in variables), None)
+    split = template.rfind('\n', 0, first.start()) + 1 if first else len(template)
+    prefix, rest = template[:split], render_template(template[split:], variables)
+
+    if not cache or len(prefix) < PROMPT_CACHE_MIN_TOKENS * CHARS_PER_TOKEN:
+        return [{"text": prefix + rest}]
+    blocks = [{"text": prefix}, {"cachePoint": {"type": "default"}}]
+    if rest:
+        blocks.append({"text": rest})
+    return blocks
+
+
+def uses_prompt_cache(system_blocks: List[Dict[str, Any]]) -> bool:
+    return any('cachePoint' in block for block in system_blocks)
+
+
+def record_bedrock_usage(
+    usage: Optional[Dict[str, Any]],
+    service: str,
+    operation: str,
+    prompt_cache: bool,
+    model: Optional[str] = None
+) -> None:
+    """
+    Emit the token usage of one Converse call.
+
+    Args:
+        usage: response["usage"] (or the ConverseStream metadata usage)
+        service: Lambda name, e.g. "orchestrator"
+        operation: Call site, e.g. "generate_response"
+        prompt_cache: Whether the request carried a cache point
+        model: Model ID that served the call (adds a Model dimension)
+    """
+    if not usage:
+        return
+    dimensions = {'Service': service, 'Operation': operation, 'PromptCache': 'on' if prompt_cache else 'off'}
+    if model:
+        dimensions['Model'] = model
+    emit_metrics(
+        {name: (usage.get(field, 0), 'Count') for field, name in USAGE_METRICS.items()},
+        dimensions=dimensions
+    )
@@ -0,0 +1,228 @@
+"""
+Token-bucket rate limiting per phone number and per session.
+
+Every message that reaches the orchestrator costs several Bedrock calls, so
+the webhooks check the sender's buckets first and drop floods. Each scope
+("phone", "session") has a bucket of RATE_LIMIT_<SCOPE>_BURST tokens that
+refills at RATE_LIMIT_<SCOPE>_PER_MINUTE.
+
+A bucket is stored as its theoretical arrival time (GCRA): "tat" is when the
+bucket would be full again. A message is allowed when tat - now is within
+the burst tolerance, and then moves tat forward by one refill interval. That
+is a single conditional update_item on the shared DynamoDB item (no read):
+
+    idle bucket (tat < now):  SET tat = now + interval
+    busy bucket:              ADD tat :interval  IF tat <= now + tolerance
+
+tat only moves forward, so the value a container last saw is a lower bound
+of the shared one: when it already says the bucket is empty, the message is
+rejected in memory without a DynamoDB call. This in-memory fast path absorbs
+floods, and the shared item keeps the limit correct across containers.
+
+Bucket items live in the sessions table ("RATELIMIT#<scope>#<id>", turn 0,
+expiring via the ttl attribute once the bucket is full again). Without a
+table the buckets are per container. DynamoDB errors fail open to the
+in-memory bucket.
+
+Configuration:
+    RATE_LIMIT_ENABLED: "true" to enforce limits (default: false)
+    RATE_LIMIT_PHONE_PER_MINUTE / RATE_LIMIT_PHONE_BURST: default 20 / 10
+    RATE_LIMIT_SESSION_PER_MINUTE / RATE_LIMIT_SESSION_BURST: default 12 / 6
+    RATE_LIMIT_TABLE: Shared bucket table with the sessions key schema
+        (default: DYNAMODB_SESSIONS_TABLE, "" for in-memory buckets only)
+
+Rejections emit RateLimitRejected (Service, Scope dimensions; source
+"local", "shared" or "memory" as a property), store failures RateLimitStoreErrors.
+
+Usage:
+    RATE_LIMITER = RateLimiter.from_env(service='twilio-webhook')
+    decision = RATE_LIMITER.check(phone=phone_number, session=session_id)
+    if not decision.allowed:
+        ...  # 429, Retry-After: decision.retry_after
+"""
+
+import os
+import time
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, NamedTuple, Optional, Tuple
+
+from chatbot_core.clients import get_resource
+from chatbot_core.metrics import emit_metrics
+
+MAX_LOCAL_BUCKETS = 10000
+
+
+class Limit(NamedTuple):
+    per_minute: float
+    burst: int
+
+    @property
+    def interval_ms(self) -> int:
+        return max(1, int(60000 / self.per_minute))
+
+    @property
+    def tolerance_ms(self) -> int:
+        return self.interval_ms * (self.burst - 1)
+
+
+class Decision(NamedTuple):
+    allowed: bool
+    scope: Optional[str] = None
+    retry_after: float = 0.0
+    source: Optional[str] = None
+
+
+ALLOWED = Decision(True)
+
+
+class RateLimiter:
+    """Per-scope token buckets, in memory with an optional shared DynamoDB state."""
+
+    def __init__(
+        self,
+        limits: Dict[str, Limit],
+        table_name: Optional[str] = None,
+        service: str = 'chatbot',
+        enabled: bool = True,
+        clock: Callable[[], float] = time.time
+    ):
+        self.limits = limits
+        self.table_name = table_name
+        self.service = service
+        self.enabled = enabled
+        self.clock = clock
+        self._tats: 'OrderedDict[Tuple[str, str], int]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls, service: str) -> 'RateLimiter':
+        def limit(scope: str, per_minute: str, burst: str) -> Limit:
+            prefix = f"RATE_LIMIT_{scope.upper()}"
+            return Limit(float(os.environ.get(f"{prefix}_PER_MINUTE", per_minute)),
+                         max(1, int(os.environ.get(f"{prefix}_BURST", burst))))
+
+        return cls(
+            limits={'phone': limit('phone', '20', '10'), 'session': limit('session', '12', '6')},
+            table_name=os.environ.get('RATE_LIMIT_TABLE', os.environ.get('DYNAMODB_SESSIONS_TABLE', 'chatbot-sessions')),
+            service=service,
+            enabled=os.environ.get('RATE_LIMIT_ENABLED', 'false').lower() == 'true'
+        )
+
+    def check(self, **keys: Optional[str]) -> Decision:
+        """
+        Take one token from the bucket of every given scope.
+
+        Args:
+            keys: scope -> identifier, e.g. phone="+60123456789", session="SESSION-..."
+                  (scopes without a limit or identifier are skipped)
+
+        Returns:
+            Decision; allowed=False names the exhausted scope and seconds until a token is free
+        """
+        if not self.enabled:
+            return ALLOWED
+
+        now_ms = int(self.clock() * 1000)
+        for scope, identifier in keys.items():
+            limit = self.limits.get(scope)
+            if not identifier or limit is None:
+                continue
+            decision = self._take(scope, identifier, limit, now_ms)
+            if not decision.allowed:
+                print(f"[WARN] Rate limit exceeded for {scope} {identifier} "
+                      f"({decision.source}, retry after {decision.retry_after:.1f}s)")
+                emit_metrics(
+                    {'RateLimitRejected': (1, 'Count')},
+                    dimensions={'Service': self.service, 'Scope': scope},
+                    properties={'source': decision.source}
+                )
+                return decision
+        return ALLOWED
+
+    def _take(self, scope: str, identifier: str, limit: Limit, now_ms: int) -> Decision:
+        bucket = (scope, identifier)
+        with self._lock:
+            tat = self._tats.get(bucket)
+
+        # In-memory fast path: this container already saw the bucket empty
+        if tat is not None and tat - now_ms > limit.tolerance_ms:
+            return self._rejected(scope, tat, limit, now_ms, 'local')
+
+        source = 'shared'
+        if self.table_name:
+            try:
+                allowed, tat = self._take_shared(scope, identifier, limit, now_ms, tat)
+            except Exception as e:
+                print(f"[WARN] Rate limit store unavailable, using in-memory bucket: {e}")
+                emit_metrics({'RateLimitStoreErrors': (1, 'Count')}, dimensions={'Service': self.service})
+                source = 'memory'
+                allowed, tat = True, max(tat or 0, now_ms) + limit.interval_ms
+        else:
+            source = 'memory'
+            allowed, tat = True, max(tat or 0, now_ms) + limit.interval_ms
+
+        with self._lock:
+            self._tats[bucket] = max(tat, self._tats.get(bucket, 0))
+            self._tats.move_to_end(bucket)
+            while len(self._tats) > MAX_LOCAL_BUCKETS:
+                self._tats.popitem(last=False)
+
+        return ALLOWED if allowed else self._rejected(scope, tat, limit, now_ms, source)
+
+    @staticmethod
+    def _rejected(scope: str, tat: int, limit: Limit, now_ms: int, source: str) -> Decision:
+        return Decision(False, scope, max(0, tat - limit.tolerance_ms - now_ms) / 1000, source)
+
+    def _take_shared(
+        self,
+        scope: str,
+        identifier: str,
+        limit: Limit,
+        now_ms: int,
+        tat: Optional[int]
+    ) -> Tuple[bool, int]:
+        """One conditional update of the shared bucket; returns (allowed, new or current tat)."""
+        table = get_resource('dynamodb').Table(self.table_name)
+        conditional_check_failed = table.meta.client.exceptions.ConditionalCheckFailedException
+        request = {
+            'Key': {'session_id': f"RATELIMIT#{scope}#{identifier}", 'turn_number': 0},
+            'ExpressionAttributeNames': {'#ttl': 'ttl'},
+            'ReturnValuesOnConditionCheckFailure': 'ALL_OLD'
+        }
+        # The item is worthless once the bucket is full again
+        ttl = (now_ms + limit.tolerance_ms + limit.interval_ms) // 1000 + 60
+
+        # The cached tat picks the likely branch; a wrong guess costs one more update
+        for _ in range(2):
+            try:
+                if tat is None or tat < now_ms:
+                    table.update_item(
+                        UpdateExpression="SET tat = :next, #ttl = :ttl",
+                        ConditionExpression="attribute_not_exists(tat) OR tat < :now",
+                        ExpressionAttributeValues={':next': now_ms + limit.interval_ms, ':now': now_ms, ':ttl': ttl},
+                        **request
+                    )
+                    return True, now_ms + limit.interval_ms
+
+                response = table.update_item(
+                    UpdateExpression="ADD tat :interval SET #ttl = :ttl",
+                    ConditionExpression="tat BETWEEN :now AND :limit",
+                    ExpressionAttributeValues={
+                        ':interval': limit.interval_ms,
+                        ':now': now_ms,
+                        ':limit': now_ms + limit.tolerance_ms,
+                        ':ttl': ttl
+                    },
+                    ReturnValues='UPDATED_NEW',
+                    **request
+                )
+                return True, int(response['Attributes']['tat'])
+            except conditional_check_failed as e:
+                current = e.response.get('Item', {}).get('tat', {}).get('N')
+                tat = int(float(current)) if current is not None else None
+                if tat is not None and tat - now_ms > limit.tolerance_ms:
+                    return False, tat
+
+        # The bucket changed branch twice under concurrent requests: let this one through
+        return True, max(tat or 0, now_ms)
@@ -0,0 +1,303 @@
+"""
+Bedrock model routing per pipeline stage.
+
+Each Bedrock call names its stage ("nlu", "response", "translate", "kb") and
+optional route keys (intent, response status). The routing table maps the
+most specific match to a model tier, and a tier is an ordered fallback chain
+of model IDs: when a model is throttled, unavailable or not enabled, the next
+one is tried.
+
+Lookup order for stage "response" with keys ("awaiting_pin", "deactivate_voicemail"):
+    response:awaiting_pin -> response:deactivate_voicemail -> response -> default
+
+Configuration (no code change needed):
+    BEDROCK_MODEL_ROUTES: JSON routing table, merged over the defaults, e.g.
+        {"tiers": {"fast": ["apac.amazon.nova-lite-v1:0", "apac.amazon.nova-pro-v1:0"]},
+         "routes": {"nlu": "fast", "response:greeting": "fast", "kb": "pro"}}
+        A route value is a tier name, a model ID or a list of model IDs; a tier
+        value is a model ID or a list of model IDs.
+    BEDROCK_MODEL_FAST: Model of the default "fast" tier (default: apac.amazon.nova-lite-v1:0)
+
+Every attempt emits ModelLatencyMs, ModelErrors and ModelFallbacks plus the
+token usage (chatbot_core.prompts.record_bedrock_usage) with Service,
+Operation (the route) and Model dimensions. For ConverseStream calls
+(ModelRouter.stream) latency and usage are recorded when the stream ends or
+is closed, so ModelLatencyMs covers generation, not just opening the stream.
+
+Usage:
+    router = ModelRouter.from_env(BEDROCK_MODEL, service='orchestrator')
+    response, model = router.invoke(
+        'response', lambda model_id: bedrock_runtime.converse(modelId=model_id, **args), status, intent
+    )
+
+    stream = router.stream('response', lambda model_id: bedrock_runtime.converse_stream(modelId=model_id, **args))
+    for event in stream:
+        ...
+    stream.model  # model ID that served the stream
+"""
+
+import os
+import json
+import time
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple, TypeVar, Union
+
+from chatbot_core.metrics import emit_metrics
+from chatbot_core.prompts import record_bedrock_usage
+
+FAST_MODEL = os.environ.get('BEDROCK_MODEL_FAST', 'apac.amazon.nova-lite-v1:0')
+
+DEFAULT_ROUTES = {
+    'default': 'pro',
+    'nlu': 'fast',
+    # NLU_CASCADE: small model first, larger model for unsure results
+    'nlu:cascade_first': 'fast',
+    'nlu:cascade_escalate': 'pro',
+    'translate': 'fast',
+    'response:greeting': 'fast',
+    'response:awaiting_pin': 'fast',
+    'response:customer_not_found': 'fast',
+    'kb': 'pro',
+}
+
+# Errors worth retrying on the next model of the chain
+FALLBACK_ERROR_CODES = frozenset({
+    'ThrottlingException',
+    'ServiceQuotaExceededException',
+    'ServiceUnavailableException',
+    'ModelNotReadyException',
+    'ModelTimeoutException',
+    'ModelErrorException',
+    'InternalServerException',
+    'AccessDeniedException',
+    'ResourceNotFoundException',
+})
+
+T = TypeVar('T')
+RouteValue = Union[str, Sequence[str]]
+
+
+def _is_fallback_error(error: Exception) -> bool:
+    code = getattr(error, 'response', {}).get('Error', {}).get('Code')
+    if code:
+        return code in FALLBACK_ERROR_CODES
+    # Connection and read timeouts (botocore exceptions without an error code)
+    return type(error).__name__ in ('ReadTimeoutError', 'ConnectTimeoutError', 'EndpointConnectionError')
+
+
+class ModelRouter:
+    """Stage/intent -> model fallback chain, with per-route metrics."""
+
+    def __init__(
+        self,
+        tiers: Dict[str, List[str]],
+        routes: Dict[str, RouteValue],
+        service: str
+    ):
+        self.tiers = tiers
+        self.routes = routes
+        self.service = service
+
+    @classmethod
+    def from_env(cls, default_model: str, service: str) -> 'ModelRouter':
+        """
+        Default table (fast/pro tiers around default_model) merged with BEDROCK_MODEL_ROUTES.
+
+        An invalid BEDROCK_MODEL_ROUTES, or an invalid tier in it, is logged and ignored.
+        """
+        tiers = {
+            'pro': [default_model, FAST_MODEL],
+            'fast': [FAST_MODEL, default_model],
+        }
+        routes: Dict[str, RouteValue] = dict(DEFAULT_ROUTES)
+        raw = os.environ.get('BEDROCK_MODEL_ROUTES')
+        if raw:
+            try:
+                table = json.loads(raw)
+                for name, models in table.get('tiers', {}).items():
+                    # A single model ID is a one-model chain, like a route value
+                    if isinstance(models, str):
+                        models = [models]
+                    if not models or not isinstance(models, list) or not all(isinstance(m, str) for m in models):
+                        print(f"[WARN] Invalid BEDROCK_MODEL_ROUTES tier {name!r}, ignoring: {models!r}")
+                        continue
+                    tiers[name] = models
+                routes.update(table.get('routes', {}))
+            except (ValueError, AttributeError) as e:
+                print(f"[WARN] Invalid BEDROCK_MODEL_ROUTES, using default routes: {e}")
+        # A chain never repeats a model
+        tiers = {name: list(dict.fromkeys(models)) for name, models in tiers.items()}
+        return cls(tiers, routes, service)
+
+    def resolve(self, stage: str, *keys: Optional[str]) -> Tuple[str, List[str]]:
+        """
+        Route name and model chain for a call.
+
+        Returns:
+            (matched route, e.g. "response:greeting", [model IDs in fallback order])
+        """
+        candidates = [f"{stage}:{key}" for key in keys if key] + [stage, 'default']
+        route = next((name for name in candidates if name in self.routes), 'default')
+        value = self.routes.get(route, 'pro')
+        if isinstance(value, str):
+            models = self.tiers.get(value, [value])
+        else:
+            models = list(value)
+        return route, models
+
+    def primary_model(self, stage: str, *keys: Optional[str]) -> str:
+        return self.resolve(stage, *keys)[1][0]
+
+    def invoke(
+        self,
+        stage: str,
+        call: Callable[[str], T],
+        *keys: Optional[str],
+        prompt_cache: bool = False
+    ) -> Tuple[T, str]:
+        """
+        Run call(model_id) on the route's chain until one model succeeds.
+
+        Args:
+            stage: Pipeline stage ("nlu", "response", "translate", "kb")
+            call: Performs the Bedrock request with the given model ID
+            keys: Route keys, most specific first (response status, intent)
+            prompt_cache: Whether the request carries a cache point (usage metric dimension)
+
+        Returns:
+            (call result, model ID that produced it)
+
+        Raises:
+            The last error if every model failed, or the first error that is not worth a fallback
+        """
+        route, models = self.resolve(stage, *keys)
+        for attempt, model in enumerate(models):
+            start = time.perf_counter()
+            try:
+                result = call(model)
+            except Exception as e:
+                last = attempt == len(models) - 1
+                fallback = _is_fallback_error(e) and not last
+                emit_metrics(
+                    {'ModelErrors': (1, 'Count'), 'ModelLatencyMs': ((time.perf_counter() - start) * 1000, 'Milliseconds')},
+                    dimensions={'Service': self.service, 'Operation': route, 'Model': model}
+                )
+                if not fallback:
+                    raise
+                print(f"[WARN] {route} on {model} failed ({e}), falling back to {models[attempt + 1]}")
+                continue
+
+            usage = result.get('usage') if isinstance(result, dict) else None
+            self._record_success(route, model, attempt, start, usage, prompt_cache)
+            return result, model
+        raise RuntimeError(f"No models configured for route {route}")
+
+    def stream(
+        self,
+        stage: str,
+        call: Callable[[str], Dict[str, Any]],
+        *keys: Optional[str],
+        prompt_cache: bool = False
+    ) -> 'ModelStream':
+        """
+        Run a ConverseStream call(model_id) on the route's chain.
+
+        Unlike invoke, the metrics are emitted when the stream ends: ModelLatencyMs
+        spans the whole generation (or until the caller closes the stream early)
+        and the usage comes from the stream's metadata event. An error while the
+        stream is read counts as a ModelErrors and falls back to the next model
+        as long as no text has been handed to the caller yet.
+
+        Args:
+            stage: Pipeline stage ("nlu", "response", "kb")
+            call: Performs the ConverseStream (or retrieve_and_generate_stream) request with the given model ID
+            keys: Route keys, most specific first
+            prompt_cache: Whether the request carries a cache point (usage metric dimension)
+
+        Returns:
+            Iterable of stream events; close() it to stop reading early
+        """
+        route, models = self.resolve(stage, *keys)
+        return ModelStream(self, route, models, call, prompt_cache)
+
+    def _record_success(
+        self,
+        route: str,
+        model: str,
+        attempt: int,
+        start: float,
+        usage: Optional[Dict[str, Any]],
+        prompt_cache: bool
+    ) -> None:
+        emit_metrics(
+            {'ModelLatencyMs': ((time.perf_counter() - start) * 1000, 'Milliseconds'), 'ModelFallbacks': (attempt, 'Count')},
+            dimensions={'Service': self.service, 'Operation': route, 'Model': model}
+        )
+        record_bedrock_usage(usage, self.service, route, prompt_cache, model=model)
+
+
+class ModelStream:
+    """Events of a routed ConverseStream call (see ModelRouter.stream)."""
+
+    def __init__(
+        self,
+        router: ModelRouter,
+        route: str,
+        models: List[str],
+        call: Callable[[str], Dict[str, Any]],
+        prompt_cache: bool
+    ):
+        self.route = route
+        self.model: Optional[str] = None
+        self._router = router
+        self._models = models
+        self._call = call
+        self._prompt_cache = prompt_cache
+        self._events = self._run()
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        return self._events
+
+    def close(self) -> None:
+        """Stop reading and release the connection (the metrics cover the time until now)."""
+        self._events.close()
+
+    def _run(self) -> Iterator[Dict[str, Any]]:
+        router, route, models = self._router, self.route, self._models
+        for attempt, model in enumerate(models):
+            self.model = model
+            start = time.perf_counter()
+            stream = None
+            usage = None
+            text_sent = False
+            try:
+                stream = self._call(model).get('stream', [])
+                for event in stream:
+                    if 'metadata' in event:
+                        usage = event['metadata'].get('usage')
+                    # ConverseStream text deltas, or retrieve_and_generate_stream output
+                    text_sent = text_sent or 'contentBlockDelta' in event or 'output' in event
+                    yield event
+            except GeneratorExit:
+                # Closed early by the caller (e.g. NLU stops once intent and confidence are parsed)
+                router._record_success(route, model, attempt, start, usage, self._prompt_cache)
+                raise
+            except Exception as e:
+                last = attempt == len(models) - 1
+                fallback = _is_fallback_error(e) and not last and not text_sent
+                emit_metrics(
+                    {'ModelErrors': (1, 'Count'), 'ModelLatencyMs': ((time.perf_counter() - start) * 1000, 'Milliseconds')},
+                    dimensions={'Service': router.service, 'Operation': route, 'Model': model}
+                )
+                if not fallback:
+                    raise
+                print(f"[WARN] {route} stream on {model} failed ({e}), falling back to {models[attempt + 1]}")
+                continue
+            finally:
+                # Release the connection instead of draining the rest of the reply
+                close = getattr(stream, 'close', None)
+                if close is not None:
+                    close()
+
+            router._record_success(route, model, attempt, start, usage, self._prompt_cache)
+            return
+        raise RuntimeError(f"No models configured for route {route}")
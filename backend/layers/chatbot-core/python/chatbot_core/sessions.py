@@ -0,0 +1,205 @@
+"""
+Session create/resume for the chat entry points.
+
+Shared by the API handler (whatsapp-webhook) and the streaming endpoint
+(orchestrator/src/stream_server.py). A session is one item per turn in the
+sessions table (session_id + turn_number sort key).
+
+The customer lookup and the latest-turn read are independent, so they are
+issued concurrently. A resumed turn is written with one conditional put that
+refuses to overwrite a turn written by a concurrent request; on a conflict
+the write is retried once with a fresh turn number, then SessionTurnConflict
+is raised (starting a new session would drop awaiting_action/pending_intent
+in the middle of a PIN flow).
+
+Every DynamoDB call goes through the low-level client, which is thread-safe
+(the reads run on worker threads and the streaming endpoint serves requests
+on many threads).
+
+Environment Variables:
+    DYNAMODB_SESSIONS_TABLE: Sessions table (default: chatbot-sessions)
+
+Usage:
+    try:
+        session = create_or_resume_session(phone_number, message, session_id, channel)
+    except SessionTurnConflict:
+        ...  # 503 + Retry-After
+"""
+
+import os
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional
+
+from chatbot_core.clients import get_client, serialize_item, deserialize_item
+from chatbot_core.customers import lookup_customer
+from chatbot_core.tracing import xray_recorder
+from chatbot_core.validation import normalize_phone_number
+
+SESSIONS_TABLE = os.environ.get('DYNAMODB_SESSIONS_TABLE', 'chatbot-sessions')
+
+# Session TTL: 24 hours
+SESSION_TTL_HOURS = 24
+
+# Reused across warm invocations for the concurrent customer/session reads
+ENTRY_EXECUTOR = ThreadPoolExecutor(max_workers=2)
+
+
+class SessionTurnConflict(Exception):
+    """Concurrent requests kept taking the next turn of a resumed session."""
+
+
+def get_latest_session_turn(session_id: str) -> Optional[Dict[str, Any]]:
+    """
+    Get the most recent turn of a session (turn_number is the sort key).
+
+    Args:
+        session_id: Session ID to resume
+
+    Returns:
+        Latest session item or None if not found
+    """
+    try:
+        response = get_client('dynamodb').query(
+            TableName=SESSIONS_TABLE,
+            KeyConditionExpression='session_id = :sid',
+            ExpressionAttributeValues={':sid': {'S': session_id}},
+            ScanIndexForward=False,
+            Limit=1
+        )
+
+        items = response.get('Items', [])
+        return deserialize_item(items[0]) if items else None
+
+    except Exception as e:
+        print(f"[WARN] Error resuming session: {e}")
+        return None
+
+
+@xray_recorder.capture("create_or_resume_session")
+def create_or_resume_session(phone_number: str, message: str, session_id: Optional[str] = None, channel: str = 'web') -> Dict[str, Any]:
+    """
+    Create new session or resume existing session.
+    Also looks up customer in CRM to check if they're registered.
+
+    Args:
+        phone_number: Customer phone number
+        message: User message
+        session_id: Existing session ID (optional)
+        channel: Channel type (web, mobile, whatsapp)
+
+    Returns:
+        Session data: session_id, turn_number, customer_id, phone_number
+        (normalized), customer_verified and is_new_session
+
+    Raises:
+        SessionTurnConflict: Both turn writes lost to concurrent requests
+    """
+    client = get_client('dynamodb')
+
+    # Normalize phone number
+    normalized_phone = normalize_phone_number(phone_number)
+    if normalized_phone:
+        phone_number = normalized_phone
+
+    # Look up customer in CRM and latest session turn concurrently
+    # (session query needs the unknown latest turn_number, so BatchGetItem does not apply)
+    customer_future = ENTRY_EXECUTOR.submit(lookup_customer, phone_number)
+    session_future = ENTRY_EXECUTOR.submit(get_latest_session_turn, session_id) if session_id else None
+
+    customer = customer_future.result()
+    session = session_future.result() if session_future else None
+
+    customer_verified = customer is not None
+    customer_id = customer.get('customer_id') if customer else f"CUST-{phone_number.replace('+', '')}"
+
+    # If session_id provided, try to resume
+    if session and 'ttl' in session:
+        if session['ttl'] > datetime.utcnow().timestamp():
+            print(f"[OK] Resuming session: {session_id}")
+
+            # CRITICAL: Preserve session state for multi-turn flows (PIN verification)
+            awaiting_action = session.get('awaiting_action')
+            pending_intent = session.get('pending_intent')
+            session_state = session.get('session_state', 'active')
+
+            print(f"[DEBUG] Preserving session state: awaiting={awaiting_action}, intent={pending_intent}")
+
+            # Retry once with a fresh turn number if a concurrent request took ours
+            for attempt in range(2):
+                new_turn = int(session.get('turn_number', 0)) + 1
+                try:
+                    client.put_item(
+                        TableName=SESSIONS_TABLE,
+                        Item=serialize_item({
+                            'session_id': session_id,
+                            'turn_number': new_turn,
+                            'customer_id': customer_id,
+                            'phone_number': phone_number,
+                            'user_message': message,
+                            'channel': channel,
+                            'customer_verified': customer_verified,
+                            'session_state': session_state,
+                            'awaiting_action': awaiting_action,  # Preserve for PIN flow
+                            'pending_intent': pending_intent,    # Preserve intent being verified
+                            'created_at': session.get('created_at', datetime.utcnow().isoformat()),
+                            'updated_at': datetime.utcnow().isoformat(),
+                            'ttl': int((datetime.utcnow() + timedelta(hours=SESSION_TTL_HOURS)).timestamp())
+                        }),
+                        ConditionExpression='attribute_not_exists(turn_number)'
+                    )
+
+                    return {
+                        'session_id': session_id,
+                        'turn_number': new_turn,
+                        'customer_id': customer_id,
+                        'phone_number': phone_number,
+                        'customer_verified': customer_verified,
+                        'is_new_session': False
+                    }
+
+                except client.exceptions.ConditionalCheckFailedException:
+                    print(f"[WARN] Turn {new_turn} already written for session {session_id}, retrying")
+                    session = get_latest_session_turn(session_id) or session
+                except Exception as e:
+                    print(f"[WARN] Error resuming session: {e}")
+                    break
+            else:
+                # A new session here would drop awaiting_action/pending_intent mid PIN flow
+                raise SessionTurnConflict(f"Could not claim a turn for session {session_id}")
+        else:
+            print(f"[WARN] Session expired: {session_id}")
+
+    # Create new session
+    new_session_id = f"SESSION-{uuid.uuid4().hex[:16]}"
+    turn_number = 0
+
+    session_data = {
+        'session_id': new_session_id,
+        'turn_number': turn_number,
+        'customer_id': customer_id,
+        'phone_number': phone_number,
+        'user_message': message,
+        'session_state': 'active',
+        'channel': channel,
+        'customer_verified': customer_verified,
+        'pin_attempts': 0,
+        'conversation_history': [],
+        'created_at': datetime.utcnow().isoformat(),
+        'updated_at': datetime.utcnow().isoformat(),
+        'ttl': int((datetime.utcnow() + timedelta(hours=SESSION_TTL_HOURS)).timestamp())
+    }
+
+    client.put_item(TableName=SESSIONS_TABLE, Item=serialize_item(session_data))
+
+    print(f"[OK] Created new session: {new_session_id}, customer_verified: {customer_verified}")
+
+    return {
+        'session_id': new_session_id,
+        'turn_number': turn_number,
+        'customer_id': customer_id,
+        'phone_number': phone_number,
+        'customer_verified': customer_verified,
+        'is_new_session': True
+    }
@@ -0,0 +1,18 @@
+"""
+Optional AWS X-Ray tracing.
+
+aws_xray_sdk is not available in all Lambda environments (and is not needed
+for local runs), so a no-op recorder is used when it cannot be imported.
+"""
+
+try:
+    from aws_xray_sdk.core import xray_recorder
+except ImportError:
+    class DummyRecorder:
+        def capture(self, name):
+            def decorator(func):
+                return func
+            return decorator
+    xray_recorder = DummyRecorder()
+
+__all__ = ['xray_recorder']
@@ -0,0 +1,66 @@
+"""
+Input normalization shared by the chat entry points.
+"""
+
+import re
+from typing import Optional
+
+
+def normalize_phone_number(phone: str) -> Optional[str]:
+    """
+    Normalize Malaysian phone number to standard +60 format.
+    
+    Handles formats:
+    - +60177967594
+    - 60177967594
+    - 0177967594
+    - 177967594
+    - +60 17 796 7594 (with spaces)
+    
+    Returns:
+        Normalized phone number in +60XXXXXXXXX format or None
+    """
+    if not phone:
+        return None
+    
+    # Remove all non-digit characters except leading +
+    cleaned = ''.join(c for c in phone if c.isdigit() or c == '+')
+    
+    # Remove leading + for processing
+    if cleaned.startswith('+'):
+        cleaned = cleaned[1:]
+    
+    # Handle different formats
+    if cleaned.startswith('60'):
+        # Already has country code
+        return f'+{cleaned}'
+    elif cleaned.startswith('0'):
+        # Malaysian format starting with 0
+        return f'+60{cleaned[1:]}'
+    elif len(cleaned) >= 9 and len(cleaned) <= 11:
+        # Assume Malaysian number without country code or leading 0
+        return f'+60{cleaned}'
+    else:
+        # Return as-is with + prefix
+        return f'+{cleaned}' if cleaned else None
+
+
+def sanitize_message(message: str) -> str:
+    """
+    Sanitize user message (prevent injection attacks).
+
+    Args:
+        message: User message
+
+    Returns:
+        Sanitized message
+    """
+    # Limit length
+    message = message[:500]
+
+    # Remove potentially dangerous characters (basic sanitization)
+    # Remove: script tags, HTML tags
+    sanitized = re.sub(r'<script.*?</script>', '', message, flags=re.IGNORECASE | re.DOTALL)
+    sanitized = re.sub(r'<.*?>', '', sanitized)  # Remove HTML tags
+
+    return sanitized.strip()
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Build the NLU Asset Bundle
+
+Compiles the slang dictionary and the lookup tables derived from the NLU
+training data into one versioned binary file (see nlu-engine/src/nlu_assets.py):
+- slang: flattened {slang_term: standard_term} map used by normalize_slang
+- language_markers: {word: "EN" | "BM"} for words seen in only one language
+- intent_model: local naive Bayes intent classifier (intent_classifier.py)
+- language_model: per-word EN/BM classifier for words not in language_markers
+- nlu_examples: few-shot example index for the Bedrock NLU prompt
+
+The NLU Lambda memory-maps the file at cold start instead of downloading and
+flattening slang_dictionary.json. deploy_all_lambdas.sh runs this script and
+packages the output with the function; --upload also publishes it to S3 for
+functions configured with NLU_ASSETS_S3_KEY.
+
+USAGE:
+    python build_nlu_assets.py --output nlu_assets.bin
+    python build_nlu_assets.py --output nlu_assets.bin --upload s3://bucket/nlu_assets.bin
+
+Options:
+    --slang       Path to slang_dictionary.json (default: Data/slang_dictionary.json)
+    --training    Path to nlu_training_data.json (default: Data/nlu_training_data.json)
+    --output      Output bundle path
+    --upload      Also upload the bundle to this s3:// URI
+"""
+
+import os
+import sys
+import json
+import argparse
+
+# Paths
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+PROJECT_ROOT = os.path.dirname(BACKEND_DIR)
+NLU_SRC_DIR = os.path.join(BACKEND_DIR, 'lambdas', 'nlu-engine', 'src')
+
+sys.path.insert(0, NLU_SRC_DIR)
+from nlu_assets import AssetBundle, compile_tables, write_bundle  # noqa: E402
+
+
+def load_json(path: str):
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def upload(path: str, uri: str) -> None:
+    """Upload the bundle to s3://bucket/key."""
+    import boto3
+
+    bucket, _, key = uri[len('s3://'):].partition('/')
+    s3 = boto3.client('s3', region_name=os.environ.get('REGION', 'ap-southeast-1'))
+    with open(path, 'rb') as f:
+        response = s3.put_object(Bucket=bucket, Key=key, Body=f, ContentType='application/octet-stream')
+    print(f"[OK] Uploaded to {uri} (ETag {response.get('ETag')})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compile NLU lookup tables into a versioned asset bundle')
+    parser.add_argument('--slang', default=os.path.join(PROJECT_ROOT, 'Data', 'slang_dictionary.json'))
+    parser.add_argument('--training', default=os.path.join(PROJECT_ROOT, 'Data', 'nlu_training_data.json'))
+    parser.add_argument('--output', required=True, help='Output bundle path')
+    parser.add_argument('--upload', help='s3://bucket/key to publish the bundle to')
+    args = parser.parse_args()
+
+    raw_slang = load_json(args.slang)
+    training_data = load_json(args.training) if os.path.exists(args.training) else None
+    if training_data is None:
+        print(f"[WARN] {args.training} not found - building the slang table only")
+
+    tables = compile_tables(raw_slang, training_data)
+    sources = {
+        'slang_dictionary': {'file': os.path.basename(args.slang), 'version': raw_slang.get('version')},
+    }
+    if training_data is not None:
+        sources['nlu_training_data'] = {'file': os.path.basename(args.training)}
+
+    version = write_bundle(args.output, tables, sources)
+
+    # Read it back the way the Lambda does
+    bundle = AssetBundle.open(args.output)
+    for name, mapping in tables.items():
+        if bundle.table(name).as_dict() != mapping:
+            print(f"[ERROR] Table {name} did not round-trip")
+            sys.exit(1)
+    bundle.close()
+
+    print(f"[OK] Wrote {args.output} ({os.path.getsize(args.output)} bytes), version {version}")
+    for name, mapping in tables.items():
+        print(f"   {name}: {len(mapping)} entries")
+
+    if args.upload:
+        upload(args.output, args.upload)
+
+
+if __name__ == '__main__':
+    main()
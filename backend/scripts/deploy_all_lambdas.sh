@@ -11,6 +11,9 @@
 # 5. chatbot-guardrails
 # 6. chatbot-crm-mock
 #
+# Shared code and dependencies (chatbot_core, boto3, aws-xray-sdk) are
+# published once as the chatbot-core layer and attached to every function.
+#
 # Prerequisites:
 # - AWS CLI configured with credentials
 # - IAM role ChatbotLambdaExecutionRole exists
@@ -25,6 +28,7 @@ REGION="ap-southeast-1"
 BACKEND_DIR="/Users/kita/Desktop/BreakIntoAI/Let-It-Fly/backend"
 ROLE_NAME="ChatbotLambdaExecutionRole"
 RUNTIME="python3.12"
+CORE_LAYER_NAME="chatbot-core"
 
 # Per-Lambda memory and timeout configurations (optimized for P95 < 2.5s)
 get_lambda_memory() {
@@ -129,6 +133,43 @@ load_env_vars() {
     echo_success "Environment variables loaded"
 }
 
+###############################################################################
+# Publish Shared Layer
+###############################################################################
+
+publish_core_layer() {
+    local LAYER_DIR="$BACKEND_DIR/layers/$CORE_LAYER_NAME"
+    local BUILD_DIR="$LAYER_DIR/build"
+    local ZIP_FILE="$LAYER_DIR/layer.zip"
+
+    echo_info "Packaging $CORE_LAYER_NAME layer..."
+
+    rm -rf "$BUILD_DIR"
+    rm -f "$ZIP_FILE"
+    mkdir -p "$BUILD_DIR/python"
+
+    # Layer contents must live under python/ to land on sys.path
+    cp -r "$LAYER_DIR/python/"* "$BUILD_DIR/python/"
+    pip3 install -r "$LAYER_DIR/requirements.txt" -t "$BUILD_DIR/python" --quiet --upgrade 2>&1 | grep -v "dependency conflicts" || true
+
+    cd "$BUILD_DIR"
+    zip -r "$ZIP_FILE" . -q -x '*__pycache__*'
+    cd - > /dev/null
+    rm -rf "$BUILD_DIR"
+
+    CORE_LAYER_ARN=$(aws lambda publish-layer-version \
+        --layer-name $CORE_LAYER_NAME \
+        --zip-file fileb://$ZIP_FILE \
+        --compatible-runtimes $RUNTIME \
+        --region $REGION \
+        --query 'LayerVersionArn' \
+        --output text)
+
+    rm -f "$ZIP_FILE"
+
+    echo_success "Published $CORE_LAYER_ARN"
+}
+
 ###############################################################################
 # Package Lambda Function
 ###############################################################################
@@ -149,6 +190,12 @@ package_lambda() {
     # Copy source code
     cp -r "$LAMBDA_DIR/src/"* "$BUILD_DIR/"
 
+    # Compile the NLU lookup tables into a bundle loaded with mmap at cold start
+    if [ "$LAMBDA_NAME" == "nlu-engine" ]; then
+        echo_info "Building NLU asset bundle..." >&2
+        python3 "$BACKEND_DIR/scripts/build_nlu_assets.py" --output "$BUILD_DIR/nlu_assets.bin" >&2
+    fi
+
     # Install dependencies if requirements.txt exists
     if [ -f "$LAMBDA_DIR/requirements.txt" ]; then
         echo_info "Installing dependencies for $LAMBDA_NAME..." >&2
@@ -210,6 +257,7 @@ deploy_lambda() {
             --timeout $TIMEOUT \
             --memory-size $MEMORY \
             --environment "$ENV_VARS_JSON" \
+            --layers $CORE_LAYER_ARN \
             --region $REGION \
             --no-cli-pager > /dev/null
 
@@ -227,6 +275,7 @@ deploy_lambda() {
             --memory-size $MEMORY \
             --environment "$ENV_VARS_JSON" \
             --tracing-config Mode=Active \
+            --layers $CORE_LAYER_ARN \
             --region $REGION \
             --no-cli-pager > /dev/null
 
@@ -260,6 +309,10 @@ main() {
         "twilio-webhook"
     )
 
+    # Publish shared layer first - every function depends on it
+    echo_section "Publishing Shared Layer"
+    publish_core_layer
+
     # Deploy each lambda
     echo_section "Deploying Lambda Functions"
 
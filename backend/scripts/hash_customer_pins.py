@@ -4,23 +4,31 @@ Hash Customer PINs in DynamoDB
 
 This script updates existing customer records in DynamoDB with hashed PINs.
 It reads plaintext PINs from the source JSON and adds:
-- security_pin_hash: PBKDF2-HMAC-SHA256 hashed PIN
-- salt: Random salt used for hashing
+- security_pin_hash: versioned PIN hash ("$<algorithm>$<params>$<salt>$<hash>",
+  see chatbot_core.pin_hash) under PIN_HASH_POLICY
+
+Records that already have a hash are skipped. Hashes under an older policy
+are upgraded by the Guardrails Lambda on the customer's next successful
+login; --rehash upgrades them now from the PINs in the source JSON.
 
 USAGE:
-    python hash_customer_pins.py [--dry-run]
+    python hash_customer_pins.py [--dry-run] [--rehash]
 
 Options:
     --dry-run    Show what would be updated without making changes
+    --rehash     Also re-hash PINs whose hash differs from PIN_HASH_POLICY
 """
 
 import json
 import os
 import sys
-import hashlib
 import boto3
 from botocore.exceptions import ClientError
 
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, os.path.join(BACKEND_DIR, 'layers', 'chatbot-core', 'python'))
+from chatbot_core.pin_hash import PIN_HASH_POLICY, hash_pin, verify_pin_hash  # noqa: E402
+
 # AWS Configuration
 REGION = 'ap-southeast-1'
 TABLE_NAME = 'chatbot-customers'
@@ -30,26 +38,6 @@ PROJECT_ROOT = "/Users/kita/Desktop/BreakIntoAI/Let-It-Fly"
 CUSTOMER_JSON_PATH = os.path.join(PROJECT_ROOT, "Data", "customer_data.json")
 
 
-def hash_pin(pin: str, salt: bytes) -> str:
-    """
-    Hash PIN using PBKDF2-HMAC-SHA256.
-    
-    Args:
-        pin: Plaintext PIN (4 digits)
-        salt: Random salt bytes
-    
-    Returns:
-        Hex string of hashed PIN
-    """
-    pin_hash = hashlib.pbkdf2_hmac(
-        'sha256',
-        pin.encode('utf-8'),
-        salt,
-        100000  # 100,000 iterations (matches Guardrails Lambda)
-    )
-    return pin_hash.hex()
-
-
 def load_pin_mapping() -> dict:
     """Load phone_number -> PIN mapping from JSON."""
     try:
@@ -64,16 +52,18 @@ def load_pin_mapping() -> dict:
         sys.exit(1)
 
 
-def hash_customer_pins(dry_run: bool = False):
+def hash_customer_pins(dry_run: bool = False, rehash: bool = False):
     """
     Update all customer records with hashed PINs.
     
     Args:
         dry_run: If True, show what would be updated without making changes
+        rehash: If True, also re-hash PINs stored under another policy
     """
     print(f"{'[DRY-RUN] ' if dry_run else ''}Hashing customer PINs in DynamoDB...")
     print(f"   Table: {TABLE_NAME}")
     print(f"   Region: {REGION}")
+    print(f"   Policy: {PIN_HASH_POLICY}")
     print()
     
     # Load PIN mapping from JSON
@@ -127,23 +117,30 @@ def hash_customer_pins(dry_run: bool = False):
                 skipped_count += 1
                 continue
             
-            # Check if already hashed
-            if customer.get('security_pin_hash') and customer.get('salt'):
-                print(f"[SKIP] {phone_number}: Already has hashed PIN")
-                already_hashed += 1
-                continue
-            
             # Get plaintext PIN from JSON mapping
             plaintext_pin = pin_mapping.get(phone_number)
+            stored_hash = customer.get('security_pin_hash')
+            
+            # Check if already hashed (and, with --rehash, under the current policy)
+            if stored_hash:
+                outdated = False
+                if rehash and plaintext_pin:
+                    try:
+                        _, outdated = verify_pin_hash(plaintext_pin, stored_hash, customer.get('salt'))
+                    except ValueError as e:
+                        print(f"[WARN] {phone_number}: Unreadable hash ({e})")
+                if not outdated:
+                    print(f"[SKIP] {phone_number}: Already has hashed PIN")
+                    already_hashed += 1
+                    continue
             
             if not plaintext_pin:
                 print(f"[WARN] {phone_number}: No PIN found in JSON source")
                 not_found += 1
                 continue
             
-            # Generate salt and hash PIN
-            salt = os.urandom(32)
-            pin_hash = hash_pin(plaintext_pin, salt)
+            # Hash PIN (random salt, algorithm and cost recorded in the hash)
+            pin_hash = hash_pin(plaintext_pin)
             
             if dry_run:
                 print(f"[DRY-RUN] {phone_number}: Would add hash (PIN: {plaintext_pin} → hash: {pin_hash[:16]}...)")
@@ -153,10 +150,9 @@ def hash_customer_pins(dry_run: bool = False):
                 try:
                     table.update_item(
                         Key={'phone_number': phone_number},
-                        UpdateExpression="SET security_pin_hash = :hash, salt = :salt",
+                        UpdateExpression="SET security_pin_hash = :hash REMOVE salt",
                         ExpressionAttributeValues={
-                            ':hash': pin_hash,
-                            ':salt': salt.hex()
+                            ':hash': pin_hash
                         }
                     )
                     print(f"[OK] {phone_number}: Added hashed PIN")
@@ -183,7 +179,7 @@ def hash_customer_pins(dry_run: bool = False):
     if dry_run:
         print("[DRY-RUN] This was a DRY RUN. Run without --dry-run to apply changes.")
     else:
-        print("[SECURE] All PINs stored as PBKDF2-HMAC-SHA256 hashes (100,000 iterations)")
+        print(f"[SECURE] All PINs stored as {PIN_HASH_POLICY} hashes")
 
 
 def verify_hash(phone_number: str, test_pin: str):
@@ -202,18 +198,18 @@ def verify_hash(phone_number: str, test_pin: str):
         
         customer = response['Item']
         stored_hash = customer.get('security_pin_hash')
-        salt_hex = customer.get('salt')
         
-        if not stored_hash or not salt_hex:
-            print(f"[ERROR] No hash/salt found for {phone_number}")
+        if not stored_hash:
+            print(f"[ERROR] No hash found for {phone_number}")
             return False
         
-        # Hash the test PIN with stored salt
-        salt = bytes.fromhex(salt_hex)
-        computed_hash = hash_pin(test_pin, salt)
+        # Hash the test PIN with the stored algorithm, cost and salt
+        matches, outdated = verify_pin_hash(test_pin, stored_hash, customer.get('salt'))
         
-        if computed_hash == stored_hash:
+        if matches:
             print(f"[OK] PIN verified successfully!")
+            if outdated:
+                print(f"[INFO] Hash differs from {PIN_HASH_POLICY}; rehashed on next login")
             return True
         else:
             print(f"[ERROR] PIN mismatch")
@@ -229,6 +225,7 @@ if __name__ == "__main__":
     
     parser = argparse.ArgumentParser(description="Hash customer PINs in DynamoDB")
     parser.add_argument('--dry-run', action='store_true', help='Show what would be updated without making changes')
+    parser.add_argument('--rehash', action='store_true', help='Also re-hash PINs stored under another policy')
     parser.add_argument('--verify', metavar='PHONE', help='Verify PIN for a specific phone number')
     parser.add_argument('--pin', metavar='PIN', help='PIN to verify (use with --verify)')
     
@@ -240,5 +237,5 @@ if __name__ == "__main__":
             sys.exit(1)
         verify_hash(args.verify, args.pin)
     else:
-        hash_customer_pins(dry_run=args.dry_run)
+        hash_customer_pins(dry_run=args.dry_run, rehash=args.rehash)
 
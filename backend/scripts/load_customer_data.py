@@ -2,39 +2,26 @@
 """
 Load customer data from JSON into DynamoDB with secure PIN hashing.
 
-SECURITY: Never stores plaintext PINs - uses PBKDF2-HMAC-SHA256 with salt.
+SECURITY: Never stores plaintext PINs - uses the versioned PIN hash format
+of the chatbot-core layer (chatbot_core.pin_hash), with the KDF and cost
+from PIN_HASH_POLICY (default: PBKDF2-HMAC-SHA256, 100,000 iterations).
 """
 
 import json
 import os
 import sys
-import hashlib
 import boto3
 from botocore.exceptions import ClientError
 
+# Paths
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, os.path.join(BACKEND_DIR, 'layers', 'chatbot-core', 'python'))
+from chatbot_core.pin_hash import PIN_HASH_POLICY, hash_pin  # noqa: E402
+
 # AWS Configuration
 REGION = 'ap-southeast-1'
 TABLE_NAME = 'chatbot-customers'
 
-def hash_pin(pin: str, salt: bytes) -> str:
-    """
-    Hash PIN using PBKDF2-HMAC-SHA256.
-
-    Args:
-        pin: Plaintext PIN (4 digits)
-        salt: Random salt bytes
-
-    Returns:
-        Hex string of hashed PIN
-    """
-    pin_hash = hashlib.pbkdf2_hmac(
-        'sha256',
-        pin.encode('utf-8'),
-        salt,
-        100000  # 100,000 iterations
-    )
-    return pin_hash.hex()
-
 def load_customer_data():
     """Load customer data from JSON and insert into DynamoDB with hashed PINs."""
 
@@ -74,11 +61,8 @@ def load_customer_data():
             skipped_count += 1
             continue
 
-        # Generate random salt for this customer
-        salt = os.urandom(32)
-
-        # Hash the PIN
-        pin_hash = hash_pin(plaintext_pin, salt)
+        # Hash the PIN (random salt, algorithm and cost recorded in the hash)
+        pin_hash = hash_pin(plaintext_pin)
 
         # Prepare customer record (remove plaintext PIN)
         customer_record = {
@@ -88,7 +72,6 @@ def load_customer_data():
             'language_preference': customer.get('language_preference', 'EN'),
             'voicemail_active': customer.get('voicemail_active', False),
             'security_pin_hash': pin_hash,
-            'salt': salt.hex(),
             'created_at': customer.get('created_at', '2024-01-01T00:00:00Z')
         }
 
@@ -105,7 +88,7 @@ def load_customer_data():
     print(f"   Loaded: {loaded_count} customers")
     print(f"   Skipped: {skipped_count} customers")
     print(f"   Total: {len(customers)} customers in source file")
-    print(f"\n[SECURE] Security: All PINs stored as PBKDF2-HMAC-SHA256 hashes (100,000 iterations)")
+    print(f"\n[SECURE] Security: All PINs stored as {PIN_HASH_POLICY} hashes")
 
 if __name__ == "__main__":
     load_customer_data()
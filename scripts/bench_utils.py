@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Shared helpers for the local benchmark scripts.
+
+Benchmarks run the Lambda code in-process against a local DynamoDB stand-in
+(moto) with an injected per-call round-trip time, so they can count AWS calls
+and compare latency between code paths without touching a real account.
+
+Usage:
+    from bench_utils import local_aws, load_lambda, create_chatbot_tables, inject_latency
+"""
+
+import os
+import sys
+import time
+import statistics
+import importlib.util
+from contextlib import contextmanager
+from typing import Dict, List, Any, Optional
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+LAMBDAS_DIR = os.path.join(REPO_ROOT, 'backend', 'lambdas')
+CORE_LAYER_DIR = os.path.join(REPO_ROOT, 'backend', 'layers', 'chatbot-core', 'python')
+
+
+@contextmanager
+def local_aws(region: str = 'ap-southeast-1'):
+    """
+    Run the enclosed block against moto's in-memory AWS stand-in.
+
+    Sets dummy credentials and REGION before any Lambda module is loaded, so
+    module-level boto3 clients are created inside the mock.
+    """
+    from moto import mock_aws
+
+    os.environ.setdefault('AWS_ACCESS_KEY_ID', 'testing')
+    os.environ.setdefault('AWS_SECRET_ACCESS_KEY', 'testing')
+    os.environ['AWS_DEFAULT_REGION'] = region
+    os.environ['REGION'] = region
+
+    with mock_aws():
+        yield
+
+
+def load_lambda(name: str):
+    """
+    Import backend/lambdas/<name>/src/lambda_function.py as an isolated module.
+
+    Args:
+        name: Lambda directory name (e.g., "whatsapp-webhook")
+
+    Returns:
+        Loaded module
+    """
+    src_dir = os.path.join(LAMBDAS_DIR, name, 'src')
+    for path in (CORE_LAYER_DIR, src_dir):
+        if path not in sys.path:
+            sys.path.insert(0, path)
+
+    module_name = f"{name.replace('-', '_')}_lambda"
+    spec = importlib.util.spec_from_file_location(module_name, os.path.join(src_dir, 'lambda_function.py'))
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[module_name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+class CallCounter:
+    """Counts AWS API calls per operation name and injects a fixed round-trip time."""
+
+    def __init__(self, latency_ms: float = 0.0):
+        self.latency_ms = latency_ms
+        self.calls: Dict[str, int] = {}
+
+    def __call__(self, model=None, **kwargs):
+        name = model.name if model is not None else 'Unknown'
+        self.calls[name] = self.calls.get(name, 0) + 1
+        if self.latency_ms:
+            time.sleep(self.latency_ms / 1000)
+
+    @property
+    def total(self) -> int:
+        return sum(self.calls.values())
+
+    def reset(self):
+        self.calls = {}
+
+
+def inject_latency(client, service: str, latency_ms: float, counter: Optional[CallCounter] = None) -> CallCounter:
+    """
+    Attach a CallCounter to a boto3 client (or resource.meta.client).
+
+    Args:
+        client: boto3 client
+        service: Service event prefix (e.g., "dynamodb")
+        latency_ms: Simulated network round trip per API call
+        counter: Existing counter to share (e.g. a resource's client and the low-level client)
+
+    Returns:
+        CallCounter registered on the client
+    """
+    counter = counter or CallCounter(latency_ms)
+    client.meta.events.register(f'before-call.{service}', counter)
+    return counter
+
+
+def create_chatbot_tables(dynamodb) -> None:
+    """Create the sessions, customers and audit tables with the production key schema."""
+    dynamodb.create_table(
+        TableName=os.environ.get('DYNAMODB_SESSIONS_TABLE', 'chatbot-sessions'),
+        KeySchema=[
+            {'AttributeName': 'session_id', 'KeyType': 'HASH'},
+            {'AttributeName': 'turn_number', 'KeyType': 'RANGE'}
+        ],
+        AttributeDefinitions=[
+            {'AttributeName': 'session_id', 'AttributeType': 'S'},
+            {'AttributeName': 'turn_number', 'AttributeType': 'N'}
+        ],
+        BillingMode='PAY_PER_REQUEST'
+    )
+    dynamodb.create_table(
+        TableName=os.environ.get('DYNAMODB_CUSTOMERS_TABLE', 'chatbot-customers'),
+        KeySchema=[{'AttributeName': 'phone_number', 'KeyType': 'HASH'}],
+        AttributeDefinitions=[{'AttributeName': 'phone_number', 'AttributeType': 'S'}],
+        BillingMode='PAY_PER_REQUEST'
+    )
+    dynamodb.create_table(
+        TableName=os.environ.get('DYNAMODB_AUDIT_TABLE', 'chatbot-audit-logs'),
+        KeySchema=[{'AttributeName': 'log_id', 'KeyType': 'HASH'}],
+        AttributeDefinitions=[{'AttributeName': 'log_id', 'AttributeType': 'S'}],
+        BillingMode='PAY_PER_REQUEST'
+    )
+
+
+def summarize(samples_ms: List[float]) -> Dict[str, Any]:
+    """Return count, mean, p50 and p95 for a list of latencies in milliseconds."""
+    ordered = sorted(samples_ms)
+    if not ordered:
+        return {'count': 0, 'mean_ms': 0.0, 'p50_ms': 0.0, 'p95_ms': 0.0}
+    return {
+        'count': len(ordered),
+        'mean_ms': statistics.fmean(ordered),
+        'p50_ms': ordered[len(ordered) // 2],
+        'p95_ms': ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+    }
+
+
+def print_summary(label: str, samples_ms: List[float]) -> Dict[str, Any]:
+    """Print and return latency statistics for a benchmark case."""
+    stats = summarize(samples_ms)
+    print(f"  {label:<40} mean={stats['mean_ms']:8.2f}ms  p50={stats['p50_ms']:8.2f}ms  p95={stats['p95_ms']:8.2f}ms  (n={stats['count']})")
+    return stats
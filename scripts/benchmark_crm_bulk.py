@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Throughput of the CRM Mock bulk action vs. one invocation per phone number.
+
+Seeds --sizes customers in moto DynamoDB with --latency-ms injected per
+call, then for each batch size runs:
+
+- check_status: one handler call per number vs. {"action": "bulk"} (BatchGetItem)
+- deactivate: one handler call per number vs. bulk (parallel chunks)
+- deactivate retried: the same bulk request again (idempotent replays)
+
+Each handler call is charged --invoke-ms on top (Lambda Invoke round trip
+from the caller; 0 measures the handler alone). Reports wall time, phone
+numbers per second and DynamoDB calls, and checks every number succeeded.
+
+Updates run on the non-transactional path (CRM_TRANSACTIONS_ENABLED=false)
+unless --transactions is given. moto's TransactWriteItems deep-copies every
+table it touches once per action and is not thread-safe, so with
+--transactions its calls are serialized and the timings grow with table
+size. The DynamoDB call counts still hold, but time transactions against
+real DynamoDB.
+
+Usage:
+    python benchmark_crm_bulk.py --sizes 10,100,1000 --latency-ms 8
+    CRM_BULK_CHUNK_SIZE=50 CRM_BULK_CONCURRENCY=10 python benchmark_crm_bulk.py --invoke-ms 20
+    python benchmark_crm_bulk.py --sizes 10,100 --transactions
+"""
+
+import io
+import time
+import threading
+import argparse
+from contextlib import redirect_stdout
+from typing import Callable, Dict, List
+
+from bench_utils import local_aws, load_lambda, create_chatbot_tables, inject_latency
+
+
+def measure(label: str, size: int, run: Callable[[], List[Dict]], counter, invokes: int, invoke_ms: float) -> Dict:
+    counter.reset()
+    start = time.perf_counter()
+    with redirect_stdout(io.StringIO()):
+        results = run()
+    elapsed = time.perf_counter() - start + invokes * invoke_ms / 1000
+    ok = sum(1 for result in results if result.get('success'))
+    idempotent = sum(1 for result in results if result.get('idempotent'))
+    print(f"  {label:<32} {elapsed * 1000:>9.0f} {size / elapsed:>10.0f} {counter.total:>8} {invokes:>8} "
+          f"{ok:>6}/{size:<6} {idempotent:>10}")
+    return {'seconds': elapsed, 'ok': ok}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark bulk voicemail operations against per-number invokes')
+    parser.add_argument('--sizes', default='10,100,1000', help='Comma-separated batch sizes (default: 10,100,1000)')
+    parser.add_argument('--latency-ms', type=float, default=8.0, help='Simulated DynamoDB round trip (default: 8)')
+    parser.add_argument('--invoke-ms', type=float, default=0.0,
+                        help='Simulated Lambda Invoke round trip per handler call (default: 0)')
+    parser.add_argument('--transactions', action='store_true',
+                        help='Update through TransactWriteItems (serialized in moto, see above)')
+    args = parser.parse_args()
+    sizes = [int(size) for size in args.sizes.split(',')]
+
+    import boto3
+
+    with local_aws():
+        dynamodb = boto3.resource('dynamodb')
+        create_chatbot_tables(dynamodb)
+        crm = load_lambda('crm-mock')
+        crm.CRM_TRANSACTIONS_ENABLED = args.transactions
+        from chatbot_core import get_resource
+
+        if args.transactions:
+            from moto.dynamodb.models import DynamoDBBackend
+
+            lock = threading.Lock()
+            transact_write_items = DynamoDBBackend.transact_write_items
+
+            def serialized(self, *items, **kwargs):
+                with lock:
+                    return transact_write_items(self, *items, **kwargs)
+            DynamoDBBackend.transact_write_items = serialized
+
+        phones = [f"+6019{i:07d}" for i in range(max(sizes))]
+        with dynamodb.Table('chatbot-customers').batch_writer() as batch:
+            for i, phone in enumerate(phones):
+                batch.put_item(Item={'phone_number': phone, 'customer_id': f"CUST{i:05d}", 'voicemail_active': True})
+
+        counter = inject_latency(get_resource('dynamodb').meta.client, 'dynamodb', args.latency_ms)
+
+        print("=" * 100)
+        print(f"CRM MOCK BULK OPERATIONS ({args.latency_ms:.0f}ms per DynamoDB call, {args.invoke_ms:.0f}ms per invoke, "
+              f"chunk {crm.CRM_BULK_CHUNK_SIZE}, concurrency {crm.CRM_BULK_CONCURRENCY}, "
+              f"{'transactions' if args.transactions else 'no transactions'})")
+        print("=" * 100)
+        speedups = []
+        for size in sizes:
+            batch_phones = phones[:size]
+            print(f"batch of {size}")
+            print(f"  {'mode':<32} {'wall ms':>9} {'numbers/s':>10} {'DDB calls':>8} {'invokes':>8} "
+                  f"{'ok':>13} {'idempotent':>10}")
+
+            def single(action: str, batch_id: str) -> Callable[[], List[Dict]]:
+                return lambda: [
+                    crm.handler({'action': action, 'phone_number': phone, 'customer_id': 'CUST',
+                                 'session_id': f"{batch_id}:{phone}"}, None)
+                    for phone in batch_phones
+                ]
+
+            def bulk(operation: str, batch_id: str) -> Callable[[], List[Dict]]:
+                return lambda: crm.handler({'action': 'bulk', 'operation': operation, 'phone_numbers': batch_phones,
+                                            'batch_id': batch_id}, None)['results']
+
+            for operation in ('check_status', 'deactivate'):
+                sequential = measure(f"{operation}, per-number invokes", size,
+                                     single(operation, f"SEQ-{size}"), counter, size, args.invoke_ms)
+                batched = measure(f"{operation}, bulk", size,
+                                  bulk(operation, f"BULK-{size}"), counter, 1, args.invoke_ms)
+                speedups.append((size, operation, sequential['seconds'] / batched['seconds']))
+            measure("deactivate, bulk retried", size, bulk('deactivate', f"BULK-{size}"), counter, 1, args.invoke_ms)
+            print()
+
+        print("Bulk speedup over per-number invokes:")
+        for size, operation, speedup in speedups:
+            print(f"  {size:>5} x {operation:<13} {speedup:>6.1f}x")
+
+
+if __name__ == '__main__':
+    main()
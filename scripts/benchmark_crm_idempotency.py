@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Benchmark CRM Mock idempotency: DynamoDB calls per request and duplicate CRM writes.
+
+Runs deactivate_voicemail() against moto DynamoDB with --latency-ms injected
+per call, for a first request and for retries of the same request:
+
+- first request
+- retry in the same session turn
+- retry after the session moved on to a later turn
+
+For each case it reports the DynamoDB calls of the measured request, how
+often it changed the customer record (over --repeat runs; on a retry, a
+duplicate CRM operation) and the mean latency. With --baseline-ref the same cases run on the CRM Mock Lambda from
+an earlier git revision (e.g. the latest-turn query before and after the update).
+
+Usage:
+    python benchmark_crm_idempotency.py --latency-ms 8
+    python benchmark_crm_idempotency.py --latency-ms 8 --baseline-ref HEAD~1
+"""
+
+import io
+import os
+import sys
+import time
+import tempfile
+import argparse
+import subprocess
+import importlib.util
+from contextlib import redirect_stdout
+from typing import Dict, List
+
+from bench_utils import REPO_ROOT, CORE_LAYER_DIR, local_aws, load_lambda, create_chatbot_tables, \
+    inject_latency, summarize
+
+PHONE = '+60123456789'
+CUSTOMER_ID = 'CUST001'
+CRM_SOURCE = 'backend/lambdas/crm-mock/src/lambda_function.py'
+
+# name, requests before the measured one, new session turn before the measured one
+CASES = [
+    ('first request', 0, False),
+    ('retry, same turn', 1, False),
+    ('retry, later turn', 1, True),
+]
+
+
+def load_baseline(ref: str, target_dir: str):
+    """Import the CRM Mock Lambda source at a git revision."""
+    source = subprocess.run(['git', 'show', f"{ref}:{CRM_SOURCE}"], cwd=REPO_ROOT,
+                            check=True, capture_output=True, text=True).stdout
+    path = os.path.join(target_dir, 'crm_mock_baseline.py')
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(source)
+    if CORE_LAYER_DIR not in sys.path:
+        sys.path.insert(0, CORE_LAYER_DIR)
+    spec = importlib.util.spec_from_file_location('crm_mock_baseline', path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def run(label: str, crm, dynamodb, args) -> Dict[str, Dict]:
+    from chatbot_core import get_resource
+
+    client = get_resource('dynamodb').meta.client
+    counter = inject_latency(client, 'dynamodb', args.latency_ms)
+    sessions = dynamodb.Table('chatbot-sessions')
+    customers = dynamodb.Table('chatbot-customers')
+    customers.put_item(Item={'phone_number': PHONE, 'voicemail_active': True})
+
+    def updated_at():
+        return customers.get_item(Key={'phone_number': PHONE})['Item'].get('updated_at')
+
+    results = {}
+    print(label)
+    print(f"  {'case':<20} {'calls':>6}  {'operations':<36} {'CRM writes':>10} {'mean ms':>8}")
+    for name, earlier, new_turn in CASES:
+        samples: List[float] = []
+        crm_writes = 0
+        for i in range(args.repeat):
+            session_id = f"SESSION-BENCH-{label}-{name}-{i}".replace(' ', '')
+            sessions.put_item(Item={'session_id': session_id, 'turn_number': 1})
+            with redirect_stdout(io.StringIO()):
+                for _ in range(earlier):
+                    crm.deactivate_voicemail(PHONE, CUSTOMER_ID, session_id)
+            if new_turn:
+                sessions.put_item(Item={'session_id': session_id, 'turn_number': 2})
+            before = updated_at()
+            counter.reset()
+            start = time.perf_counter()
+            with redirect_stdout(io.StringIO()):
+                result = crm.deactivate_voicemail(PHONE, CUSTOMER_ID, session_id)
+            samples.append((time.perf_counter() - start) * 1000)
+            calls, operations = counter.total, dict(counter.calls)
+            crm_writes += updated_at() != before
+        operations = ', '.join(f"{op} {n}" for op, n in sorted(operations.items()))
+        stats = summarize(samples)
+        results[name] = {'calls': calls, 'crm_writes': crm_writes, 'mean_ms': stats['mean_ms']}
+        print(f"  {name:<20} {calls:>6}  {operations:<36} {crm_writes:>10} {stats['mean_ms']:>8.1f}")
+        if not result.get('success'):
+            print(f"    [WARN] {result.get('error')}")
+
+    client.meta.events.unregister('before-call.dynamodb', counter)
+    print()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark DynamoDB calls per CRM Mock request and retry')
+    parser.add_argument('--latency-ms', type=float, default=8.0, help='Simulated DynamoDB round trip (default: 8)')
+    parser.add_argument('--repeat', type=int, default=5, help='Runs per case (default: 5)')
+    parser.add_argument('--baseline-ref', help='Git revision of the CRM Mock Lambda to compare against')
+    args = parser.parse_args()
+
+    import boto3
+
+    with local_aws():
+        dynamodb = boto3.resource('dynamodb')
+        create_chatbot_tables(dynamodb)
+
+        print("=" * 80)
+        print(f"CRM MOCK IDEMPOTENCY ({args.latency_ms:.0f}ms per DynamoDB call)")
+        print("=" * 80)
+        current = run('current', load_lambda('crm-mock'), dynamodb, args)
+
+        if args.baseline_ref:
+            with tempfile.TemporaryDirectory() as tmp:
+                baseline = run(f'baseline ({args.baseline_ref})', load_baseline(args.baseline_ref, tmp),
+                               dynamodb, args)
+            print(f"  {'case':<20} {'calls':>14} {'CRM writes':>14} {'mean ms':>18}")
+            for name in current:
+                before, after = baseline[name], current[name]
+                print(f"  {name:<20} {before['calls']:>6} -> {after['calls']:<5} "
+                      f"{before['crm_writes']:>6} -> {after['crm_writes']:<5} "
+                      f"{before['mean_ms']:>8.1f} -> {after['mean_ms']:<8.1f}")
+
+
+if __name__ == '__main__':
+    main()
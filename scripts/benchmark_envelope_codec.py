@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Benchmark the inter-Lambda envelope codec against the previous double-JSON payloads.
+
+Previous shape (every handler):   {"statusCode": 200, "body": json.dumps(result)}
+  - encode: json.dumps(result), then the Lambda runtime json.dumps the outer dict
+  - decode: json.loads(payload), then json.loads(payload["body"])
+
+Envelope (chatbot_core.envelope): {"v": 1, "statusCode": 200, "codec": "json", "data": result}
+  - encode/decode once; with --codec msgpack also compares the msgpack variant
+
+Measures encode time, decode time and payload bytes for representative NLU,
+guardrails, CRM and orchestrator results. Runs locally, no AWS calls.
+
+Usage:
+    python benchmark_envelope_codec.py --iterations 20000
+"""
+
+import sys
+import json
+import time
+import argparse
+from typing import Any, Callable, Dict, Tuple
+
+from bench_utils import CORE_LAYER_DIR
+
+sys.path.insert(0, CORE_LAYER_DIR)
+from chatbot_core import envelope  # noqa: E402
+
+KB_ANSWER = (
+    "Voicemail lets callers leave you a message when you cannot answer. "
+    "To check your messages, dial 1313 from your mobile number. "
+) * 6
+
+PAYLOADS: Dict[str, Dict[str, Any]] = {
+    'nlu': {
+        'intent': 'deactivate_voicemail',
+        'confidence': 0.92,
+        'slots': {'phone_number': '+60123456789', 'security_pin': None, 'language_preference': 'BM'},
+        'normalized_message': 'nak off voicemail sekarang',
+        'language': 'BM'
+    },
+    'guardrails': {'authorized': True, 'reason': 'PIN verified', 'attempts_remaining': 3},
+    'crm': {
+        'success': True,
+        'customer_id': 'CUST001',
+        'voicemail_status': 'inactive',
+        'previous_status': 'active',
+        'message': 'Voicemail deactivated successfully',
+        'timestamp': '2024-12-07T15:30:00Z',
+        'idempotent': False
+    },
+    'orchestrator': {
+        'response': KB_ANSWER,
+        'intent': 'check_voicemail_info',
+        'grounded': True,
+        'language': 'EN',
+        'confidence': 0.88,
+        'citations': [{'uri': f's3://kb/articles/{i}.json', 'score': 0.8} for i in range(4)],
+        'requires_followup': False,
+        'escalate': False
+    },
+}
+
+
+def legacy_encode(result: Dict[str, Any]) -> bytes:
+    return json.dumps({'statusCode': 200, 'body': json.dumps(result)}).encode('utf-8')
+
+
+def legacy_decode(payload: bytes) -> Tuple[int, Dict[str, Any]]:
+    result = json.loads(payload)
+    if 'body' in result:
+        return result['statusCode'], json.loads(result['body']) if isinstance(result['body'], str) else result['body']
+    return 200, result
+
+
+def time_per_call(func: Callable, arg: Any, iterations: int) -> float:
+    """Mean microseconds per call."""
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func(arg)
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark inter-Lambda payload codec')
+    parser.add_argument('--iterations', type=int, default=20000, help='Calls per measurement (default: 20000)')
+    args = parser.parse_args()
+
+    codecs = {
+        'legacy (double JSON)': (legacy_encode, legacy_decode),
+        'envelope json': (lambda d: envelope.encode(d, codec='json'), envelope.decode),
+    }
+    if envelope.MSGPACK_AVAILABLE:
+        codecs['envelope msgpack'] = (lambda d: envelope.encode(d, codec='msgpack'), envelope.decode)
+    else:
+        print("[WARN] msgpack not installed - skipping msgpack codec (pip install msgpack)")
+
+    print("=" * 80)
+    print("INTER-LAMBDA PAYLOAD CODEC")
+    print("=" * 80)
+
+    for name, data in PAYLOADS.items():
+        print(f"\n{name} result")
+        for label, (encode, decode) in codecs.items():
+            payload = encode(data)
+            assert decode(payload) == (200, data), f"{label} did not round-trip {name}"
+            encode_us = time_per_call(encode, data, args.iterations)
+            decode_us = time_per_call(decode, payload, args.iterations)
+            print(f"  {label:<22} encode={encode_us:7.2f}us  decode={decode_us:7.2f}us  "
+                  f"size={len(payload):6d} bytes")
+
+
+if __name__ == '__main__':
+    main()
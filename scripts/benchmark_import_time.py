@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Measure module import (cold start init) time for every Lambda function.
+
+Each sample imports lambda_function.py in a fresh interpreter, the same work a
+Lambda cold start does before the first request. With --baseline-ref, the same
+measurement is repeated on the Lambda sources from an earlier git revision
+(e.g., before the chatbot-core layer and lazy clients), so the two can be
+compared side by side.
+
+Usage:
+    python benchmark_import_time.py --samples 10
+    python benchmark_import_time.py --samples 10 --baseline-ref HEAD~1
+"""
+
+import os
+import sys
+import json
+import argparse
+import tempfile
+import subprocess
+from typing import Dict, List, Optional
+
+from bench_utils import REPO_ROOT, summarize
+
+LAMBDAS = [
+    'crm-mock',
+    'guardrails',
+    'nlu-engine',
+    'orchestrator',
+    'whatsapp-webhook',
+    'twilio-webhook',
+]
+
+IMPORT_SNIPPET = (
+    "import time, json\n"
+    "start = time.perf_counter()\n"
+    "import lambda_function\n"
+    "print(json.dumps({'import_ms': (time.perf_counter() - start) * 1000}))\n"
+)
+
+
+def import_once(backend_dir: str, name: str) -> Optional[float]:
+    """Import one Lambda in a fresh interpreter and return the import time (ms), or None on failure."""
+    paths = [os.path.join(backend_dir, 'lambdas', name, 'src')]
+    layer_dir = os.path.join(backend_dir, 'layers', 'chatbot-core', 'python')
+    if os.path.isdir(layer_dir):
+        paths.append(layer_dir)
+
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join(paths)
+    env.setdefault('REGION', 'ap-southeast-1')
+    env.setdefault('AWS_DEFAULT_REGION', env['REGION'])
+    env.setdefault('AWS_ACCESS_KEY_ID', 'testing')
+    env.setdefault('AWS_SECRET_ACCESS_KEY', 'testing')
+
+    result = subprocess.run(
+        [sys.executable, '-c', IMPORT_SNIPPET],
+        cwd=paths[0], env=env, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        print(f"  [WARN] {name}: import failed: {result.stderr.strip().splitlines()[-1]}")
+        return None
+    return json.loads(result.stdout.strip().splitlines()[-1])['import_ms']
+
+
+def measure(backend_dir: str, samples: int) -> Dict[str, Dict]:
+    """Return import time statistics per Lambda."""
+    stats = {}
+    for name in LAMBDAS:
+        times: List[float] = []
+        for _ in range(samples):
+            elapsed = import_once(backend_dir, name)
+            if elapsed is None:
+                break
+            times.append(elapsed)
+        stats[name] = summarize(times)
+    return stats
+
+
+def checkout_backend(ref: str, target_dir: str) -> str:
+    """Extract backend/ at a git revision into target_dir and return its backend path."""
+    archive = subprocess.run(
+        ['git', 'archive', ref, 'backend/lambdas', 'backend/layers'],
+        cwd=REPO_ROOT, capture_output=True
+    )
+    if archive.returncode != 0:
+        # backend/layers does not exist before the shared layer was introduced
+        archive = subprocess.run(
+            ['git', 'archive', ref, 'backend/lambdas'],
+            cwd=REPO_ROOT, capture_output=True, check=True
+        )
+    subprocess.run(['tar', '-x', '-C', target_dir], input=archive.stdout, check=True)
+    return os.path.join(target_dir, 'backend')
+
+
+def print_table(title: str, stats: Dict[str, Dict]) -> None:
+    print(f"\n{title}")
+    for name, s in stats.items():
+        if s['count']:
+            print(f"  {name:<20} p50={s['p50_ms']:8.1f}ms  mean={s['mean_ms']:8.1f}ms  (n={s['count']})")
+        else:
+            print(f"  {name:<20} (import failed)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark Lambda import (cold start init) time')
+    parser.add_argument('--samples', type=int, default=10, help='Fresh interpreters per function (default: 10)')
+    parser.add_argument('--baseline-ref', help='Git revision to compare against (e.g., HEAD~1)')
+    args = parser.parse_args()
+
+    print("=" * 80)
+    print("LAMBDA IMPORT TIME")
+    print("=" * 80)
+
+    current = measure(os.path.join(REPO_ROOT, 'backend'), args.samples)
+    print_table('Current tree', current)
+
+    if args.baseline_ref:
+        with tempfile.TemporaryDirectory() as tmp:
+            baseline = measure(checkout_backend(args.baseline_ref, tmp), args.samples)
+        print_table(f'Baseline ({args.baseline_ref})', baseline)
+
+        print("\nChange (p50)")
+        for name in LAMBDAS:
+            before, after = baseline[name], current[name]
+            if before['count'] and after['count']:
+                saved = before['p50_ms'] - after['p50_ms']
+                print(f"  {name:<20} {saved:+8.1f}ms saved ({saved / before['p50_ms'] * 100:.0f}%)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Benchmark the per-stage Bedrock model routing (chatbot_core.routing).
+
+Replays a turn mix shaped like production traffic (NLU on every turn, a
+response per turn keyed by status and intent, translation for BM replies,
+occasional KB questions) through ModelRouter against a stub runtime with a
+latency and price per model, and compares:
+
+- routed: the default table (BEDROCK_MODEL_ROUTES merged over it)
+- all-pro: every stage on the pro tier, i.e. the behaviour before routing
+
+Then injects ThrottlingException on the fast model (--throttle-rate) to show
+the fallback to the next model of the chain.
+
+Model latency/price are rough on-demand figures; adjust MODELS for the region.
+
+Usage:
+    python benchmark_model_router.py --turns 200
+    python benchmark_model_router.py --turns 200 --throttle-rate 0.3
+"""
+
+import io
+import time
+import random
+import argparse
+from collections import defaultdict
+from contextlib import redirect_stdout
+from typing import Any, Dict, List, Optional, Tuple
+
+from bench_utils import load_lambda, summarize
+
+# model ID -> (time to first token ms, ms per output token, USD per 1k input tokens, USD per 1k output tokens)
+MODELS = {
+    'apac.amazon.nova-pro-v1:0': (450.0, 12.0, 0.00084, 0.00336),
+    'apac.amazon.nova-lite-v1:0': (220.0, 5.0, 0.00006, 0.00024),
+}
+
+# (stage, route keys, input tokens, output tokens, share of turns)
+WORKLOAD: List[Tuple[str, Tuple[Optional[str], ...], int, int, float]] = [
+    ('nlu', (), 1400, 25, 1.0),
+    ('response', (None, 'greeting'), 900, 60, 0.25),
+    ('response', ('awaiting_pin', 'deactivate_voicemail'), 900, 50, 0.30),
+    ('response', ('success', 'deactivate_voicemail'), 950, 90, 0.25),
+    ('response', ('customer_not_found', 'check_voicemail_status'), 900, 60, 0.05),
+    ('response', (None, 'unclear_intent'), 900, 80, 0.15),
+    ('translate', (), 1100, 90, 0.4),
+    ('kb', (), 2500, 200, 0.1),
+]
+
+
+class ThrottlingException(Exception):
+    def __init__(self):
+        super().__init__('Too many requests')
+        self.response = {'Error': {'Code': 'ThrottlingException'}}
+
+
+class StubRuntime:
+    """Sleeps for the model's latency (scaled by --time-scale) and returns a Converse-shaped reply."""
+
+    def __init__(self, time_scale: float, throttle: Dict[str, float], rng: random.Random):
+        self.time_scale = time_scale
+        self.throttle = throttle
+        self.rng = rng
+
+    def converse(self, modelId: str, inputTokens: int, outputTokens: int) -> Dict[str, Any]:
+        if self.rng.random() < self.throttle.get(modelId, 0.0):
+            time.sleep(0.02 * self.time_scale)
+            raise ThrottlingException()
+        ttft_ms, token_ms, _, _ = MODELS[modelId]
+        time.sleep((ttft_ms + token_ms * outputTokens) / 1000 * self.time_scale)
+        return {
+            'output': {'message': {'content': [{'text': 'ok'}]}},
+            'usage': {'inputTokens': inputTokens, 'outputTokens': outputTokens},
+            'stopReason': 'end_turn'
+        }
+
+
+def run(router, runtime: StubRuntime, turns: int, rng: random.Random) -> Dict[str, Any]:
+    """Replay the workload; returns per-route latency (unscaled ms), cost and fallbacks."""
+    latency: Dict[str, List[float]] = defaultdict(list)
+    cost: Dict[str, float] = defaultdict(float)
+    models: Dict[str, set] = defaultdict(set)
+    fallbacks = 0
+    for _ in range(turns):
+        for stage, keys, input_tokens, output_tokens, share in WORKLOAD:
+            if rng.random() >= share:
+                continue
+            route, chain = router.resolve(stage, *keys)
+            start = time.perf_counter()
+            with redirect_stdout(io.StringIO()):  # [WARN] line per fallback
+                response, model = router.invoke(
+                    stage,
+                    lambda model_id: runtime.converse(model_id, input_tokens, output_tokens),
+                    *keys
+                )
+            latency[route].append((time.perf_counter() - start) * 1000 / runtime.time_scale)
+            _, _, input_price, output_price = MODELS[model]
+            usage = response['usage']
+            cost[route] += usage['inputTokens'] / 1000 * input_price + usage['outputTokens'] / 1000 * output_price
+            models[route].add(model)
+            fallbacks += model != chain[0]
+    return {'latency': latency, 'cost': cost, 'models': models, 'fallbacks': fallbacks}
+
+
+def report(label: str, result: Dict[str, Any], turns: int) -> float:
+    print(label)
+    print(f"  {'route':<30} {'model':<28} {'calls':>6} {'mean ms':>9} {'p95 ms':>9} {'USD/1k turns':>13}")
+    for route in sorted(result['latency']):
+        stats = summarize(result['latency'][route])
+        model = ', '.join(sorted(m.split('.')[-1] for m in result['models'][route]))
+        print(f"  {route:<30} {model:<28} {stats['count']:>6} {stats['mean_ms']:>9.0f} {stats['p95_ms']:>9.0f} "
+              f"{result['cost'][route] / turns * 1000:>13.4f}")
+    total = sum(result['cost'].values()) / turns * 1000
+    all_ms = [ms for samples in result['latency'].values() for ms in samples]
+    print(f"  total: {total:.4f} USD per 1k turns, mean {summarize(all_ms)['mean_ms']:.0f}ms per call, "
+          f"{result['fallbacks']} fallbacks\n")
+    return total
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark per-stage Bedrock model routing')
+    parser.add_argument('--turns', type=int, default=200, help='Conversation turns to replay (default: 200)')
+    parser.add_argument('--throttle-rate', type=float, default=0.2,
+                        help='Share of fast-model calls throttled in the fallback run (default: 0.2)')
+    parser.add_argument('--time-scale', type=float, default=0.01,
+                        help='Fraction of the modelled latency actually slept (default: 0.01)')
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+
+    orchestrator = load_lambda('orchestrator')
+    import chatbot_core.routing as routing
+
+    # Metrics go to stdout as EMF in Lambda; keep the report readable
+    routing.emit_metrics = lambda *_, **__: None
+    routing.record_bedrock_usage = lambda *_, **__: None
+
+    router = orchestrator.MODEL_ROUTER
+    fast, pro = router.tiers['fast'][0], router.tiers['pro'][0]
+    for model in (fast, pro):
+        MODELS.setdefault(model, MODELS['apac.amazon.nova-pro-v1:0'])
+
+    print("=" * 80)
+    print("BEDROCK MODEL ROUTING PER PIPELINE STAGE")
+    print("=" * 80)
+    print(f"Tiers: {router.tiers}")
+    for stage, keys, *_ in WORKLOAD:
+        route, chain = router.resolve(stage, *keys)
+        print(f"  {stage + ' ' + str([k for k in keys if k]):<55} -> {route:<28} {chain[0]}")
+    print()
+
+    all_pro = routing.ModelRouter(router.tiers, {'default': 'pro'}, service='orchestrator')
+    baseline = report('all-pro', run(all_pro, StubRuntime(args.time_scale, {}, random.Random(1)),
+                                     args.turns, random.Random(args.seed)), args.turns)
+    routed = report('routed', run(router, StubRuntime(args.time_scale, {}, random.Random(1)),
+                                  args.turns, random.Random(args.seed)), args.turns)
+    print(f"Routed cost: {routed / baseline:.0%} of all-pro\n")
+
+    throttled = StubRuntime(args.time_scale, {fast: args.throttle_rate}, random.Random(1))
+    report(f"routed, {args.throttle_rate:.0%} of {fast} calls throttled",
+           run(router, throttled, args.turns, random.Random(args.seed)), args.turns)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Benchmark NLU cold-start init: compiled asset bundle vs slang_dictionary.json from S3.
+
+Each sample resets the NLU module caches and runs what the first request of a
+new container does before calling Bedrock: load the slang dictionary and
+compile the SlangMatcher (normalize_slang on one message).
+
+Cases:
+1. JSON from S3 (previous): get_object + json.loads + flatten, against moto with
+   an injected round trip per S3 call
+2. Bundle fetched from S3: first download, then a warm /tmp copy with a 304 ETag check
+3. Bundle packaged with the function: mmap the local file, no S3 call
+
+Usage:
+    python benchmark_nlu_assets.py --samples 50 --latency-ms 20
+"""
+
+import os
+import json
+import time
+import argparse
+import tempfile
+
+from bench_utils import REPO_ROOT, local_aws, load_lambda, inject_latency, print_summary
+
+DATA_DIR = os.path.join(REPO_ROOT, 'Data')
+BUCKET = 'chatbot-nlu-assets-bench'
+
+
+def reset(nlu) -> None:
+    if nlu.NLU_ASSETS is not None:
+        nlu.NLU_ASSETS.close()
+    nlu.SLANG_DICT = None
+    nlu.SLANG_MATCHER = None
+    nlu.NLU_ASSETS = None
+
+
+def cold_init_ms(nlu, samples: int, before_each=None) -> list:
+    times = []
+    for _ in range(samples):
+        reset(nlu)
+        if before_each:
+            before_each()
+        start = time.perf_counter()
+        nlu.normalize_slang("nk off vm skrg")
+        times.append((time.perf_counter() - start) * 1000)
+    return times
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark NLU cold-start dictionary init')
+    parser.add_argument('--samples', type=int, default=50, help='Cold inits per case (default: 50)')
+    parser.add_argument('--latency-ms', type=float, default=20.0, help='Simulated S3 round trip (default: 20)')
+    args = parser.parse_args()
+
+    with local_aws(), tempfile.TemporaryDirectory() as tmp:
+        os.environ['SLANG_DICT_S3_BUCKET'] = BUCKET
+        os.environ['SLANG_DICT_S3_KEY'] = 'slang_dictionary.json'
+        nlu = load_lambda('nlu-engine')
+        from nlu_assets import compile_tables, write_bundle
+
+        with open(os.path.join(DATA_DIR, 'slang_dictionary.json'), encoding='utf-8') as f:
+            raw_slang = json.load(f)
+        with open(os.path.join(DATA_DIR, 'nlu_training_data.json'), encoding='utf-8') as f:
+            training_data = json.load(f)
+        bundle_path = os.path.join(tmp, 'nlu_assets.bin')
+        version = write_bundle(bundle_path, compile_tables(raw_slang, training_data))
+
+        s3 = nlu.s3_client
+        s3.create_bucket(Bucket=BUCKET, CreateBucketConfiguration={'LocationConstraint': os.environ['REGION']})
+        s3.put_object(Bucket=BUCKET, Key='slang_dictionary.json', Body=json.dumps(raw_slang).encode('utf-8'))
+        with open(bundle_path, 'rb') as f:
+            s3.put_object(Bucket=BUCKET, Key='nlu_assets.bin', Body=f.read())
+        counter = inject_latency(s3, 's3', args.latency_ms)
+
+        print("=" * 80)
+        print("NLU COLD-START INIT (slang dictionary + matcher)")
+        print("=" * 80)
+        print(f"Bundle {version}: {os.path.getsize(bundle_path)} bytes, "
+              f"S3 JSON: {len(json.dumps(raw_slang))} bytes, S3 round trip {args.latency_ms:.0f}ms\n")
+
+        # 1. Previous path: no bundle anywhere
+        nlu.NLU_ASSETS_PATH = os.path.join(tmp, 'missing.bin')
+        nlu.NLU_ASSETS_S3_KEY = None
+        counter.reset()
+        print_summary('JSON from S3 (previous)', cold_init_ms(nlu, args.samples))
+        print(f"    S3 calls per init: {counter.total / args.samples:.1f}")
+
+        # 2. Bundle from S3 with ETag check
+        nlu.NLU_ASSETS_S3_KEY = 'nlu_assets.bin'
+        nlu.NLU_ASSETS_CACHE_PATH = os.path.join(tmp, 'cache.bin')
+
+        def drop_cache():
+            for suffix in ('', '.etag'):
+                if os.path.exists(nlu.NLU_ASSETS_CACHE_PATH + suffix):
+                    os.remove(nlu.NLU_ASSETS_CACHE_PATH + suffix)
+
+        print_summary('bundle from S3 (download)', cold_init_ms(nlu, args.samples, drop_cache))
+        print_summary('bundle from S3 (cached, 304)', cold_init_ms(nlu, args.samples))
+
+        # 3. Bundle packaged with the function
+        nlu.NLU_ASSETS_PATH = bundle_path
+        counter.reset()
+        print_summary('bundle packaged (mmap)', cold_init_ms(nlu, args.samples))
+        print(f"    S3 calls per init: {counter.total / args.samples:.1f}")
+
+        # Both sources must produce the same dictionary
+        json_dict = nlu.flatten_slang_dictionary(raw_slang)
+        assert nlu.SLANG_DICT == json_dict, "bundle and JSON slang tables differ"
+        reset(nlu)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Benchmark the NLU engine batch mode ({"messages": [...]}).
+
+Classifies the same message stream (training examples, a share of them
+repeated) through the NLU handler in batches of 1, 16 and 128 messages.
+Bedrock is replaced by a stub that sleeps --bedrock-ms per call (thread-safe,
+so the batch concurrency is real); the Lambda invoke round trip is added per
+invocation from --invoke-ms. The result cache is cleared before every run so
+batches only benefit from their own deduplication.
+
+Reports throughput, Lambda invocations, Bedrock calls and per-invocation
+latency for each batch size, and checks that every batch returns results in
+input order.
+
+Usage:
+    python benchmark_nlu_batch.py --messages 256 --bedrock-ms 100 --concurrency 8
+"""
+
+import os
+import json
+import time
+import random
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List
+
+from bench_utils import REPO_ROOT, load_lambda, print_summary
+
+DATA_DIR = os.path.join(REPO_ROOT, 'Data')
+
+
+def message_stream(training_data: Dict, count: int, repeat_share: float, seed: int = 7) -> List[str]:
+    """Shuffled training examples, with repeat_share of the stream repeating earlier messages."""
+    rng = random.Random(seed)
+    examples = [
+        example
+        for intent in training_data['intents']
+        for field in ('examples_en', 'examples_bm', 'examples_slang')
+        for example in intent.get(field, [])
+    ]
+    rng.shuffle(examples)
+    stream = []
+    for i in range(count):
+        if stream and rng.random() < repeat_share:
+            stream.append(rng.choice(stream))
+        else:
+            stream.append(examples[i % len(examples)])
+    return stream
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the NLU batch mode')
+    parser.add_argument('--messages', type=int, default=256, help='Messages to classify (default: 256)')
+    parser.add_argument('--sizes', default='1,16,128', help='Batch sizes (default: 1,16,128)')
+    parser.add_argument('--bedrock-ms', type=float, default=100.0, help='Stub Bedrock latency (default: 100)')
+    parser.add_argument('--invoke-ms', type=float, default=30.0, help='Lambda invoke round trip (default: 30)')
+    parser.add_argument('--concurrency', type=int, default=8, help='NLU_BATCH_CONCURRENCY (default: 8)')
+    parser.add_argument('--repeat-share', type=float, default=0.25, help='Share of repeated messages (default: 0.25)')
+    args = parser.parse_args()
+
+    nlu = load_lambda('nlu-engine')
+    from nlu_assets import compile_tables, encode_bundle, AssetBundle
+
+    with open(os.path.join(DATA_DIR, 'nlu_training_data.json'), encoding='utf-8') as f:
+        training_data = json.load(f)
+    with open(os.path.join(DATA_DIR, 'slang_dictionary.json'), encoding='utf-8') as f:
+        raw_slang = json.load(f)
+
+    # In-memory bundle, so the fast path and language detection behave as deployed
+    bundle = AssetBundle.from_bytes(encode_bundle(compile_tables(raw_slang, training_data)))
+    nlu.NLU_ASSETS = bundle
+    nlu.SLANG_DICT = bundle.table('slang').as_dict()
+    nlu.SLANG_DICT_VERSION = bundle.version
+    nlu.SLANG_DICT_REFRESH_SECONDS = 0
+    nlu.BATCH_EXECUTOR = ThreadPoolExecutor(max_workers=args.concurrency)
+
+    def stub_bedrock(message, normalized_message):
+        time.sleep(args.bedrock_ms / 1000)
+        return {'intent': 'unclear_intent', 'confidence': 0.5}
+    nlu.detect_intent_via_bedrock = stub_bedrock
+
+    stream = message_stream(training_data, args.messages, args.repeat_share)
+    print("=" * 80)
+    print("NLU BATCH MODE")
+    print("=" * 80)
+    print(f"{len(stream)} messages ({len(set(stream))} distinct), Bedrock {args.bedrock_ms:.0f}ms, "
+          f"invoke {args.invoke_ms:.0f}ms, concurrency {args.concurrency}\n")
+    print(f"{'Batch':>6} {'Invocations':>12} {'Bedrock calls':>14} {'Fast path':>10} {'Msg/s':>9} {'Total':>10}")
+    print("-" * 80)
+
+    latencies = {}
+    for size in (int(value) for value in args.sizes.split(',')):
+        nlu.NLU_CACHE.clear()
+        invocations, bedrock_calls, fast_path, elapsed = 0, 0, 0, 0.0
+        per_call = []
+        for start in range(0, len(stream), size):
+            batch = stream[start:start + size]
+            began = time.perf_counter()
+            response = nlu.handler({'messages': batch}, None)
+            took = (time.perf_counter() - began) * 1000 + args.invoke_ms
+            per_call.append(took)
+            elapsed += took
+            invocations += 1
+            bedrock_calls += response['stats']['bedrock_calls']
+            fast_path += response['stats']['fast_path']
+            expected = [nlu.normalize_slang(message) for message in batch]
+            assert [result['normalized_message'] for result in response['results']] == expected, "order changed"
+
+        latencies[size] = per_call
+        print(f"{size:>6} {invocations:>12} {bedrock_calls:>14} {fast_path:>10} "
+              f"{len(stream) / (elapsed / 1000):>9.1f} {elapsed / 1000:>9.2f}s")
+
+    print()
+    for size, samples in latencies.items():
+        print_summary(f"Invocation latency, batch of {size}", samples)
+
+
+if __name__ == '__main__':
+    main()
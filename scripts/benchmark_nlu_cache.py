@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Benchmark the NLU result cache (nlu_cache.py).
+
+Replays a simulated message stream through detect_intent_cached() on several
+Lambda containers (each with its own in-memory cache), with and without the
+shared DynamoDB tier (moto, injected round trip per call). Bedrock is replaced
+by a stub that returns the labelled intent and counts calls; its latency is
+added analytically from --bedrock-ms.
+
+Traffic: a head of very common short messages ("hi", "agent", "off vm"),
+a Zipf-distributed tail over the training examples, and a share of messages
+with a PIN or phone number (never cached).
+
+Reports hit ratio (memory and shared), Bedrock calls avoided, memory footprint
+of the in-memory tier and latency saved per message.
+
+Usage:
+    python benchmark_nlu_cache.py --messages 5000 --containers 4
+"""
+
+import os
+import json
+import time
+import random
+import argparse
+from typing import Dict, List, Tuple
+
+from bench_utils import REPO_ROOT, local_aws, load_lambda, inject_latency
+
+DATA_DIR = os.path.join(REPO_ROOT, 'Data')
+TABLE_NAME = 'chatbot-nlu-cache'
+
+HEAD = [
+    ('hi', 'greeting'), ('hello', 'greeting'), ('hai', 'greeting'), ('Hi', 'greeting'),
+    ('agent', 'escalate_to_agent'), ('nk ckp dgn agent', 'escalate_to_agent'),
+    ('off vm', 'deactivate_voicemail'), ('off voicemail', 'deactivate_voicemail'),
+    ('on voicemail', 'activate_voicemail'), ('on vm', 'activate_voicemail'),
+]
+
+
+def message_stream(training_data: Dict, count: int, seed: int = 7) -> List[Tuple[str, str]]:
+    """40% head messages, 50% Zipf tail over training examples, 10% with a PIN or phone number."""
+    rng = random.Random(seed)
+    tail = [
+        (example, intent['intent_name'])
+        for intent in training_data['intents']
+        for field in ('examples_en', 'examples_bm', 'examples_slang')
+        for example in intent.get(field, [])
+    ]
+    rng.shuffle(tail)
+    tail_weights = [1 / (rank + 1) for rank in range(len(tail))]
+    head_weights = [1 / (rank + 1) for rank in range(len(HEAD))]
+
+    stream = []
+    for _ in range(count):
+        roll = rng.random()
+        if roll < 0.4:
+            stream.append(rng.choices(HEAD, head_weights)[0])
+        elif roll < 0.9:
+            stream.append(rng.choices(tail, tail_weights)[0])
+        else:
+            stream.append((f"my pin is {rng.randint(1000, 9999)}", 'deactivate_voicemail'))
+    return stream
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the NLU result cache')
+    parser.add_argument('--messages', type=int, default=5000, help='Messages to replay (default: 5000)')
+    parser.add_argument('--containers', type=int, default=4, help='Concurrent Lambda containers (default: 4)')
+    parser.add_argument('--max-entries', type=int, default=1000, help='In-memory entries per container')
+    parser.add_argument('--bedrock-ms', type=float, default=1200.0, help='Bedrock NLU latency (default: 1200)')
+    parser.add_argument('--latency-ms', type=float, default=5.0, help='DynamoDB round trip (default: 5)')
+    args = parser.parse_args()
+
+    with local_aws():
+        nlu = load_lambda('nlu-engine')
+        from nlu_cache import NluResultCache
+
+        with open(os.path.join(DATA_DIR, 'nlu_training_data.json'), encoding='utf-8') as f:
+            training_data = json.load(f)
+        with open(os.path.join(DATA_DIR, 'slang_dictionary.json'), encoding='utf-8') as f:
+            nlu.SLANG_DICT = nlu.flatten_slang_dictionary(json.load(f))
+
+        nlu.dynamodb.create_table(
+            TableName=TABLE_NAME,
+            KeySchema=[{'AttributeName': 'cache_key', 'KeyType': 'HASH'}],
+            AttributeDefinitions=[{'AttributeName': 'cache_key', 'AttributeType': 'S'}],
+            BillingMode='PAY_PER_REQUEST'
+        )
+        counter = inject_latency(nlu.dynamodb.meta.client, 'dynamodb', args.latency_ms)
+
+        stream = message_stream(training_data, args.messages)
+        labels = dict(stream)
+
+        def fake_bedrock(message, normalized_message):
+            digits = ''.join(char for char in message if char.isdigit())
+            return {
+                'intent': labels.get(message, 'unclear_intent'),
+                'confidence': 0.9,
+                'slots': {'phone_number': None, 'security_pin': digits or None, 'language_preference': 'EN'}
+            }
+        nlu.detect_intent_via_bedrock = fake_bedrock
+
+        print("=" * 80)
+        print("NLU RESULT CACHE")
+        print("=" * 80)
+        print(f"{args.messages} messages over {args.containers} containers, "
+              f"{len({m for m, _ in stream})} distinct, Bedrock {args.bedrock_ms:.0f}ms, "
+              f"DynamoDB {args.latency_ms:.0f}ms\n")
+
+        for label, table_name in (('memory only', None), ('memory + DynamoDB', TABLE_NAME)):
+            caches = [
+                NluResultCache(args.max_entries, 3600, namespace=label, table_name=table_name, dynamodb=nlu.dynamodb)
+                for _ in range(args.containers)
+            ]
+            counter.reset()
+            hit_ms, bedrock_calls = [], 0
+            for index, (message, _) in enumerate(stream):
+                nlu.NLU_CACHE = caches[index % args.containers]
+                normalized = nlu.normalize_slang(message)
+                start = time.perf_counter()
+                result, cached = nlu.detect_intent_cached(message, normalized)
+                if cached:
+                    hit_ms.append((time.perf_counter() - start) * 1000)
+                else:
+                    bedrock_calls += 1
+                assert not (cached and result['slots'].get('security_pin')), "PIN served from cache"
+
+            memory_hits = sum(c.stats['hits'] for c in caches)
+            shared_hits = sum(c.stats['shared_hits'] for c in caches)
+            entries = sum(len(c) for c in caches)
+            memory = sum(c.memory_bytes() for c in caches)
+            hit_cost = sum(hit_ms) / len(hit_ms) if hit_ms else 0.0
+            miss_cost = counter.total * args.latency_ms / max(1, bedrock_calls) if table_name else 0.0
+            saved = ((memory_hits + shared_hits) * (args.bedrock_ms - hit_cost) - bedrock_calls * miss_cost) / len(stream)
+
+            print(label)
+            print(f"  hit ratio         {(memory_hits + shared_hits) / len(stream):6.1%}  "
+                  f"(memory {memory_hits / len(stream):.1%}, shared {shared_hits / len(stream):.1%})")
+            bypassed = sum(not NluResultCache.cacheable_message(message) for message, _ in stream)
+            print(f"  Bedrock calls     {bedrock_calls} of {len(stream)} "
+                  f"({bypassed} messages with digits bypassed the cache)")
+            print(f"  memory footprint  {memory / 1024:.1f} KiB for {entries} entries "
+                  f"({memory / max(1, entries):.0f} bytes/entry, all containers)")
+            print(f"  hit latency       {hit_cost:.3f}ms mean")
+            print(f"  latency saved     {saved:.0f}ms per message\n")
+
+
+if __name__ == '__main__':
+    main()
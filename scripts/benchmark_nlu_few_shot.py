@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Benchmark dynamic few-shot example selection for the NLU prompt (NLU_FEW_SHOT_K, example_index.py).
+
+Uses k-fold cross-validation over Data/nlu_training_data.json: for each fold
+the example index is built from the other folds and queried with the
+held-out messages (slang-normalized like the Lambda does), so a message is
+never shown its own example.
+
+Offline, for each k (--k):
+- label recall: how often the true intent is among the k selected examples
+- kNN vote F1: weighted F1 of a similarity-weighted vote over the k examples
+  (a floor for what the model sees)
+- example tokens per prompt (~4 characters per token) against a static prompt
+  that lists every training example
+- selection latency with NumPy and with the pure Python fallback
+
+--live additionally classifies --limit held-out messages with Bedrock (AWS
+credentials): the static prompt (--static-prompt-id, NLU_FEW_SHOT_K=0) against
+the few-shot prompt (--few-shot-prompt-id, a slim template with or without an
+{{examples}} variable) for each k, and reports weighted F1, input tokens from
+the Converse usage and latency per call.
+
+Usage:
+    python benchmark_nlu_few_shot.py --k 4,8,16
+    python benchmark_nlu_few_shot.py --live --static-prompt-id arn:...:prompt/STATIC:3 \\
+        --few-shot-prompt-id arn:...:prompt/SLIM:1 --region ap-southeast-1 --limit 100
+"""
+
+import os
+import json
+import time
+import random
+import argparse
+from collections import defaultdict
+from typing import Dict, List, Tuple
+
+from bench_utils import REPO_ROOT, load_lambda, summarize
+from evaluate_intent_f1 import calculate_f1_score
+
+DATA_DIR = os.path.join(REPO_ROOT, 'Data')
+CHARS_PER_TOKEN = 4
+
+
+def knn_vote(nearest) -> str:
+    votes: Dict[str, float] = defaultdict(float)
+    for score, example in nearest:
+        votes[example.intent] += score
+    return max(votes, key=votes.get) if votes else 'unclear_intent'
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark dynamic few-shot NLU examples')
+    parser.add_argument('--k', default='4,8,16', help='Examples per prompt to compare (default: 4,8,16)')
+    parser.add_argument('--folds', type=int, default=5, help='Cross-validation folds (default: 5)')
+    parser.add_argument('--live', action='store_true', help='Also classify with Bedrock')
+    parser.add_argument('--static-prompt-id', help='Prompt ARN with the fixed example list (baseline)')
+    parser.add_argument('--few-shot-prompt-id', help='Slim prompt ARN that receives the selected examples')
+    parser.add_argument('--limit', type=int, default=100, help='Held-out messages sent to Bedrock (default: 100)')
+    parser.add_argument('--region', default='ap-southeast-1')
+    args = parser.parse_args()
+
+    if args.live:
+        os.environ.setdefault('REGION', args.region)
+    nlu = load_lambda('nlu-engine')
+    import example_index
+    from nlu_assets import build_examples, flatten_slang_dictionary
+
+    with open(os.path.join(DATA_DIR, 'nlu_training_data.json'), encoding='utf-8') as f:
+        training_data = json.load(f)
+    with open(os.path.join(DATA_DIR, 'slang_dictionary.json'), encoding='utf-8') as f:
+        slang = flatten_slang_dictionary(json.load(f))
+    examples = build_examples(training_data, nlu.SlangMatcher(slang))
+    ks = [int(value) for value in args.k.split(',')]
+
+    folds = {}
+    for fold in range(args.folds):
+        train = [example for i, example in enumerate(examples) if i % args.folds != fold]
+        folds[fold] = {
+            'numpy': example_index.ExampleIndex(train, use_numpy=True),
+            'python': example_index.ExampleIndex(train, use_numpy=False),
+        }
+
+    all_lines = '\n'.join(f"{json.dumps(e.text, ensure_ascii=False)} -> {e.intent}" for e in examples)
+    static_tokens = len(all_lines) // CHARS_PER_TOKEN
+    y_true = [example.intent for example in examples]
+
+    print("=" * 80)
+    print("NLU DYNAMIC FEW-SHOT EXAMPLES")
+    print("=" * 80)
+    print(f"Examples: {len(examples)} ({args.folds}-fold cross-validation), "
+          f"{example_index.DIMENSIONS} hashed n-gram buckets, NumPy {'available' if example_index.np else 'missing'}")
+    print(f"Static prompt listing every example: ~{static_tokens} example tokens per call\n")
+
+    print(f"{'k':>3} {'label recall':>13} {'kNN vote F1':>12} {'example tokens':>15} "
+          f"{'numpy ms':>9} {'python ms':>10}")
+    print("-" * 70)
+    for k in ks:
+        predictions, hits, tokens = [], 0, []
+        latency = {'numpy': [], 'python': []}
+        for i, example in enumerate(examples):
+            fold = folds[i % args.folds]
+            for kind in ('numpy', 'python'):
+                if kind == 'numpy' and not fold['numpy'].use_numpy:
+                    continue
+                start = time.perf_counter()
+                nearest = fold[kind].nearest(example.normalized, k)
+                latency[kind].append((time.perf_counter() - start) * 1000)
+            hits += example.intent in {selected.intent for _, selected in nearest}
+            predictions.append(knn_vote(nearest))
+            nlu.EXAMPLE_INDEX = fold['python']
+            tokens.append(len(nlu.format_few_shot_examples(example.normalized, k)) // CHARS_PER_TOKEN)
+        f1 = calculate_f1_score(y_true, predictions)['weighted_f1']
+        numpy_ms = f"{summarize(latency['numpy'])['mean_ms']:.3f}" if latency['numpy'] else 'n/a'
+        print(f"{k:>3} {hits / len(examples):>13.1%} {f1:>12.4f} {sum(tokens) / len(tokens):>15.0f} "
+              f"{numpy_ms:>9} {summarize(latency['python'])['mean_ms']:>10.3f}")
+
+    if not args.live:
+        return
+    if not (args.static_prompt_id and args.few_shot_prompt_id):
+        parser.error('--live needs --static-prompt-id and --few-shot-prompt-id')
+
+    import chatbot_core.routing as routing
+    usage_log: List[int] = []
+    record = routing.record_bedrock_usage
+
+    def record_usage(usage, *rest, **kwargs):
+        usage_log.append((usage or {}).get('inputTokens', 0) + (usage or {}).get('cacheReadInputTokens', 0))
+        record(usage, *rest, **kwargs)
+    routing.record_bedrock_usage = record_usage
+
+    sample = random.Random(7).sample(range(len(examples)), min(args.limit, len(examples)))
+    arms: List[Tuple[str, str, int]] = [('static prompt', args.static_prompt_id, 0)]
+    arms += [(f'few-shot k={k}', args.few_shot_prompt_id, k) for k in ks]
+
+    print(f"\nBedrock, {len(sample)} held-out messages")
+    print(f"{'arm':<16} {'weighted F1':>12} {'input tokens':>13} {'mean ms':>9} {'p95 ms':>9}")
+    print("-" * 64)
+    for label, prompt_id, k in arms:
+        nlu.NLU_PROMPT_ID, nlu.NLU_INTENT_PROMPT_ID, nlu.NLU_FEW_SHOT_K = prompt_id, None, k
+        usage_log.clear()
+        predicted, latency = [], []
+        for i in sample:
+            nlu.EXAMPLE_INDEX = folds[i % args.folds]['python']
+            message = examples[i].text
+            start = time.perf_counter()
+            result = nlu.detect_intent_via_bedrock(message, examples[i].normalized)
+            latency.append((time.perf_counter() - start) * 1000)
+            predicted.append(result.get('intent', 'unclear_intent'))
+        f1 = calculate_f1_score([examples[i].intent for i in sample], predicted)['weighted_f1']
+        stats = summarize(latency)
+        print(f"{label:<16} {f1:>12.4f} {sum(usage_log) / max(len(usage_log), 1):>13.0f} "
+              f"{stats['mean_ms']:>9.0f} {stats['p95_ms']:>9.0f}")
+
+
+if __name__ == '__main__':
+    main()
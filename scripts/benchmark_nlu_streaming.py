@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Benchmark the NLU streaming mode (NLU_STREAMING, json_stream.py).
+
+Replaces the Bedrock runtime client with a stub that produces a reply at a
+fixed time to first token and per-token rate, for both converse (returns once
+the whole reply is generated) and converse_stream (yields ~4-character text
+deltas as they are generated). detect_intent_via_bedrock is timed with
+streaming off and on for:
+
+- the full prompt reply (intent, confidence, slots, reasoning)
+- the same reply inside a ```json fence with a leading sentence
+- the intent-only reply (NLU_INTENT_PROMPT_ID)
+
+and the parsed intent/confidence are checked against the non-streaming path.
+
+Usage:
+    python benchmark_nlu_streaming.py --ttft-ms 250 --token-ms 15 --runs 5
+"""
+
+import json
+import time
+import argparse
+from typing import Any, Dict, Iterator
+
+from bench_utils import load_lambda, print_summary
+
+FULL_REPLY = json.dumps({
+    'intent': 'deactivate_voicemail',
+    'confidence': 0.92,
+    'slots': {'phone_number': '+60123456789', 'security_pin': None, 'language_preference': 'BM'},
+    'reasoning': 'The customer wants to turn off voicemail and wrote in Malay slang with a phone number.'
+}, indent=2)
+REPLIES = {
+    'full prompt reply': FULL_REPLY,
+    'fenced, with preamble': f"Here is the classification:\n```json\n{FULL_REPLY}\n```",
+    'intent-only reply': json.dumps({'intent': 'deactivate_voicemail', 'confidence': 0.92}),
+}
+CHARS_PER_TOKEN = 4
+
+
+class StubRuntime:
+    """Bedrock runtime stand-in that generates a fixed reply at a fixed token rate."""
+
+    def __init__(self, ttft_ms: float, token_ms: float):
+        self.ttft_ms = ttft_ms
+        self.token_ms = token_ms
+        self.reply = ''
+        self.tokens_generated = 0
+
+    def _tokens(self):
+        return [self.reply[i:i + CHARS_PER_TOKEN] for i in range(0, len(self.reply), CHARS_PER_TOKEN)]
+
+    def converse(self, **kwargs) -> Dict[str, Any]:
+        tokens = self._tokens()
+        time.sleep((self.ttft_ms + len(tokens) * self.token_ms) / 1000)
+        self.tokens_generated = len(tokens)
+        return {
+            'output': {'message': {'role': 'assistant', 'content': [{'text': self.reply}]}},
+            'stopReason': 'end_turn'
+        }
+
+    def converse_stream(self, **kwargs) -> Dict[str, Any]:
+        def events() -> Iterator[Dict[str, Any]]:
+            self.tokens_generated = 0
+            yield {'messageStart': {'role': 'assistant'}}
+            time.sleep(self.ttft_ms / 1000)
+            for token in self._tokens():
+                time.sleep(self.token_ms / 1000)
+                self.tokens_generated += 1
+                yield {'contentBlockDelta': {'contentBlockIndex': 0, 'delta': {'text': token}}}
+            yield {'contentBlockStop': {'contentBlockIndex': 0}}
+            yield {'messageStop': {'stopReason': 'end_turn'}}
+        return {'stream': events()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the NLU streaming mode')
+    parser.add_argument('--ttft-ms', type=float, default=250.0, help='Time to first token (default: 250)')
+    parser.add_argument('--token-ms', type=float, default=15.0, help='Time per output token (default: 15)')
+    parser.add_argument('--runs', type=int, default=5, help='Runs per case (default: 5)')
+    args = parser.parse_args()
+
+    nlu = load_lambda('nlu-engine')
+    runtime = StubRuntime(args.ttft_ms, args.token_ms)
+    nlu.bedrock_runtime = runtime
+    nlu.get_nlu_prompt = lambda *_: {'system': 'Classify the intent.', 'user_message': 'nk off vm skrg'}
+
+    print("=" * 80)
+    print("NLU STREAMING (EARLY-TERMINATING JSON PARSE)")
+    print("=" * 80)
+    print(f"Time to first token {args.ttft_ms:.0f}ms, {args.token_ms:.0f}ms per token, {args.runs} runs\n")
+
+    for label, reply in REPLIES.items():
+        runtime.reply = reply
+        timings, tokens = {}, {}
+        results = {}
+        for streaming in (False, True):
+            nlu.NLU_STREAMING = streaming
+            samples = []
+            for _ in range(args.runs):
+                start = time.perf_counter()
+                results[streaming] = nlu.detect_intent_via_bedrock('nk off vm skrg', 'nak off voicemail sekarang')
+                samples.append((time.perf_counter() - start) * 1000)
+            timings[streaming], tokens[streaming] = samples, runtime.tokens_generated
+
+        for key in ('intent', 'confidence'):
+            assert results[True][key] == results[False][key], f"{label}: streaming {key} differs"
+
+        print(f"{label} ({len(reply)} chars)")
+        full = print_summary(f"converse, {tokens[False]} tokens", timings[False])
+        early = print_summary(f"converse_stream, stopped after {tokens[True]} tokens", timings[True])
+        print(f"  {'saved':<40} {full['mean_ms'] - early['mean_ms']:8.2f}ms per call "
+              f"({1 - early['mean_ms'] / full['mean_ms']:.0%})\n")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Benchmark PIN hash cost (PIN_HASH_POLICY, chatbot_core.pin_hash) per Lambda memory size.
+
+1. KDF cost: times verify_pin_hash() for PBKDF2-SHA256 iteration counts
+   (--iterations) and scrypt settings on this machine, then projects the
+   verify latency at each Lambda memory size (--memory). Lambda gives a
+   function CPU in proportion to its memory, one full vCPU at 1769 MB; a
+   single-threaded KDF gets no faster above that. --cpu-factor scales the
+   local timings to the Lambda CPU (measure one size in Lambda and divide).
+   --budget-ms prints the highest iteration count under that verify latency
+   for each memory size.
+2. Rehash on verify: a legacy record (bare digest + salt attribute) is
+   verified through the Guardrails Lambda (moto DynamoDB); the first login
+   rehashes it to the policy, the second verifies the new format.
+
+Usage:
+    python benchmark_pin_hash.py
+    python benchmark_pin_hash.py --iterations 50000,100000,210000,600000 --budget-ms 50 --cpu-factor 1.3
+"""
+
+import os
+import io
+import time
+import hashlib
+import argparse
+from contextlib import redirect_stdout
+from typing import Dict
+
+from bench_utils import load_lambda, local_aws, create_chatbot_tables, summarize
+
+FULL_VCPU_MB = 1769
+SCRYPT_POLICIES = ['scrypt$n=8192,r=8,p=1', 'scrypt$n=16384,r=8,p=1']
+
+
+def vcpu_share(memory_mb: int) -> float:
+    """CPU available to a single-threaded Lambda at this memory size."""
+    return min(1.0, memory_mb / FULL_VCPU_MB)
+
+
+def time_verify(pin_hash, policy: str, repeat: int) -> float:
+    """Median local verify time (ms) of a hash made under policy."""
+    stored = pin_hash.hash_pin('1234', policy)
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        pin_hash.verify_pin_hash('1234', stored, policy=policy)
+        samples.append((time.perf_counter() - start) * 1000)
+    return summarize(samples)['p50_ms']
+
+
+def benchmark_cost(pin_hash, args) -> None:
+    memory = [int(value) for value in args.memory.split(',')]
+    policies = [f"pbkdf2-sha256$i={value}" for value in args.iterations.split(',')] + SCRYPT_POLICIES
+    local_ms: Dict[str, float] = {policy: time_verify(pin_hash, policy, args.repeat) for policy in policies}
+
+    print(f"Projected verify latency (ms), local timings x {args.cpu_factor} / vCPU share")
+    print(f"  {'policy':<28} {'local':>8}" + ''.join(f"{str(mb) + 'MB':>9}" for mb in memory))
+    for policy in policies:
+        row = ''.join(f"{local_ms[policy] * args.cpu_factor / vcpu_share(mb):>9.0f}" for mb in memory)
+        marker = ' *' if policy == pin_hash.PIN_HASH_POLICY else ''
+        print(f"  {policy + marker:<28} {local_ms[policy]:>8.1f}{row}")
+    print("  * current PIN_HASH_POLICY\n")
+
+    if args.budget_ms:
+        pbkdf2 = [policy for policy in policies if policy.startswith('pbkdf2')]
+        per_iteration = sum(local_ms[p] / pin_hash.parse_policy(p)[1]['i'] for p in pbkdf2) / len(pbkdf2)
+        print(f"Highest PBKDF2-SHA256 iteration count under {args.budget_ms:.0f}ms per verify")
+        for mb in memory:
+            iterations = args.budget_ms * vcpu_share(mb) / (per_iteration * args.cpu_factor)
+            print(f"  {mb:>5}MB  {int(iterations // 1000) * 1000:>10,}")
+        print()
+
+
+def benchmark_rehash(pin_hash) -> None:
+    import boto3
+
+    with local_aws():
+        dynamodb = boto3.resource('dynamodb')
+        create_chatbot_tables(dynamodb)
+        guardrails = load_lambda('guardrails')
+        guardrails.emit_metrics = lambda *_, **__: None
+        customers = dynamodb.Table(guardrails.CUSTOMERS_TABLE)
+
+        salt = os.urandom(32)
+        legacy = hashlib.pbkdf2_hmac('sha256', b'1234', salt, 100000).hex()
+        customers.put_item(Item={'phone_number': '+60123456789', 'security_pin_hash': legacy, 'salt': salt.hex()})
+
+        print(f"Rehash on verify (legacy record -> {pin_hash.PIN_HASH_POLICY})")
+        for login in ('first login', 'second login', 'wrong PIN'):
+            pin = '0000' if login == 'wrong PIN' else '1234'
+            start = time.perf_counter()
+            with redirect_stdout(io.StringIO()):
+                result = guardrails.verify_pin('+60123456789', pin)
+            elapsed = (time.perf_counter() - start) * 1000
+            item = customers.get_item(Key={'phone_number': '+60123456789'})['Item']
+            stored = item['security_pin_hash']
+            version = stored.rsplit('$', 2)[0] if stored.startswith('$') else 'legacy (salt attribute)'
+            print(f"  {login:<14} verified={str(result['verified']):<6} {elapsed:>7.1f}ms  stored: {version}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark PIN hash cost per Lambda memory size')
+    parser.add_argument('--iterations', default='25000,50000,100000,210000,600000',
+                        help='PBKDF2-SHA256 iteration counts (default: 25000,50000,100000,210000,600000)')
+    parser.add_argument('--memory', default='128,256,512,1024,1769,3008',
+                        help='Lambda memory sizes in MB (default: 128,256,512,1024,1769,3008)')
+    parser.add_argument('--cpu-factor', type=float, default=1.0,
+                        help='Lambda vCPU time / local CPU time for the same work (default: 1.0)')
+    parser.add_argument('--budget-ms', type=float, default=50.0,
+                        help='Verify latency budget for the iteration table (default: 50, 0 to skip)')
+    parser.add_argument('--repeat', type=int, default=5, help='Verifications per policy (default: 5)')
+    args = parser.parse_args()
+
+    # Loads chatbot_core onto sys.path like the Lambdas see it
+    load_lambda('guardrails')
+    from chatbot_core import pin_hash
+
+    print("=" * 80)
+    print("PIN HASH COST PER LAMBDA MEMORY SIZE")
+    print("=" * 80)
+    benchmark_cost(pin_hash, args)
+    benchmark_rehash(pin_hash)
+
+
+if __name__ == '__main__':
+    main()
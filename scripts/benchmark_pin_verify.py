@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Benchmark the Guardrails PIN verification path: DynamoDB calls and latency per outcome.
+
+Runs check_authorization() against moto DynamoDB with --latency-ms injected
+per call, for each outcome (latency includes the PIN KDF, see
+benchmark_pin_hash.py):
+
+- success, success after a wrong PIN, success after an expired lock
+- success with a legacy hash (rehash to PIN_HASH_POLICY)
+- wrong PIN, wrong PIN that locks the account, locked account
+
+With --baseline-ref the same outcomes run on the Guardrails Lambda from an
+earlier git revision (e.g. the per-session attempt counter in a separate
+sessions-table query and update), seeded in the record format it expects.
+
+Usage:
+    python benchmark_pin_verify.py --latency-ms 8
+    python benchmark_pin_verify.py --latency-ms 8 --baseline-ref HEAD~3
+"""
+
+import io
+import os
+import sys
+import time
+import hashlib
+import tempfile
+import argparse
+import subprocess
+import importlib.util
+from contextlib import redirect_stdout
+from datetime import datetime, timedelta
+from typing import Dict, List
+
+from bench_utils import REPO_ROOT, CORE_LAYER_DIR, local_aws, load_lambda, create_chatbot_tables, \
+    inject_latency, summarize
+
+PHONE = '+60123456789'
+SESSION = 'SESSION-BENCH-1'
+GUARDRAILS_SOURCE = 'backend/lambdas/guardrails/src/lambda_function.py'
+
+# name, PIN entered, failed attempts before, lock ('future' / 'past' / None), legacy hash
+OUTCOMES = [
+    ('success', '1234', 0, None, False),
+    ('success after wrong PIN', '1234', 1, None, False),
+    ('success after expired lock', '1234', 0, 'past', False),
+    ('success, legacy hash', '1234', 0, None, True),
+    ('wrong PIN', '0000', 0, None, False),
+    ('wrong PIN, locks', '0000', 2, None, False),
+    ('locked', '1234', 0, 'future', False),
+]
+
+
+def load_baseline(ref: str, target_dir: str):
+    """Import the Guardrails Lambda source at a git revision."""
+    source = subprocess.run(['git', 'show', f"{ref}:{GUARDRAILS_SOURCE}"], cwd=REPO_ROOT,
+                            check=True, capture_output=True, text=True).stdout
+    path = os.path.join(target_dir, 'guardrails_baseline.py')
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(source)
+    if CORE_LAYER_DIR not in sys.path:
+        sys.path.insert(0, CORE_LAYER_DIR)
+    spec = importlib.util.spec_from_file_location('guardrails_baseline', path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def seed(dynamodb, pin_hash, failed: int, lock, legacy: bool, baseline: bool) -> None:
+    """Write the customer (and, for the baseline, session) record for one outcome."""
+    customer = {'phone_number': PHONE}
+    if legacy or baseline:
+        salt = os.urandom(32)
+        customer['security_pin_hash'] = hashlib.pbkdf2_hmac('sha256', b'1234', salt, 100000).hex()
+        customer['salt'] = salt.hex()
+    else:
+        customer['security_pin_hash'] = pin_hash.hash_pin('1234')
+    if lock:
+        delta = timedelta(minutes=10) if lock == 'future' else -timedelta(minutes=1)
+        customer['pin_locked_until'] = (datetime.utcnow() + delta).isoformat()
+    if baseline:
+        dynamodb.Table('chatbot-sessions').put_item(
+            Item={'session_id': SESSION, 'turn_number': 1, 'pin_attempts': failed}
+        )
+    else:
+        customer['pin_failed_attempts'] = failed
+    dynamodb.Table('chatbot-customers').put_item(Item=customer)
+
+
+def run(label: str, guardrails, dynamodb, pin_hash, args, baseline: bool) -> Dict[str, Dict]:
+    from chatbot_core import get_resource
+
+    counter = inject_latency(get_resource('dynamodb').meta.client, 'dynamodb', args.latency_ms)
+    guardrails.emit_metrics = lambda *_, **__: None
+    results = {}
+
+    print(label)
+    print(f"  {'outcome':<28} {'authorized':>10} {'calls':>6}  {'operations':<38} {'mean ms':>8}")
+    for name, pin, failed, lock, legacy in OUTCOMES:
+        samples: List[float] = []
+        for _ in range(args.repeat):
+            seed(dynamodb, pin_hash, failed, lock, legacy, baseline)
+            counter.reset()
+            event = {'action': 'verify_pin', 'session_id': SESSION, 'phone_number': PHONE, 'security_pin': pin}
+            start = time.perf_counter()
+            with redirect_stdout(io.StringIO()):
+                result = guardrails.check_authorization(event)
+            samples.append((time.perf_counter() - start) * 1000)
+        operations = ', '.join(f"{op} {n}" for op, n in sorted(counter.calls.items()))
+        stats = summarize(samples)
+        results[name] = {'calls': counter.total, 'mean_ms': stats['mean_ms']}
+        print(f"  {name:<28} {str(result['authorized']):>10} {counter.total:>6}  {operations:<38} "
+              f"{stats['mean_ms']:>8.1f}")
+    get_resource('dynamodb').meta.client.meta.events.unregister('before-call.dynamodb', counter)
+    print()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark DynamoDB calls per PIN verification outcome')
+    parser.add_argument('--latency-ms', type=float, default=8.0, help='Simulated DynamoDB round trip (default: 8)')
+    parser.add_argument('--repeat', type=int, default=5, help='Runs per outcome (default: 5)')
+    parser.add_argument('--baseline-ref', help='Git revision of the Guardrails Lambda to compare against')
+    args = parser.parse_args()
+
+    import boto3
+
+    with local_aws():
+        dynamodb = boto3.resource('dynamodb')
+        create_chatbot_tables(dynamodb)
+        guardrails = load_lambda('guardrails')
+        from chatbot_core import pin_hash
+
+        print("=" * 80)
+        print(f"PIN VERIFICATION PATH ({args.latency_ms:.0f}ms per DynamoDB call, {pin_hash.PIN_HASH_POLICY})")
+        print("=" * 80)
+        current = run('current', guardrails, dynamodb, pin_hash, args, baseline=False)
+
+        if args.baseline_ref:
+            with tempfile.TemporaryDirectory() as tmp:
+                baseline = run(f'baseline ({args.baseline_ref})', load_baseline(args.baseline_ref, tmp),
+                               dynamodb, pin_hash, args, baseline=True)
+            print(f"  {'outcome':<28} {'calls':>14} {'mean ms':>18}")
+            for name in current:
+                before, after = baseline[name], current[name]
+                print(f"  {name:<28} {before['calls']:>6} -> {after['calls']:<5} "
+                      f"{before['mean_ms']:>8.1f} -> {after['mean_ms']:<8.1f}")
+
+
+if __name__ == '__main__':
+    main()
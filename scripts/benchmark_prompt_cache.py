@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+A/B the Bedrock prompt cache points (BEDROCK_PROMPT_CACHE) on the orchestrator's
+generate_response and translate_to_bahasa.
+
+Prompt Management is replaced by synthetic templates shaped like the deployed
+prompts: a long static instruction block, then the request-specific
+{{intent}}/{{context}}/{{language}} lines. Each arm sends the same requests
+with cache points on and off and collects the usage that
+record_bedrock_usage() would emit.
+
+- default: a stub runtime that accounts tokens like Bedrock (about 4
+  characters per token; the first request writes the cached prefix, later
+  requests read it) - checks the request layout and the usage plumbing
+- --live: the real Bedrock runtime (AWS credentials, --model-id); also
+  reports latency per call
+
+Reports input tokens, cache read/write tokens and the relative input cost
+(--cached-price: price of a cached token relative to a normal input token).
+
+Usage:
+    python benchmark_prompt_cache.py --requests 20
+    python benchmark_prompt_cache.py --live --model-id apac.amazon.nova-pro-v1:0 --region ap-southeast-1
+"""
+
+import time
+import hashlib
+import argparse
+from typing import Any, Dict, List
+
+from bench_utils import load_lambda, print_summary
+
+RULES = "\n".join(
+    f"{i}. {rule}" for i, rule in enumerate([
+        "Answer only questions about this telco's mobile services: voicemail, billing, data, roaming and plans.",
+        "Never invent prices, fees, dates or policy details that are not in the context.",
+        "Never repeat a customer's PIN, full phone number or account identifiers back to them.",
+        "Keep answers under 80 words unless the customer asks for step-by-step instructions.",
+        "When an action succeeded, confirm it and say what changes for the customer.",
+        "When an action failed, apologise once, explain what happened and offer the next step.",
+        "Offer to connect the customer to a human agent if they are frustrated or ask twice.",
+        "Use plain language; avoid internal system names, intent names and error codes.",
+    ] * 16, start=1)
+)
+RESPONSE_TEMPLATE = (
+    "You are the customer service assistant for a Malaysian mobile network.\n\n"
+    f"Rules:\n{RULES}\n\n"
+    "Detected intent: {{intent}}\n"
+    "Context:\n{{context}}\n"
+    "Reply in {{language}}."
+)
+TRANSLATION_TEMPLATE = (
+    "You translate customer service replies into {{target_language}}.\n\n"
+    f"Rules:\n{RULES}\n\n"
+    "Keep product names, numbers and URLs unchanged. Reply with the translation only."
+)
+CHARS_PER_TOKEN = 4
+
+
+def prompt_response(system: str, user: str) -> Dict[str, Any]:
+    chat = {'system': [{'text': system}], 'messages': [{'role': 'user', 'content': [{'text': user}]}]}
+    return {'variants': [{'templateConfiguration': {'chat': chat}}]}
+
+
+class StubPromptManagement:
+    def get_prompt(self, promptIdentifier: str) -> Dict[str, Any]:
+        if promptIdentifier == 'translation':
+            return prompt_response(TRANSLATION_TEMPLATE, "Translate:\n{{text}}")
+        return prompt_response(RESPONSE_TEMPLATE, "Write the reply for intent {{intent}}.")
+
+
+class StubRuntime:
+    """Counts tokens like Bedrock: text before a cachePoint is written once, then read."""
+
+    def __init__(self):
+        self.cached = set()
+
+    def converse(self, **kwargs) -> Dict[str, Any]:
+        usage = {'inputTokens': 0, 'outputTokens': 40, 'cacheReadInputTokens': 0, 'cacheWriteInputTokens': 0}
+        prefix = []
+        for block in kwargs['system']:
+            if 'cachePoint' in block:
+                key = hashlib.sha256(''.join(prefix).encode()).hexdigest()
+                tokens = len(''.join(prefix)) // CHARS_PER_TOKEN
+                field = 'cacheReadInputTokens' if key in self.cached else 'cacheWriteInputTokens'
+                usage[field] += tokens
+                usage['inputTokens'] -= tokens
+                self.cached.add(key)
+            else:
+                prefix.append(block.get('text', ''))
+        text = ''.join(prefix) + ''.join(c.get('text', '') for m in kwargs['messages'] for c in m['content'])
+        usage['inputTokens'] += len(text) // CHARS_PER_TOKEN
+        return {'output': {'message': {'content': [{'text': 'Voicemail is now off.'}]}}, 'usage': usage,
+                'stopReason': 'end_turn'}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='A/B Bedrock prompt cache points')
+    parser.add_argument('--requests', type=int, default=20, help='Requests per call site and arm (default: 20)')
+    parser.add_argument('--cached-price', type=float, default=0.25,
+                        help='Price of a cache read relative to an input token (default: 0.25)')
+    parser.add_argument('--live', action='store_true', help='Call the real Bedrock runtime')
+    parser.add_argument('--model-id', default='apac.amazon.nova-pro-v1:0')
+    parser.add_argument('--region', default='ap-southeast-1')
+    args = parser.parse_args()
+
+    orchestrator = load_lambda('orchestrator')
+    import chatbot_core.prompts as prompts
+    import chatbot_core.routing as routing
+
+    orchestrator.bedrock_agent_mgmt = StubPromptManagement()
+    orchestrator.RESPONSE_PROMPT_ID, orchestrator.TRANSLATION_PROMPT_ID = 'response', 'translation'
+    orchestrator.GUARDRAIL_ID = None
+    if args.live:
+        import boto3
+        orchestrator.bedrock_runtime = boto3.client('bedrock-runtime', region_name=args.region)
+        orchestrator.MODEL_ROUTER.routes = {'default': [args.model_id]}
+    else:
+        orchestrator.bedrock_runtime = StubRuntime()
+
+    usage_log: List[Dict[str, Any]] = []
+    routing.record_bedrock_usage = lambda usage, *_, **__: usage_log.append(dict(usage or {}))
+
+    contexts = [
+        {'status': 'success', 'action': 'deactivate', 'voicemail_status': 'inactive', 'request': i}
+        for i in range(args.requests)
+    ]
+    calls = {
+        'generate_response': lambda i: orchestrator.generate_response('deactivate_voicemail', contexts[i], 'EN'),
+        'translate_to_bahasa': lambda i: orchestrator.translate_to_bahasa(f"Voicemail is now off (request {i})."),
+    }
+
+    print("=" * 80)
+    print(f"BEDROCK PROMPT CACHE A/B ({'live ' + args.model_id if args.live else 'stub runtime'})")
+    print("=" * 80)
+    blocks = prompts.build_system_blocks(RESPONSE_TEMPLATE, {'intent': 'x', 'context': '{}', 'language': 'EN'}, cache=True)
+    print(f"Static prefix: ~{len(blocks[0]['text']) // CHARS_PER_TOKEN} tokens, "
+          f"minimum for a cache point {prompts.PROMPT_CACHE_MIN_TOKENS}\n")
+
+    for name, call in calls.items():
+        print(name)
+        costs = {}
+        for enabled in (False, True):
+            prompts.PROMPT_CACHE_ENABLED = enabled
+            if not args.live:
+                orchestrator.bedrock_runtime.cached.clear()
+            usage_log.clear()
+            latencies = []
+            for i in range(args.requests):
+                start = time.perf_counter()
+                call(i)
+                latencies.append((time.perf_counter() - start) * 1000)
+            totals = {field: sum(u.get(field, 0) for u in usage_log) for field in prompts.USAGE_METRICS}
+            costs[enabled] = (
+                totals['inputTokens'] + totals['cacheWriteInputTokens']
+                + totals['cacheReadInputTokens'] * args.cached_price
+            )
+            label = 'cache points on ' if enabled else 'cache points off'
+            print(f"  {label}  input {totals['inputTokens']:>7}  cache read {totals['cacheReadInputTokens']:>7}  "
+                  f"cache write {totals['cacheWriteInputTokens']:>6}  ({len(usage_log)} calls)")
+            if args.live:
+                print_summary(f"  latency, {label.strip()}", latencies)
+        print(f"  relative input cost with cache points: {costs[True] / costs[False]:.0%}\n")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Load test for message rate limiting (RATE_LIMIT_ENABLED, chatbot_core.rate_limit).
+
+Replays --duration seconds of simulated time through the API handler
+(whatsapp-webhook) on --containers warm containers against moto DynamoDB:
+one abusive phone number sending --abuse-rate messages per second, plus
+--users normal users sending a message every --user-interval seconds in
+their own session. The orchestrator is a stub that counts turns, and each
+turn is charged --bedrock-per-turn Bedrock calls.
+
+Compared:
+- off: no rate limiting (behaviour before)
+- per-container: in-memory buckets only (RATE_LIMIT_TABLE="")
+- shared: in-memory fast path + shared DynamoDB buckets
+
+Reports, per mode, messages allowed and Bedrock calls for the abuser and
+normal users, rejections by source (local fast path / shared bucket) and
+the number of rate-limit DynamoDB writes per message.
+
+Usage:
+    python benchmark_rate_limit.py --duration 120 --abuse-rate 5 --containers 4
+"""
+
+import io
+import os
+import argparse
+from collections import Counter
+from contextlib import redirect_stdout
+from typing import Dict, List
+
+from bench_utils import local_aws, load_lambda, create_chatbot_tables
+
+ABUSER = '+60111111111'
+
+
+def build_schedule(args) -> List[tuple]:
+    """(time in seconds, phone number, session id) for every message, in time order."""
+    events = [(i / args.abuse_rate, ABUSER, None) for i in range(int(args.duration * args.abuse_rate))]
+    for user in range(args.users):
+        phone = f"+6012{user:07d}"
+        offset = user * args.user_interval / max(args.users, 1)
+        t = offset
+        while t < args.duration:
+            events.append((t, phone, f"SESSION-USER{user}"))
+            t += args.user_interval
+    return sorted(events, key=lambda event: event[0])
+
+
+def run_mode(label: str, args, schedule: List[tuple], enabled: bool, table: str) -> Dict:
+    import boto3
+
+    os.environ['RATE_LIMIT_ENABLED'] = 'true' if enabled else 'false'
+    os.environ['RATE_LIMIT_TABLE'] = table
+    clock = [0.0]
+    turns: Counter = Counter()
+    rejections: Counter = Counter()
+
+    with local_aws():
+        dynamodb = boto3.resource('dynamodb')
+        create_chatbot_tables(dynamodb)
+        containers = [load_lambda('whatsapp-webhook') for _ in range(args.containers)]
+        import chatbot_core.rate_limit as rate_limit
+        from chatbot_core import get_resource
+
+        rate_limit.emit_metrics = lambda values, dimensions=None, properties=None, **_: rejections.update(
+            [properties['source']] if properties else []
+        )
+        writes = Counter()
+
+        def count_write(params=None, **_):
+            key = params.get('Key', {}).get('session_id')
+            key = key.get('S', '') if isinstance(key, dict) else str(key)
+            if key.startswith('RATELIMIT#'):
+                writes['rate_limit'] += 1
+        events = get_resource('dynamodb').meta.client.meta.events
+        events.register('before-parameter-build.dynamodb.UpdateItem', count_write)
+
+        for container in containers:
+            container.RATE_LIMITER.clock = lambda: clock[0]
+            container.invoke_orchestrator = lambda session, message, phone, channel='web': (
+                turns.update(['abuser' if phone == ABUSER else 'users']) or {'response': 'ok'}
+            )
+
+        statuses: Counter = Counter()
+        for i, (t, phone, session_id) in enumerate(schedule):
+            clock[0] = t
+            body = {'phone_number': phone, 'message': 'nk off vm skrg'}
+            if session_id:
+                body['session_id'] = session_id
+            with redirect_stdout(io.StringIO()):
+                response = containers[i % len(containers)].handler(body, None)
+            statuses[('abuser' if phone == ABUSER else 'users', response['statusCode'])] += 1
+        events.unregister('before-parameter-build.dynamodb.UpdateItem', count_write)
+
+    sent = Counter(('abuser' if phone == ABUSER else 'users') for _, phone, _ in schedule)
+    print(label)
+    for who in ('abuser', 'users'):
+        print(f"  {who:<7} sent {sent[who]:>5}  allowed {turns[who]:>5}  "
+              f"429s {statuses[(who, 429)]:>5}  Bedrock calls {turns[who] * args.bedrock_per_turn:>6}")
+    if enabled:
+        print(f"  rejected in memory (fast path): {rejections['local']}, by the shared bucket: {rejections['shared']}")
+        print(f"  rate-limit DynamoDB writes: {writes['rate_limit']} "
+              f"({writes['rate_limit'] / len(schedule):.2f} per message)")
+    print()
+    return turns
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Load test per-phone/per-session rate limiting')
+    parser.add_argument('--duration', type=float, default=120.0, help='Simulated seconds (default: 120)')
+    parser.add_argument('--abuse-rate', type=float, default=5.0, help='Abuser messages per second (default: 5)')
+    parser.add_argument('--users', type=int, default=20, help='Normal users (default: 20)')
+    parser.add_argument('--user-interval', type=float, default=15.0,
+                        help='Seconds between a normal user\'s messages (default: 15)')
+    parser.add_argument('--containers', type=int, default=4, help='Warm webhook containers (default: 4)')
+    parser.add_argument('--bedrock-per-turn', type=int, default=3,
+                        help='Bedrock calls per orchestrator turn (default: 3)')
+    args = parser.parse_args()
+
+    schedule = build_schedule(args)
+    print("=" * 80)
+    print("MESSAGE RATE LIMITING UNDER ABUSE")
+    print("=" * 80)
+    print(f"{len(schedule)} messages over {args.duration:.0f}s on {args.containers} containers; "
+          f"phone limit {os.environ.get('RATE_LIMIT_PHONE_PER_MINUTE', '20')}/min "
+          f"burst {os.environ.get('RATE_LIMIT_PHONE_BURST', '10')}\n")
+
+    off = run_mode('off', args, schedule, enabled=False, table='')
+    run_mode('per-container buckets', args, schedule, enabled=True, table='')
+    shared = run_mode('shared buckets', args, schedule, enabled=True, table='chatbot-sessions')
+
+    cap = args.duration / 60 * float(os.environ.get('RATE_LIMIT_PHONE_PER_MINUTE', '20')) + \
+        int(os.environ.get('RATE_LIMIT_PHONE_BURST', '10'))
+    print(f"Abuser Bedrock calls: {off['abuser'] * args.bedrock_per_turn} -> "
+          f"{shared['abuser'] * args.bedrock_per_turn} (cap: {cap:.0f} turns)")
+
+
+if __name__ == '__main__':
+    main()
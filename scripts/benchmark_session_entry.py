@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Benchmark the API handler entry path (customer lookup + session resume + turn write).
+
+Compares the previous sequential path (get_item -> query -> put_item) with
+chatbot_core.create_or_resume_session, which issues the customer and session reads
+concurrently and writes the new turn with a single conditional put.
+Runs against a local DynamoDB stand-in with an injected round-trip time.
+
+Usage:
+    python benchmark_session_entry.py --requests 200 --latency-ms 8
+"""
+
+import time
+import argparse
+from datetime import datetime, timedelta
+
+import boto3
+
+from bench_utils import local_aws, load_lambda, create_chatbot_tables, inject_latency, print_summary
+
+
+def sequential_entry(module, phone_number: str, message: str, session_id: str) -> None:
+    """Previous entry path: customer read, then session read, then turn write."""
+    from chatbot_core import lookup_customer
+
+    sessions_table = module.dynamodb.Table(module.SESSIONS_TABLE)
+    customer = lookup_customer(phone_number)
+    customer_id = customer.get('customer_id') if customer else f"CUST-{phone_number.replace('+', '')}"
+
+    response = sessions_table.query(
+        KeyConditionExpression='session_id = :sid',
+        ExpressionAttributeValues={':sid': session_id},
+        ScanIndexForward=False,
+        Limit=1
+    )
+    session = response['Items'][0]
+    sessions_table.put_item(Item={
+        'session_id': session_id,
+        'turn_number': int(session['turn_number']) + 1,
+        'customer_id': customer_id,
+        'phone_number': phone_number,
+        'user_message': message,
+        'created_at': session.get('created_at'),
+        'updated_at': datetime.utcnow().isoformat(),
+        'ttl': int((datetime.utcnow() + timedelta(hours=24)).timestamp())
+    })
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark API handler session entry path')
+    parser.add_argument('--requests', type=int, default=200, help='Requests per path (default: 200)')
+    parser.add_argument('--latency-ms', type=float, default=8.0,
+                        help='Simulated DynamoDB round trip per call (default: 8)')
+    args = parser.parse_args()
+
+    with local_aws():
+        create_chatbot_tables(boto3.resource('dynamodb'))
+        module = load_lambda('whatsapp-webhook')
+        from chatbot_core import get_client
+
+        counter = inject_latency(module.dynamodb.meta.client, 'dynamodb', args.latency_ms)
+        # create_or_resume_session uses the low-level client (see chatbot_core.sessions)
+        inject_latency(get_client('dynamodb'), 'dynamodb', args.latency_ms, counter=counter)
+
+        phone_number = '+60123456789'
+        module.dynamodb.Table(module.CUSTOMERS_TABLE).put_item(
+            Item={'phone_number': phone_number, 'customer_id': 'CUST001'}
+        )
+
+        results = {}
+        for label in ('sequential', 'concurrent'):
+            session = module.create_or_resume_session(phone_number, 'hi', None, 'web')
+            session_id = session['session_id']
+            counter.reset()
+
+            samples = []
+            for _ in range(args.requests):
+                start = time.perf_counter()
+                if label == 'sequential':
+                    sequential_entry(module, phone_number, 'nk off vm', session_id)
+                else:
+                    module.create_or_resume_session(phone_number, 'nk off vm', session_id, 'web')
+                samples.append((time.perf_counter() - start) * 1000)
+
+            results[label] = print_summary(f"{label} entry path", samples)
+            print(f"    DynamoDB calls per request: {counter.total / args.requests:.2f} {counter.calls}")
+
+        saved = results['sequential']['mean_ms'] - results['concurrent']['mean_ms']
+        print(f"\nEntry-path latency saved per request: {saved:.2f}ms "
+              f"({saved / results['sequential']['mean_ms'] * 100:.1f}%) at {args.latency_ms}ms per DynamoDB call")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Benchmark and accuracy check for the NLU slang normalizer.
+
+Compares the previous single-token normalizer (lowercase, re.findall, dict
+lookup per token, ' '.join) with the trie-based SlangMatcher used by
+normalize_slang:
+
+1. Accuracy: every slang -> standard pair in nlu_training_data.json
+   "slang_patterns", alone and inside a sentence. Reported separately for
+   pairs whose slang term exists in slang_dictionary.json (normalizer
+   accuracy) and for all pairs (dictionary coverage).
+2. Formatting: every examples_slang message must come back unchanged when
+   every dictionary entry maps to itself (spacing and punctuation preserved).
+3. Speed: mean time per message for short, 500-char and 5000-char messages
+   (best of 5 runs).
+
+Runs locally from the Data/ files, no AWS calls.
+
+Usage:
+    python benchmark_slang_normalizer.py --iterations 2000
+"""
+
+import os
+import re
+import json
+import time
+import argparse
+from typing import Callable, Dict, List
+
+from bench_utils import REPO_ROOT, load_lambda
+
+DATA_DIR = os.path.join(REPO_ROOT, 'Data')
+
+
+def legacy_normalize(slang_dict: Dict[str, str], message: str) -> str:
+    """Previous normalize_slang body, unchanged: single-token lookup, tokens re-joined with spaces."""
+    tokens = re.findall(r'\w+|[^\w\s]', message.lower())
+
+    normalized_tokens = []
+    for token in tokens:
+        normalized = slang_dict.get(token, token)
+        normalized_tokens.append(normalized)
+
+    return ' '.join(normalized_tokens)
+
+
+def gold_pairs(training_data: Dict) -> Dict[str, List[str]]:
+    """slang -> accepted standard forms, from "nak (want)" or "dah/sudah (already)" glosses."""
+    pairs = {}
+    for category in training_data.get('slang_patterns', {}).values():
+        if not isinstance(category, dict):
+            continue
+        for slang, gloss in category.items():
+            if isinstance(gloss, str):
+                standard = gloss.split(' (')[0].strip().lower()
+                pairs[slang.lower()] = [alt.strip() for alt in standard.split('/')]
+    return pairs
+
+
+def is_correct(output: str, accepted: List[str]) -> bool:
+    words = re.findall(r'[^\W_]+', output.lower())
+    padded = f" {' '.join(words)} "
+    return any(f" {alt} " in padded for alt in accepted)
+
+
+def accuracy(normalize: Callable[[str], str], pairs: Dict[str, List[str]]) -> float:
+    correct = 0
+    for slang, accepted in pairs.items():
+        alone = normalize(slang)
+        in_sentence = normalize(f"Hi, {slang} ok!")
+        correct += is_correct(alone, accepted) and is_correct(in_sentence, accepted)
+    return correct / len(pairs) * 100 if pairs else 0.0
+
+
+def time_per_message(normalize: Callable[[str], str], messages: List[str], iterations: int, repeats: int = 5) -> float:
+    """Mean microseconds per message, best of `repeats` runs (filters scheduler noise)."""
+    best = float('inf')
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for _ in range(iterations):
+            for message in messages:
+                normalize(message)
+        best = min(best, time.perf_counter() - start)
+    return best / (iterations * len(messages)) * 1e6
+
+
+def build_messages(examples: List[str], length: int, count: int = 20) -> List[str]:
+    """Concatenate slang examples into messages of roughly `length` characters."""
+    messages = []
+    for offset in range(count):
+        parts, size, index = [], 0, offset
+        while size < length:
+            example = examples[index % len(examples)]
+            parts.append(example)
+            size += len(example) + 2
+            index += 1
+        messages.append('. '.join(parts)[:length])
+    return messages
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the NLU slang normalizer')
+    parser.add_argument('--iterations', type=int, default=2000, help='Passes over the short messages (default: 2000)')
+    args = parser.parse_args()
+
+    nlu = load_lambda('nlu-engine')
+    from slang_matcher import TOKEN_PATTERN
+    with open(os.path.join(DATA_DIR, 'slang_dictionary.json'), encoding='utf-8') as f:
+        slang_dict = nlu.flatten_slang_dictionary(json.load(f))
+    with open(os.path.join(DATA_DIR, 'nlu_training_data.json'), encoding='utf-8') as f:
+        training_data = json.load(f)
+
+    # Serve normalize_slang from the local file instead of S3
+    nlu.SLANG_DICT = slang_dict
+    matcher_normalize = nlu.normalize_slang
+    # Both sides pay the same load_slang_dictionary() call the Lambda makes per message
+    old_normalize = lambda message: legacy_normalize(nlu.load_slang_dictionary(), message)  # noqa: E731
+
+    matcher = nlu.SlangMatcher(slang_dict)
+    phrases = sum(1 for key in slang_dict if len(TOKEN_PATTERN.findall(key)) > 1)
+    print("=" * 80)
+    print("SLANG NORMALIZER")
+    print("=" * 80)
+    print(f"Dictionary: {len(slang_dict)} entries ({phrases} multi-word), trie depth {matcher.max_tokens} tokens")
+
+    # 1. Accuracy
+    pairs = gold_pairs(training_data)
+    in_dict = {slang: accepted for slang, accepted in pairs.items() if slang in slang_dict}
+    print(f"\nAccuracy on slang_patterns ({len(in_dict)} of {len(pairs)} pairs present in the dictionary)")
+    for label, normalize in (('previous', old_normalize), ('trie matcher', matcher_normalize)):
+        print(f"  {label:<14} in-dictionary={accuracy(normalize, in_dict):5.1f}%  all pairs={accuracy(normalize, pairs):5.1f}%")
+
+    # 2. Formatting preserved
+    examples = [example for intent in training_data['intents'] for example in intent.get('examples_slang', [])]
+    identity = nlu.SlangMatcher({key: key for key in slang_dict})
+    changed = [example for example in examples if identity.normalize(example).lower() != example.lower()]
+    print(f"\nFormatting: {len(examples) - len(changed)}/{len(examples)} examples_slang messages unchanged under identity mapping")
+    for example in changed[:5]:
+        print(f"  [WARN] changed: {example!r}")
+
+    # 3. Speed
+    print("\nSpeed (mean per message)")
+    for label, messages, iterations in (
+        ('short examples', examples, args.iterations),
+        ('500-char messages', build_messages(examples, 500), max(1, args.iterations // 5)),
+        ('5000-char messages', build_messages(examples, 5000), max(1, args.iterations // 50)),
+    ):
+        before = time_per_message(old_normalize, messages, iterations)
+        after = time_per_message(matcher_normalize, messages, iterations)
+        print(f"  {label:<20} previous={before:9.1f}us  trie={after:9.1f}us  ({before / after:.2f}x)")
+
+    print("\nExample:")
+    sample = "Mcm mne nk off vm skrg?? tq!"
+    print(f"  input:    {sample}")
+    print(f"  previous: {old_normalize(sample)}")
+    print(f"  trie:     {matcher_normalize(sample)}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Check and benchmark the NLU slang dictionary background refresh.
+
+Runs the NLU module against moto S3 with an injected round trip per call:
+
+1. Conditional GET: an unchanged dictionary costs one 304 and no reload
+2. Update: a changed slang_dictionary.json is picked up, version changes
+3. Request path: time added to a request that triggers a refresh (background
+   thread) vs forcing a synchronous reload (previous option: drop the cache)
+4. Consistency: requests running during repeated swaps only ever see the old
+   or the new mapping
+
+Usage:
+    python benchmark_slang_refresh.py --latency-ms 20 --requests 200
+"""
+
+import io
+import os
+import json
+import time
+import argparse
+import threading
+from contextlib import redirect_stdout
+
+from bench_utils import REPO_ROOT, local_aws, load_lambda, inject_latency, print_summary
+
+DATA_DIR = os.path.join(REPO_ROOT, 'Data')
+BUCKET = 'chatbot-slang-refresh-bench'
+KEY = 'slang_dictionary.json'
+
+
+def with_entry(raw_slang, slang: str, standard: str):
+    """Copy of the dictionary with one extra common_abbreviations entry."""
+    updated = json.loads(json.dumps(raw_slang))
+    updated['categories']['common_abbreviations']['entries'].append({'slang': slang, 'standard': standard})
+    return updated
+
+
+def emf_records(output: str):
+    return [json.loads(line) for line in output.splitlines() if line.startswith('{"_aws"')]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark background slang dictionary refresh')
+    parser.add_argument('--latency-ms', type=float, default=20.0, help='Simulated S3 round trip (default: 20)')
+    parser.add_argument('--requests', type=int, default=200, help='Requests per timing case (default: 200)')
+    args = parser.parse_args()
+
+    with local_aws():
+        os.environ['SLANG_DICT_S3_BUCKET'] = BUCKET
+        os.environ['SLANG_DICT_S3_KEY'] = KEY
+        os.environ['NLU_ASSETS_PATH'] = os.path.join(DATA_DIR, 'missing.bin')  # JSON source only
+        nlu = load_lambda('nlu-engine')
+
+        with open(os.path.join(DATA_DIR, 'slang_dictionary.json'), encoding='utf-8') as f:
+            raw_slang = json.load(f)
+        s3 = nlu.s3_client
+        s3.create_bucket(Bucket=BUCKET, CreateBucketConfiguration={'LocationConstraint': os.environ['REGION']})
+        s3.put_object(Bucket=BUCKET, Key=KEY, Body=json.dumps(raw_slang).encode('utf-8'))
+        counter = inject_latency(s3, 's3', args.latency_ms)
+
+        print("=" * 80)
+        print("SLANG DICTIONARY BACKGROUND REFRESH")
+        print("=" * 80)
+
+        log = io.StringIO()
+        with redirect_stdout(log):
+            nlu.normalize_slang("nk off vm")
+            initial_version = nlu.SLANG_DICT_VERSION
+
+            # 1. Unchanged dictionary
+            counter.reset()
+            unchanged = nlu.refresh_slang_dictionary()
+            unchanged_calls = dict(counter.calls)
+
+            # 2. Updated dictionary
+            s3.put_object(Bucket=BUCKET, Key=KEY, Body=json.dumps(with_entry(raw_slang, 'zzq', 'baru')).encode('utf-8'))
+            updated = nlu.refresh_slang_dictionary()
+            picked_up = nlu.normalize_slang("zzq")
+
+        print(f"\nUnchanged: outcome={unchanged}, S3 calls={unchanged_calls}")
+        print(f"Updated:   outcome={updated}, version {initial_version} -> {nlu.SLANG_DICT_VERSION}, "
+              f"'zzq' -> {picked_up!r}")
+        records = emf_records(log.getvalue())
+        if records:
+            last = records[-1]
+            print(f"Metrics:   {len(records)} EMF records, last: outcome={last['outcome']} "
+                  f"SlangDictionaryReloadMs={last['SlangDictionaryReloadMs']} "
+                  f"DictionaryVersion={last['DictionaryVersion']}")
+
+        # 3. Request-path cost of a refresh
+        print(f"\nRequest path when a refresh is due (S3 round trip {args.latency_ms:.0f}ms)")
+        nlu.SLANG_DICT_REFRESH_SECONDS = 0.0001
+        sync_ms, background_ms = [], []
+        with redirect_stdout(io.StringIO()):
+            for index in range(args.requests // 10):
+                s3.put_object(Bucket=BUCKET, Key=KEY,
+                              Body=json.dumps(with_entry(raw_slang, 'zzq', f'v{index}')).encode('utf-8'))
+                start = time.perf_counter()
+                nlu.SLANG_DICT = None  # previous option: drop the cache and reload inline
+                nlu.normalize_slang("nk off vm skrg")
+                sync_ms.append((time.perf_counter() - start) * 1000)
+
+            for index in range(args.requests):
+                if index % 10 == 0:
+                    s3.put_object(Bucket=BUCKET, Key=KEY,
+                                  Body=json.dumps(with_entry(raw_slang, 'zzq', f'w{index}')).encode('utf-8'))
+                time.sleep(0.001)
+                start = time.perf_counter()
+                nlu.normalize_slang("nk off vm skrg")
+                thread = nlu.maybe_refresh_slang_dictionary()
+                background_ms.append((time.perf_counter() - start) * 1000)
+                if thread is not None:
+                    thread.join()
+        print_summary('synchronous reload (previous)', sync_ms)
+        print_summary('background refresh', background_ms)
+
+        # 4. Consistency under concurrent swaps
+        seen, errors, stop = set(), [], threading.Event()
+
+        def reader():
+            while not stop.is_set():
+                try:
+                    seen.add(nlu.normalize_slang("zzq"))
+                except Exception as e:  # noqa: BLE001
+                    errors.append(e)
+
+        readers = [threading.Thread(target=reader) for _ in range(4)]
+        expected = set()
+        with redirect_stdout(io.StringIO()):
+            for thread in readers:
+                thread.start()
+            for index in range(20):
+                expected.add(f'c{index}')
+                s3.put_object(Bucket=BUCKET, Key=KEY,
+                              Body=json.dumps(with_entry(raw_slang, 'zzq', f'c{index}')).encode('utf-8'))
+                nlu.refresh_slang_dictionary()
+            stop.set()
+            for thread in readers:
+                thread.join()
+        unexpected = {value for value in seen if not value.startswith(('c', 'w'))}
+        print(f"\nConsistency: {len(seen)} distinct results across 20 swaps, "
+              f"{len(errors)} errors, unexpected={sorted(unexpected)}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Measure time-to-first-byte of the streaming (SSE) chat endpoint against the current JSON endpoint.
+
+For each message, records:
+- JSON endpoint: time to first byte and total time
+- SSE endpoint: time to first byte, first "metadata" event, first "token" event and "done"
+
+Usage:
+    python benchmark_stream_ttfb.py \
+        --json-url https://API_ID.execute-api.ap-southeast-1.amazonaws.com/prod/chat \
+        --stream-url https://FUNCTION_URL_ID.lambda-url.ap-southeast-1.on.aws/ \
+        --phone-number +60123456789
+"""
+
+import json
+import time
+import argparse
+import http.client
+from urllib.parse import urlparse
+from typing import Dict, Any
+
+from bench_utils import print_summary
+
+DEFAULT_MESSAGES = [
+    "hi",
+    "how much does voicemail cost?",
+    "nk off vm skrg",
+    "what is roaming",
+    "macam mana nak semak bil saya",
+]
+
+
+def open_request(url: str, payload: Dict[str, Any], accept: str) -> http.client.HTTPResponse:
+    """POST JSON to url and return the response once the status line arrives."""
+    parsed = urlparse(url)
+    conn_cls = http.client.HTTPSConnection if parsed.scheme == 'https' else http.client.HTTPConnection
+    conn = conn_cls(parsed.netloc, timeout=60)
+    conn.request('POST', parsed.path or '/', body=json.dumps(payload),
+                 headers={'Content-Type': 'application/json', 'Accept': accept})
+    return conn.getresponse()
+
+
+def measure_json(url: str, payload: Dict[str, Any]) -> Dict[str, float]:
+    """Time the current endpoint, which only responds once the orchestrator has finished."""
+    start = time.perf_counter()
+    response = open_request(url, payload, 'application/json')
+    first_byte = response.read(1)
+    ttfb = time.perf_counter() - start
+    body = first_byte + response.read()
+    total = time.perf_counter() - start
+    result = json.loads(body) if body else {}
+    return {'ttfb_ms': ttfb * 1000, 'total_ms': total * 1000, 'session_id': result.get('session_id')}
+
+
+def measure_stream(url: str, payload: Dict[str, Any]) -> Dict[str, float]:
+    """Time the SSE endpoint per event type."""
+    start = time.perf_counter()
+    response = open_request(url, payload, 'text/event-stream')
+    timings: Dict[str, float] = {}
+    session_id = None
+    event_name = None
+
+    while True:
+        line = response.readline()
+        if not line:
+            break
+        elapsed = (time.perf_counter() - start) * 1000
+        timings.setdefault('ttfb_ms', elapsed)
+
+        line = line.decode('utf-8').rstrip('\n')
+        if line.startswith('event:'):
+            event_name = line[6:].strip()
+        elif line.startswith('data:') and event_name:
+            timings.setdefault(f'first_{event_name}_ms', elapsed)
+            if event_name in ('metadata', 'done'):
+                session_id = json.loads(line[5:]).get('session_id') or session_id
+            if event_name in ('done', 'error'):
+                break
+
+    timings['total_ms'] = (time.perf_counter() - start) * 1000
+    timings['session_id'] = session_id
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark streaming chat endpoint TTFB')
+    parser.add_argument('--json-url', required=True, help='Current chat endpoint (API Gateway)')
+    parser.add_argument('--stream-url', required=True, help='Streaming SSE endpoint (Function URL or local server)')
+    parser.add_argument('--phone-number', default='+60123456789', help='Test phone number')
+    parser.add_argument('--rounds', type=int, default=3, help='Repetitions per message (default: 3)')
+    parser.add_argument('--channel', default='mobile', help='Channel sent to both endpoints (default: mobile)')
+    args = parser.parse_args()
+
+    json_samples = {'ttfb_ms': [], 'total_ms': []}
+    stream_samples = {'ttfb_ms': [], 'first_metadata_ms': [], 'first_token_ms': [], 'total_ms': []}
+
+    for _ in range(args.rounds):
+        for message in DEFAULT_MESSAGES:
+            # Fresh session per request so the two endpoints do the same work
+            payload = {'message': message, 'phone_number': args.phone_number, 'channel': args.channel}
+
+            result = measure_json(args.json_url, payload)
+            for key in json_samples:
+                json_samples[key].append(result[key])
+
+            result = measure_stream(args.stream_url, payload)
+            for key in stream_samples:
+                if key in result:
+                    stream_samples[key].append(result[key])
+
+    print("=" * 80)
+    print("JSON endpoint (current)")
+    json_ttfb = print_summary('time to first byte', json_samples['ttfb_ms'])
+    print_summary('total', json_samples['total_ms'])
+
+    print("\nSSE endpoint (streaming)")
+    stream_ttfb = print_summary('time to first byte', stream_samples['ttfb_ms'])
+    print_summary('first metadata event (NLU done)', stream_samples['first_metadata_ms'])
+    print_summary('first token event', stream_samples['first_token_ms'])
+    print_summary('total', stream_samples['total_ms'])
+
+    print(f"\nTTFB improvement (p50): {json_ttfb['p50_ms'] - stream_ttfb['p50_ms']:.0f}ms")
+
+
+if __name__ == '__main__':
+    main()
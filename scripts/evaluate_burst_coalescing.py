@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+Evaluate inbound message coalescing for rapid multi-message WhatsApp bursts.
+
+Splits the NLU training examples into bursts of short fragments (the way users
+type "nk off vm", "skrg", "pls" as separate messages), applies the same
+debounce policy as the Twilio webhook (COALESCE_WINDOW_MS / COALESCE_MAX_WAIT_MS)
+and compares, with and without coalescing:
+- Orchestrator turns (= NLU + generation Bedrock calls) per conversation
+- Intent accuracy / weighted F1 of the turns that reach the NLU engine
+- Latency added by the debounce window
+
+Usage:
+    python evaluate_burst_coalescing.py --lambda-arn chatbot-nlu-engine --window-ms 1500
+    python evaluate_burst_coalescing.py --dry-run   # Policy simulation only, no Lambda calls
+"""
+
+import json
+import os
+import argparse
+import statistics
+from typing import List, Dict, Any
+
+import boto3
+
+from evaluate_intent_f1 import calculate_f1_score
+
+
+def build_bursts(test_data: Dict[str, Any], max_fragments: int) -> List[Dict[str, Any]]:
+    """
+    Split multi-word training examples into bursts of fragments.
+
+    Args:
+        test_data: Parsed nlu_training_data.json
+        max_fragments: Maximum number of messages per burst
+
+    Returns:
+        List of {"intent", "fragments"} dicts
+    """
+    bursts = []
+    for intent_obj in test_data['intents']:
+        examples = []
+        examples.extend(intent_obj.get('examples_en', []))
+        examples.extend(intent_obj.get('examples_bm', []))
+        examples.extend(intent_obj.get('examples_slang', []))
+
+        for example in examples:
+            words = example.split()
+            if len(words) < 2:
+                continue
+
+            count = min(max_fragments, len(words))
+            size = -(-len(words) // count)  # Ceiling division
+            fragments = [' '.join(words[i:i + size]) for i in range(0, len(words), size)]
+            bursts.append({'intent': intent_obj['intent_name'], 'fragments': fragments})
+
+    return bursts
+
+
+def coalesce_burst(fragments: List[str], gap_ms: int, window_ms: int, max_wait_ms: int) -> List[Dict[str, Any]]:
+    """
+    Apply the webhook debounce policy to a burst with a fixed inter-message gap.
+
+    A turn is flushed when no new fragment arrives within window_ms of the
+    latest one, or when max_wait_ms has elapsed since the first fragment.
+
+    Returns:
+        List of {"message", "added_latency_ms"} turns
+    """
+    if window_ms <= 0:
+        return [{'message': f, 'added_latency_ms': 0} for f in fragments]
+
+    turns = []
+    pending = []
+    first_at = 0
+    for idx, fragment in enumerate(fragments):
+        arrived_at = idx * gap_ms
+        if pending and (arrived_at - pending[-1][0] > window_ms or arrived_at - first_at > max_wait_ms):
+            flush_at = min(pending[-1][0] + window_ms, first_at + max_wait_ms)
+            turns.append({'message': ' '.join(p[1] for p in pending), 'added_latency_ms': flush_at - pending[-1][0]})
+            pending = []
+        if not pending:
+            first_at = arrived_at
+        pending.append((arrived_at, fragment))
+
+    flush_at = min(pending[-1][0] + window_ms, first_at + max_wait_ms)
+    turns.append({'message': ' '.join(p[1] for p in pending), 'added_latency_ms': flush_at - pending[-1][0]})
+    return turns
+
+
+def classify(lambda_client, lambda_function_name: str, message: str) -> str:
+    """Invoke the NLU Lambda and return the predicted intent."""
+    response = lambda_client.invoke(
+        FunctionName=lambda_function_name,
+        InvocationType='RequestResponse',
+        Payload=json.dumps({"message": message})
+    )
+    result = json.loads(response['Payload'].read())
+    if 'body' in result:
+        result = json.loads(result['body']) if isinstance(result['body'], str) else result['body']
+    return result.get('intent', 'unclear_intent')
+
+
+def evaluate_mode(bursts, lambda_client, lambda_function_name, gap_ms, window_ms, max_wait_ms) -> Dict[str, Any]:
+    """Evaluate one coalescing configuration over all bursts."""
+    y_true = []
+    y_pred = []
+    turn_count = 0
+    added_latency = []
+
+    for burst in bursts:
+        turns = coalesce_burst(burst['fragments'], gap_ms, window_ms, max_wait_ms)
+        turn_count += len(turns)
+        added_latency.extend(t['added_latency_ms'] for t in turns)
+
+        if lambda_client is None:
+            continue
+
+        # The last turn of the burst is the one the customer's request is acted on
+        predicted = classify(lambda_client, lambda_function_name, turns[-1]['message'])
+        y_true.append(burst['intent'])
+        y_pred.append(predicted)
+
+    result = {
+        'window_ms': window_ms,
+        'turns': turn_count,
+        'turns_per_conversation': turn_count / len(bursts) if bursts else 0.0,
+        # Each turn costs one NLU call plus one generation/KB call
+        'bedrock_calls_per_conversation': 2 * turn_count / len(bursts) if bursts else 0.0,
+        'added_latency_p50_ms': statistics.median(added_latency) if added_latency else 0,
+        'added_latency_max_ms': max(added_latency) if added_latency else 0
+    }
+
+    if y_true:
+        metrics = calculate_f1_score(y_true, y_pred)
+        result['accuracy'] = sum(t == p for t, p in zip(y_true, y_pred)) / len(y_true)
+        result['weighted_f1'] = metrics['weighted_f1']
+
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Evaluate WhatsApp burst coalescing')
+    parser.add_argument('--test-data', default='Data/nlu_training_data.json',
+                        help='Path to nlu_training_data.json (default: Data/nlu_training_data.json)')
+    parser.add_argument('--lambda-arn', help='Name or ARN of NLU Lambda function (e.g., chatbot-nlu-engine)')
+    parser.add_argument('--region', default='ap-southeast-5', help='AWS region (default: ap-southeast-5)')
+    parser.add_argument('--max-fragments', type=int, default=3, help='Messages per burst (default: 3)')
+    parser.add_argument('--gap-ms', type=int, default=800, help='Gap between burst messages (default: 800)')
+    parser.add_argument('--window-ms', type=int, default=1500, help='Coalescing window (default: 1500)')
+    parser.add_argument('--max-wait-ms', type=int, default=2500, help='Added latency cap (default: 2500)')
+    parser.add_argument('--dry-run', action='store_true', help='Simulate the policy without invoking NLU')
+    parser.add_argument('--output', help='Output file for results (JSON)')
+    args = parser.parse_args()
+
+    if not os.path.exists(args.test_data):
+        print(f"❌ Error: File not found: {args.test_data}")
+        return
+
+    if not args.dry_run and not args.lambda_arn:
+        parser.error('--lambda-arn is required unless --dry-run is set')
+
+    with open(args.test_data, 'r', encoding='utf-8') as f:
+        bursts = build_bursts(json.load(f), args.max_fragments)
+
+    lambda_client = None if args.dry_run else boto3.client('lambda', region_name=args.region)
+
+    print(f"Evaluating {len(bursts)} bursts (gap={args.gap_ms}ms)")
+    print("=" * 80)
+
+    results = []
+    for window_ms in (0, args.window_ms):
+        result = evaluate_mode(bursts, lambda_client, args.lambda_arn, args.gap_ms, window_ms, args.max_wait_ms)
+        results.append(result)
+
+        label = 'coalesced' if window_ms else 'baseline'
+        print(f"\n[{label}] window={window_ms}ms")
+        print(f"  Turns per conversation:        {result['turns_per_conversation']:.2f}")
+        print(f"  Bedrock calls per conversation: {result['bedrock_calls_per_conversation']:.2f}")
+        print(f"  Added latency p50 / max:        {result['added_latency_p50_ms']}ms / {result['added_latency_max_ms']}ms")
+        if 'accuracy' in result:
+            print(f"  Intent accuracy:                {result['accuracy']:.4f}")
+            print(f"  Weighted F1:                    {result['weighted_f1']:.4f}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"\n📊 Results saved to: {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+Fault-injection test for the CRM Mock write path (transaction vs. fallback).
+
+Runs deactivate_voicemail() against moto DynamoDB and injects a fault into
+the call that carries the customer change (TransactWriteItems, or the
+customer UpdateItem on the fallback path), then retries the same request:
+
+- crash after the write (the backend applied it, the Lambda died before
+  it could finish), retried at once or after IDEMPOTENCY_LEASE_SECONDS
+- crash before the write, retried at once
+- the write throttled (an error result), retried at once
+- a backend without TransactWriteItems
+
+A "crash" is an exception the Lambda code cannot catch, like a timeout.
+Each scenario runs with CRM_TRANSACTIONS_ENABLED on and off, and checks that
+the customer record changed exactly once and that the retry succeeded.
+
+Verdicts:
+    OK         changed once, retry succeeded
+    DUPLICATE  the operation ran twice
+    BLOCKED    retry refused (claim left in progress), user has to wait
+    LOST       never applied
+    FAILED     retry returned an error
+
+Usage:
+    python evaluate_crm_faults.py
+"""
+
+import io
+import argparse
+from contextlib import redirect_stdout
+from typing import Dict, Optional
+
+from bench_utils import local_aws, load_lambda, create_chatbot_tables
+
+PHONE = '+60123456789'
+CUSTOMER_ID = 'CUST001'
+WRITE_OPERATIONS = ('TransactWriteItems', 'UpdateItem')
+
+
+class Crash(BaseException):
+    """Simulated Lambda crash or timeout (not caught by `except Exception`)."""
+
+
+class Fault:
+    """Raise `error` around the DynamoDB call that writes the customer record."""
+
+    def __init__(self, client, when: str, error: Optional[BaseException], operations=WRITE_OPERATIONS):
+        self.client = client
+        self.when = when
+        self.error = error
+        self.operations = operations
+        self.remaining = 1 if when != 'always' else None
+        self._targeted = False
+        self._handlers = []
+        for operation in operations:
+            self._register(f"before-parameter-build.dynamodb.{operation}", self._match)
+            self._register(f"before-call.dynamodb.{operation}", self._before)
+            self._register(f"after-call.dynamodb.{operation}", self._after)
+
+    def _register(self, event: str, handler) -> None:
+        self.client.meta.events.register(event, handler)
+        self._handlers.append((event, handler))
+
+    def remove(self) -> None:
+        for event, handler in self._handlers:
+            self.client.meta.events.unregister(event, handler)
+
+    def _match(self, params=None, model=None, **_):
+        self._targeted = model.name == 'TransactWriteItems' or params.get('TableName') == 'chatbot-customers'
+
+    def _fire(self, when: str) -> None:
+        if not self._targeted or self.error is None:
+            return
+        if self.when == 'always' or (self.when == when and self.remaining):
+            if self.remaining:
+                self.remaining -= 1
+            raise self.error
+
+    def _before(self, **_):
+        self._fire('before')
+
+    def _after(self, **_):
+        self._fire('after')
+
+
+def client_error(code: str, operation: str) -> BaseException:
+    from botocore.exceptions import ClientError
+
+    return ClientError({'Error': {'Code': code, 'Message': f'injected {code}'}}, operation)
+
+
+# name, when, error factory, operations to fault, lease seconds for the retry
+SCENARIOS = [
+    ('crash after write, retry at once', 'after', lambda: Crash(), None, None),
+    ('crash after write, retry after lease', 'after', lambda: Crash(), None, 0),
+    ('crash before write, retry at once', 'before', lambda: Crash(), None, None),
+    ('write throttled, retry at once', 'before',
+     lambda: client_error('ProvisionedThroughputExceededException', 'UpdateItem'), None, None),
+    ('no transaction support', 'always',
+     lambda: client_error('UnknownOperationException', 'TransactWriteItems'), ('TransactWriteItems',), None),
+]
+
+
+def outcome(result) -> str:
+    if isinstance(result, Crash):
+        return 'crash'
+    if result.get('in_progress'):
+        return 'in progress'
+    if not result.get('success'):
+        return 'error'
+    return 'cached' if result.get('idempotent') else 'ok'
+
+
+def run_scenario(dynamodb, transactions: bool, index: int, scenario) -> Dict[str, str]:
+    name, when, error, operations, lease = scenario
+    crm = load_lambda('crm-mock')
+    from chatbot_core import get_resource
+
+    crm.CRM_TRANSACTIONS_ENABLED = transactions
+    customers = dynamodb.Table('chatbot-customers')
+    customers.put_item(Item={'phone_number': PHONE, 'voicemail_active': True})
+    session_id = f"SESSION-FAULT-{int(transactions)}-{index}"
+    writes = 0
+
+    def attempt():
+        nonlocal writes
+        before = customers.get_item(Key={'phone_number': PHONE})['Item'].get('updated_at')
+        try:
+            with redirect_stdout(io.StringIO()):
+                result = crm.deactivate_voicemail(PHONE, CUSTOMER_ID, session_id)
+        except Crash as crash:
+            result = crash
+        writes += customers.get_item(Key={'phone_number': PHONE})['Item'].get('updated_at') != before
+        return result
+
+    fault = Fault(get_resource('dynamodb').meta.client, when, error(), operations or WRITE_OPERATIONS)
+    try:
+        first = attempt()
+        if lease is not None:
+            crm.IDEMPOTENCY_LEASE_SECONDS = lease
+        retry = attempt()
+    finally:
+        fault.remove()
+
+    record = dynamodb.Table('chatbot-sessions').get_item(Key=crm.idempotency_record_key(session_id, 'deactivate_voicemail'))
+    voicemail_active = customers.get_item(Key={'phone_number': PHONE})['Item']['voicemail_active']
+
+    if writes > 1:
+        verdict = 'DUPLICATE'
+    elif outcome(retry) == 'in progress':
+        verdict = 'BLOCKED'
+    elif writes == 0 or voicemail_active:
+        verdict = 'LOST'
+    else:
+        verdict = 'OK' if outcome(retry) in ('ok', 'cached') else 'FAILED'
+
+    return {
+        'first': outcome(first),
+        'retry': outcome(retry),
+        'writes': str(writes),
+        'record': record.get('Item', {}).get('status', '-'),
+        'verdict': verdict
+    }
+
+
+def main():
+    argparse.ArgumentParser(description='Inject faults into the CRM Mock write path').parse_args()
+
+    import boto3
+
+    with local_aws():
+        dynamodb = boto3.resource('dynamodb')
+        create_chatbot_tables(dynamodb)
+
+        print("=" * 100)
+        print("CRM MOCK FAULT INJECTION")
+        print("=" * 100)
+        verdicts = {}
+        for transactions in (True, False):
+            print('transaction' if transactions else 'fallback (CRM_TRANSACTIONS_ENABLED=false)')
+            print(f"  {'scenario':<38} {'first':<12} {'retry':<12} {'writes':>6}  {'record':<12} verdict")
+            for index, scenario in enumerate(SCENARIOS):
+                row = run_scenario(dynamodb, transactions, index, scenario)
+                verdicts[(transactions, scenario[0])] = row['verdict']
+                print(f"  {scenario[0]:<38} {row['first']:<12} {row['retry']:<12} {row['writes']:>6}  "
+                      f"{row['record']:<12} {row['verdict']}")
+            print()
+
+        failed = sum(1 for (transactions, _), verdict in verdicts.items() if transactions and verdict != 'OK')
+        print(f"Transaction path: {len(SCENARIOS) - failed}/{len(SCENARIOS)} scenarios OK")
+        return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
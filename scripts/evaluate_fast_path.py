@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Evaluate the NLU local fast-path classifier (NLU_FAST_PATH_THRESHOLD).
+
+Uses k-fold cross-validation over Data/nlu_training_data.json: for each fold
+the classifier is trained on the other folds and every held-out example goes
+through the same detect_intent_locally() gate as the Lambda. Examples it does
+not short-circuit are answered by Bedrock:
+
+- default: Bedrock is assumed to return the labelled intent (upper bound), so
+  the F1 change is the cost of the fast path alone
+- --lambda-arn: the deployed NLU Lambda is invoked for every example (deploy it
+  with NLU_FAST_PATH_THRESHOLD=2 so it always uses Bedrock) and its real
+  predictions and latencies are used
+
+Reports the fraction short-circuited, weighted and per-intent F1 (same metrics
+as evaluate_intent_f1.py) with and without the fast path, and the latency saved.
+
+Usage:
+    python evaluate_fast_path.py --thresholds 0.7,0.8,0.85,0.9,0.95
+    python evaluate_fast_path.py --lambda-arn chatbot-nlu-engine --region ap-southeast-5
+"""
+
+import os
+import json
+import time
+import argparse
+from typing import Dict, List, Optional, Tuple
+
+from bench_utils import REPO_ROOT, load_lambda
+from evaluate_intent_f1 import calculate_f1_score
+
+DATA_DIR = os.path.join(REPO_ROOT, 'Data')
+
+
+def labelled_examples(training_data: Dict) -> List[Tuple[str, str]]:
+    return [
+        (example, intent['intent_name'])
+        for intent in training_data['intents']
+        for field in ('examples_en', 'examples_bm', 'examples_slang')
+        for example in intent.get(field, [])
+    ]
+
+
+def bedrock_predictions(examples: List[Tuple[str, str]], lambda_arn: Optional[str], region: str) -> Tuple[List[str], List[float]]:
+    """Bedrock intent and latency (ms) per example, or the labels if no Lambda is given."""
+    if not lambda_arn:
+        return [intent for _, intent in examples], []
+
+    import boto3
+    client = boto3.client('lambda', region_name=region)
+    predictions, latencies = [], []
+    for message, _ in examples:
+        start = time.perf_counter()
+        response = client.invoke(FunctionName=lambda_arn, Payload=json.dumps({'message': message}))
+        latencies.append((time.perf_counter() - start) * 1000)
+        predictions.append(json.loads(response['Payload'].read()).get('intent', 'unclear_intent'))
+    return predictions, latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Evaluate the NLU local fast-path classifier')
+    parser.add_argument('--test-data', default=os.path.join(DATA_DIR, 'nlu_training_data.json'))
+    parser.add_argument('--folds', type=int, default=5, help='Cross-validation folds (default: 5)')
+    parser.add_argument('--thresholds', default='0.7,0.8,0.85,0.9,0.95', help='Confidence thresholds to compare')
+    parser.add_argument('--lambda-arn', help='NLU Lambda to get real Bedrock predictions and latency from')
+    parser.add_argument('--region', default='ap-southeast-5')
+    parser.add_argument('--bedrock-latency-ms', type=float, default=1200.0,
+                        help='Bedrock NLU latency assumed without --lambda-arn (default: 1200)')
+    args = parser.parse_args()
+
+    nlu = load_lambda('nlu-engine')
+    from nlu_assets import flatten_slang_dictionary, training_examples
+    from intent_classifier import IntentClassifier
+
+    with open(args.test_data, encoding='utf-8') as f:
+        training_data = json.load(f)
+    with open(os.path.join(DATA_DIR, 'slang_dictionary.json'), encoding='utf-8') as f:
+        nlu.SLANG_DICT = flatten_slang_dictionary(json.load(f))
+
+    examples = labelled_examples(training_data)
+    normalized = [nlu.normalize_slang(message) for message, _ in examples]
+    y_true = [intent for _, intent in examples]
+    bedrock, bedrock_ms = bedrock_predictions(examples, args.lambda_arn, args.region)
+    bedrock_latency = sum(bedrock_ms) / len(bedrock_ms) if bedrock_ms else args.bedrock_latency_ms
+
+    # Out-of-fold local predictions (training_examples normalizes the same way as the build)
+    all_pairs = training_examples(training_data, nlu.SlangMatcher(nlu.SLANG_DICT))
+    local: List[Optional[Tuple[str, float, float]]] = [None] * len(examples)
+    local_ms = []
+    for fold in range(args.folds):
+        model = IntentClassifier.train([pair for i, pair in enumerate(all_pairs) if i % args.folds != fold])
+        for i in range(fold, len(examples), args.folds):
+            start = time.perf_counter()
+            local[i] = model.predict(normalized[i])
+            local_ms.append((time.perf_counter() - start) * 1000)
+    local_latency = sum(local_ms) / len(local_ms)
+
+    baseline = calculate_f1_score(y_true, bedrock)
+    print("=" * 80)
+    print("NLU LOCAL FAST PATH")
+    print("=" * 80)
+    print(f"Examples: {len(examples)} ({args.folds}-fold cross-validation)")
+    print(f"Bedrock: {'invoked ' + args.lambda_arn if args.lambda_arn else 'assumed correct (upper bound)'}, "
+          f"{bedrock_latency:.0f}ms per message")
+    print(f"Local classifier: {local_latency:.3f}ms per message")
+    print(f"\nBedrock only: weighted F1 {baseline['weighted_f1']:.4f}")
+
+    print(f"\n{'Threshold':<11} {'Short-circuited':<17} {'Local precision':<17} {'Weighted F1':<13} {'Saved/msg':<10}")
+    print("-" * 80)
+    reports = {}
+    for threshold in (float(value) for value in args.thresholds.split(',')):
+        hybrid, hits, correct = [], 0, 0
+        for i, (_, intent) in enumerate(examples):
+            predicted, confidence, coverage = local[i]
+            short_circuit = (
+                predicted in nlu.NLU_FAST_PATH_INTENTS
+                and confidence >= threshold
+                and coverage >= nlu.NLU_FAST_PATH_MIN_COVERAGE
+            )
+            hits += short_circuit
+            correct += short_circuit and predicted == intent
+            hybrid.append(predicted if short_circuit else bedrock[i])
+
+        metrics = calculate_f1_score(y_true, hybrid)
+        reports[threshold] = metrics
+        fraction = hits / len(examples)
+        saved = fraction * bedrock_latency - local_latency
+        precision = correct / hits if hits else 0.0
+        print(f"{threshold:<11.2f} {fraction:>14.1%}   {precision:>14.1%}   {metrics['weighted_f1']:>11.4f}   {saved:>7.0f}ms")
+
+    current = reports.get(nlu.NLU_FAST_PATH_THRESHOLD) or reports[max(reports)]
+    print(f"\nPer-intent F1 (threshold {nlu.NLU_FAST_PATH_THRESHOLD if nlu.NLU_FAST_PATH_THRESHOLD in reports else max(reports)})")
+    print("-" * 80)
+    print(f"{'Intent':<25} {'Bedrock only':>14} {'With fast path':>16} {'Change':>10}")
+    for intent in sorted(baseline['class_metrics']):
+        before = baseline['class_metrics'][intent]['f1']
+        after = current['class_metrics'].get(intent, {}).get('f1', 0.0)
+        print(f"{intent:<25} {before:>14.4f} {after:>16.4f} {after - before:>+10.4f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -7,12 +7,24 @@ the F1 score to verify the target metric of ≥0.85.
 
 Usage:
     python evaluate_intent_f1.py --lambda-arn chatbot-nlu-engine --region ap-southeast-5
+
+Examples are sent in batches of --batch-size messages ({"messages": [...]});
+--batch-size 1 invokes the Lambda once per example.
+
+Cascade (NLU_CASCADE=true on the Lambda): --cascade-thresholds replays the
+"cascade" field of each result (first-stage intent, confidence and time,
+escalated answer and time) to report accuracy, F1, escalation rate and mean
+latency per threshold. A threshold can only be replayed up to the deployed
+NLU_CASCADE_THRESHOLD, so deploy with NLU_CASCADE_THRESHOLD=1.01 (always
+escalate) and NLU_CACHE_MAX_ENTRIES=0 for a full sweep.
+
+    python evaluate_intent_f1.py --lambda-arn chatbot-nlu-engine --cascade-thresholds 0.6,0.7,0.8,0.9
 """
 
 import json
 import boto3
 import argparse
-from typing import List, Dict, Tuple
+from typing import List, Dict, Optional, Tuple
 from collections import defaultdict
 
 
@@ -67,7 +79,77 @@ def calculate_f1_score(y_true: List[str], y_pred: List[str]) -> Dict[str, float]
     }
 
 
-def evaluate_nlu(test_data_file: str, lambda_function_name: str, region: str) -> Tuple[float, Dict]:
+def classify_examples(lambda_client, lambda_function_name: str, examples: List[str]) -> List[Dict]:
+    """
+    Classify examples with one Lambda invocation.
+
+    Returns:
+        One result per example (a single example uses the single-message event)
+    """
+    payload = {"message": examples[0]} if len(examples) == 1 else {"messages": examples}
+    response = lambda_client.invoke(
+        FunctionName=lambda_function_name,
+        InvocationType='RequestResponse',
+        Payload=json.dumps(payload)
+    )
+    result = json.loads(response['Payload'].read())
+    if 'errorMessage' in result:
+        return [result] * len(examples)
+    return [result] if len(examples) == 1 else result.get('results', [result] * len(examples))
+
+
+def report_cascade(records: List[Tuple[str, str, Dict]], thresholds: List[float]) -> Dict[str, Dict]:
+    """
+    Replay the NLU cascade decisions at other confidence thresholds.
+
+    Args:
+        records: (true intent, final intent, cascade field) per Bedrock-classified example
+        thresholds: First-stage confidence thresholds to evaluate
+
+    Returns:
+        {"0.80" or "first stage only": {"accuracy", "weighted_f1", "escalation_rate", "mean_latency_ms"}}
+    """
+    y_true = [true for true, _, _ in records]
+    rows = [('first stage only', -1.0)] + [(f'{t:.2f}', t) for t in thresholds]
+    report = {}
+
+    print("\nCascade (first-stage model, escalating below the threshold)")
+    print("-" * 80)
+    print(f"{'Threshold':<18} {'Escalated':>10} {'Accuracy':>10} {'Weighted F1':>12} {'Mean latency':>14}")
+    for label, threshold in rows:
+        y_pred, escalations, latency, missing = [], 0, 0.0, 0
+        for _, final, cascade in records:
+            escalate = threshold >= 0 and (
+                cascade['first_intent'] == 'unclear_intent' or cascade['first_confidence'] < threshold
+            )
+            if escalate and not cascade.get('escalated'):
+                missing += 1
+                continue
+            y_pred.append(final if escalate else cascade['first_intent'])
+            escalations += escalate
+            latency += cascade['first_stage_ms'] + (cascade['escalation_ms'] if escalate else 0.0)
+        if missing:
+            print(f"{label:<18} n/a: {missing} examples were not escalated by the deployed threshold")
+            continue
+
+        accuracy = sum(t == p for t, p in zip(y_true, y_pred)) / len(y_true)
+        f1 = calculate_f1_score(y_true, y_pred)['weighted_f1']
+        mean_latency = latency / len(records)
+        report[label] = {
+            'accuracy': accuracy, 'weighted_f1': f1,
+            'escalation_rate': escalations / len(records), 'mean_latency_ms': mean_latency
+        }
+        print(f"{label:<18} {escalations / len(records):>10.1%} {accuracy:>10.1%} {f1:>12.4f} {mean_latency:>12.0f}ms")
+    return report
+
+
+def evaluate_nlu(
+    test_data_file: str,
+    lambda_function_name: str,
+    region: str,
+    batch_size: int = 16,
+    cascade_thresholds: Optional[List[float]] = None
+) -> Tuple[float, Dict]:
     """
     Evaluate NLU Lambda function on test dataset.
 
@@ -75,6 +157,8 @@ def evaluate_nlu(test_data_file: str, lambda_function_name: str, region: str) ->
         test_data_file: Path to nlu_training_data.json
         lambda_function_name: Name of NLU Lambda function
         region: AWS region
+        batch_size: Examples per Lambda invocation
+        cascade_thresholds: Thresholds to replay from the results' cascade field (NLU_CASCADE)
 
     Returns:
         Tuple of (weighted_f1_score, detailed_metrics)
@@ -89,6 +173,7 @@ def evaluate_nlu(test_data_file: str, lambda_function_name: str, region: str) ->
 
     y_true = []
     y_pred = []
+    cascade_records = []
     test_count = 0
     error_count = 0
 
@@ -107,23 +192,22 @@ def evaluate_nlu(test_data_file: str, lambda_function_name: str, region: str) ->
 
         print(f"\nTesting intent '{intent_name}' with {len(examples)} examples...")
 
-        for example in examples:
-            test_count += 1
+        for start in range(0, len(examples), batch_size):
+            batch = examples[start:start + batch_size]
+            test_count += len(batch)
 
             try:
                 # Invoke NLU Lambda
-                response = lambda_client.invoke(
-                    FunctionName=lambda_function_name,
-                    InvocationType='RequestResponse',
-                    Payload=json.dumps({"message": example})
-                )
-
-                # Parse response
-                result = json.loads(response['Payload'].read())
+                results = classify_examples(lambda_client, lambda_function_name, batch)
+            except Exception as e:
+                print(f"  ❌ Lambda invocation error: {e}")
+                error_count += len(batch)
+                continue
 
+            for example, result in zip(batch, results):
                 # Check for errors
-                if 'errorMessage' in result:
-                    print(f"  ❌ Error: {result['errorMessage']}")
+                if 'errorMessage' in result or 'error' in result:
+                    print(f"  ❌ Error: {result.get('errorMessage') or result.get('error')}")
                     error_count += 1
                     continue
 
@@ -133,16 +217,14 @@ def evaluate_nlu(test_data_file: str, lambda_function_name: str, region: str) ->
                 # Record results
                 y_true.append(intent_name)
                 y_pred.append(predicted_intent)
+                if result.get('cascade'):
+                    cascade_records.append((intent_name, predicted_intent, result['cascade']))
 
                 # Show misclassifications
                 if predicted_intent != intent_name:
                     print(f"  ❌ Misclassified: '{example[:50]}...'")
                     print(f"     True: {intent_name} | Predicted: {predicted_intent} (conf: {confidence:.2f})")
 
-            except Exception as e:
-                print(f"  ❌ Lambda invocation error: {e}")
-                error_count += 1
-
     # Calculate F1 score
     print("\n" + "=" * 80)
     print(f"Total tests: {test_count} | Errors: {error_count} | Valid: {len(y_true)}")
@@ -173,6 +255,14 @@ def evaluate_nlu(test_data_file: str, lambda_function_name: str, region: str) ->
     for intent, m in sorted(metrics['class_metrics'].items(), key=lambda x: x[1]['f1']):
         print(f"{intent:<25} {m['precision']:>11.4f} {m['recall']:>11.4f} {m['f1']:>11.4f} {m['support']:>9}")
 
+    if cascade_thresholds:
+        if cascade_records:
+            print(f"\n{len(cascade_records)} of {len(y_true)} examples went through the cascade "
+                  f"(the rest were answered by the fast path or the cache)")
+            metrics['cascade'] = report_cascade(cascade_records, cascade_thresholds)
+        else:
+            print("\n⚠️  No cascade field in the results - is NLU_CASCADE=true on the Lambda?")
+
     return metrics['weighted_f1'], metrics
 
 
@@ -193,6 +283,16 @@ def main():
         default='ap-southeast-5',
         help='AWS region (default: ap-southeast-5)'
     )
+    parser.add_argument(
+        '--batch-size',
+        type=int,
+        default=16,
+        help='Examples per Lambda invocation (default: 16, 1 = one invocation per example)'
+    )
+    parser.add_argument(
+        '--cascade-thresholds',
+        help='Comma-separated first-stage confidence thresholds to replay (NLU_CASCADE, e.g. 0.6,0.7,0.8,0.9)'
+    )
     parser.add_argument(
         '--output',
         help='Output file for detailed metrics (JSON)'
@@ -206,7 +306,8 @@ def main():
         return
 
     # Evaluate
-    f1_score, metrics = evaluate_nlu(args.test_data, args.lambda_arn, args.region)
+    thresholds = [float(value) for value in args.cascade_thresholds.split(',')] if args.cascade_thresholds else None
+    f1_score, metrics = evaluate_nlu(args.test_data, args.lambda_arn, args.region, args.batch_size, thresholds)
 
     # Save detailed metrics if requested
     if args.output:
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Evaluate speculative KB retrieval (KB_SPECULATION, orchestrator/kb_speculation.py).
+
+1. Heuristic quality: looks_like_kb_query() on every labelled message of
+   Data/nlu_training_data.json - how often it fires per intent, precision
+   (speculation used) and recall (KB questions that got a head start).
+2. Turn latency: process_turn() on the same messages with KB_SPECULATION off
+   and on. NLU and the Knowledge Base are replaced by stubs with fixed
+   latencies (--nlu-ms, --kb-ms), session state and audit by no-ops, so the
+   difference is the NLU/KB overlap. Reports waste rate and time saved from
+   the KbSpeculation* metrics the orchestrator emits. Stub latencies are
+   slept at --time-scale and reported unscaled.
+
+Training labels are mapped to the orchestrator's intents (INTENT_MAP) as in
+Requirements/Final-Intent-List.md, e.g. pricing questions are
+query_voicemail_info.
+
+Usage:
+    python evaluate_kb_speculation.py --nlu-ms 600 --kb-ms 1800
+"""
+
+import io
+import os
+import json
+import time
+import argparse
+from collections import Counter, defaultdict
+from contextlib import redirect_stdout
+from typing import Any, Dict, List, Tuple
+
+from bench_utils import REPO_ROOT, load_lambda, summarize
+
+DATA_DIR = os.path.join(REPO_ROOT, 'Data')
+
+# Training label -> intent handled by the orchestrator
+INTENT_MAP = {
+    'query_voicemail_pricing': 'query_voicemail_info',
+    'check_voicemail_messages': 'query_voicemail_access',
+    'query_data_balance': 'query_data',
+    'query_hotspot_usage': 'query_data',
+    'query_roaming_info': 'query_roaming',
+}
+
+
+def labelled_examples(training_data: Dict) -> List[Tuple[str, str]]:
+    return [
+        (example, INTENT_MAP.get(intent['intent_name'], intent['intent_name']))
+        for intent in training_data['intents']
+        for field in ('examples_en', 'examples_bm', 'examples_slang')
+        for example in intent.get(field, [])
+    ]
+
+
+def evaluate_heuristic(orchestrator, examples: List[Tuple[str, str]]) -> None:
+    fired, total = Counter(), Counter()
+    for message, intent in examples:
+        total[intent] += 1
+        fired[intent] += orchestrator.looks_like_kb_query(message)
+
+    kb = orchestrator.KB_INTENTS
+    true_pos = sum(fired[i] for i in total if i in kb)
+    predicted = sum(fired.values())
+    actual = sum(total[i] for i in total if i in kb)
+    print(f"{'intent':<28} {'speculated':>12}")
+    for intent in sorted(total, key=lambda i: (i not in kb, i)):
+        marker = ' (KB)' if intent in kb else ''
+        print(f"  {intent + marker:<28} {fired[intent]:>5}/{total[intent]:<5} {fired[intent] / total[intent]:>5.0%}")
+    print(f"\nPrecision (speculation used): {true_pos / max(predicted, 1):.1%}")
+    print(f"Recall (KB questions sped up): {true_pos / max(actual, 1):.1%}\n")
+
+
+def stub_orchestrator(orchestrator, nlu_ms: float, kb_ms: float, labels: Dict[str, str], metrics: List[Dict]) -> None:
+    def invoke_nlu(message: str) -> Dict[str, Any]:
+        time.sleep(nlu_ms / 1000)
+        return {'intent': labels[message], 'confidence': 0.9, 'slots': {'language_preference': 'EN'}}
+
+    def query_knowledge_base(query: str) -> Dict[str, Any]:
+        time.sleep(kb_ms / 1000)
+        return {'output': {'text': 'Voicemail is free on all postpaid plans.'},
+                'citations': [{'retrievedReferences': [{'location': {'s3Location': {'uri': 's3://kb/KB001-x.txt'}}}]}]}
+
+    orchestrator.BEDROCK_KB_ID = 'local-kb'
+    orchestrator.invoke_nlu = invoke_nlu
+    orchestrator.query_knowledge_base = query_knowledge_base
+    orchestrator.generate_response = lambda intent, context, language='EN': 'ok'
+    orchestrator.invoke_guardrails = lambda *_: {'allowed': True, 'verified': True}
+    orchestrator.invoke_crm = lambda *_: {'success': True, 'voicemail_status': 'inactive'}
+    orchestrator.get_session_state = lambda session_id: {}
+    orchestrator.update_session_state = lambda *_, **__: None
+    orchestrator.log_audit = lambda *_: None
+    orchestrator.emit_metrics = lambda values, dimensions=None, **_: metrics.append(values)
+
+
+def run_turns(orchestrator, examples: List[Tuple[str, str]], time_scale: float) -> Dict[str, List[float]]:
+    latency = defaultdict(list)
+    for turn, (message, intent) in enumerate(examples):
+        event = {'session_id': f's{turn}', 'customer_id': 'c1', 'phone_number': '+60123456789',
+                 'message': message, 'channel': 'mobile'}
+        start = time.perf_counter()
+        orchestrator.process_turn(event)
+        kind = 'KB intents' if intent in orchestrator.KB_INTENTS else 'other intents'
+        latency[kind].append((time.perf_counter() - start) * 1000 / time_scale)
+    return latency
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Evaluate speculative KB retrieval')
+    parser.add_argument('--nlu-ms', type=float, default=600.0, help='Stub NLU latency (default: 600)')
+    parser.add_argument('--kb-ms', type=float, default=1800.0, help='Stub retrieve_and_generate latency (default: 1800)')
+    parser.add_argument('--limit', type=int, default=0, help='Only replay every n-th message (default: all)')
+    parser.add_argument('--time-scale', type=float, default=0.05,
+                        help='Fraction of the stub latency actually slept (default: 0.05)')
+    args = parser.parse_args()
+
+    orchestrator = load_lambda('orchestrator')
+    with open(os.path.join(DATA_DIR, 'nlu_training_data.json'), encoding='utf-8') as f:
+        examples = labelled_examples(json.load(f))
+
+    print("=" * 80)
+    print("SPECULATIVE KB RETRIEVAL")
+    print("=" * 80)
+    evaluate_heuristic(orchestrator, examples)
+
+    replay = examples[::args.limit] if args.limit else examples
+    metrics: List[Dict] = []
+    stub_orchestrator(orchestrator, args.nlu_ms * args.time_scale, args.kb_ms * args.time_scale, dict(replay), metrics)
+    print(f"Replaying {len(replay)} turns (NLU {args.nlu_ms:.0f}ms, KB {args.kb_ms:.0f}ms)")
+
+    results = {}
+    for enabled in (False, True):
+        orchestrator.KB_SPECULATION = enabled
+        metrics.clear()
+        with redirect_stdout(io.StringIO()):
+            results[enabled] = run_turns(orchestrator, replay, args.time_scale)
+
+    print(f"  {'':<16} {'speculation off':>18} {'speculation on':>18}")
+    for kind in ('KB intents', 'other intents'):
+        off, on = summarize(results[False][kind]), summarize(results[True][kind])
+        print(f"  {kind:<16} {off['mean_ms']:>15.0f}ms {on['mean_ms']:>15.0f}ms   (n={off['count']})")
+
+    used = sum(m['KbSpeculationUsed'][0] for m in metrics)
+    wasted = sum(m['KbSpeculationWasted'][0] for m in metrics)
+    cancelled = sum(m['KbSpeculationCancelled'][0] for m in metrics)
+    saved = [m['KbSpeculationSavedMs'][0] / args.time_scale for m in metrics if m['KbSpeculationUsed'][0]]
+    print(f"\nSpeculative requests: {used + wasted + cancelled} ({used} used, {wasted} wasted, {cancelled} cancelled)")
+    print(f"Waste rate: {wasted / max(used + wasted, 1):.1%} of started KB requests")
+    print(f"Saved per used speculation: {summarize(saved)['mean_ms']:.0f}ms mean")
+
+
+if __name__ == '__main__':
+    main()
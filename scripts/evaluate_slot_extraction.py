@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+Evaluate local slot extraction in the NLU engine (slot_extractor.py).
+
+- phone_number / security_pin: the annotated entity examples in
+  Data/nlu_training_data.json ("my PIN is {1234|security_pin}"), plus
+  combined and negative messages built from them ("pin saya 1234 nombor
+  012-345 6789", "off vm"). Reports precision and recall per slot.
+- language_preference: intent examples (examples_en -> EN, examples_bm -> BM)
+  with the language model and markers from a freshly compiled asset bundle,
+  and with the markers alone; explicit requests from the language_preference
+  entity examples. examples_slang mixes English and Malay slang and has no
+  language label, so only its EN/BM/MIXED split is shown.
+- Output size: estimated output tokens of a full-prompt reply (intent,
+  confidence, slots, reasoning) against an intent-only reply.
+
+Usage:
+    python evaluate_slot_extraction.py
+"""
+
+import os
+import re
+import json
+import argparse
+from typing import Dict, List, Optional, Tuple
+
+from bench_utils import REPO_ROOT, load_lambda
+
+DATA_DIR = os.path.join(REPO_ROOT, 'Data')
+PLACEHOLDER = re.compile(r'\{([^{}|]+)\|(\w+)\}')
+
+# Combined messages: (template, has phone, has PIN)
+COMBINED = [
+    ('pin saya {pin} nombor {phone}', True, True),
+    ('my number is {phone} and my pin is {pin}', True, True),
+    ('{pin} {phone}', True, True),
+    ('nk off vm no {phone}', True, False),
+    ('off voicemail, kod {pin}', False, True),
+]
+NEGATIVES = ['off vm', 'i want 2 lines', 'nak on voicemail skrg', 'berapa harga plan 5g', 'call me at 3pm']
+
+
+def fill(example: str) -> Tuple[str, Dict[str, str]]:
+    """Replace {value|entity} placeholders with their values."""
+    values = {}
+
+    def replace(match):
+        values[match.group(2)] = match.group(1)
+        return match.group(1)
+    return PLACEHOLDER.sub(replace, example), values
+
+
+def slot_cases(training_data: Dict, normalize_phone_number) -> List[Tuple[str, Optional[str], Optional[str]]]:
+    """(message, expected phone, expected PIN)"""
+    cases, phones, pins = [], [], []
+    for entity in training_data['entities']:
+        if entity['entity_name'] not in ('phone_number', 'security_pin'):
+            continue
+        for field in ('examples_en', 'examples_bm', 'examples_slang'):
+            for example in entity.get(field, []):
+                message, values = fill(example)
+                phone = values.get('phone_number')
+                pin = values.get('security_pin')
+                cases.append((message, normalize_phone_number(phone) if phone else None, pin))
+                if phone:
+                    phones.append(phone)
+                if pin:
+                    pins.append(pin)
+
+    # Combined messages, with the phone number also written with separators
+    for i, (template, has_phone, has_pin) in enumerate(COMBINED):
+        phone = phones[i % len(phones)]
+        pin = pins[i % len(pins)]
+        for written in (phone, f"{phone[:-7]} {phone[-7:-4]}-{phone[-4:]}"):
+            message = template.format(phone=written, pin=pin)
+            cases.append((message, normalize_phone_number(phone) if has_phone else None, pin if has_pin else None))
+    cases += [(message, None, None) for message in NEGATIVES]
+    return cases
+
+
+def precision_recall(pairs: List[Tuple[Optional[str], Optional[str]]]) -> Tuple[float, float]:
+    """Precision and recall of (expected, extracted) pairs; None means no slot."""
+    extracted = sum(1 for _, got in pairs if got)
+    expected = sum(1 for want, _ in pairs if want)
+    correct = sum(1 for want, got in pairs if want and got == want)
+    return correct / extracted if extracted else 1.0, correct / expected if expected else 1.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Evaluate local slot extraction')
+    parser.add_argument('--test-data', default=os.path.join(DATA_DIR, 'nlu_training_data.json'))
+    args = parser.parse_args()
+
+    nlu = load_lambda('nlu-engine')
+    from chatbot_core import normalize_phone_number
+    from nlu_assets import build_language_markers, build_language_model, flatten_slang_dictionary
+    from slot_extractor import SlotExtractor
+
+    with open(args.test_data, encoding='utf-8') as f:
+        training_data = json.load(f)
+    with open(os.path.join(DATA_DIR, 'slang_dictionary.json'), encoding='utf-8') as f:
+        raw_slang = json.load(f)
+    nlu.SLANG_DICT = flatten_slang_dictionary(raw_slang)
+
+    markers = build_language_markers(raw_slang, training_data)
+    extractors = {
+        'model + markers': SlotExtractor(build_language_model(raw_slang, training_data), markers),
+        'markers only': SlotExtractor(None, markers),
+    }
+    extractor = extractors['model + markers']
+
+    print("=" * 80)
+    print("LOCAL SLOT EXTRACTION")
+    print("=" * 80)
+
+    cases = slot_cases(training_data, normalize_phone_number)
+    results = [(message, phone, pin, extractor.extract(message)) for message, phone, pin in cases]
+    print(f"\nPhone number and PIN ({len(cases)} messages)")
+    print("-" * 80)
+    for slot, index in (('phone_number', 1), ('security_pin', 2)):
+        precision, recall = precision_recall([(case[index], case[3][slot]) for case in results])
+        print(f"  {slot:<15} precision {precision:6.1%}   recall {recall:6.1%}")
+    errors = [
+        (message, phone, pin, slots) for message, phone, pin, slots in results
+        if (slots['phone_number'], slots['security_pin']) != (phone, pin)
+    ]
+    for message, phone, pin, slots in errors:
+        print(f"  MISS {message!r}: expected ({phone}, {pin}), "
+              f"got ({slots['phone_number']}, {slots['security_pin']})")
+
+    examples = [
+        (example, 'EN' if field == 'examples_en' else 'BM')
+        for intent in training_data['intents']
+        for field in ('examples_en', 'examples_bm')
+        for example in intent.get(field, [])
+    ]
+    slang = [example for intent in training_data['intents'] for example in intent.get('examples_slang', [])]
+    print(f"\nLanguage ({len(examples)} EN/BM intent examples, {len(slang)} slang examples)")
+    print("-" * 80)
+    for label, candidate in extractors.items():
+        detected = [candidate.extract(message, nlu.normalize_slang(message)) for message, _ in examples]
+        accuracy = sum(slots['language_preference'] == want for slots, (_, want) in zip(detected, examples))
+        mixed = sum(slots['language'] == 'MIXED' for slots in detected)
+        split = [candidate.extract(message, nlu.normalize_slang(message))['language'] for message in slang]
+        print(f"  {label:<16} preference accuracy {accuracy / len(examples):6.1%}   "
+              f"falsely MIXED {mixed / len(examples):5.1%}   "
+              f"slang EN/BM/MIXED {split.count('EN')}/{split.count('BM')}/{split.count('MIXED')}")
+
+    requests = []
+    for entity in training_data['entities']:
+        if entity['entity_name'] == 'language_preference':
+            for field in ('examples_en', 'examples_bm', 'examples_slang'):
+                for example in entity.get(field, []):
+                    message, values = fill(example)
+                    value = values['language_preference'].lower()
+                    requests.append((message, 'EN' if value in ('en', 'english', 'bahasa inggeris') else 'BM'))
+    correct = sum(extractor.extract(message)['language_preference'] == want for message, want in requests)
+    print(f"  explicit requests {correct}/{len(requests)} honoured")
+
+    full_reply = json.dumps({
+        'intent': 'deactivate_voicemail', 'confidence': 0.92,
+        'slots': {'phone_number': '+60123456789', 'security_pin': None, 'language_preference': 'BM'},
+        'reasoning': 'The customer wants to turn off voicemail and wrote in Malay slang.'
+    })
+    intent_reply = json.dumps({'intent': 'deactivate_voicemail', 'confidence': 0.92})
+    print("\nModel output (about 4 characters per token)")
+    print("-" * 80)
+    print(f"  full prompt reply   ~{len(full_reply) / 4:.0f} tokens (maxTokens {nlu.NLU_MAX_TOKENS})")
+    print(f"  intent-only reply   ~{len(intent_reply) / 4:.0f} tokens (maxTokens {nlu.NLU_INTENT_MAX_TOKENS})")
+
+
+if __name__ == '__main__':
+    main()
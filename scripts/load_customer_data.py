@@ -2,38 +2,25 @@
 """
 Load customer data from JSON into DynamoDB with secure PIN hashing.
 
-SECURITY: NEVER store plaintext PINs. Always use PBKDF2 with salt.
+SECURITY: NEVER store plaintext PINs. PINs are stored in the versioned hash
+format of chatbot_core.pin_hash (algorithm, cost and salt in the hash), under
+PIN_HASH_POLICY (default: PBKDF2-HMAC-SHA256, 100,000 iterations).
 
 Usage:
     python load_customer_data.py --region ap-southeast-5
 """
 
 import json
+import sys
 import boto3
-import hashlib
 import os
 import argparse
 from datetime import datetime
 
-
-def hash_pin(pin: str, salt: bytes) -> str:
-    """
-    Hash PIN using PBKDF2-HMAC-SHA256 with 100,000 iterations.
-
-    Args:
-        pin: Plaintext 4-digit PIN
-        salt: Random 32-byte salt
-
-    Returns:
-        Hex-encoded hash
-    """
-    pin_hash = hashlib.pbkdf2_hmac(
-        'sha256',
-        pin.encode('utf-8'),
-        salt,
-        100000  # Iterations
-    )
-    return pin_hash.hex()
+# Shared PIN hash format from the chatbot-core layer
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, os.path.join(REPO_ROOT, 'backend', 'layers', 'chatbot-core', 'python'))
+from chatbot_core.pin_hash import PIN_HASH_POLICY, hash_pin  # noqa: E402
 
 
 def load_customers(data_file: str, table_name: str, region: str):
@@ -59,30 +46,26 @@ def load_customers(data_file: str, table_name: str, region: str):
     # Process each customer
     loaded_count = 0
     for customer in customers:
-        # Generate random salt for PIN hashing
-        salt = os.urandom(32)
-
         # Hash the PIN (NEVER store plaintext)
         plaintext_pin = customer.get('security_pin', '')
         if not plaintext_pin:
             print(f"⚠️  Warning: Customer {customer.get('customer_id')} has no PIN")
             continue
 
-        pin_hash = hash_pin(plaintext_pin, salt)
+        pin_hash = hash_pin(plaintext_pin)
 
         # Remove plaintext PIN from customer data
         del customer['security_pin']
 
-        # Add hashed PIN and salt
+        # Add hashed PIN (random salt, algorithm and cost are part of the hash)
         customer['security_pin_hash'] = pin_hash
-        customer['salt'] = salt.hex()
 
         # Add metadata
         customer['created_at'] = customer.get('created_at', datetime.utcnow().isoformat())
         customer['updated_at'] = datetime.utcnow().isoformat()
 
-        # Ensure pin_locked_until is null (not locked)
-        customer['pin_locked_until'] = None
+        # Not locked: no pin_locked_until attribute (a NULL would break the lock conditions)
+        customer.pop('pin_locked_until', None)
 
         # Insert into DynamoDB
         try:
@@ -93,7 +76,7 @@ def load_customers(data_file: str, table_name: str, region: str):
             print(f"❌ Error loading customer {customer.get('customer_id')}: {e}")
 
     print(f"\n✅ Successfully loaded {loaded_count}/{len(customers)} customers into DynamoDB table '{table_name}'")
-    print(f"⚠️  SECURITY: All PINs are hashed with PBKDF2-SHA256. Plaintext PINs are NOT stored.")
+    print(f"⚠️  SECURITY: All PINs are hashed with {PIN_HASH_POLICY}. Plaintext PINs are NOT stored.")
 
 
 def main():